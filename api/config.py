@@ -6,6 +6,8 @@ import logging
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 
+from config import DATA_DIR
+
 # Logging setup
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +29,41 @@ REDIS_DB = int(os.getenv('REDIS_DB', 0))
 
 # Worker Configuration
 MAX_WORKERS = int(os.getenv('MAX_WORKERS', 4))
+# 배치/혼합 작업에서 동시에 렌더링할 클립 수 (프로세스 풀 크기)
+CLIP_RENDER_WORKERS = max(1, int(os.getenv('CLIP_RENDER_WORKERS', 2)))
+
+# Job Queue Configuration (uvicorn 워커들이 공유하는 영속 작업 큐)
+JOB_QUEUE_ENABLED = os.getenv('JOB_QUEUE_ENABLED', 'true').lower() == 'true'
+JOB_QUEUE_DB = Path(os.getenv('JOB_QUEUE_DB', str(DATA_DIR / "job_queue.db")))
+# 렌더 워커 프로세스 수 (main.py 실행 시 함께 시작, 0이면 render_worker.py를 별도 실행)
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', 1))
+# 작업 임대 시간 - 이 시간 동안 하트비트가 없으면 다른 워커가 작업을 다시 가져감
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 60))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 2))
+# 배치 작업에서 실패한 클립 자동 재시도 횟수 (완료된 클립은 체크포인트로 건너뜀)
+BATCH_CLIP_RETRIES = int(os.getenv('BATCH_CLIP_RETRIES', 1))
+# 배치를 이 클립 수 단위로 렌더링하고, 단위 사이에 대기 중인 우선 작업(단일 클립/미리보기)을 먼저 실행
+BATCH_UNIT_CLIPS = max(1, int(os.getenv('BATCH_UNIT_CLIPS', CLIP_RENDER_WORKERS * 2)))
+# 배치 단위 사이에 끼워 실행할 우선 작업 최대 수 (배치 기아 방지)
+PREEMPT_MAX_JOBS = max(1, int(os.getenv('PREEMPT_MAX_JOBS', 4)))
+# 클라이언트(IP)별 가중치 - 예: "10.0.0.5:2,10.0.0.6:0.5" (기본 1)
+JOB_CLIENT_WEIGHTS = {
+    client.rsplit(':', 1)[0].strip(): float(client.rsplit(':', 1)[1])
+    for client in os.getenv('JOB_CLIENT_WEIGHTS', '').split(',') if ':' in client
+}
+
+# Admission Control (작업 요청 수락 제한)
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+# 예상 대기 시간이 이보다 길면 429 (초)
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv('ADMISSION_MAX_WAIT_SECONDS', 1800))
+# 메모리 사용률/디스크 여유/CPU당 부하가 한계를 넘으면 503
+ADMISSION_MAX_MEMORY_PERCENT = float(os.getenv('ADMISSION_MAX_MEMORY_PERCENT', 90))
+ADMISSION_MIN_DISK_GB = float(os.getenv('ADMISSION_MIN_DISK_GB', 5))
+ADMISSION_MAX_LOAD_PER_CPU = float(os.getenv('ADMISSION_MAX_LOAD_PER_CPU', 2.0))
+# 처리량 측정값이 없을 때 워커 하나가 초당 렌더링하는 출력 길이 (초)
+ADMISSION_DEFAULT_RENDER_SPEED = float(os.getenv('ADMISSION_DEFAULT_RENDER_SPEED', 1.0))
+# 리소스 부족 시 Retry-After (초)
+ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 30))
 
 # CORS Configuration
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*').split(',')
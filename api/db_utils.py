@@ -114,9 +114,10 @@ def create_output_video(
     effect_type: Optional[str] = None,
     subtitle_mode: Optional[str] = None,
     clip_index: Optional[int] = None,
-    processing_time: Optional[float] = None
+    processing_time: Optional[float] = None,
+    probe_metadata: bool = True
 ) -> OutputVideo:
-    """Create output video record"""
+    """Create output video record (probe_metadata=False면 미리보기처럼 메타데이터 생략)"""
     
     # Get file info
     file_size = 0
@@ -135,32 +136,22 @@ def create_output_video(
         processing_time=processing_time
     )
     
-    # Try to get video metadata with ffprobe
+    # 비디오 메타데이터 (MediaProbe 캐시 - 인코딩 시 기록된 파일은 다시 프로브하지 않음)
     try:
-        import subprocess
-        result = subprocess.run([
-            'ffprobe', '-v', 'error',
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=width,height,duration,r_frame_rate,codec_name,bit_rate',
-            '-of', 'json',
-            file_path
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
-            if data.get('streams'):
-                stream = data['streams'][0]
-                video.width = stream.get('width')
-                video.height = stream.get('height')
-                video.duration = float(stream.get('duration', 0))
-                video.codec = stream.get('codec_name')
-                video.bitrate = int(stream.get('bit_rate', 0)) if stream.get('bit_rate') else None
-                
-                # Parse FPS
-                if stream.get('r_frame_rate'):
-                    fps_parts = stream['r_frame_rate'].split('/')
-                    if len(fps_parts) == 2 and fps_parts[1] != '0':
-                        video.fps = float(fps_parts[0]) / float(fps_parts[1])
+        from media_probe import get_media_probe
+        stream = get_media_probe().get_video_stream(file_path) if probe_metadata else None
+        if stream:
+            video.width = stream.get('width')
+            video.height = stream.get('height')
+            video.duration = float(stream.get('duration', 0))
+            video.codec = stream.get('codec_name')
+            video.bitrate = int(stream.get('bit_rate', 0)) if stream.get('bit_rate') else None
+            
+            # Parse FPS
+            if stream.get('r_frame_rate'):
+                fps_parts = stream['r_frame_rate'].split('/')
+                if len(fps_parts) == 2 and fps_parts[1] != '0':
+                    video.fps = float(fps_parts[0]) / float(fps_parts[1])
     except Exception as e:
         logger.warning(f"Failed to get video metadata: {e}")
     
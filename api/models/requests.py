@@ -6,6 +6,13 @@ from pydantic import BaseModel, Field, validator
 from .validators import MediaValidator
 
 
+def validate_quality_value(v: str) -> str:
+    """렌더 품질 값 검증"""
+    if v not in ["final", "draft"]:
+        raise ValueError('quality must be either "final" or "draft"')
+    return v
+
+
 class ClipData(BaseModel):
     """개별 클립 데이터"""
     media_path: Optional[str] = Field(None, description="개별 미디어 경로 (다중 미디어 모드에서 사용)")
@@ -29,6 +36,7 @@ class ClippingRequest(ClipData):
     media_path: str = Field(..., description="미디어 파일 경로")
     template_number: int = Field(1, ge=1, le=100, description="템플릿 번호 (1-3: 일반, 11-13: 쇼츠, 21-29: TTS, 31-39: 스터디클립)")
     individual_clips: bool = Field(False, description="개별 클립 저장 여부")
+    quality: str = Field("final", description="렌더 품질 (final: 최종, draft: 타이밍/텍스트 확인용 빠른 미리보기)")
     
     @validator('media_path')
     def validate_media_path(cls, v):
@@ -37,6 +45,10 @@ class ClippingRequest(ClipData):
         if not validated_path:
             raise ValueError(f'Invalid or unauthorized media path: {v}')
         return v
+    
+    @validator('quality')
+    def validate_quality(cls, v):
+        return validate_quality_value(v)
 
 
 class BatchClippingRequest(BaseModel):
@@ -57,6 +69,7 @@ class BatchClippingRequest(BaseModel):
     intro_use_gradient: bool = Field(False, description="인트로 그라데이션 효과")
     intro_use_center_crop: bool = Field(False, description="인트로 쇼츠용 세로 꽉 채우기 (체크 시 9:16 크롭, 기본값은 1:1 정사각형)")
     intro_thumbnail_crop_mode: Optional[str] = Field("square", description="인트로 썸네일 크롭 모드: square (1:1), vertical (9:16), original (원본비율)")
+    quality: str = Field("final", description="렌더 품질 (final: 최종, draft: 타이밍/텍스트 확인용 빠른 미리보기)")
     
     @validator('media_path')
     def validate_media_path(cls, v):
@@ -74,6 +87,10 @@ class BatchClippingRequest(BaseModel):
             raise ValueError('study must be either "preview", "review", or None')
         return v
     
+    @validator('quality')
+    def validate_quality(cls, v):
+        return validate_quality_value(v)
+    
     @validator('clips')
     def validate_clips(cls, v, values):
         """클립 검증 - 단일 미디어 모드와 다중 미디어 모드 확인"""
@@ -152,6 +169,7 @@ class MixedTemplateRequest(BaseModel):
     title_1: Optional[str] = Field(None, description="결합 비디오 타이틀 첫 번째 줄")
     title_2: Optional[str] = Field(None, description="결합 비디오 타이틀 두 번째 줄")
     transitions: bool = Field(False, description="트랜지션 효과 사용 여부")
+    quality: str = Field("final", description="렌더 품질 (final: 최종, draft: 타이밍/텍스트 확인용 빠른 미리보기)")
     
     @validator('media_path')
     def validate_media_path(cls, v):
@@ -159,6 +177,10 @@ class MixedTemplateRequest(BaseModel):
         if not validated_path:
             raise ValueError(f'Invalid or unauthorized media path: {v}')
         return v
+    
+    @validator('quality')
+    def validate_quality(cls, v):
+        return validate_quality_value(v)
 
 
 class ExtractRangeRequest(BaseModel):
@@ -166,7 +188,7 @@ class ExtractRangeRequest(BaseModel):
     media_path: str = Field(..., description="미디어 파일 경로")
     start_time: float = Field(..., ge=0, description="전체 구간 시작 시간")
     end_time: float = Field(..., gt=0, description="전체 구간 종료 시간")
-    subtitles: List[SubtitleInfo] = Field(..., description="구간 내 자막들의 타이밍 정보")
+    subtitles: List[SubtitleInfo] = Field(..., description="구간 내 자막들의 타이밍 정보 (빈 목록이면 미디어 옆 <이름>_translated.json에서 조회)")
     template_number: int = Field(0, description="템플릿 번호 (0: 원본 스타일)")
     title_1: Optional[str] = Field(None, description="타이틀 첫 번째 줄")
     title_2: Optional[str] = Field(None, description="타이틀 두 번째 줄")
@@ -10,6 +10,8 @@ class ClippingResponse(BaseModel):
     job_id: str
     status: str
     message: str
+    estimated_wait_seconds: Optional[float] = None  # 렌더링 시작까지 예상 대기 시간
+    estimated_start_at: Optional[str] = None
 
 
 class JobStatus(BaseModel):
@@ -13,6 +13,8 @@ from database import (
     get_statistics, get_recent_jobs, search_jobs, get_job_by_id,
     delete_job, delete_jobs_bulk, cleanup_old_jobs
 )
+from tts_cache import get_tts_cache
+from subtitle_store import get_subtitle_store
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 logger = logging.getLogger(__name__)
@@ -25,6 +27,20 @@ async def get_admin_statistics():
     return get_statistics()
 
 
+@router.get("/tts-cache",
+            summary="TTS 캐시 통계 조회")
+async def get_tts_cache_stats():
+    """TTS 오디오 캐시의 항목 수, 용량, 적중률을 조회합니다."""
+    return get_tts_cache().get_stats()
+
+
+@router.get("/subtitle-store",
+            summary="자막 저장소 통계 조회")
+async def get_subtitle_store_stats():
+    """자막 변형 생성/재사용 횟수와 현재 파일 수를 조회합니다."""
+    return get_subtitle_store().get_stats()
+
+
 @router.get("/jobs/recent",
             summary="최근 작업 목록 조회")
 async def get_recent_jobs_api(limit: int = 50):
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import json
 import logging
 import uuid
@@ -12,12 +13,18 @@ from pydantic import BaseModel, Field, validator
 # Update imports to use proper paths
 from api.models import BatchClippingRequest, ClippingResponse, ClipData
 from api.models.validators import MediaValidator
-from api.config import OUTPUT_DIR, executor, TEMPLATE_MAPPING
+from api.config import OUTPUT_DIR, executor, TEMPLATE_MAPPING, BATCH_CLIP_RETRIES, BATCH_UNIT_CLIPS
 from api.utils import (
     generate_blank_text, 
-    update_job_status_both
+    update_job_status_both,
+    get_job_status
 )
 from api.utils.id_generator import get_next_folder_id
+from api.utils.job_queue import submit_job
+from api.utils.admission import check_admission
+from api.utils.batch_checkpoint import BatchCheckpoint
+from api.utils.render_pool import render_clips
+from api.utils.intro_generator import IntroSpec, generate_intro, get_intro_tts_requests
 from api.db_utils import (
     get_client_info
 )
@@ -27,9 +34,11 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from video_encoder import VideoEncoder
-from template_video_encoder import TemplateVideoEncoder
 from review_clip_generator import ReviewClipGenerator
 from enhanced_batch_renderer import EnhancedBatchRenderer
+from render_worker import yield_to_priority_jobs
+from tts_cache import schedule_prefetch
+from ffmpeg_progress import with_job_context
 # DB imports 비활성화
 
 router = APIRouter(prefix="/api", tags=["Clipping"])
@@ -76,6 +85,10 @@ async def create_batch_clips(
     # API 요청 로깅
     request_start_time = time.time()
     client_info = get_client_info(req)
+    
+    # 수락 여부 확인 (대기열/리소스 한계 초과 시 429/503 + Retry-After)
+    admission = await asyncio.to_thread(check_admission, "batch_clip", request, client_info["ip"])
+    
     logger.info(f"[Job {job_id}] Batch request - Type: {request.template_number}, Clips: {len(request.clips)}")
     
     # 타이틀 정보 로깅
@@ -102,19 +115,21 @@ async def create_batch_clips(
     
     # DB 저장 비활성화
     
-    # 백그라운드 작업 시작
-    background_tasks.add_task(
-        process_batch_clipping,
-        job_id,
-        request
-    )
+    # 작업 큐에 제출 (렌더 워커에서 실행)
+    submit_job(background_tasks, job_id, "batch_clip", process_batch_clipping, request, job_data,
+               client_id=client_info["ip"])
+    
+    # 인트로/학습 클립 TTS를 미리 합성 (앞선 비디오 인코딩과 겹쳐서 진행, 결과는 TTS 캐시에서 사용)
+    prefetch_batch_tts(request)
     
     # API 응답 로깅
     response_time_ms = int((time.time() - request_start_time) * 1000)
     response = ClippingResponse(
         job_id=job_id,
         status="accepted",
-        message=f"배치 클리핑 작업이 시작되었습니다. (총 {len(request.clips)}개)"
+        message=f"배치 클리핑 작업이 시작되었습니다. (총 {len(request.clips)}개)",
+        estimated_wait_seconds=admission.wait_seconds,
+        estimated_start_at=admission.start_at
     )
     
     # API 응답 업데이트 - DB 저장 비활성화
@@ -122,6 +137,24 @@ async def create_batch_clips(
     return response
 
 
+def prefetch_batch_tts(request: BatchClippingRequest):
+    """배치 작업에서 사용할 인트로/학습 클립 TTS 미리 합성 시작"""
+    tts_requests = []
+    if request.include_intro and request.intro_header_text:
+        tts_requests += get_intro_tts_requests(IntroSpec(
+            header_text=request.intro_header_text,
+            korean_text=request.intro_korean_text or "",
+            explanation=request.intro_explanation or ""
+        ))
+    if request.study:
+        tts_generator = ReviewClipGenerator().tts_generator
+        tts_requests += [tts_generator.make_request(clip.text_eng) for clip in request.clips if clip.text_eng]
+    try:
+        schedule_prefetch([r for r in tts_requests if r.text.strip()])
+    except Exception as e:
+        logger.warning(f"TTS prefetch not started: {e}")
+
+
 async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
     """배치 비디오 클리핑 처리"""
     try:
@@ -144,11 +177,17 @@ async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
         daily_dir = OUTPUT_DIR / date_str
         daily_dir.mkdir(exist_ok=True)
         
-        # job_status에서 folder_id 가져오기
+        # job_status에서 folder_id 가져오기 (재개 시에는 처음 실행한 디렉토리 사용)
         from api.utils.job_management import job_status
         folder_id = job_status.get(job_id, {}).get('folder_id', job_id)
-        job_dir = daily_dir / folder_id
-        job_dir.mkdir(exist_ok=True)
+        job_dir = Path(job_status.get(job_id, {}).get('job_dir') or daily_dir / folder_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        job_status[job_id]["job_dir"] = str(job_dir)
+        update_job_status_both(job_id, "processing", 5)  # 재시작 후 자동 재개를 위해 job_dir 공유 저장
+        
+        # 클립별 체크포인트 (재개 시 완료된 클립은 다시 렌더링하지 않음)
+        checkpoint = BatchCheckpoint(job_dir)
+        checkpoint.set_request(request.dict())
         
         output_files = []
         review_clip_path = None
@@ -156,58 +195,37 @@ async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
         
         # 인트로 비디오 생성 (include_intro가 True인 경우)
         if request.include_intro and request.intro_header_text:
-            logger.info(f"[Job {job_id}] Creating intro video using HTTP API...")
+            logger.info(f"[Job {job_id}] Creating intro video...")
             job_status[job_id]["progress"] = 3
             job_status[job_id]["message"] = "인트로 비디오 생성 중..."
             
             try:
-                import httpx
-                
                 # 비디오 포맷 결정 (템플릿에 따라)
                 is_shorts = request.template_number in [11, 12, 13]
-                video_format = "shorts" if is_shorts else "youtube"
-                
-                # 인트로 API 요청 데이터 구성
-                intro_api_data = {
-                    "projectId": job_id,
-                    "headerText": request.intro_header_text,
-                    "koreanText": request.intro_korean_text,
-                    "explanation": request.intro_explanation or "",
-                    "template": "fade_in",
-                    "format": video_format,
-                    "useDarken": request.intro_use_darken,
-                    "useGradient": request.intro_use_gradient,
-                    "useCenterCrop": request.intro_use_center_crop,
-                    "thumbnailCropMode": getattr(request, 'intro_thumbnail_crop_mode', 'square')
-                }
+                intro_spec = IntroSpec(
+                    header_text=request.intro_header_text,
+                    korean_text=request.intro_korean_text,
+                    explanation=request.intro_explanation or "",
+                    video_format="shorts" if is_shorts else "youtube",
+                    use_darken=request.intro_use_darken,
+                    use_gradient=request.intro_use_gradient,
+                    use_center_crop=request.intro_use_center_crop,
+                    thumbnail_crop_mode=request.intro_thumbnail_crop_mode or "square"
+                )
                 
-                # firstSentenceMediaInfo 추가 (배경 이미지용)
-                if request.clips and request.intro_use_blur:
+                # 첫 번째 문장의 미디어에서 배경 프레임
+                if request.clips:
                     first_clip_media = request.clips[0].media_path or base_media_path
                     if first_clip_media:
                         validated_media = MediaValidator.validate_media_path(first_clip_media)
                         if validated_media:
-                            intro_api_data["firstSentenceMediaInfo"] = {
-                                "mediaPath": str(validated_media),
-                                "startTime": request.clips[0].start_time
-                            }
-                
-                # HTTP API 호출
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        "http://localhost:8080/api/intro-videos",
-                        json=intro_api_data,
-                        timeout=120.0  # 2분 타임아웃
-                    )
+                            intro_spec.background_media = str(validated_media)
+                            intro_spec.background_time = request.clips[0].start_time
                 
-                if response.status_code == 200:
-                    intro_result = response.json()
-                    if intro_result and intro_result.get("video"):
-                        intro_video_info = intro_result["video"]
-                        intro_clip_path = Path(intro_video_info["videoFilePath"])
-                        logger.info(f"[Job {job_id}] Intro video created: {intro_clip_path}")
-                else:
-                    logger.error(f"[Job {job_id}] Intro API error: {response.status_code} - {response.text}")
+                # 같은 인트로는 캐시에서 링크만 함
+                intro_video_info = await generate_intro(intro_spec, job_dir / "intro")
+                intro_clip_path = Path(intro_video_info["videoFilePath"])
+                logger.info(f"[Job {job_id}] Intro video created: {intro_clip_path}")
                 
             except Exception as e:
                 logger.error(f"[Job {job_id}] Intro video creation error: {e}")
@@ -230,41 +248,55 @@ async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
                 })
                 clip_timestamps.append((clip_data.start_time, clip_data.end_time))
             
-            # 리뷰 클립 파일명
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            review_filename = f"{timestamp}_tp_{request.template_number}_review.mp4"
-            review_clip_path = job_dir / review_filename
-            
-            # 간단한 리뷰 클립 생성
-            review_generator = ReviewClipGenerator()
+            # 리뷰 클립은 문장/모드에만 의존 - 편집으로 바뀌지 않았으면 이전 결과 재사용
+            review_key = checkpoint.inputs_key([request.study, request.template_number,
+                                                clips_data_for_review])
+            reused_review = checkpoint.get_artifact("review", review_key)
             
-            try:
-                # 모드에 따른 타이틀 텍스트 결정
-                review_title = "스피드 미리보기" if request.study == "preview" else "스피드 복습"
+            if reused_review:
+                review_clip_path = Path(reused_review)
+                review_data = {
+                    "file": str(review_clip_path),
+                    "description": f"{mode_text} 클립"
+                }
+                logger.info(f"[Job {job_id}] Study clip unchanged, reusing: {review_clip_path}")
+            else:
+                # 리뷰 클립 파일명
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                review_filename = f"{timestamp}_tp_{request.template_number}_review.mp4"
+                review_clip_path = job_dir / review_filename
                 
-                success = await review_generator.create_review_clip(
-                    clips_data=clips_data_for_review,
-                    output_path=str(review_clip_path),
-                    title_text=review_title,
-                    is_preview=(request.study == "preview")
-                )
+                # 간단한 리뷰 클립 생성
+                review_generator = ReviewClipGenerator()
                 
-                if success:
-                    logger.info(f"[Job {job_id}] Study clip created: {review_clip_path}")
-                    review_data = {
-                        "file": str(review_clip_path),
-                        "description": f"{mode_text} 클립"
-                    }
-                else:
-                    logger.error(f"[Job {job_id}] Study clip creation failed")
-            except Exception as e:
-                logger.error(f"[Job {job_id}] Study clip error: {e}")
+                try:
+                    # 모드에 따른 타이틀 텍스트 결정
+                    review_title = "스피드 미리보기" if request.study == "preview" else "스피드 복습"
+                    
+                    success = await review_generator.create_review_clip(
+                        clips_data=clips_data_for_review,
+                        output_path=str(review_clip_path),
+                        title_text=review_title,
+                        is_preview=(request.study == "preview")
+                    )
+                    
+                    if success:
+                        logger.info(f"[Job {job_id}] Study clip created: {review_clip_path}")
+                        review_data = {
+                            "file": str(review_clip_path),
+                            "description": f"{mode_text} 클립"
+                        }
+                        checkpoint.mark_artifact("review", review_key, review_clip_path)
+                    else:
+                        logger.error(f"[Job {job_id}] Study clip creation failed")
+                except Exception as e:
+                    logger.error(f"[Job {job_id}] Study clip error: {e}")
         
-        # 개별 클립 처리
+        # 개별 클립 렌더 작업 준비 (렌더링은 프로세스 풀에서 병렬 실행)
+        render_jobs = []
+        render_outputs = []
+        clip_results = []
         for clip_num, clip_data in enumerate(request.clips, 1):
-            job_status[job_id]["progress"] = 10 + int(80 * (clip_num - 1) / len(request.clips))
-            job_status[job_id]["message"] = f"클립 {clip_num}/{len(request.clips)} 처리 중..."
-            
             # 각 클립을 위한 디렉토리 생성
             clip_dir = job_dir / f"clip_{clip_num:03d}"
             clip_dir.mkdir(exist_ok=True)
@@ -325,9 +357,6 @@ async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
             filename = f"{timestamp}_tp_{request.template_number}_c{clip_num:03d}.mp4"
             output_path = clip_dir / filename
             
-            # 템플릿 기반 인코더 사용
-            template_encoder = TemplateVideoEncoder()
-            
             # 템플릿 이름 결정
             if request.template_number in TEMPLATE_MAPPING:
                 template_name = TEMPLATE_MAPPING[request.template_number]
@@ -346,32 +375,79 @@ async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
             if not validated_media_path:
                 raise ValueError(f"Invalid media path for clip {clip_num}: {clip_media_path}")
             
-            # 템플릿을 사용하여 비디오 생성
-            success = template_encoder.create_from_template(
-                template_name=template_name,
-                media_path=str(validated_media_path),
-                subtitle_data=subtitle_data,
-                output_path=str(output_path),
-                start_time=clip_data.start_time,
-                end_time=clip_data.end_time,
-                padding_before=0.5,
-                padding_after=0.5
-            )
+            render_job = {
+                "template_name": template_name,
+                "media_path": str(validated_media_path),
+                "subtitle_data": subtitle_data,
+                "output_path": str(output_path),
+                "start_time": clip_data.start_time,
+                "end_time": clip_data.end_time,
+                "padding_before": 0.5,
+                "padding_after": 0.5,
+                "quality": request.quality,
+                # 변형별 산출물 유지 (편집 시 바뀐 변형만 다시 렌더링)
+                "variant_dir": str(clip_dir / "variants")
+            }
+            clip_key = checkpoint.clip_key(render_job)
+            done_output = checkpoint.get_done_output(clip_key)
+            if done_output:
+                # 이전 실행에서 같은 입력으로 완료된 클립 재사용
+                output_path = Path(done_output)
+            render_jobs.append(render_job)
+            render_outputs.append((clip_num, clip_data, output_path, clip_key))
+            clip_results.append(bool(done_output))
+        
+        completed = sum(clip_results)
+        pending = [i for i, done in enumerate(clip_results) if not done]
+        if completed:
+            logger.info(f"[Job {job_id}] Resuming: {completed} clips from checkpoint, {len(pending)} to render")
+        job_status[job_id]["message"] = f"클립 {len(pending)}개 병렬 처리 중..."
+        
+        # 실패한 클립만 자동 재시도
+        for attempt in range(1 + BATCH_CLIP_RETRIES):
+            if not pending:
+                break
+            if attempt > 0:
+                logger.warning(f"[Job {job_id}] Retrying failed clips {[render_outputs[i][0] for i in pending]} (retry {attempt})")
             
-            if success:
-                output_files.append({
-                    "clip_number": clip_num,
-                    "file": str(output_path.relative_to(OUTPUT_DIR.parent)),
-                    "text_eng": clip_data.text_eng,
-                    "text_kor": clip_data.text_kor
-                })
-                job_status[job_id]["completed_clips"] = clip_num
-                
-                # DB 저장 비활성화
-            else:
-                raise Exception(f"클립 {clip_num} 생성 실패")
+            def on_clip_done(index: int, success: bool, unit=None):
+                nonlocal completed
+                i = unit[index]
+                clip_num, _, output_path, clip_key = render_outputs[i]
+                if not success:
+                    checkpoint.mark_failed(clip_key, clip_num, output_path)
+                    return
+                for stale_output in checkpoint.mark_done(clip_key, clip_num, output_path):
+                    # 편집 전 버전의 클립 출력 정리
+                    Path(stale_output).unlink(missing_ok=True)
+                clip_results[i] = True
+                completed += 1
+                job_status[job_id]["progress"] = 10 + int(80 * completed / len(render_jobs))
+                job_status[job_id]["message"] = f"클립 {completed}/{len(render_jobs)} 완료"
+                job_status[job_id]["completed_clips"] = completed
             
-            # DB 저장 비활성화
+            # 클립 단위로 나눠 렌더링 - 단위 사이에 대기 중인 단일 클립/미리보기 작업을 먼저 실행
+            for unit_start in range(0, len(pending), BATCH_UNIT_CLIPS):
+                if unit_start:
+                    await yield_to_priority_jobs(job_id)
+                unit = pending[unit_start:unit_start + BATCH_UNIT_CLIPS]
+                await render_clips([render_jobs[i] for i in unit],
+                                   functools.partial(on_clip_done, unit=unit))
+            pending = [i for i in pending if not clip_results[i]]
+        
+        if pending:
+            failed_clips = [render_outputs[i][0] for i in pending]
+            job_status[job_id]["failed_clips"] = failed_clips
+            raise Exception(f"클립 {failed_clips} 생성 실패 (완료된 클립은 보존됨, 재개 가능)")
+        
+        # 결과는 요청 순서대로 정리
+        for clip_num, clip_data, output_path, _ in render_outputs:
+            output_files.append({
+                "clip_number": clip_num,
+                "file": str(output_path.relative_to(OUTPUT_DIR.parent)),
+                "text_eng": clip_data.text_eng,
+                "text_kor": clip_data.text_kor
+            })
         
         # study 모드인 경우 preview는 처음에, review는 마지막에 추가
         if review_clip_path and review_clip_path.exists():
@@ -430,16 +506,30 @@ async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
             
             logger.info(f"[Job {job_id}] === 총 {len(video_files)}개 비디오 병합 예정 ===")
             
-            # 배치 비디오 생성
-            loop = asyncio.get_event_loop()
-            success = await loop.run_in_executor(
-                executor,
-                batch_renderer.create_batch_video,
-                video_files,
-                str(batch_output_path),
-                request.title_1,
-                request.title_2
-            )
+            # 병합할 파일과 타이틀이 그대로면 이전 배치 비디오 재사용 (바뀐 클립이 없는 편집/재개)
+            merge_key = checkpoint.inputs_key([[checkpoint.file_identity(f) for f in video_files],
+                                               request.title_1, request.title_2, request.quality])
+            reused_batch = checkpoint.get_artifact("batch", merge_key)
+            if reused_batch:
+                batch_output_path = Path(reused_batch)
+                success = True
+                logger.info(f"[Job {job_id}] Batch inputs unchanged, reusing: {batch_output_path}")
+            else:
+                # 배치 비디오 생성
+                loop = asyncio.get_event_loop()
+                success = await loop.run_in_executor(
+                    executor,
+                    with_job_context(
+                        batch_renderer.create_batch_video,
+                        video_files,
+                        str(batch_output_path),
+                        request.title_1,
+                        request.title_2,
+                        request.quality
+                    )
+                )
+                if success and batch_output_path.exists():
+                    checkpoint.mark_artifact("batch", merge_key, batch_output_path)
             
             if success and batch_output_path.exists():
                 output_files.append({
@@ -453,6 +543,13 @@ async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
                 # DB 저장 비활성화
         
         # 작업 완료
+        # 편집/재개 전 결과 중 더 이상 쓰이지 않는 파일 정리 (작업 디렉토리 안의 파일만)
+        current_files = {f["file"] for f in output_files}
+        for previous in job_status[job_id].get("output_files") or []:
+            previous_path = OUTPUT_DIR.parent / previous["file"]
+            if previous["file"] not in current_files and job_dir in previous_path.parents:
+                previous_path.unlink(missing_ok=True)
+
         # output_files를 먼저 설정
         job_status[job_id]["output_files"] = output_files
         
@@ -481,6 +578,112 @@ async def process_batch_clipping(job_id: str, request: BatchClippingRequest):
         # DB 업데이트 비활성화
 
 
+@router.post("/clip/batch/{job_id}/resume",
+             response_model=ClippingResponse,
+             summary="실패/중단된 배치 작업 재개")
+async def resume_batch_clips(job_id: str, background_tasks: BackgroundTasks):
+    """
+    실패했거나 서버 재시작으로 중단된 배치 작업을 재개합니다.
+    체크포인트에 완료로 기록된 클립은 건너뛰고 누락/실패한 클립만 다시 렌더링한 뒤 병합합니다.
+    """
+    state = get_job_status(job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if state.get("status") in ("pending", "accepted", "processing"):
+        raise HTTPException(status_code=409, detail="작업이 아직 진행 중입니다.")
+    
+    checkpoint = BatchCheckpoint(Path(state["job_dir"])) if state.get("job_dir") else None
+    if not checkpoint or not checkpoint.request:
+        raise HTTPException(status_code=404, detail="재개할 체크포인트가 없습니다.")
+    
+    request = BatchClippingRequest(**checkpoint.request)
+    admission = await asyncio.to_thread(check_admission, "batch_clip", request)
+    
+    from api.utils.job_management import job_status
+    job_data = dict(state)
+    job_data.update({
+        "job_id": job_id,
+        "status": "accepted",
+        "message": "배치 클리핑 작업을 재개합니다.",
+        "error": None,
+        "failed_clips": None
+    })
+    job_status[job_id] = job_data
+    
+    submit_job(background_tasks, job_id, "batch_clip", process_batch_clipping, request, job_data,
+               requeue=True)
+    logger.info(f"[Job {job_id}] Batch resume requested (failed clips: {state.get('failed_clips')})")
+    
+    return ClippingResponse(
+        job_id=job_id,
+        status="accepted",
+        message="배치 클리핑 작업을 재개합니다.",
+        estimated_wait_seconds=admission.wait_seconds,
+        estimated_start_at=admission.start_at
+    )
+
+
+# 모든 클립의 렌더 결과에 영향을 주는 배치 공통 필드
+BATCH_SHARED_RENDER_FIELDS = ('media_path', 'template_number', 'title_1', 'title_2', 'title_3', 'quality')
+
+
+def _diff_batch_requests(old: dict, new: dict) -> List[int]:
+    """이전 요청과 비교해 바뀐 클립 번호 (1부터)"""
+    if any(old.get(field) != new.get(field) for field in BATCH_SHARED_RENDER_FIELDS):
+        return list(range(1, len(new['clips']) + 1))
+    old_clips = old.get('clips') or []
+    return [clip_num for clip_num, clip in enumerate(new['clips'], 1)
+            if clip_num > len(old_clips) or old_clips[clip_num - 1] != clip]
+
+
+@router.post("/clip/batch/{job_id}/edit",
+             response_model=ClippingResponse,
+             summary="완료된 배치 작업 편집 후 부분 재렌더링")
+async def edit_batch_clips(job_id: str, request: BatchClippingRequest, background_tasks: BackgroundTasks):
+    """
+    완료된 배치 작업을 수정된 요청으로 다시 만듭니다.
+    체크포인트(매니페스트)와 비교해 입력이 바뀐 클립만, 그 안에서도 바뀐 자막 변형만
+    다시 렌더링합니다. 리뷰 클립과 배치 병합은 입력(문장, 병합할 파일)이 바뀐 경우에만 다시 만듭니다.
+    """
+    state = get_job_status(job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if state.get("status") in ("pending", "accepted", "processing"):
+        raise HTTPException(status_code=409, detail="작업이 아직 진행 중입니다.")
+    
+    checkpoint = BatchCheckpoint(Path(state["job_dir"])) if state.get("job_dir") else None
+    if not checkpoint or not checkpoint.request:
+        raise HTTPException(status_code=404, detail="편집할 배치 매니페스트가 없습니다.")
+    
+    changed_clips = _diff_batch_requests(checkpoint.request, request.dict())
+    # 다시 렌더링하는 클립만으로 예상 렌더링 양 계산
+    admission = await asyncio.to_thread(check_admission, "batch_clip", request, None, changed_clips)
+    
+    from api.utils.job_management import job_status
+    job_data = dict(state)
+    job_data.update({
+        "job_id": job_id,
+        "status": "accepted",
+        "message": f"배치 편집: 클립 {len(changed_clips)}개 다시 렌더링",
+        "error": None,
+        "failed_clips": None,
+        "edited_clips": changed_clips
+    })
+    job_status[job_id] = job_data
+    
+    submit_job(background_tasks, job_id, "batch_clip", process_batch_clipping, request, job_data,
+               requeue=True, clip_numbers=changed_clips)
+    logger.info(f"[Job {job_id}] Batch edit requested, changed clips: {changed_clips}")
+    
+    return ClippingResponse(
+        job_id=job_id,
+        status="accepted",
+        message=f"배치 편집: 클립 {len(changed_clips)}개 다시 렌더링",
+        estimated_wait_seconds=admission.wait_seconds,
+        estimated_start_at=admission.start_at
+    )
+
+
 def _get_subtitle_mode(template_number: int) -> str:
     """템플릿 번호로 자막 모드 추측"""
     if template_number == 1:
@@ -4,6 +4,7 @@ Single Clip Routes
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
 from typing import Optional
 import uuid
+import asyncio
 import logging
 import json
 import time
@@ -20,6 +21,8 @@ from api.utils import (
     active_processes
 )
 from api.utils.id_generator import get_next_folder_id
+from api.utils.job_queue import submit_job
+from api.utils.admission import check_admission
 from api.db_utils import (
     create_job_in_db,
     create_media_source,
@@ -63,6 +66,7 @@ async def create_clip(
     - **keywords**: 키워드 리스트 (선택)
     - **template_number**: 1 (기본), 2 (키워드 블랭크), 또는 3 (점진적 학습)
     - **individual_clips**: 개별 클립 저장 여부
+    - **quality**: final (기본) 또는 draft (축소 해상도 빠른 미리보기, 개별 클립 생략)
     """
     # Job ID는 여전히 UUID 사용 (DB 키로 사용)
     job_id = str(uuid.uuid4())
@@ -80,6 +84,9 @@ async def create_clip(
     # 클라이언트 정보 추출
     client_info = get_client_info(req)
     
+    # 수락 여부 확인 (대기열/리소스 한계 초과 시 429/503 + Retry-After)
+    admission = await asyncio.to_thread(check_admission, "single_clip", request, client_info["ip"])
+    
     # 작업 상태 초기화
     job_data = {
         "status": "pending",
@@ -135,19 +142,18 @@ async def create_clip(
         except Exception as e2:
             logger.error(f"Failed to save job to old DB: {e2}")
     
-    # 백그라운드 작업 시작
-    background_tasks.add_task(
-        process_clipping,
-        job_id,
-        request
-    )
+    # 작업 큐에 제출 (렌더 워커에서 실행)
+    submit_job(background_tasks, job_id, "single_clip", process_clipping, request, job_data,
+               client_id=client_info["ip"])
     
     # API 응답 로깅
     response_time_ms = int((time.time() - request_start_time) * 1000)
     response = ClippingResponse(
         job_id=job_id,
         status="accepted",
-        message="클리핑 작업이 시작되었습니다."
+        message="클리핑 작업이 시작되었습니다.",
+        estimated_wait_seconds=admission.wait_seconds,
+        estimated_start_at=admission.start_at
     )
     
     # API 응답 업데이트
@@ -275,6 +281,9 @@ async def process_clipping(job_id: str, request: ClippingRequest):
         # 템플릿 기반 인코더 사용
         template_encoder = TemplateVideoEncoder()
         
+        # 미리보기는 개별 클립/출력 메타데이터 프로브 생략
+        is_draft = request.quality == "draft"
+        
         # 날짜시간_tp_X.mp4 형식의 파일명 생성
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{timestamp}_tp_{request.template_number}.mp4"
@@ -298,7 +307,8 @@ async def process_clipping(job_id: str, request: ClippingRequest):
             end_time=request.end_time,
             padding_before=0.5,
             padding_after=0.5,
-            save_individual_clips=request.individual_clips
+            save_individual_clips=request.individual_clips and not is_draft,
+            quality=request.quality
         )
         
         if success:
@@ -312,7 +322,8 @@ async def process_clipping(job_id: str, request: ClippingRequest):
                     video_type="main",
                     file_path=str(output_path),
                     subtitle_mode=_get_subtitle_mode(request.template_number),
-                    processing_time=None  # 나중에 추가 가능
+                    processing_time=None,  # 나중에 추가 가능
+                    probe_metadata=not is_draft
                 )
                 
                 update_job_status_db(session, job_id, "processing", 90, "클리핑 완료, 파일 정리 중...")
@@ -320,7 +331,7 @@ async def process_clipping(job_id: str, request: ClippingRequest):
             
             # 개별 클립 찾기 및 DB 저장
             individual_clips = None
-            if request.individual_clips:
+            if request.individual_clips and not is_draft:
                 clips_dir = job_dir / "individual_clips"
                 if clips_dir.exists():
                     clips = list(clips_dir.glob("*.mp4"))
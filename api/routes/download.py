@@ -3,19 +3,16 @@ Download Routes
 """
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse, StreamingResponse
+import asyncio
 import logging
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 from api.models import JobStatus
-from api.utils import job_status
+from api.utils import get_job_status
 from api.config import OUTPUT_DIR
 
-# Import database functions from parent directory
-import sys
-sys.path.append(str(Path(__file__).parent.parent.parent))
-from database import get_job_by_id
-
 router = APIRouter(prefix="/api", tags=["Download"])
 logger = logging.getLogger(__name__)
 
@@ -24,23 +21,10 @@ logger = logging.getLogger(__name__)
             summary="클립 다운로드")
 async def download_clip(job_id: str):
     """생성된 클립을 다운로드합니다."""
-    # Check memory first (current worker)
-    output_file = None
-    status = None
-    
-    if job_id in job_status:
-        status = job_status[job_id]["status"]
-        output_file = job_status[job_id].get("output_file")
-        
-    # If not found in memory, check database
-    if not output_file:
-        try:
-            db_job = get_job_by_id(job_id)
-            if db_job:
-                status = db_job.get('status')
-                output_file = db_job.get('output_file')
-        except Exception as e:
-            logger.warning(f"Database lookup failed for job {job_id}: {e}")
+    # 렌더 워커가 갱신하는 공유 상태 (API 프로세스의 메모리 상태는 제출 시점 값)
+    state = await asyncio.to_thread(get_job_status, job_id) or {}
+    status = state.get("status")
+    output_file = state.get("output_file")
     
     if not output_file:
         raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
@@ -59,10 +43,11 @@ async def download_clip(job_id: str):
             summary="개별 클립 다운로드")
 async def download_individual_clip(job_id: str, index: int):
     """개별 클립을 다운로드합니다."""
-    if job_id not in job_status:
+    state = await asyncio.to_thread(get_job_status, job_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    individual_clips = job_status[job_id].get("individual_clips", [])
+    individual_clips = state.get("individual_clips", [])
     if not individual_clips or index >= len(individual_clips):
         raise HTTPException(status_code=404, detail="Individual clip not found")
     
@@ -81,21 +66,12 @@ async def download_batch_results(job_id: str):
     import io
     
     # Get job status
-    if job_id not in job_status:
-        # Try database
-        try:
-            db_job = get_job_by_id(job_id)
-            if not db_job:
-                raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
-            
-            output_files = db_job.get('output_files', [])
-            status = db_job.get('status')
-        except Exception as e:
-            logger.warning(f"Database lookup failed for job {job_id}: {e}")
-            raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
-    else:
-        output_files = job_status[job_id].get("output_files", [])
-        status = job_status[job_id]["status"]
+    state = await asyncio.to_thread(get_job_status, job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    
+    output_files = state.get("output_files") or []
+    status = state.get("status")
     
     if status != "completed":
         raise HTTPException(status_code=400, detail=f"작업이 완료되지 않았습니다. (현재 상태: {status})")
@@ -4,6 +4,7 @@ Extract Range Routes - 구간 추출 (원본 스타일)
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
 from typing import List, Optional
 import uuid
+import asyncio
 import logging
 import json
 import time
@@ -15,6 +16,8 @@ from api.models.validators import MediaValidator
 from api.config import OUTPUT_DIR, executor, TEMPLATE_MAPPING
 from api.utils import update_job_status_both, job_status
 from api.utils.id_generator import get_next_folder_id
+from api.utils.job_queue import submit_job
+from api.utils.admission import check_admission
 from api.db_utils import (
     create_job_in_db,
     create_media_source,
@@ -32,6 +35,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from template_video_encoder import TemplateVideoEncoder
 from ass_generator import ASSGenerator
+from subtitle_index import get_range_subtitles
 from database_v2.models_v2 import DatabaseManager, APIRequest
 
 router = APIRouter(prefix="/api", tags=["Extract"])
@@ -72,6 +76,9 @@ async def extract_range(
     logger.info(f"  Subtitles: {len(request.subtitles)} items")
     logger.info(f"  Template: {request.template_number}")
     
+    # 수락 여부 확인 (대기열/리소스 한계 초과 시 429/503 + Retry-After)
+    admission = await asyncio.to_thread(check_admission, "range_extraction", request, client_info["ip"])
+    
     # 작업 상태 초기화
     job_data = {
         "status": "pending",
@@ -117,19 +124,18 @@ async def extract_range(
     except Exception as e:
         logger.error(f"Failed to save job to new DB: {e}")
     
-    # 백그라운드 작업 시작
-    background_tasks.add_task(
-        process_range_extraction,
-        job_id,
-        request
-    )
+    # 작업 큐에 제출 (렌더 워커에서 실행)
+    submit_job(background_tasks, job_id, "range_extraction", process_range_extraction, request, job_data,
+               client_id=client_info["ip"])
     
     # API 응답 로깅
     response_time_ms = int((time.time() - request_start_time) * 1000)
     response = ClippingResponse(
         job_id=job_id,
         status="accepted",
-        message=f"구간 추출 작업이 시작되었습니다. ({request.end_time - request.start_time:.1f}초)"
+        message=f"구간 추출 작업이 시작되었습니다. ({request.end_time - request.start_time:.1f}초)",
+        estimated_wait_seconds=admission.wait_seconds,
+        estimated_start_at=admission.start_at
     )
     
     # API 응답 업데이트
@@ -173,6 +179,14 @@ async def process_range_extraction(job_id: str, request: ExtractRangeRequest):
         job_dir = daily_dir / folder_id
         job_dir.mkdir(exist_ok=True)
         
+        # 자막이 없으면 미디어 옆 에피소드 자막 인덱스에서 구간에 해당하는 자막 사용
+        if not request.subtitles:
+            # 자막 파일 읽기/번역은 이벤트 루프 밖에서
+            range_subtitles = await asyncio.get_running_loop().run_in_executor(
+                executor, get_range_subtitles, str(media_path), request.start_time, request.end_time)
+            request.subtitles = [SubtitleInfo(**sub) for sub in range_subtitles]
+            logger.info(f"[Job {job_id}] {len(request.subtitles)} subtitles from episode index")
+        
         # 자막 파일 생성
         update_job_status_both(job_id, "processing", 20, message="자막 파일 생성 중...")
         
@@ -8,36 +8,22 @@ from pathlib import Path
 import uuid
 import logging
 import os
+import asyncio
 import subprocess
-import json
 import re
 from datetime import datetime
-from api.routes.settings import load_settings
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from api.config import executor
+from template_standards import TemplateStandards
+from ffmpeg_progress import with_job_context
+from media_probe import get_media_probe
+from api.utils.intro_generator import IntroSpec, generate_intro, INTRO_OUTPUT_DIR
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["intro"])
 
-def get_tts_config():
-    """설정에서 TTS 구성 가져오기"""
-    settings = load_settings()
-    tts_settings = settings.get("tts", {})
-    
-    # 속도와 피치를 Edge TTS 형식으로 변환
-    speed_percent = f"{'+' if tts_settings.get('speed', 0) >= 0 else ''}{tts_settings.get('speed', 0)}%"
-    
-    return {
-        "english": {
-            "voice": tts_settings.get("voice_english", "en-US-AriaNeural"),
-            "rate": speed_percent,
-            "volume": f"+{100 - tts_settings.get('volume', 100)}%" if tts_settings.get('volume', 100) < 100 else "+0%"
-        },
-        "korean": {
-            "voice": tts_settings.get("voice_korean", "ko-KR-SunHiNeural"),
-            "rate": speed_percent,
-            "volume": f"+{100 - tts_settings.get('volume', 100)}%" if tts_settings.get('volume', 100) < 100 else "+0%"
-        }
-    }
-
 # Font paths
 FONT_PATHS = {
     "english": "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
@@ -66,417 +52,32 @@ class IntroVideoRequest(BaseModel):
     thumbnailCropMode: Optional[str] = Field("square", description="썸네일 크롭 모드: square (1:1), vertical (9:16), original (원본비율)")
 
 
-async def generate_tts(text: str, language: str, output_path: str) -> float:
-    """TTS 생성 함수"""
-    tts_config = get_tts_config()
-    config = tts_config.get(language, tts_config["english"])
-    
-    logger.info(f"[TTS] Generating TTS for: {text}")
-    
-    # edge-tts 명령어로 음성 생성
-    edge_tts_path = "/home/kang/.local/bin/edge-tts"
-    command = [
-        edge_tts_path,
-        "--voice", config["voice"],
-        "--rate", config["rate"],
-        "--volume", config["volume"],
-        "--text", text,
-        "--write-media", output_path
-    ]
-    
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        logger.info(f"TTS generated: {output_path}")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"TTS generation failed: {e.stderr}")
-        raise HTTPException(status_code=500, detail=f"TTS generation failed: {e.stderr}")
-    
-    # FFprobe로 오디오 길이 확인
-    duration_command = [
-        "ffprobe",
-        "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        output_path
-    ]
-    
-    try:
-        result = subprocess.run(duration_command, capture_output=True, text=True, check=True)
-        duration = float(result.stdout.strip())
-        return duration
-    except Exception as e:
-        logger.error(f"Failed to get audio duration: {e}")
-        return 0.0
-
-
-async def extract_thumbnail_from_media(media_path: str, start_time: float, output_path: str) -> str:
-    """미디어에서 썸네일 추출"""
-    # -ss를 입력 앞에 두면 더 빠름 (입력 seek)
-    command = [
-        "ffmpeg", "-y",
-        "-ss", str(start_time),  # 입력 앞에 -ss를 두면 빠른 seek
-        "-i", media_path,
-        "-vframes", "1",
-        "-q:v", "2",  # 품질을 약간 낮춰서 속도 향상
-        "-vf", "scale=-1:720",  # 썸네일 크기 제한
-        output_path
-    ]
-    
-    try:
-        # 10초 타임아웃 설정
-        subprocess.run(command, capture_output=True, text=True, check=True, timeout=10)
-        return output_path
-    except subprocess.TimeoutExpired:
-        logger.error(f"Thumbnail extraction timed out after 10 seconds")
-        return None
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to extract thumbnail: {e.stderr}")
-        return None
-
-
-async def create_ass_subtitle(english_text: str, korean_text: str, duration: float, output_path: Path, width: int = 1080, height: int = 1920) -> Path:
-    """ASS 자막 파일 생성"""
-    # 텍스트 정리 - 순수 텍스트만 사용
-    english_text = english_text.strip()
-    korean_text = korean_text.strip()
-    
-    # ASS 파일을 위한 텍스트 이스케이프
-    # 중괄호만 이스케이프하여 ASS 제어 코드로 해석되지 않도록 함
-    english_text_escaped = english_text.replace('{', '\\{').replace('}', '\\}')
-    korean_text_escaped = korean_text.replace('{', '\\{').replace('}', '\\}')
-    
-    # 원본 텍스트 로그
-    logger.info(f"[ASS] English text: '{english_text}'")
-    logger.info(f"[ASS] Korean text: '{korean_text}'")
-    # 쇼츠(세로)와 유튜브(가로) 형식에 따른 위치 조정
-    if width > height:  # 가로 형식 (YouTube)
-        # YouTube 사이즈
-        title_size = 65
-        title_margin = 100
-        english_size = 110
-        english_margin = 280
-        korean_size = 70
-        korean_margin = 480
-    else:  # 세로 형식 (Shorts)
-        # Shorts 사이즈
-        title_size = 90
-        title_margin = 180
-        english_size = 130
-        english_margin = 750
-        korean_size = 80
-        korean_margin = 1050
-    
-    ass_content = f"""[Script Info]
-Title: Intro Subtitle
-ScriptType: v4.00+
-PlayResX: {width}
-PlayResY: {height}
-WrapStyle: 0
-
-[V4+ Styles]
-Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: Title,TmonMonsori,{title_size},&H00F5F5F5,&H000000FF,&H20000000,&H80000000,0,0,0,0,100,100,2,0,1,4,6,8,100,100,{title_margin},1
-Style: English,Noto Sans CJK KR,{english_size},&H0000CCFF,&H000000FF,&H20000000,&HB0000000,1,0,0,0,100,100,0,0,1,5,8,5,120,120,{english_margin},1
-Style: Korean,Noto Sans CJK KR,{korean_size},&H00FFFFFF,&H000000FF,&H40000000,&HA0000000,1,0,0,0,100,100,1,0,1,4,6,5,120,120,{korean_margin},1
-
-[Events]
-Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
-Dialogue: 0,0:00:00.00,0:00:{duration:.2f},Title,,0,0,0,,{{\\fad(600,600)\\bord4\\shad6\\be2\\blur1\\3c&H404040&\\4c&HA0000000&}}스크린 영어 핵심 패턴
-Dialogue: 0,0:00:00.40,0:00:{duration:.2f},English,,0,0,0,,{{\\fad(800,600)\\bord5\\shad8\\be2\\blur2\\3c&H000000&\\4c&HC0000000&\\fscx105\\fscy105}}{english_text_escaped}
-Dialogue: 0,0:00:00.80,0:00:{duration:.2f},Korean,,0,0,0,,{{\\fad(800,600)\\bord4\\shad6\\be1\\blur1\\3c&H202020&\\4c&HB0000000&}}{korean_text_escaped}
-"""
-    
-    ass_path = output_path.parent / f"{output_path.stem}_subtitle.ass"
-    with open(ass_path, 'w', encoding='utf-8') as f:
-        f.write(ass_content)
-    
-    logger.info(f"[ASS] File created: {ass_path}")
-    
-    return ass_path
-
-
-async def generate_video_fade_in(params: dict) -> str:
-    """Fade In 템플릿으로 비디오 생성"""
-    english_text = params['english_text']
-    korean_text = params['korean_text']
-    audio_path = params['audio_path']
-    output_path = params['output_path']
-    duration = params['duration']
-    background_image = params.get('background_image')
-    use_darken = params.get('use_darken', True)
-    use_gradient = params.get('use_gradient', False)
-    use_center_crop = params.get('use_center_crop', True)
-    thumbnail_crop_mode = params.get('thumbnail_crop_mode', 'square')
-    width = params.get('width', 1080)
-    height = params.get('height', 1920)
-    
-    # ASS 자막 파일 생성
-    ass_path = await create_ass_subtitle(
-        english_text=english_text,
-        korean_text=korean_text,
-        duration=duration,
-        output_path=Path(output_path),
-        width=width,
-        height=height
-    )
-    logger.info(f"[ASS] Subtitle file created: {ass_path}")
-    
-    if background_image:
-        # 배경 이미지가 있는 경우
-        is_shorts = width < height  # 쇼츠 형식인지 확인
-        
-        if is_shorts:
-            # thumbnailCropMode 우선 적용, use_center_crop은 하위 호환성을 위해 유지
-            if thumbnail_crop_mode == "vertical" or (thumbnail_crop_mode == "square" and use_center_crop):
-                # vertical 모드: 쇼츠용 세로 중앙 크롭 (16:9 영상에서 9:16 부분 추출)
-                filter_str = f"[0:v]crop='min(iw,ih*9/16)':'ih',scale={width}:{height},setsar=1"
-                logger.info("[FFmpeg] Using 9:16 vertical crop for shorts format")
-            elif thumbnail_crop_mode == "original":
-                # original 모드: 원본 비율 유지하며 중앙 배치
-                filter_str = f"[0:v]scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1"
-                logger.info("[FFmpeg] Using original aspect ratio for shorts format")
-            else:
-                # square 모드 (기본값): 1:1 정사각형 중앙 크롭
-                filter_str = f"[0:v]crop='min(iw,ih)':'min(iw,ih)',scale={width}:{width},pad={width}:{height}:0:(oh-ih)/2:black,setsar=1"
-                logger.info("[FFmpeg] Using 1:1 square center crop for shorts format (default)")
-        else:
-            # 유튜브 형식: 전체 이미지를 축소하여 중앙 배치
-            filter_str = f"[0:v]scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1"
-            logger.info("[FFmpeg] Using full image with padding for youtube format")
-        
-        logger.info(f"[FFmpeg] Background effects - darken: {use_darken}, gradient: {use_gradient}, center_crop: {use_center_crop}, crop_mode: {thumbnail_crop_mode}")
-        
-        if use_darken:
-            # 텍스트 영역에만 반투명 검은색 오버레이 적용 (텍스트 가독성 향상)
-            # 양쪽 10% 마진 적용 (박스 너비 = 전체 너비의 80%)
-            margin = int(width * 0.1)
-            box_width = int(width * 0.8)
-            
-            # 상단 제목 영역 (0 ~ 25%)
-            filter_str += f",drawbox={margin}:0:{box_width}:{int(height*0.25)}:black@0.4:t=fill"
-            # 중앙 텍스트 영역 (35% ~ 65%)
-            filter_str += f",drawbox={margin}:{int(height*0.35)}:{box_width}:{int(height*0.3)}:black@0.5:t=fill"
-            # 약간의 대비 증가로 선명도 향상
-            filter_str += ",eq=contrast=1.05:saturation=0.95"
-            logger.info("[FFmpeg] Applied text-friendly overlay with preserved image quality")
-        
-        if use_gradient:
-            # 선형 그라데이션: 여러 개의 반투명 박스를 겹쳐서 점진적 효과 생성
-            gradient_steps = 30
-            for i in range(gradient_steps):
-                x_pos = int(width * i / gradient_steps)
-                box_width = int(width / gradient_steps)
-                opacity = 0.6 * (1 - i / gradient_steps)  # 왼쪽이 더 어둡게
-                filter_str += f",drawbox={x_pos}:0:{box_width}:{height}:black@{opacity:.2f}:t=fill"
-            logger.info("[FFmpeg] Applied linear gradient effect (left to right, 30 steps)")
-        
-        # ASS 자막 추가
-        ass_path_str = str(ass_path)
-        filter_str += f",ass={ass_path_str}"
-        
-        # TemplateStandards와 동일한 인코딩 설정 사용
-        command = f"""ffmpeg -y -loop 1 -i "{background_image}" -i "{audio_path}" -filter_complex "{filter_str}" -map 0:v -map 1:a -t {duration} -c:v libx264 -preset veryfast -crf 23 -profile:v high -level 4.1 -pix_fmt yuv420p -g 60 -r 30 -c:a aac -b:a 192k -ar 48000 -ac 2 -movflags +faststart "{output_path}" """
-    else:
-        # 배경 이미지가 없는 경우
-        ass_path_str = str(ass_path)
-        command = f"""ffmpeg -y -f lavfi -i "color=c=black:s={width}x{height}:d={duration}:r=30" -i "{audio_path}" -vf "ass={ass_path_str}" -c:v libx264 -preset veryfast -crf 23 -profile:v high -level 4.1 -pix_fmt yuv420p -g 60 -r 30 -c:a aac -b:a 192k -ar 48000 -ac 2 -movflags +faststart -shortest "{output_path}" """
-    
-    return command
-
-
-async def extract_thumbnail(video_path: str, output_path: str):
-    """비디오에서 썸네일 추출"""
-    command = [
-        "ffmpeg", "-y",
-        "-i", video_path,
-        "-ss", "0",
-        "-vframes", "1", 
-        "-q:v", "1",
-        output_path
-    ]
-    
-    try:
-        subprocess.run(command, capture_output=True, text=True, check=True)
-        logger.info(f"Thumbnail extracted: {output_path}")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Thumbnail extraction failed: {e.stderr}")
-
-
 @router.post("/intro-videos")
 async def create_intro_video(request: IntroVideoRequest):
-    """인트로 비디오 생성 요청 (동기식 처리)"""
+    """인트로 비디오 생성 요청 (동기식 처리, 같은 인트로는 캐시 사용)"""
     try:
         logger.info("Starting intro video generation")
         logger.info(f"Request: {request.dict()}")
         
-        # 날짜별 디렉토리 생성
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
-        time_str = now.strftime("%H%M%S")
-        unique_suffix = uuid.uuid4().hex[:6]
-        
-        # 기본 출력 디렉토리
-        base_output_dir = Path("/home/kang/dev_amd/shadowing_maker_xls/output/intro_videos")
-        
-        # 날짜별 디렉토리
-        date_dir = base_output_dir / date_str
-        
-        # 시간별 작업 디렉토리 (각 요청마다 고유한 폴더)
-        job_dir = date_dir / f"{time_str}_{unique_suffix}"
-        job_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 작업 ID (폴더명과 동일)
-        job_id = f"{time_str}_{unique_suffix}"
-        
-        # TTS 파일 경로 설정
-        english_tts_path = job_dir / "audio_en.mp3"
-        korean_tts_path = job_dir / "audio_ko.mp3"
-        tts_path = job_dir / "audio_combined.mp3"
-        
-        # 1. 영어 패턴 문장 TTS 생성
-        logger.info(f"[TTS] 영어 TTS 생성 시작: {request.headerText}")
-        english_duration = await generate_tts(request.headerText, "english", str(english_tts_path))
-        logger.info(f"[TTS] 영어 TTS 생성 완료: {english_tts_path} (길이: {english_duration:.2f}초)")
-        
-        # 파일 존재 확인
-        if not english_tts_path.exists():
-            logger.error(f"[TTS] 영어 TTS 파일 생성 실패: {english_tts_path}")
-        
-        # 2. 한글 설명 TTS 생성
-        korean_text = request.koreanText
-        if request.explanation:
-            korean_text += f". {request.explanation}"
-        
-        logger.info(f"[TTS] 한글 TTS 생성 시작: {korean_text[:50]}...")
-        korean_duration = await generate_tts(korean_text, "korean", str(korean_tts_path))
-        logger.info(f"[TTS] 한글 TTS 생성 완료: {korean_tts_path} (길이: {korean_duration:.2f}초)")
-        
-        # 파일 존재 확인
-        if not korean_tts_path.exists():
-            logger.error(f"[TTS] 한글 TTS 파일 생성 실패: {korean_tts_path}")
-        
-        # 3. 두 오디오 파일을 연결 (0.5초 간격 추가)
-        concat_command = [
-            "ffmpeg", "-y",
-            "-i", str(english_tts_path),
-            "-i", str(korean_tts_path),
-            "-filter_complex", 
-            "[0:a]apad=pad_dur=0.5[a0];[a0][1:a]concat=n=2:v=0:a=1[out]",
-            "-map", "[out]",
-            "-c:a", "aac",
-            "-b:a", "192k",
-            "-ar", "48000",
-            "-ac", "2",
-            str(tts_path)
-        ]
-        
-        logger.info(f"[TTS] 오디오 연결 시작: {english_tts_path.name} + {korean_tts_path.name} -> {tts_path.name}")
-        
-        try:
-            result = subprocess.run(concat_command, capture_output=True, text=True, check=True)
-            logger.info(f"[TTS] 오디오 연결 성공: {tts_path}")
-            
-            # 최종 파일 크기 확인
-            if tts_path.exists():
-                file_size_kb = tts_path.stat().st_size / 1024
-                logger.info(f"[TTS] 최종 오디오 파일: {tts_path.name} ({file_size_kb:.2f}KB)")
-            
-            # 임시 파일 삭제
-            english_tts_path.unlink()
-            korean_tts_path.unlink()
-        except subprocess.CalledProcessError as e:
-            logger.error(f"[TTS] 오디오 연결 실패: {e.stderr}")
-            # concat 실패 시 한국어만 사용
-            korean_tts_path.rename(tts_path)
-            if english_tts_path.exists():
-                english_tts_path.unlink()
-        
-        # 전체 오디오 길이 계산
-        audio_duration = english_duration + 0.5 + korean_duration
-        logger.info(f"[TTS] 전체 오디오 길이: {audio_duration:.2f}초")
-        
-        # 비디오 생성 파라미터 설정
-        video_path = job_dir / "intro_video.mp4"
-        
-        # 배경 이미지 처리
-        background_image = None
+        spec = IntroSpec(
+            header_text=request.headerText,
+            korean_text=request.koreanText,
+            explanation=request.explanation or "",
+            video_format=request.format,
+            template=request.template,
+            use_darken=request.useDarken if request.useBlur is None else request.useBlur,  # 하위 호환성
+            use_gradient=request.useGradient,
+            use_center_crop=request.useCenterCrop,
+            thumbnail_crop_mode=request.thumbnailCropMode
+        )
         if request.firstSentenceMediaInfo:
-            # 첫 번째 문장의 미디어에서 썸네일 추출 (모든 템플릿에서 사용 가능)
-            bg_thumbnail_path = job_dir / "background.jpg"
-            background_image = await extract_thumbnail_from_media(
-                request.firstSentenceMediaInfo.mediaPath, 
-                request.firstSentenceMediaInfo.startTime,
-                str(bg_thumbnail_path)
-            )
-        
-        # TTS 파일이 FFmpeg에 전달되는지 확인
-        if not tts_path.exists():
-            logger.error(f"[FFmpeg] TTS 파일이 존재하지 않음: {tts_path}")
-            raise HTTPException(status_code=500, detail=f"TTS file not found: {tts_path}")
-        
-        logger.info(f"[FFmpeg] 비디오 생성 준비 - TTS 파일: {tts_path} (존재: {tts_path.exists()})")
-        
-        # 비디오 생성 파라미터
-        video_params = {
-            'english_text': request.headerText,
-            'korean_text': request.koreanText,
-            'audio_path': str(tts_path),
-            'output_path': str(video_path),
-            'duration': audio_duration,
-            'width': 1920 if request.format == 'youtube' else 1080,
-            'height': 1080 if request.format == 'youtube' else 1920,
-            'background_image': background_image,
-            'use_darken': request.useDarken if request.useBlur is None else request.useBlur,  # 하위 호환성
-            'use_gradient': request.useGradient,
-            'use_center_crop': request.useCenterCrop,
-            'thumbnail_crop_mode': request.thumbnailCropMode
-        }
-        
-        logger.info(f"[FFmpeg] 비디오 파라미터: format={request.format}, duration={audio_duration:.2f}s, resolution={video_params['width']}x{video_params['height']}")
-        actual_darken = request.useDarken if request.useBlur is None else request.useBlur
-        logger.info(f"[FFmpeg] 배경 효과: background_image={background_image is not None}, use_darken={actual_darken}, use_gradient={request.useGradient}")
-        
-        # 템플릿에 따른 비디오 생성
-        if request.template == "fade_in" or (request.template in ["shorts_thumbnail", "youtube_thumbnail"] and background_image):
-            ffmpeg_command = await generate_video_fade_in(video_params)
-        else:
-            # 기본 템플릿 (fade_in 사용)
-            ffmpeg_command = await generate_video_fade_in(video_params)
-        
-        # FFmpeg 실행
-        logger.info(f"[FFmpeg] Executing command...")
-        logger.debug(f"[FFmpeg] Full command: {ffmpeg_command}")
-        
-        try:
-            # shell=True를 사용하여 복잡한 명령어 실행
-            result = subprocess.run(ffmpeg_command, shell=True, capture_output=True, text=True, check=True)
-            logger.info(f"Video generated successfully: {video_path}")
-            if result.stdout:
-                logger.debug(f"FFmpeg stdout: {result.stdout}")
-            if result.stderr:
-                logger.info(f"FFmpeg stderr (not error): {result.stderr}")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg failed: {e.stderr}")
-            raise HTTPException(status_code=500, detail=f"Video generation failed: {e.stderr}")
+            # 첫 번째 문장의 미디어에서 배경 프레임 추출 (모든 템플릿에서 사용 가능)
+            spec.background_media = request.firstSentenceMediaInfo.mediaPath
+            spec.background_time = request.firstSentenceMediaInfo.startTime
         
-        # 썸네일 생성
-        thumbnail_path = job_dir / "thumbnail.jpg"
-        await extract_thumbnail(str(video_path), str(thumbnail_path))
-        
-        # 결과 반환 (폴더 구조 정보 포함)
+        video_info = await generate_intro(spec)
         result_data = {
-            "video": {
-                "id": job_id,
-                "jobFolder": str(job_dir),
-                "videoFilePath": str(video_path),
-                "ttsFilePath": str(tts_path),
-                "thumbnailPath": str(thumbnail_path),
-                "duration": audio_duration,
-                "headerText": request.headerText,
-                "koreanText": request.koreanText,
-                "format": request.format,
-                "template": request.template
-            },
+            "video": video_info,
             "status": "completed",
             "message": "인트로 영상 생성 완료"
         }
@@ -492,7 +93,7 @@ async def create_intro_video(request: IntroVideoRequest):
 @router.get("/intro-videos/{video_id}")
 async def get_intro_video(video_id: str):
     """생성된 인트로 비디오 정보 조회"""
-    base_output_dir = Path("/home/kang/dev_amd/shadowing_maker_xls/output/intro_videos")
+    base_output_dir = INTRO_OUTPUT_DIR
     
     # video_id는 'HHMMSS_unique' 형식이므로, 날짜별 폴더를 검색해야 함
     # 최근 7일간의 폴더를 검색
@@ -558,20 +159,28 @@ async def merge_videos(request: MergeVideosRequest):
                 logger.info(f"[Merge] 입력 파일 {idx}: {Path(video_path).name} ({file_size_mb:.2f}MB)")
                 f.write(f"file '{video_path}'\n")
         
-        # 첫 번째 비디오의 속성 확인 (해상도, fps 기준)
-        probe_cmd = [
-            "ffprobe", "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height,r_frame_rate",
-            "-of", "json",
-            request.videoPaths[0]
-        ]
-        
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
-        probe_data = json.loads(probe_result.stdout)
-        
-        if probe_data.get("streams"):
-            video_info = probe_data["streams"][0]
+        # 병합 계약을 만족하는 클립은 재인코딩 없이 stream copy로 병합
+        start_time = datetime.now()
+        loop = asyncio.get_event_loop()
+        merged = await loop.run_in_executor(
+            executor,
+            with_job_context(TemplateStandards.merge_clips_by_contract, request.videoPaths, str(output_path))
+        )
+        if merged:
+            concat_file.unlink()
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+            logger.info(f"[Merge] ✅ stream copy 병합 완료 - 소요시간: {elapsed_time:.2f}초")
+            return {
+                "success": True,
+                "outputPath": str(output_path),
+                "message": "비디오 병합 완료"
+            }
+        logger.warning("[Merge] stream copy 병합 실패, 전체 재인코딩으로 진행")
+        
+        # 첫 번째 비디오의 속성 확인 (해상도, fps 기준) - 계약 검사 때 캐시됨
+        video_info = get_media_probe().get_video_stream(request.videoPaths[0])
+        
+        if video_info:
             width = video_info.get("width", 1080)
             height = video_info.get("height", 1920)
             
@@ -4,13 +4,13 @@ Mixed Template Routes - 여러 템플릿을 혼합하여 사용
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
 from typing import List, Optional
 import uuid
+import asyncio
 import logging
 import json
 import time
 from datetime import datetime
 from pathlib import Path
 import tempfile
-import subprocess
 
 from api.models import MixedTemplateRequest, ClippingResponse, SubtitleInfo
 from api.models.validators import MediaValidator
@@ -22,6 +22,9 @@ from api.utils import (
     cleanup_memory_jobs
 )
 from api.utils.id_generator import get_next_folder_id
+from api.utils.render_pool import render_clips
+from api.utils.job_queue import submit_job
+from api.utils.admission import check_admission
 from api.db_utils import (
     create_job_in_db,
     create_media_source,
@@ -39,7 +42,10 @@ from api.utils.text_processing import create_multi_subtitle_file
 # Import required modules from parent directory
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from template_video_encoder import TemplateVideoEncoder
+from template_standards import TemplateStandards
+from subtitle_index import get_range_subtitles
+from cpu_slots import run_ffmpeg
+from ffmpeg_progress import with_job_context
 from database_v2.models_v2 import DatabaseManager, APIRequest
 # No longer need get_ass_styles_section as we use extract.py's function
 
@@ -80,6 +86,10 @@ async def create_mixed_template_clips(
     
     # 클라이언트 정보 추출
     client_info = get_client_info(req)
+    
+    # 수락 여부 확인 (대기열/리소스 한계 초과 시 429/503 + Retry-After)
+    admission = await asyncio.to_thread(check_admission, "mixed_template", request, client_info["ip"])
+    
     for i, clip in enumerate(request.clips):
         logger.info(f"  Clip {i+1}: Template {clip.template_number}, {clip.start_time}-{clip.end_time}s")
     
@@ -130,19 +140,18 @@ async def create_mixed_template_clips(
     except Exception as e:
         logger.error(f"Failed to save job to new DB: {e}")
     
-    # 백그라운드 작업 시작
-    background_tasks.add_task(
-        process_mixed_clips,
-        job_id,
-        request
-    )
+    # 작업 큐에 제출 (렌더 워커에서 실행)
+    submit_job(background_tasks, job_id, "mixed_template", process_mixed_clips, request, job_data,
+               client_id=client_info["ip"])
     
     # API 응답 로깅
     response_time_ms = int((time.time() - request_start_time) * 1000)
     response = ClippingResponse(
         job_id=job_id,
         status="accepted",
-        message=f"혼합 템플릿 작업이 시작되었습니다. (총 {len(request.clips)}개)"
+        message=f"혼합 템플릿 작업이 시작되었습니다. (총 {len(request.clips)}개)",
+        estimated_wait_seconds=admission.wait_seconds,
+        estimated_start_at=admission.start_at
     )
     
     # API 응답 업데이트
@@ -194,16 +203,22 @@ async def process_mixed_clips(job_id: str, request: MixedTemplateRequest):
         job_dir.mkdir(exist_ok=True)
         
         output_files = []
-        template_encoder = TemplateVideoEncoder()
         
-        # 각 클립을 해당 템플릿으로 생성
+        # 클립별 렌더 작업 준비 (렌더링은 프로세스 풀에서 병렬 실행)
+        render_jobs = []
+        render_outputs = []
         for idx, clip_data in enumerate(request.clips):
             clip_num = idx + 1
-            job_status[job_id]["progress"] = int((idx / len(request.clips)) * 80)
-            job_status[job_id]["message"] = f"클립 {clip_num}/{len(request.clips)} 처리 중 (템플릿 {clip_data.template_number})..."
             
             # Template 0 또는 10 (구간 추출)인 경우
             if clip_data.template_number in [0, 10]:
+                # 자막이 없으면 미디어 옆 에피소드 자막 인덱스에서 구간에 해당하는 자막 사용
+                if not clip_data.subtitles:
+                    # 자막 파일 읽기/번역은 이벤트 루프 밖에서
+                    range_subtitles = await asyncio.get_running_loop().run_in_executor(
+                        executor, get_range_subtitles, str(media_path), clip_data.start_time, clip_data.end_time)
+                    clip_data.subtitles = [SubtitleInfo(**sub) for sub in range_subtitles]
+                
                 # 자막 파일 생성
                 ass_path = job_dir / f"subtitles_c{clip_num:03d}.ass"
                 is_shorts = clip_data.template_number == 10
@@ -258,18 +273,34 @@ async def process_mixed_clips(job_id: str, request: MixedTemplateRequest):
             filename = f"{timestamp}_tp_{clip_data.template_number}_c{clip_num:03d}.mp4"
             output_path = job_dir / filename
             
-            # 템플릿을 사용하여 비디오 생성
-            success = template_encoder.create_from_template(
-                template_name=template_name,
-                media_path=str(media_path),
-                subtitle_data=subtitle_data,
-                output_path=str(output_path),
-                start_time=clip_data.start_time,
-                end_time=clip_data.end_time,
-                padding_before=0.5,
-                padding_after=0.5
-            )
-            
+            render_jobs.append({
+                "template_name": template_name,
+                "media_path": str(media_path),
+                "subtitle_data": subtitle_data,
+                "output_path": str(output_path),
+                "start_time": clip_data.start_time,
+                "end_time": clip_data.end_time,
+                "padding_before": 0.5,
+                "padding_after": 0.5,
+                "quality": request.quality
+            })
+            render_outputs.append((clip_num, clip_data, output_path))
+        
+        job_status[job_id]["message"] = f"클립 {len(render_jobs)}개 병렬 처리 중..."
+        completed = 0
+        
+        def on_clip_done(index: int, success: bool):
+            nonlocal completed
+            if not success:
+                return
+            completed += 1
+            job_status[job_id]["progress"] = int((completed / len(render_jobs)) * 80)
+            job_status[job_id]["message"] = f"클립 {completed}/{len(render_jobs)} 완료"
+        
+        results = await render_clips(render_jobs, on_clip_done)
+        
+        # 결과는 요청 순서대로 정리
+        for (clip_num, clip_data, output_path), success in zip(render_outputs, results):
             if success and output_path.exists():
                 file_info = {
                     "clip_number": clip_num,
@@ -305,7 +336,8 @@ async def process_mixed_clips(job_id: str, request: MixedTemplateRequest):
                         video_type="mixed_clip",
                         file_path=str(output_path),
                         subtitle_mode=_get_subtitle_mode(clip_data.template_number),
-                        clip_index=clip_num
+                        clip_index=clip_num,
+                        probe_metadata=request.quality != "draft"
                     )
                     
                     add_processing_log(session, job_id, "info", "mixed_clip", 
@@ -329,7 +361,8 @@ async def process_mixed_clips(job_id: str, request: MixedTemplateRequest):
             success = await combine_videos(
                 video_files=[Path(f["file"]) for f in output_files],
                 output_path=combined_path,
-                transitions=request.transitions
+                transitions=request.transitions,
+                quality=request.quality
             )
             
             if success and combined_path.exists():
@@ -345,7 +378,8 @@ async def process_mixed_clips(job_id: str, request: MixedTemplateRequest):
                         video_type="mixed_combined",
                         file_path=str(combined_path),
                         subtitle_mode="mixed",
-                        clip_index=0
+                        clip_index=0,
+                        probe_metadata=request.quality != "draft"
                     )
                     add_processing_log(session, job_id, "info", "combine", 
                                      f"{len(output_files)}개 클립 결합 완료")
@@ -416,8 +450,9 @@ def _get_subtitle_mode(template_number: int) -> str:
     return "both"
 
 
-async def combine_videos(video_files: List[Path], output_path: Path, transitions: bool = False) -> bool:
-    """여러 비디오를 하나로 결합"""
+async def combine_videos(video_files: List[Path], output_path: Path, transitions: bool = False,
+                         quality: str = TemplateStandards.QUALITY_FINAL) -> bool:
+    """여러 비디오를 하나로 결합 (quality='draft'면 미리보기 설정으로 병합)"""
     try:
         if transitions:
             # 트랜지션 효과가 있는 결합 (나중에 구현)
@@ -427,6 +462,19 @@ async def combine_videos(video_files: List[Path], output_path: Path, transitions
         for i, video_file in enumerate(video_files):
             logger.info(f"Video {i+1}: {video_file} (exists: {video_file.exists()}, size: {video_file.stat().st_size if video_file.exists() else 0})")
         
+        import asyncio
+        loop = asyncio.get_event_loop()
+        
+        # 병합 계약을 만족하는 클립은 재인코딩 없이 stream copy로 병합
+        merged = await loop.run_in_executor(
+            executor,
+            with_job_context(TemplateStandards.merge_clips_by_contract,
+                             [str(video_file) for video_file in video_files], str(output_path), quality=quality)
+        )
+        if merged:
+            return True
+        logger.warning("Stream-copy merge failed, falling back to full re-encode")
+        
         # concat demuxer를 위한 임시 파일 생성
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
             for video_file in video_files:
@@ -480,13 +528,13 @@ async def combine_videos(video_files: List[Path], output_path: Path, transitions
                 str(output_path)
             ]
         
+        if quality == TemplateStandards.QUALITY_DRAFT:
+            cmd = TemplateStandards.apply_draft_options(cmd)
         logger.info(f"Combining videos: {' '.join(cmd)}")
         
-        import asyncio
-        loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
             executor,
-            lambda: subprocess.run(cmd, capture_output=True, text=True)
+            with_job_context(run_ffmpeg, cmd)
         )
         
         # 임시 파일 삭제
@@ -1,23 +1,36 @@
 """
 Job Status Routes
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
 from api.models import JobStatus
-from api.utils import get_job_status as get_job_status_util
-from api.config import OUTPUT_DIR
+from api.utils import get_job_status as get_job_status_util, update_job_status_both, job_status
+from api.utils.job_queue import get_job_queue
+from api.config import OUTPUT_DIR, JOB_QUEUE_ENABLED
 
 # Import database functions from parent directory
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from database import get_job_by_id
+from ffmpeg_progress import get_progress_store
+from job_processes import request_cancel
 
 router = APIRouter(prefix="/api", tags=["Status"])
 logger = logging.getLogger(__name__)
 
+# SSE 갱신 확인 간격 / 변화가 없을 때 연결 유지용 주석 전송 간격 (초)
+SSE_POLL_INTERVAL = 0.5
+SSE_KEEPALIVE_INTERVAL = 15.0
+# 이 상태가 되면 마지막 이벤트를 보내고 스트림 종료
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
 
 @router.get("/status/{job_id}", 
             response_model=JobStatus,
@@ -32,8 +45,8 @@ async def get_job_status(job_id: str):
         if 'job_id' in status_data:
             status_data.pop('job_id')
         
-        # output_files 확인을 위한 로그
-        logger.info(f"Status data for job {job_id}: output_files={status_data.get('output_files', 'NOT FOUND')}")
+        logger.debug(f"Status for job {job_id}: {status_data.get('status')} "
+                     f"({len(status_data.get('output_files') or [])} output files)")
         
         return JobStatus(
             job_id=job_id,
@@ -59,4 +72,92 @@ async def get_job_status(job_id: str):
         logger.warning(f"Database lookup failed for job {job_id}: {e}")
     
     # Job not found anywhere
-    raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
\ No newline at end of file
+    raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+
+def _read_job_progress(job_id: str, store) -> tuple:
+    """작업 상태 + 인코딩 진행 상황 (SQLite 조회 - 이벤트 루프 밖의 스레드에서 실행)"""
+    return get_job_status_util(job_id) or {}, store.get_job_progress(job_id)
+
+
+def _format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.get("/status/{job_id}/events",
+            summary="작업 진행 상황 스트림 (Server-Sent Events)")
+async def stream_job_status(job_id: str, request: Request):
+    """작업 상태와 실제 인코딩 진행 상황(out_time, fps, speed, ETA)을 SSE로 전송합니다.
+
+    변화가 있을 때마다 `progress` 이벤트를 보내고, 작업이 끝나면 `done` 이벤트
+    (output_files 포함)를 보낸 뒤 스트림을 닫습니다.
+    """
+    if not await asyncio.to_thread(get_job_status_util, job_id):
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+    async def events():
+        store = get_progress_store()
+        last_payload = None
+        last_sent = time.time()
+        while not await request.is_disconnected():
+            # 큐/진행 상황 DB 조회가 이벤트 루프를 막지 않도록 스레드에서 실행
+            state, encode = await asyncio.to_thread(_read_job_progress, job_id, store)
+            status = state.get('status', 'unknown')
+            payload = {
+                "job_id": job_id,
+                "status": status,
+                "progress": state.get('progress', 0),
+                "message": state.get('message', ''),
+                "encode": encode,
+            }
+            if status in TERMINAL_STATUSES:
+                payload["output_files"] = state.get('output_files')
+                payload["error"] = state.get('error')
+                yield _format_sse("done", payload)
+                return
+            if payload != last_payload:
+                yield _format_sse("progress", payload)
+                last_payload = payload
+                last_sent = time.time()
+            elif time.time() - last_sent >= SSE_KEEPALIVE_INTERVAL:
+                yield ": keepalive\n\n"
+                last_sent = time.time()
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.delete("/jobs/{job_id}",
+               summary="작업 취소")
+async def cancel_job(job_id: str):
+    """대기 중이거나 실행 중인 작업을 취소합니다.
+
+    대기 중인 작업은 큐에서 제거되고, 실행 중인 작업은 어느 워커 프로세스에서 실행 중이든
+    FFmpeg 프로세스 트리가 종료되며 만들다 만 출력 파일은 삭제됩니다.
+    이미 끝난 작업은 변경하지 않습니다.
+    """
+    state = get_job_status_util(job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if state.get('status') in TERMINAL_STATUSES:
+        return {"job_id": job_id, "status": state.get('status'), "cancelled": False,
+                "message": "이미 종료된 작업입니다."}
+
+    # 취소 표시를 먼저 남겨서 이후 시작되는 FFmpeg/클립 렌더링도 막음
+    request_cancel(job_id)
+    dequeued = False
+    if JOB_QUEUE_ENABLED:
+        # 공유 상태(진행률, job_dir 등)를 기준으로 취소 상태 저장
+        # (이 프로세스의 job_status는 제출 시점 값이므로 사용하지 않음)
+        cancelled_state = dict(state, status='cancelled', message="작업이 취소되었습니다.",
+                               updated_at=datetime.now().isoformat())
+        dequeued = get_job_queue().cancel(job_id, cancelled_state)
+    else:
+        job_status.setdefault(job_id, dict(state))
+        update_job_status_both(job_id, "cancelled", message="작업이 취소되었습니다.")
+    get_progress_store().clear(job_id)
+    logger.info(f"[Job {job_id}] Cancelled ({'dequeued' if dequeued else 'running'})")
+
+    return {"job_id": job_id, "status": "cancelled", "cancelled": True,
+            "message": "작업이 취소되었습니다."}
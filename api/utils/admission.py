@@ -0,0 +1,170 @@
+"""
+Admission Control
+작업 요청을 받을 때 예상 렌더링 양과 큐 대기량, 서버 리소스로 수락 여부 결정
+
+- 작업 비용: 클립 길이(패딩 포함) x 템플릿 반복 횟수 = 렌더링할 출력 길이 (초)
+- 예상 대기 시간: 같거나 높은 우선순위의 대기/실행 중 렌더링 양 / (측정된 처리량 x 워커 수)
+- 예상 대기 시간이 한계를 넘으면 429, 메모리/디스크/CPU 부하가 한계를 넘으면 503
+  (둘 다 Retry-After 헤더 포함)
+
+렌더 워커 수는 고정되어 있으므로 큐가 길어져도 부하는 늘지 않지만, 처리할 수 없는
+양을 계속 받으면 대기 시간만 끝없이 늘어난다. 수락한 요청에는 예상 시작 시각을 알려준다.
+"""
+import os
+import json
+import math
+import time
+import shutil
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from api.config import (
+    OUTPUT_DIR, TEMPLATE_MAPPING, JOB_QUEUE_ENABLED, RENDER_WORKERS,
+    ADMISSION_ENABLED, ADMISSION_MAX_WAIT_SECONDS, ADMISSION_MAX_MEMORY_PERCENT,
+    ADMISSION_MIN_DISK_GB, ADMISSION_MAX_LOAD_PER_CPU, ADMISSION_DEFAULT_RENDER_SPEED,
+    ADMISSION_RETRY_AFTER
+)
+from api.utils.job_queue import get_job_queue, get_job_priority
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 클립 앞뒤 기본 패딩 합 (create_from_template 기본값 0.5 + 0.5)
+CLIP_PADDING_SECONDS = 1.0
+TEMPLATE_PATTERNS_PATH = Path(__file__).parent.parent.parent / "templates" / "shadowing_patterns.json"
+
+
+@dataclass
+class Admission:
+    """수락된 작업의 예상 정보"""
+    est_seconds: float
+    wait_seconds: Optional[float] = None
+
+    @property
+    def start_at(self) -> Optional[str]:
+        if self.wait_seconds is None:
+            return None
+        return datetime.fromtimestamp(time.time() + self.wait_seconds).isoformat(timespec='seconds')
+
+
+@lru_cache(maxsize=1)
+def _load_template_repeats() -> dict:
+    """템플릿 이름별 반복 횟수 (clips의 count 합)"""
+    try:
+        with open(TEMPLATE_PATTERNS_PATH, 'r', encoding='utf-8') as f:
+            patterns = json.load(f).get('patterns', {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to load template patterns for admission: {e}")
+        return {}
+    return {name: sum(clip.get('count', 1) for clip in pattern.get('clips', [])) or 1
+            for name, pattern in patterns.items()}
+
+
+def get_template_repeats(template_number: int) -> int:
+    """템플릿 번호의 클립당 반복 횟수 (알 수 없으면 1)"""
+    template_name = TEMPLATE_MAPPING.get(template_number, f"template_{template_number}")
+    return _load_template_repeats().get(template_name, 1)
+
+
+def estimate_job_seconds(job_type: str, request, clip_numbers: Optional[List[int]] = None) -> float:
+    """작업이 렌더링할 출력 길이 추정 (초)
+
+    clip_numbers: 배치 편집처럼 일부 클립만 다시 렌더링하면 그 클립 번호 (1부터)
+    """
+    if job_type == 'range_extraction':
+        return request.end_time - request.start_time
+    if job_type == 'single_clip':
+        clips = [(request, request.template_number)]
+    elif job_type == 'mixed_template':
+        clips = [(clip, clip.template_number) for clip in request.clips]
+    else:
+        clips = [(clip, request.template_number) for clip in request.clips]
+    if clip_numbers is not None:
+        clips = [clips[clip_num - 1] for clip_num in clip_numbers if 0 < clip_num <= len(clips)]
+    return sum((clip.end_time - clip.start_time + CLIP_PADDING_SECONDS) * get_template_repeats(template_number)
+               for clip, template_number in clips)
+
+
+def _check_resources() -> Optional[str]:
+    """리소스가 한계를 넘었으면 이유, 아니면 None"""
+    try:
+        disk_free_gb = shutil.disk_usage(OUTPUT_DIR).free / (1024 ** 3)
+    except OSError:
+        # 출력 디렉토리가 아직 없으면 (첫 작업 전) 디스크 부족으로 보지 않음
+        disk_free_gb = None
+    if disk_free_gb is not None and disk_free_gb < ADMISSION_MIN_DISK_GB:
+        return f"disk free {disk_free_gb:.1f}GB"
+    if PSUTIL_AVAILABLE:
+        memory_percent = psutil.virtual_memory().percent
+        if memory_percent > ADMISSION_MAX_MEMORY_PERCENT:
+            return f"memory {memory_percent:.0f}%"
+    try:
+        load_per_cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return None
+    if load_per_cpu > ADMISSION_MAX_LOAD_PER_CPU:
+        return f"load {load_per_cpu:.1f}/cpu"
+    return None
+
+
+def estimate_wait_seconds(priority: int) -> float:
+    """지금 제출한 작업이 시작되기까지 예상 대기 시간 (초)"""
+    queue = get_job_queue()
+    backlog = queue.get_backlog(priority)
+    workers = max(RENDER_WORKERS, backlog['running'], 1)
+    if backlog['queued'] == 0 and backlog['running'] < workers:
+        return 0.0
+    speed = queue.get_throughput() or ADMISSION_DEFAULT_RENDER_SPEED
+    return (backlog['queued_seconds'] + backlog['running_seconds']) / (speed * workers)
+
+
+def check_admission(job_type: str, request, client_id: Optional[str] = None,
+                    clip_numbers: Optional[List[int]] = None) -> Admission:
+    """작업 수락 여부 확인 - 거절하면 HTTPException(429/503, Retry-After)
+
+    큐 DB 조회와 디스크/메모리 확인이 블로킹이므로 라우트에서는 asyncio.to_thread로 호출한다.
+
+    Args:
+        clip_numbers: 일부 클립만 렌더링하는 작업(배치 편집)이면 그 클립 번호
+
+    Returns:
+        수락된 작업의 예상 렌더링 길이와 대기 시간
+    """
+    est_seconds = estimate_job_seconds(job_type, request, clip_numbers)
+    if not ADMISSION_ENABLED:
+        return Admission(est_seconds)
+
+    reason = _check_resources()
+    if reason:
+        logger.warning(f"Admission rejected ({job_type}, client {client_id}): {reason}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"서버 리소스가 부족합니다. 잠시 후 다시 시도해주세요. ({reason})",
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER)}
+        )
+
+    if not JOB_QUEUE_ENABLED:
+        return Admission(est_seconds)
+
+    wait_seconds = estimate_wait_seconds(get_job_priority(job_type, request))
+    if wait_seconds > ADMISSION_MAX_WAIT_SECONDS:
+        retry_after = math.ceil(wait_seconds - ADMISSION_MAX_WAIT_SECONDS)
+        logger.warning(f"Admission rejected ({job_type}, client {client_id}): "
+                       f"estimated wait {wait_seconds:.0f}s")
+        raise HTTPException(
+            status_code=429,
+            detail=f"작업 대기열이 가득 찼습니다. 약 {retry_after}초 후 다시 시도해주세요.",
+            headers={"Retry-After": str(retry_after)}
+        )
+    return Admission(est_seconds, round(wait_seconds, 1))
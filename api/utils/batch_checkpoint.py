@@ -0,0 +1,128 @@
+"""
+Batch Checkpoint
+배치 작업의 클립별 체크포인트 (작업 디렉토리의 batch_checkpoint.json)
+
+클립마다 입력(템플릿, 원본 파일 크기/mtime, 구간, 자막 데이터, 품질)의 내용 해시를
+키로 완료된 출력 파일을 기록한다. 서버 재시작이나 일부 클립 실패 후 재개하면
+해시가 같고 출력 파일이 남아 있는 클립은 건너뛰고 나머지만 다시 렌더링한다.
+
+배치 편집 시에도 같은 방식으로 바뀐 클립만 다시 렌더링하며, 클립 내부의
+변형별 산출물은 클립 디렉토리의 variants/manifest.json에 기록된다.
+리뷰 클립, 배치 병합 같은 클립 외 산출물도 입력 해시로 기록하여 입력이 그대로면 재사용한다.
+"""
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILENAME = "batch_checkpoint.json"
+
+
+class BatchCheckpoint:
+    """배치 작업 디렉토리의 클립별 체크포인트"""
+
+    def __init__(self, job_dir: Path):
+        self.path = Path(job_dir) / CHECKPOINT_FILENAME
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                data.setdefault('clips', {})
+                data.setdefault('artifacts', {})
+                return data
+        except (OSError, ValueError):
+            return {'request': None, 'clips': {}, 'artifacts': {}}
+
+    def _save(self):
+        # 재시작 중에 반쯤 쓴 파일이 남지 않도록 임시 파일에 쓴 뒤 교체
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def request(self) -> Optional[Dict[str, Any]]:
+        """재개용으로 저장된 원래 요청"""
+        return self._data.get('request')
+
+    def set_request(self, request: Dict[str, Any]):
+        with self._lock:
+            self._data['request'] = request
+            self._save()
+
+    @staticmethod
+    def inputs_key(inputs: Any) -> str:
+        """산출물 입력 내용 해시"""
+        payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def file_identity(path: str) -> List[Any]:
+        """파일 경로 + 크기/mtime (내용이 바뀌면 달라짐)"""
+        try:
+            stat = os.stat(path)
+            return [str(path), stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            return [str(path), None, None]
+
+    @staticmethod
+    def clip_key(render_job: Dict[str, Any]) -> str:
+        """클립 입력 내용 해시 (출력 경로 제외, 원본 파일 변경 감지 포함)"""
+        inputs = {k: v for k, v in render_job.items() if k != 'output_path'}
+        try:
+            stat = os.stat(render_job['media_path'])
+            inputs['media_stat'] = [stat.st_size, stat.st_mtime_ns]
+        except (KeyError, OSError):
+            pass
+        return BatchCheckpoint.inputs_key(inputs)
+
+    def get_done_output(self, key: str) -> Optional[str]:
+        """완료된 클립 출력 경로 (파일이 없으면 None)"""
+        entry = self._data['clips'].get(key)
+        if entry and entry.get('status') == 'done' and os.path.exists(entry['output']):
+            return entry['output']
+        return None
+
+    def mark_done(self, key: str, clip_num: int, output_path: str) -> List[str]:
+        """완료 기록 - 같은 클립 번호의 이전 기록(편집 전 입력)은 제거하고 그 출력 경로 반환"""
+        with self._lock:
+            stale = [k for k, entry in self._data['clips'].items()
+                     if entry['clip_num'] == clip_num and k != key]
+            stale_outputs = [self._data['clips'].pop(k)['output'] for k in stale]
+            self._data['clips'][key] = {'clip_num': clip_num, 'status': 'done', 'output': str(output_path)}
+            self._save()
+        return [path for path in stale_outputs if path != str(output_path)]
+
+    def mark_failed(self, key: str, clip_num: int, output_path: str):
+        with self._lock:
+            self._data['clips'][key] = {'clip_num': clip_num, 'status': 'failed', 'output': str(output_path)}
+            self._save()
+
+    def failed_clips(self) -> List[int]:
+        return sorted(entry['clip_num'] for entry in self._data['clips'].values()
+                      if entry.get('status') == 'failed')
+
+    def get_artifact(self, name: str, key: str) -> Optional[str]:
+        """같은 입력으로 만든 산출물(리뷰 클립, 배치 병합 등) 경로 (없으면 None)"""
+        entry = self._data['artifacts'].get(name)
+        if entry and entry['key'] == key and os.path.exists(entry['output']):
+            return entry['output']
+        return None
+
+    def mark_artifact(self, name: str, key: str, output_path: str):
+        with self._lock:
+            self._data['artifacts'][name] = {'key': key, 'output': str(output_path)}
+            self._save()
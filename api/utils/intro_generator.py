@@ -0,0 +1,427 @@
+"""
+Intro Video Generator
+인트로 비디오(영어 헤더 + 한국어 설명 TTS, 배경 프레임, ASS 자막) 생성
+
+배치 작업은 HTTP 루프백 호출 없이 generate_intro()를 직접 await하고,
+/api/intro-videos 라우트도 같은 함수를 사용한다. TTS와 FFmpeg는 스레드 풀에서
+실행하므로 이벤트 루프를 막지 않는다.
+
+같은 인트로는 여러 배치에서 반복 사용되므로 결과(비디오, 오디오, 썸네일)를
+(헤더, 한국어, 설명, 포맷, 크롭 모드, 배경 프레임, 효과, TTS 설정) 해시로 캐싱한다.
+"""
+import os
+import json
+import uuid
+import shutil
+import asyncio
+import hashlib
+import logging
+import subprocess
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from api.config import DATA_DIR, executor
+from api.routes.settings import load_settings
+from cpu_slots import run_ffmpeg
+from exceptions import FFmpegError
+from ffmpeg_progress import with_job_context
+from media_probe import get_media_probe
+from render_cache import RenderCache
+from tts_cache import TTSRequest, get_tts_cache
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+INTRO_OUTPUT_DIR = Path(os.getenv("INTRO_OUTPUT_DIR", "/home/kang/dev_amd/shadowing_maker_xls/output/intro_videos"))
+INTRO_CACHE_ENABLED = os.getenv("INTRO_CACHE_ENABLED", "true").lower() == "true"
+INTRO_CACHE_DIR = Path(os.getenv("INTRO_CACHE_DIR", str(DATA_DIR / "intro_cache")))
+INTRO_CACHE_MAX_BYTES = int(float(os.getenv("INTRO_CACHE_MAX_GB", "5")) * 1024 ** 3)
+
+# 인트로 구성/인코딩 설정이 바뀌면 올려서 기존 캐시를 무효화
+INTRO_CACHE_VERSION = 1
+
+VIDEO_NAME = "intro_video.mp4"
+AUDIO_NAME = "audio_combined.mp3"
+THUMBNAIL_NAME = "thumbnail.jpg"
+META_NAME = "intro.json"
+CACHED_FILES = (VIDEO_NAME, AUDIO_NAME, THUMBNAIL_NAME)
+
+# 영어/한국어 음성 사이 간격 (초)
+TTS_GAP_SECONDS = 0.5
+FRAME_EXTRACT_TIMEOUT = 10
+
+
+@dataclass
+class IntroSpec:
+    """인트로 비디오 입력"""
+    header_text: str
+    korean_text: str
+    explanation: str = ""
+    video_format: str = "shorts"
+    template: str = "fade_in"
+    use_darken: bool = True
+    use_gradient: bool = False
+    use_center_crop: bool = False
+    thumbnail_crop_mode: str = "square"
+    # 배경 프레임 (첫 문장의 미디어와 시작 시간)
+    background_media: Optional[str] = None
+    background_time: float = 0.0
+
+    @property
+    def width(self) -> int:
+        return 1920 if self.video_format == 'youtube' else 1080
+
+    @property
+    def height(self) -> int:
+        return 1080 if self.video_format == 'youtube' else 1920
+
+
+def get_tts_config() -> Dict:
+    """설정에서 TTS 구성 가져오기"""
+    settings = load_settings()
+    tts_settings = settings.get("tts", {})
+
+    # 속도와 피치를 Edge TTS 형식으로 변환
+    speed_percent = f"{'+' if tts_settings.get('speed', 0) >= 0 else ''}{tts_settings.get('speed', 0)}%"
+
+    return {
+        "english": {
+            "voice": tts_settings.get("voice_english", "en-US-AriaNeural"),
+            "rate": speed_percent,
+            "volume": f"+{100 - tts_settings.get('volume', 100)}%" if tts_settings.get('volume', 100) < 100 else "+0%"
+        },
+        "korean": {
+            "voice": tts_settings.get("voice_korean", "ko-KR-SunHiNeural"),
+            "rate": speed_percent,
+            "volume": f"+{100 - tts_settings.get('volume', 100)}%" if tts_settings.get('volume', 100) < 100 else "+0%"
+        }
+    }
+
+
+def get_intro_tts_requests(spec: IntroSpec, job_dir: Optional[Path] = None,
+                           tts_config: Optional[Dict] = None) -> List[TTSRequest]:
+    """인트로 TTS 요청 (영어 패턴 문장, 한글 설명) - job_dir이 없으면 미리 합성용"""
+    tts_config = tts_config or get_tts_config()
+    korean_text = spec.korean_text
+    if spec.explanation:
+        korean_text += f". {spec.explanation}"
+    requests = []
+    for text, language, file_name in ((spec.header_text, "english", "audio_en.mp3"),
+                                      (korean_text, "korean", "audio_ko.mp3")):
+        config = tts_config[language]
+        requests.append(TTSRequest(text, str(job_dir / file_name) if job_dir else None,
+                                   voice=config["voice"], rate=config["rate"], volume=config["volume"]))
+    return requests
+
+
+def extract_background_frame(media_path: str, start_time: float, output_path: str) -> Optional[str]:
+    """미디어에서 배경 프레임 추출 (실패하면 None)"""
+    command = [
+        "ffmpeg", "-y",
+        "-ss", str(start_time),  # 입력 앞에 -ss를 두면 빠른 seek
+        "-i", media_path,
+        "-vframes", "1",
+        "-q:v", "2",
+        "-vf", "scale=-1:720",  # 썸네일 크기 제한
+        output_path
+    ]
+    try:
+        result = run_ffmpeg(command, timeout=FRAME_EXTRACT_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logger.error(f"Thumbnail extraction timed out after {FRAME_EXTRACT_TIMEOUT} seconds")
+        return None
+    if result.returncode != 0:
+        logger.error(f"Failed to extract thumbnail: {result.stderr}")
+        return None
+    return output_path
+
+
+def write_intro_ass(english_text: str, korean_text: str, duration: float, ass_path: Path,
+                    width: int = 1080, height: int = 1920) -> Path:
+    """인트로 ASS 자막 파일 생성"""
+    # 중괄호만 이스케이프하여 ASS 제어 코드로 해석되지 않도록 함
+    english_text_escaped = english_text.strip().replace('{', '\\{').replace('}', '\\}')
+    korean_text_escaped = korean_text.strip().replace('{', '\\{').replace('}', '\\}')
+
+    # 쇼츠(세로)와 유튜브(가로) 형식에 따른 위치 조정
+    if width > height:
+        title_size, title_margin = 65, 100
+        english_size, english_margin = 110, 280
+        korean_size, korean_margin = 70, 480
+    else:
+        title_size, title_margin = 90, 180
+        english_size, english_margin = 130, 750
+        korean_size, korean_margin = 80, 1050
+
+    ass_content = f"""[Script Info]
+Title: Intro Subtitle
+ScriptType: v4.00+
+PlayResX: {width}
+PlayResY: {height}
+WrapStyle: 0
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Title,TmonMonsori,{title_size},&H00F5F5F5,&H000000FF,&H20000000,&H80000000,0,0,0,0,100,100,2,0,1,4,6,8,100,100,{title_margin},1
+Style: English,Noto Sans CJK KR,{english_size},&H0000CCFF,&H000000FF,&H20000000,&HB0000000,1,0,0,0,100,100,0,0,1,5,8,5,120,120,{english_margin},1
+Style: Korean,Noto Sans CJK KR,{korean_size},&H00FFFFFF,&H000000FF,&H40000000,&HA0000000,1,0,0,0,100,100,1,0,1,4,6,5,120,120,{korean_margin},1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:00.00,0:00:{duration:.2f},Title,,0,0,0,,{{\\fad(600,600)\\bord4\\shad6\\be2\\blur1\\3c&H404040&\\4c&HA0000000&}}스크린 영어 핵심 패턴
+Dialogue: 0,0:00:00.40,0:00:{duration:.2f},English,,0,0,0,,{{\\fad(800,600)\\bord5\\shad8\\be2\\blur2\\3c&H000000&\\4c&HC0000000&\\fscx105\\fscy105}}{english_text_escaped}
+Dialogue: 0,0:00:00.80,0:00:{duration:.2f},Korean,,0,0,0,,{{\\fad(800,600)\\bord4\\shad6\\be1\\blur1\\3c&H202020&\\4c&HB0000000&}}{korean_text_escaped}
+"""
+    with open(ass_path, 'w', encoding='utf-8') as f:
+        f.write(ass_content)
+    logger.info(f"[ASS] File created: {ass_path}")
+    return ass_path
+
+
+def build_fade_in_command(spec: IntroSpec, audio_path: str, output_path: str, duration: float,
+                          ass_path: Path, background_image: Optional[str] = None) -> List[str]:
+    """Fade In 템플릿 FFmpeg 명령어 (인자 리스트 - 셸을 거치지 않음)"""
+    width, height = spec.width, spec.height
+    encode_options = [
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-profile:v', 'high', '-level', '4.1',
+        '-pix_fmt', 'yuv420p', '-g', '60', '-r', '30',
+        '-c:a', 'aac', '-b:a', '192k', '-ar', '48000', '-ac', '2', '-movflags', '+faststart'
+    ]
+
+    if not background_image:
+        return ['ffmpeg', '-y',
+                '-f', 'lavfi', '-i', f"color=c=black:s={width}x{height}:d={duration}:r=30",
+                '-i', audio_path,
+                '-vf', f"ass={ass_path}",
+                *encode_options, '-shortest', output_path]
+
+    if width < height:
+        # thumbnailCropMode 우선 적용, use_center_crop은 하위 호환성을 위해 유지
+        if spec.thumbnail_crop_mode == "vertical" or (spec.thumbnail_crop_mode == "square" and spec.use_center_crop):
+            # 쇼츠용 세로 중앙 크롭 (16:9 영상에서 9:16 부분 추출)
+            filter_str = f"[0:v]crop='min(iw,ih*9/16)':'ih',scale={width}:{height},setsar=1"
+        elif spec.thumbnail_crop_mode == "original":
+            # 원본 비율 유지하며 중앙 배치
+            filter_str = (f"[0:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                          f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1")
+        else:
+            # square (기본값): 1:1 정사각형 중앙 크롭
+            filter_str = (f"[0:v]crop='min(iw,ih)':'min(iw,ih)',scale={width}:{width},"
+                          f"pad={width}:{height}:0:(oh-ih)/2:black,setsar=1")
+    else:
+        # 유튜브 형식: 전체 이미지를 축소하여 중앙 배치
+        filter_str = (f"[0:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                      f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1")
+
+    if spec.use_darken:
+        # 텍스트 영역에만 반투명 검은색 오버레이 (양쪽 10% 마진)
+        margin = int(width * 0.1)
+        box_width = int(width * 0.8)
+        filter_str += f",drawbox={margin}:0:{box_width}:{int(height*0.25)}:black@0.4:t=fill"
+        filter_str += f",drawbox={margin}:{int(height*0.35)}:{box_width}:{int(height*0.3)}:black@0.5:t=fill"
+        filter_str += ",eq=contrast=1.05:saturation=0.95"
+
+    if spec.use_gradient:
+        # 선형 그라데이션: 반투명 박스를 겹쳐서 왼쪽이 더 어둡게
+        gradient_steps = 30
+        for i in range(gradient_steps):
+            x_pos = int(width * i / gradient_steps)
+            box_width = int(width / gradient_steps)
+            opacity = 0.6 * (1 - i / gradient_steps)
+            filter_str += f",drawbox={x_pos}:0:{box_width}:{height}:black@{opacity:.2f}:t=fill"
+
+    filter_str += f",ass={ass_path}"
+    return ['ffmpeg', '-y', '-loop', '1', '-i', background_image, '-i', audio_path,
+            '-filter_complex', filter_str, '-map', '0:v', '-map', '1:a', '-t', str(duration),
+            *encode_options, output_path]
+
+
+def _run_checked(command: List[str], description: str):
+    result = run_ffmpeg(command)
+    if result.returncode != 0:
+        raise FFmpegError(f"{description} failed", stderr=result.stderr, returncode=result.returncode)
+
+
+def render_intro(spec: IntroSpec, job_dir: Path) -> float:
+    """인트로 비디오/오디오/썸네일을 job_dir에 생성하고 길이 반환"""
+    english_request, korean_request = get_intro_tts_requests(spec, job_dir)
+    english_tts_path = Path(english_request.output_path)
+    korean_tts_path = Path(korean_request.output_path)
+    tts_path = job_dir / AUDIO_NAME
+
+    # 1. 영어 패턴 문장 / 한글 설명 TTS (동시에 생성, 스레드 풀에서 실행되므로 이 스레드 전용 이벤트 루프)
+    logger.info(f"[TTS] Generating TTS for: {spec.header_text}")
+    english_result, korean_result = asyncio.run(
+        get_tts_cache().synthesize_many([english_request, korean_request])
+    )
+    if english_result is None or korean_result is None:
+        raise RuntimeError("TTS generation failed")
+    english_duration = english_result['duration'] or 0.0
+    korean_duration = korean_result['duration'] or 0.0
+
+    # 2. 두 오디오 연결 (0.5초 간격)
+    result = run_ffmpeg([
+        "ffmpeg", "-y",
+        "-i", str(english_tts_path),
+        "-i", str(korean_tts_path),
+        "-filter_complex", f"[0:a]apad=pad_dur={TTS_GAP_SECONDS}[a0];[a0][1:a]concat=n=2:v=0:a=1[out]",
+        "-map", "[out]",
+        "-c:a", "aac", "-b:a", "192k", "-ar", "48000", "-ac", "2",
+        str(tts_path)
+    ])
+    if result.returncode == 0:
+        english_tts_path.unlink()
+        korean_tts_path.unlink()
+    else:
+        logger.error(f"[TTS] 오디오 연결 실패: {result.stderr}")
+        # 연결 실패 시 한국어만 사용
+        korean_tts_path.rename(tts_path)
+        english_tts_path.unlink(missing_ok=True)
+    duration = english_duration + TTS_GAP_SECONDS + korean_duration
+
+    # 3. 배경 프레임
+    background_image = None
+    if spec.background_media:
+        background_image = extract_background_frame(spec.background_media, spec.background_time,
+                                                     str(job_dir / "background.jpg"))
+
+    # 4. 비디오 생성
+    video_path = job_dir / VIDEO_NAME
+    ass_path = write_intro_ass(spec.header_text, spec.korean_text, duration,
+                               job_dir / f"{video_path.stem}_subtitle.ass", spec.width, spec.height)
+    _run_checked(build_fade_in_command(spec, str(tts_path), str(video_path), duration, ass_path,
+                                       background_image), "Intro video generation")
+    logger.info(f"Intro video generated: {video_path} ({duration:.2f}s, {spec.width}x{spec.height})")
+
+    # 5. 썸네일
+    result = run_ffmpeg(["ffmpeg", "-y", "-i", str(video_path), "-ss", "0", "-vframes", "1", "-q:v", "1",
+                         str(job_dir / THUMBNAIL_NAME)])
+    if result.returncode != 0:
+        logger.error(f"Thumbnail extraction failed: {result.stderr}")
+    return duration
+
+
+class IntroCache(RenderCache):
+    """인트로 결과 캐시 (비디오, 오디오, 썸네일 + 길이)"""
+
+    def make_intro_key(self, spec: IntroSpec) -> Optional[str]:
+        """인트로 입력의 해시 (배경 미디어를 확인할 수 없으면 None - 캐시 사용 안 함)"""
+        if not self.enabled:
+            return None
+        background = None
+        if spec.background_media:
+            try:
+                real_path = os.path.realpath(spec.background_media)
+                stat = os.stat(real_path)
+            except OSError:
+                return None
+            background = [real_path, stat.st_size, stat.st_mtime_ns, spec.background_time]
+
+        payload = json.dumps({
+            'spec': {k: v for k, v in asdict(spec).items() if k not in ('background_media', 'background_time')},
+            'background': background,
+            'tts': get_tts_config(),
+            'version': INTRO_CACHE_VERSION,
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def load(self, key: str, job_dir: Path) -> Optional[float]:
+        """캐시 항목을 job_dir에 링크하고 길이 반환 (없으면 None)"""
+        entry = self.cache_dir / key
+        try:
+            with open(entry / META_NAME, 'r', encoding='utf-8') as f:
+                duration = json.load(f)['duration']
+            for name in CACHED_FILES:
+                if (entry / name).exists():
+                    self._link(entry / name, job_dir / name)
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(entry, None)
+        except OSError:
+            pass
+        get_media_probe().record_copy(str(entry / VIDEO_NAME), str(job_dir / VIDEO_NAME))
+        logger.info(f"Intro cache hit: {key[:12]} -> {job_dir}")
+        return duration
+
+    def save(self, key: str, job_dir: Path, duration: float):
+        """생성된 인트로를 캐시에 저장 (임시 디렉토리에 링크한 뒤 이름 변경)"""
+        entry = self.cache_dir / key
+        if entry.exists():
+            return
+        temp_entry = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        try:
+            for name in CACHED_FILES:
+                if (job_dir / name).exists():
+                    self._link(job_dir / name, temp_entry / name)
+            with open(temp_entry / META_NAME, 'w', encoding='utf-8') as f:
+                json.dump({'duration': duration}, f)
+            os.rename(temp_entry, entry)
+        except OSError as e:
+            logger.warning(f"Intro cache store failed ({key[:12]}): {e}")
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            return
+        self._evict(keep=entry)
+
+
+def create_intro(spec: IntroSpec, job_dir: Optional[Path] = None) -> Dict:
+    """인트로 비디오 생성 (캐시 사용, 동기 - 스레드 풀에서 실행)
+
+    Args:
+        job_dir: 결과를 둘 디렉토리 (없으면 INTRO_OUTPUT_DIR/날짜/시간_고유값)
+
+    Returns:
+        인트로 비디오 정보 (/api/intro-videos 응답의 video 항목)
+    """
+    if job_dir is None:
+        now = datetime.now()
+        job_dir = INTRO_OUTPUT_DIR / now.strftime("%Y-%m-%d") / f"{now.strftime('%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    job_dir = Path(job_dir)
+    job_dir.mkdir(parents=True, exist_ok=True)
+
+    cache = get_intro_cache()
+    key = cache.make_intro_key(spec)
+    if key is None:
+        duration = render_intro(spec, job_dir)
+    else:
+        # 같은 인트로를 동시에 요청하면 한 번만 생성
+        with cache.coalesce(key):
+            duration = cache.load(key, job_dir)
+            if duration is None:
+                duration = render_intro(spec, job_dir)
+                cache.save(key, job_dir, duration)
+
+    return {
+        "id": job_dir.name,
+        "jobFolder": str(job_dir),
+        "videoFilePath": str(job_dir / VIDEO_NAME),
+        "ttsFilePath": str(job_dir / AUDIO_NAME),
+        "thumbnailPath": str(job_dir / THUMBNAIL_NAME),
+        "duration": duration,
+        "headerText": spec.header_text,
+        "koreanText": spec.korean_text,
+        "format": spec.video_format,
+        "template": spec.template,
+    }
+
+
+async def generate_intro(spec: IntroSpec, job_dir: Optional[Path] = None) -> Dict:
+    """인트로 비디오 생성 (이벤트 루프를 막지 않도록 스레드 풀에서 실행)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, with_job_context(create_intro, spec, job_dir))
+
+
+_intro_cache: Optional[IntroCache] = None
+
+
+def get_intro_cache() -> IntroCache:
+    """프로세스 전역 IntroCache 인스턴스"""
+    global _intro_cache
+    if _intro_cache is None:
+        _intro_cache = IntroCache(INTRO_CACHE_DIR, INTRO_CACHE_MAX_BYTES, INTRO_CACHE_ENABLED)
+    return _intro_cache
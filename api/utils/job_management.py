@@ -12,6 +12,10 @@ import sys
 # Add parent directory to path for database imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from api.config import JOB_QUEUE_ENABLED
+from api.utils.job_queue import get_job_queue
+from job_processes import is_cancelled, kill_job_processes
+
 logger = logging.getLogger(__name__)
 
 # Job status storage (will be initialized by main app)
@@ -35,7 +39,7 @@ def cleanup_memory_jobs():
     if not USE_REDIS and len(job_status) > MAX_JOB_MEMORY:
         # 가장 오래된 완료된 작업들 제거
         completed_jobs = [(k, v) for k, v in job_status.items() 
-                         if v.get('status') in ['completed', 'failed']]
+                         if v.get('status') in ['completed', 'failed', 'cancelled']]
         if completed_jobs:
             # 시간순 정렬 (오래된 것부터)
             completed_jobs.sort(key=lambda x: x[1].get('created_at', ''))
@@ -47,6 +51,8 @@ def cleanup_memory_jobs():
 
 def cleanup_job_processes(job_id: str):
     """작업과 관련된 모든 프로세스 정리"""
+    # 현재 프로세스에서 작업에 등록된 FFmpeg 프로세스 트리
+    kill_job_processes(job_id)
     if job_id in active_processes:
         process_info = active_processes[job_id]
         try:
@@ -101,6 +107,12 @@ def update_job_status_both(job_id: str, status: str, progress: int = None,
     
     job_data = job_status[job_id]
     
+    # 취소된 작업은 처리 함수가 보고하는 실패/완료 대신 취소 상태로 마무리
+    if is_cancelled(job_id) and status != 'cancelled':
+        status = 'cancelled'
+        message = "작업이 취소되었습니다."
+        error_message = None
+    
     # 기존 데이터 보존 (output_files 등)
     existing_output_files = job_data.get('output_files')
     
@@ -122,6 +134,13 @@ def update_job_status_both(job_id: str, status: str, progress: int = None,
     
     # DB 업데이트 비활성화 - 메모리만 사용
     
+    # 공유 작업 큐에 상태 저장 (API 워커 어디서든 조회 가능)
+    if JOB_QUEUE_ENABLED:
+        try:
+            get_job_queue().update_state(job_id, job_data)
+        except Exception as e:
+            logger.warning(f"Job queue state update failed: {e}")
+    
     # Redis 업데이트 (모든 worker에서 접근 가능)
     if USE_REDIS and redis_client:
         try:
@@ -137,8 +156,8 @@ def update_job_status_both(job_id: str, status: str, progress: int = None,
     # 메모리 정리
     cleanup_memory_jobs()
     
-    # 완료/실패 시 프로세스 정리
-    if status in ['completed', 'failed']:
+    # 완료/실패/취소 시 프로세스 정리
+    if status in ['completed', 'failed', 'cancelled']:
         cleanup_job_processes(job_id)
         
         # 출력 파일 경로 업데이트 (웹 접근 가능한 경로로 변환)
@@ -181,8 +200,17 @@ def update_job_status_both(job_id: str, status: str, progress: int = None,
 
 
 def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
-    """작업 상태 조회 (메모리, Redis 또는 새 DB에서)"""
-    # 먼저 메모리에서 확인
+    """작업 상태 조회 (공유 작업 큐, 메모리, Redis 또는 새 DB에서)"""
+    # 렌더 워커가 갱신하는 공유 상태가 우선 (API 프로세스의 메모리 상태는 제출 시점 값)
+    if JOB_QUEUE_ENABLED:
+        try:
+            state = get_job_queue().get_state(job_id)
+            if state:
+                return state
+        except Exception as e:
+            logger.warning(f"Job queue read failed: {e}")
+    
+    # 메모리에서 확인
     if job_id in job_status:
         return job_status[job_id]
     
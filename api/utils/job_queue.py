@@ -0,0 +1,498 @@
+"""
+Durable Job Queue
+모든 uvicorn 워커와 렌더 워커 프로세스가 공유하는 SQLite(WAL) 작업 큐
+
+API 프로세스는 작업을 큐에 넣고 상태만 조회한다. 렌더링은 별도의 렌더 워커
+(render_worker.py)가 작업을 임대(claim)하여 실행하고, 실행 중에는 하트비트로
+임대를 연장한다. 워커가 죽으면 임대가 만료되어 다른 워커가 다시 가져간다.
+
+작업 상태(job_status와 같은 딕셔너리)도 이 큐에 저장되므로
+/api/status/{job_id}는 어느 워커가 요청을 받든 같은 결과를 반환한다.
+
+스케줄링: 우선순위(단일 클립/미리보기 > 혼합 > 배치)가 높은 작업부터,
+같은 우선순위 안에서는 클라이언트(IP)별 가중 공정 큐잉(가상 시간이 가장 작은
+클라이언트의 가장 오래된 작업)으로 임대한다. 긴 배치는 클립 단위 사이에서
+더 높은 우선순위 작업에 워커를 양보한다 (render_worker.yield_to_priority_jobs).
+
+작업마다 예상 렌더링 길이(est_seconds)를 저장하고, 완료된 작업의 실제 처리 시간으로
+렌더 처리량을 학습한다. 요청 수락 제한(api/utils/admission.py)이 이를 사용한다.
+"""
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.config import (
+    JOB_QUEUE_ENABLED, JOB_QUEUE_DB, JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS, JOB_EXPIRE_TIME, JOB_CLIENT_WEIGHTS
+)
+
+logger = logging.getLogger(__name__)
+
+# 큐 상태 (사용자에게 보이는 작업 상태는 state JSON의 status)
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+
+# 우선순위 (enhanced_batch_renderer.JobPriority와 같은 값 - 작을수록 먼저)
+PRIORITY_URGENT = 1
+PRIORITY_HIGH = 2
+PRIORITY_NORMAL = 3
+PRIORITY_LOW = 4
+
+# 작업 종류별 기본 우선순위 (미리보기 품질 작업은 종류와 관계없이 HIGH)
+JOB_PRIORITIES = {
+    'single_clip': PRIORITY_HIGH,
+    'range_extraction': PRIORITY_HIGH,
+    'mixed_template': PRIORITY_NORMAL,
+    'batch_clip': PRIORITY_LOW,
+}
+
+# 처리량 이동 평균 반영 비율
+THROUGHPUT_ALPHA = 0.2
+
+# 작업 종류별 처리 함수와 요청 모델 (렌더 워커에서 지연 import)
+JOB_HANDLERS = {
+    'single_clip': ('api.routes.clip', 'process_clipping', 'ClippingRequest'),
+    'batch_clip': ('api.routes.batch', 'process_batch_clipping', 'BatchClippingRequest'),
+    'mixed_template': ('api.routes.mixed', 'process_mixed_clips', 'MixedTemplateRequest'),
+    'range_extraction': ('api.routes.extract', 'process_range_extraction', 'ExtractRangeRequest'),
+}
+
+
+class JobQueue:
+    """SQLite 기반 영속 작업 큐 (임대/하트비트)"""
+
+    def __init__(self, db_path: Path = JOB_QUEUE_DB, lease_seconds: int = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: 트랜잭션을 BEGIN IMMEDIATE로 직접 관리
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    job_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    queue_status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    lease_until REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # 스케줄링 컬럼 (이전 버전 DB에는 추가)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, ddl in (('priority', f"INTEGER NOT NULL DEFAULT {PRIORITY_NORMAL}"),
+                                ('client_id', "TEXT"),
+                                ('cost', "REAL NOT NULL DEFAULT 1"),
+                                ('est_seconds', "REAL NOT NULL DEFAULT 0"),
+                                ('started_at', "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {ddl}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (queue_status, priority, created_at)")
+            # 클라이언트별 가상 시간 (받은 서비스량 / 가중치)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS client_service (
+                    client_id TEXT PRIMARY KEY,
+                    virtual_time REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("DELETE FROM client_service WHERE updated_at < ?", (time.time() - JOB_EXPIRE_TIME,))
+            # 렌더 처리량 (워커 하나가 초당 렌더링하는 예상 출력 길이, 지수 이동 평균)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS render_throughput (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    speed REAL NOT NULL,
+                    samples INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # 오래된 완료 작업 정리
+            conn.execute("DELETE FROM jobs WHERE queue_status = ? AND updated_at < ?",
+                         (DONE, time.time() - JOB_EXPIRE_TIME))
+        finally:
+            conn.close()
+
+    def enqueue(self, job_id: str, job_type: str, payload: Dict[str, Any], state: Dict[str, Any],
+                requeue: bool = False, priority: int = PRIORITY_NORMAL,
+                client_id: Optional[str] = None, cost: float = 1.0, est_seconds: float = 0.0):
+        """작업을 큐에 추가
+
+        Args:
+            requeue: 종료된 같은 job_id의 작업을 다시 대기 상태로 (재개)
+            priority: 우선순위 (PRIORITY_*)
+            client_id: 공정 큐잉 단위 (클라이언트 IP)
+            cost: 작업량 (클립 수) - 클라이언트 가상 시간 증가분
+            est_seconds: 예상 렌더링 출력 길이 (초) - 대기 시간 예측용
+        """
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = time.time()
+        sql = ("INSERT INTO jobs (id, job_type, payload, state, queue_status, priority, client_id, cost, "
+               "est_seconds, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+        if requeue:
+            sql += (" ON CONFLICT(id) DO UPDATE SET payload = excluded.payload, state = excluded.state, "
+                    "queue_status = excluded.queue_status, attempts = 0, worker_id = NULL, "
+                    "lease_until = NULL, priority = excluded.priority, cost = excluded.cost, "
+                    "est_seconds = excluded.est_seconds, started_at = NULL, "
+                    "client_id = COALESCE(excluded.client_id, jobs.client_id), "
+                    "updated_at = excluded.updated_at")
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._activate_client(conn, client_id, now)
+            conn.execute(sql, (job_id, job_type, json.dumps(payload, default=str),
+                               json.dumps(state, default=str), QUEUED, priority, client_id, cost,
+                               est_seconds, now, now))
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        logger.info(f"[Job {job_id}] {'Requeued' if requeue else 'Queued'} ({job_type}, priority {priority}, "
+                    f"client {client_id})")
+
+    def claim(self, worker_id: str, max_priority: Optional[int] = None) -> Optional[Tuple[str, str, Dict, Dict]]:
+        """다음 작업을 원자적으로 임대
+
+        임대가 만료된(워커가 죽은) 작업을 먼저, 그다음 대기 중인 작업을
+        우선순위 + 클라이언트별 가중 공정 큐잉 순서로 가져온다.
+
+        Args:
+            max_priority: 이 값 이하(더 높은) 우선순위 작업만 임대 (배치 단위 사이 양보용)
+
+        Returns:
+            (job_id, job_type, payload, state) 또는 None
+        """
+        now = time.time()
+        priority_limit = max_priority if max_priority is not None else PRIORITY_LOW + 1000
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._fail_exhausted(conn, now)
+            row = conn.execute(
+                "SELECT id, job_type, payload, state, attempts, client_id, cost FROM jobs "
+                "WHERE queue_status = ? AND lease_until < ? AND priority <= ? "
+                "ORDER BY priority, created_at LIMIT 1",
+                (RUNNING, now, priority_limit)
+            ).fetchone()
+            if row is None:
+                row = self._select_fair(conn, priority_limit)
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row['attempts'] == 0:
+                self._charge_client(conn, row['client_id'], row['cost'], now)
+            conn.execute(
+                "UPDATE jobs SET queue_status = ?, worker_id = ?, lease_until = ?, "
+                "attempts = attempts + 1, started_at = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, worker_id, now + self.lease_seconds, now, now, row['id'])
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        if row['attempts'] > 0:
+            logger.warning(f"[Job {row['id']}] Lease expired, retrying (attempt {row['attempts'] + 1})")
+        return row['id'], row['job_type'], json.loads(row['payload']), json.loads(row['state'])
+
+    def _select_fair(self, conn: sqlite3.Connection, priority_limit: int) -> Optional[sqlite3.Row]:
+        """가장 높은 우선순위에서 가상 시간이 가장 작은 클라이언트의 가장 오래된 작업"""
+        top = conn.execute(
+            "SELECT MIN(priority) AS p FROM jobs WHERE queue_status = ? AND priority <= ?",
+            (QUEUED, priority_limit)
+        ).fetchone()['p']
+        if top is None:
+            return None
+        return conn.execute(
+            "SELECT j.id, j.job_type, j.payload, j.state, j.attempts, j.client_id, j.cost FROM jobs j "
+            "LEFT JOIN client_service c ON c.client_id = IFNULL(j.client_id, '') "
+            "WHERE j.queue_status = ? AND j.priority = ? "
+            "ORDER BY IFNULL(c.virtual_time, 0), j.created_at LIMIT 1",
+            (QUEUED, top)
+        ).fetchone()
+
+    @staticmethod
+    def _set_virtual_time(conn: sqlite3.Connection, client_id: str, virtual_time: float, now: float):
+        conn.execute(
+            "INSERT INTO client_service (client_id, virtual_time, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(client_id) DO UPDATE SET virtual_time = excluded.virtual_time, "
+            "updated_at = excluded.updated_at",
+            (client_id, virtual_time, now)
+        )
+
+    def _activate_client(self, conn: sqlite3.Connection, client_id: Optional[str], now: float):
+        """작업을 넣는 클라이언트의 가상 시간을 대기 중인 다른 클라이언트의 최솟값 이상으로 맞춤
+
+        한동안 쉬던 클라이언트가 쌓아 둔 크레딧으로 큐를 독점하지 않도록 한다.
+        """
+        client_id = client_id or ''
+        floor = conn.execute(
+            "SELECT MIN(virtual_time) AS v FROM client_service WHERE client_id IN "
+            "(SELECT IFNULL(client_id, '') FROM jobs WHERE queue_status = ?) AND client_id != ?",
+            (QUEUED, client_id)
+        ).fetchone()['v']
+        current = conn.execute("SELECT virtual_time FROM client_service WHERE client_id = ?",
+                               (client_id,)).fetchone()
+        virtual_time = current['virtual_time'] if current else (floor or 0.0)
+        if floor is not None:
+            virtual_time = max(virtual_time, floor)
+        self._set_virtual_time(conn, client_id, virtual_time, now)
+
+    def _charge_client(self, conn: sqlite3.Connection, client_id: Optional[str], cost: float, now: float):
+        """임대한 작업량만큼 클라이언트 가상 시간 증가 (가중치가 크면 덜 증가)"""
+        client_id = client_id or ''
+        weight = JOB_CLIENT_WEIGHTS.get(client_id, 1.0) or 1.0
+        current = conn.execute("SELECT virtual_time FROM client_service WHERE client_id = ?",
+                               (client_id,)).fetchone()
+        virtual_time = current['virtual_time'] if current else 0.0
+        self._set_virtual_time(conn, client_id, virtual_time + cost / weight, now)
+
+    def _fail_exhausted(self, conn: sqlite3.Connection, now: float):
+        """재시도 횟수를 다 쓴 만료 작업은 실패 처리"""
+        rows = conn.execute(
+            "SELECT id, state FROM jobs WHERE queue_status = ? AND lease_until < ? AND attempts >= ?",
+            (RUNNING, now, self.max_attempts)
+        ).fetchall()
+        for row in rows:
+            state = json.loads(row['state'])
+            state.update({'status': 'failed', 'error': '렌더 워커가 응답하지 않아 작업이 중단되었습니다.'})
+            conn.execute(
+                "UPDATE jobs SET queue_status = ?, state = ?, updated_at = ? WHERE id = ?",
+                (DONE, json.dumps(state, default=str), now, row['id'])
+            )
+            logger.error(f"[Job {row['id']}] Failed after {self.max_attempts} attempts (worker lost)")
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """임대 연장 - 다른 워커가 가져간 작업이면 False"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND queue_status = ?",
+                (now + self.lease_seconds, now, job_id, worker_id, RUNNING)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def update_state(self, job_id: str, state: Dict[str, Any]):
+        """작업 상태 저장 (job_status 딕셔너리 전체)"""
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE jobs SET state = ?, updated_at = ? WHERE id = ?",
+                         (json.dumps(state, default=str), time.time(), job_id))
+        finally:
+            conn.close()
+
+    def finish(self, job_id: str, worker_id: str, state: Dict[str, Any]):
+        """작업 종료 - 최종 상태 저장 (완료된 작업은 처리량 측정에 반영)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT est_seconds, started_at FROM jobs WHERE id = ? AND worker_id = ?",
+                               (job_id, worker_id)).fetchone()
+            conn.execute(
+                "UPDATE jobs SET queue_status = ?, state = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ?",
+                (DONE, json.dumps(state, default=str), now, job_id, worker_id)
+            )
+            if (row and row['started_at'] and row['est_seconds'] > 0
+                    and state.get('status') == 'completed'):
+                self._record_throughput(conn, row['est_seconds'] / max(1.0, now - row['started_at']), now)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _record_throughput(conn: sqlite3.Connection, speed: float, now: float):
+        """렌더 처리량 지수 이동 평균 갱신"""
+        row = conn.execute("SELECT speed, samples FROM render_throughput WHERE id = 1").fetchone()
+        if row:
+            speed = row['speed'] + THROUGHPUT_ALPHA * (speed - row['speed'])
+        conn.execute(
+            "INSERT INTO render_throughput (id, speed, samples, updated_at) VALUES (1, ?, 1, ?) "
+            "ON CONFLICT(id) DO UPDATE SET speed = excluded.speed, samples = samples + 1, "
+            "updated_at = excluded.updated_at",
+            (speed, now)
+        )
+
+    def get_throughput(self) -> Optional[float]:
+        """측정된 렌더 처리량 (워커 하나가 초당 렌더링하는 예상 출력 길이, 측정 전이면 None)"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT speed FROM render_throughput WHERE id = 1").fetchone()
+        finally:
+            conn.close()
+        return row['speed'] if row else None
+
+    def get_backlog(self, max_priority: int) -> Dict[str, float]:
+        """우선순위가 max_priority 이하(같거나 높은)인 작업의 남은 렌더링 양
+
+        Returns:
+            queued_seconds: 대기 중인 작업의 예상 출력 길이 합,
+            running_seconds: 실행 중인 작업의 남은 예상 출력 길이 합 (진행률 반영),
+            queued/running: 작업 수
+        """
+        conn = self._connect()
+        try:
+            queued = conn.execute(
+                "SELECT COUNT(*) AS n, IFNULL(SUM(est_seconds), 0) AS s FROM jobs "
+                "WHERE queue_status = ? AND priority <= ?", (QUEUED, max_priority)
+            ).fetchone()
+            running = conn.execute("SELECT est_seconds, state FROM jobs WHERE queue_status = ?",
+                                   (RUNNING,)).fetchall()
+        finally:
+            conn.close()
+        running_seconds = 0.0
+        for row in running:
+            progress = json.loads(row['state']).get('progress') or 0
+            running_seconds += row['est_seconds'] * max(0.0, 1 - progress / 100)
+        return {
+            'queued': queued['n'],
+            'queued_seconds': queued['s'],
+            'running': len(running),
+            'running_seconds': running_seconds,
+        }
+
+    def cancel(self, job_id: str, state: Dict[str, Any]) -> bool:
+        """작업 취소 상태 저장 - 대기 중인 작업은 큐에서 빼서 다시 임대되지 않게 함
+
+        실행 중인 작업은 상태만 저장하고, 워커가 프로세스 종료 후 finish로 마무리한다.
+
+        Returns:
+            대기 중이던 작업을 큐에서 뺐으면 True
+        """
+        conn = self._connect()
+        try:
+            now = time.time()
+            cursor = conn.execute(
+                "UPDATE jobs SET queue_status = ?, state = ?, updated_at = ? WHERE id = ? AND queue_status = ?",
+                (DONE, json.dumps(state, default=str), now, job_id, QUEUED)
+            )
+            if cursor.rowcount:
+                return True
+            conn.execute("UPDATE jobs SET state = ?, updated_at = ? WHERE id = ? AND queue_status = ?",
+                         (json.dumps(state, default=str), now, job_id, RUNNING))
+            return False
+        finally:
+            conn.close()
+
+    def get_state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """공유 저장소의 작업 상태"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row['state']) if row else None
+
+    def get_stats(self) -> Dict[str, int]:
+        """큐 상태별 작업 수"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT queue_status, COUNT(*) AS n FROM jobs GROUP BY queue_status").fetchall()
+        finally:
+            conn.close()
+        return {row['queue_status']: row['n'] for row in rows}
+
+
+class LeaseHeartbeat:
+    """작업 실행 중 백그라운드 스레드에서 주기적으로 임대 연장"""
+
+    def __init__(self, queue: JobQueue, job_id: str, worker_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker_id):
+                    logger.warning(f"[Job {self.job_id}] Lease lost")
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"[Job {self.job_id}] Heartbeat failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+
+def get_job_priority(job_type: str, request) -> int:
+    """작업 종류와 품질로 우선순위 결정"""
+    if getattr(request, 'quality', None) == 'draft':
+        return PRIORITY_HIGH
+    return JOB_PRIORITIES.get(job_type, PRIORITY_NORMAL)
+
+
+def submit_job(background_tasks, job_id: str, job_type: str, handler, request,
+               state: Dict[str, Any], requeue: bool = False, client_id: Optional[str] = None,
+               clip_numbers: Optional[List[int]] = None):
+    """작업 제출 - 큐가 켜져 있으면 큐에 넣고, 아니면 현재 프로세스의 BackgroundTasks로 실행
+
+    clip_numbers: 일부 클립만 다시 렌더링하는 작업(배치 편집)이면 그 클립 번호 (예상 렌더링 양에 사용)
+    """
+    if requeue:
+        # 취소된 작업을 다시 실행하는 경우 취소 표시 제거
+        from job_processes import clear_cancel
+        clear_cancel(job_id)
+    if JOB_QUEUE_ENABLED:
+        from api.utils.admission import estimate_job_seconds
+        priority = get_job_priority(job_type, request)
+        cost = len(clip_numbers if clip_numbers is not None else getattr(request, 'clips', None) or []) or 1
+        # 처리 함수가 클립 단위 사이에서 양보할 때 자신의 우선순위를 참조
+        state['priority'] = priority
+        get_job_queue().enqueue(job_id, job_type, request.dict(), state, requeue=requeue,
+                                priority=priority, client_id=client_id, cost=cost,
+                                est_seconds=estimate_job_seconds(job_type, request, clip_numbers))
+    else:
+        background_tasks.add_task(_run_tracked, handler, job_id, request)
+
+
+async def _run_tracked(handler, job_id: str, request):
+    """현재 프로세스에서 실행하는 작업의 FFmpeg 진행 상황 기록"""
+    from ffmpeg_progress import progress_job
+    with progress_job(job_id):
+        await handler(job_id, request)
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """프로세스 전역 JobQueue 인스턴스"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
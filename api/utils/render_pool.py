@@ -0,0 +1,99 @@
+"""
+Clip Render Pool
+배치/혼합 작업의 클립 렌더링을 프로세스 풀로 분산
+
+create_from_template는 블로킹 호출이므로 이벤트 루프 스레드에서 직접 실행하지 않고
+별도 프로세스에서 실행한다. 결과는 요청한 클립 순서대로 반환한다.
+"""
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from api.config import CLIP_RENDER_WORKERS
+from ffmpeg_progress import progress_job, get_current_job
+from job_processes import check_cancelled, JobCancelled
+
+logger = logging.getLogger(__name__)
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _init_worker(thread_budget: int):
+    """워커 프로세스 초기화 - 워커들이 CPU 스레드 예산을 나눠 사용"""
+    os.environ['FFMPEG_THREAD_BUDGET'] = str(thread_budget)
+
+
+def render_template_clip(job: Dict[str, Any], progress_job_id: Optional[str] = None) -> bool:
+    """워커 프로세스에서 템플릿 클립 하나를 렌더링
+
+    Args:
+        job: TemplateVideoEncoder.create_from_template 키워드 인자
+        progress_job_id: 인코딩 진행 상황을 기록할 작업 ID
+    """
+    from template_video_encoder import TemplateVideoEncoder
+
+    # 대기 중에 작업이 취소되었으면 렌더링하지 않음
+    if progress_job_id:
+        check_cancelled(progress_job_id)
+    encoder = TemplateVideoEncoder()
+    with progress_job(progress_job_id):
+        return encoder.create_from_template(**job)
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """프로세스 전역 클립 렌더 풀 (처음 사용할 때 생성)"""
+    global _render_pool
+    if _render_pool is None:
+        thread_budget = max(1, (os.cpu_count() or 4) // CLIP_RENDER_WORKERS)
+        # 이벤트 루프/스레드 풀이 있는 프로세스를 fork하지 않도록 spawn 사용
+        _render_pool = ProcessPoolExecutor(
+            max_workers=CLIP_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(thread_budget,)
+        )
+        logger.info(f"Clip render pool started: {CLIP_RENDER_WORKERS} workers x {thread_budget} threads")
+    return _render_pool
+
+
+def shutdown_render_pool():
+    """렌더 풀 종료 (앱 종료 시)"""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+
+async def render_clips(jobs: List[Dict[str, Any]],
+                       on_clip_done: Optional[Callable[[int, bool], None]] = None) -> List[bool]:
+    """여러 클립을 병렬 렌더링하고 요청 순서대로 결과 반환
+
+    Args:
+        jobs: 클립별 create_from_template 키워드 인자 리스트
+        on_clip_done: 클립 하나가 끝날 때마다 (인덱스, 성공 여부)로 호출 (이벤트 루프에서 실행)
+
+    Returns:
+        jobs와 같은 순서의 성공 여부 리스트
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_render_pool()
+    # 호출한 작업의 진행 상황 컨텍스트를 워커 프로세스로 전달
+    progress_job_id = get_current_job()
+
+    async def run(index: int, job: Dict[str, Any]):
+        try:
+            success = await loop.run_in_executor(pool, render_template_clip, job, progress_job_id)
+        except JobCancelled:
+            # 취소는 클립 실패로 기록하지 않고 작업 처리 함수로 전달
+            raise
+        except Exception as e:
+            logger.error(f"Clip {index + 1} render error: {e}")
+            success = False
+        if on_clip_done:
+            on_clip_done(index, success)
+        return success
+
+    return list(await asyncio.gather(*(run(i, job) for i, job in enumerate(jobs))))
@@ -15,6 +15,8 @@ MAX_WORKERS = int(os.getenv('MAX_WORKERS', '4'))
 BASE_DIR = Path(__file__).parent
 OUTPUT_DIR = Path(os.getenv('OUTPUT_DIR', str(BASE_DIR / 'output')))
 MEDIA_ROOT = Path(os.getenv('MEDIA_ROOT', '/media'))
+# 캐시/작업 상태 데이터 (SQLite DB, 렌더/TTS 캐시) - 소스 트리 밖에 저장
+DATA_DIR = Path(os.getenv('SHADOWING_DATA_DIR', str(Path.home() / '.cache' / 'shadowing_api')))
 
 # Redis 설정
 REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
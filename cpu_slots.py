@@ -0,0 +1,188 @@
+"""
+Host-wide CPU slot scheduler for FFmpeg
+호스트 전체(모든 uvicorn 워커/프로세스 풀)에서 FFmpeg 인코딩에 CPU 슬롯을 배분
+
+슬롯 하나 = 인코더 스레드 하나. 슬롯은 공유 디렉토리의 잠금 파일(flock)로 표현되므로
+프로세스가 비정상 종료해도 잠금이 자동으로 해제된다.
+인코딩 작업은 가능한 만큼(최대 CPU_SLOT_MAX_PER_JOB) 슬롯을 잡고,
+잡은 슬롯 수에 맞춰 FFmpeg -threads / x264 threads를 설정한다.
+
+x264는 스레드 수가 늘수록 효율이 떨어지므로 작업당 상한을 두고
+여러 작업을 동시에 돌리는 편이 전체 처리량이 높다.
+"""
+import os
+import re
+import time
+import random
+import logging
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+from ffmpeg_progress import run_with_progress
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+CPU_SLOTS_ENABLED = os.getenv("CPU_SLOTS_ENABLED", "true").lower() == "true"
+CPU_SLOT_DIR = Path(os.getenv("CPU_SLOT_DIR", "/tmp/shadowing_cpu_slots"))
+CPU_SLOT_COUNT = int(os.getenv("CPU_SLOT_COUNT", str(os.cpu_count() or 4)))
+CPU_SLOT_MAX_PER_JOB = int(os.getenv("CPU_SLOT_MAX_PER_JOB", "4"))
+# 슬롯을 기다리는 최대 시간 (초) - 초과하면 1 스레드로 그냥 실행
+CPU_SLOT_WAIT_TIMEOUT = float(os.getenv("CPU_SLOT_WAIT_TIMEOUT", "600"))
+
+POLL_INTERVAL = 0.2
+
+
+class SlotLease:
+    """획득한 CPU 슬롯"""
+
+    def __init__(self, handles: List):
+        self._handles = handles
+
+    @property
+    def threads(self) -> int:
+        return max(1, len(self._handles))
+
+    def release(self):
+        for handle in self._handles:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            except OSError:
+                pass
+            handle.close()
+        self._handles = []
+
+
+class CpuSlotScheduler:
+    """잠금 파일 기반 호스트 전역 CPU 슬롯 스케줄러"""
+
+    def __init__(self, slot_dir: Path = CPU_SLOT_DIR, total_slots: int = CPU_SLOT_COUNT,
+                 max_per_job: int = CPU_SLOT_MAX_PER_JOB, enabled: bool = CPU_SLOTS_ENABLED):
+        self.slot_dir = Path(slot_dir)
+        self.total_slots = max(1, total_slots)
+        self.max_per_job = max(1, max_per_job)
+        self.enabled = enabled and FCNTL_AVAILABLE
+
+        if self.enabled:
+            try:
+                self.slot_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"CPU slot scheduler disabled, cannot create {self.slot_dir}: {e}")
+                self.enabled = False
+
+    def _try_acquire(self, want: int) -> List:
+        """빈 슬롯을 최대 want개까지 즉시 획득 (대기하지 않음)"""
+        handles = []
+        slots = list(range(self.total_slots))
+        # 항상 앞쪽 슬롯부터 경쟁하지 않도록 순서를 섞음
+        random.shuffle(slots)
+        for slot in slots:
+            if len(handles) >= want:
+                break
+            handle = open(self.slot_dir / f"slot_{slot}.lock", 'a')
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                handles.append(handle)
+            except OSError:
+                handle.close()
+        return handles
+
+    def acquire(self, want: Optional[int] = None, timeout: float = CPU_SLOT_WAIT_TIMEOUT) -> SlotLease:
+        """슬롯을 최소 1개 이상 획득할 때까지 대기
+
+        Args:
+            want: 원하는 스레드 수 (None이면 작업당 상한)
+        """
+        want = min(want or self.max_per_job, self.max_per_job)
+        if not self.enabled:
+            return SlotLease([])
+
+        deadline = time.time() + timeout
+        waited = False
+        while True:
+            handles = self._try_acquire(want)
+            if handles:
+                if waited:
+                    logger.debug(f"CPU slots acquired after waiting: {len(handles)}/{want}")
+                return SlotLease(handles)
+            if time.time() >= deadline:
+                logger.warning(f"No CPU slot available after {timeout}s, running with 1 thread")
+                return SlotLease([])
+            waited = True
+            time.sleep(POLL_INTERVAL)
+
+    @contextmanager
+    def lease(self, want: Optional[int] = None):
+        """with 블록 동안 슬롯 유지"""
+        slot_lease = self.acquire(want)
+        try:
+            yield slot_lease
+        finally:
+            slot_lease.release()
+
+
+def get_requested_threads(cmd: List[str]) -> Optional[int]:
+    """명령어에 지정된 -threads 값 (없거나 0이면 None)"""
+    for i, arg in enumerate(cmd[:-1]):
+        if arg == '-threads':
+            try:
+                value = int(cmd[i + 1])
+            except ValueError:
+                continue
+            if value > 0:
+                return value
+    return None
+
+
+def apply_thread_options(cmd: List[str], threads: int) -> List[str]:
+    """FFmpeg 명령어의 스레드 옵션을 획득한 슬롯 수에 맞게 변경
+
+    -threads 값과 x264opts/x264-params의 threads=N을 모두 바꾸고,
+    -threads가 없으면 마지막 출력 파일 앞에 추가한다. 출력이 여러 개인 명령은
+    출력마다 -threads를 지정해야 모든 출력이 슬롯 수를 따른다.
+    """
+    cmd = list(cmd)
+    found = False
+    for i, arg in enumerate(cmd[:-1]):
+        if arg == '-threads':
+            cmd[i + 1] = str(threads)
+            found = True
+        elif arg in ('-x264opts', '-x264-params'):
+            cmd[i + 1] = re.sub(r'(^|:)threads=\d+', rf'\g<1>threads={threads}', cmd[i + 1])
+
+    if not found and len(cmd) > 1:
+        cmd[-1:-1] = ['-threads', str(threads)]
+    return cmd
+
+
+def run_ffmpeg(cmd: List[str], timeout: Optional[float] = None, check: bool = False) -> subprocess.CompletedProcess:
+    """CPU 슬롯을 잡고 FFmpeg 실행 (subprocess.run과 같은 결과/예외)
+
+    현재 작업 컨텍스트가 있으면 인코딩 진행 상황을 기록하고, 작업 취소 시 종료된다 (ffmpeg_progress).
+    check=True이면 실패 시 CalledProcessError.
+    """
+    scheduler = get_cpu_scheduler()
+    with scheduler.lease(get_requested_threads(cmd)) as slot_lease:
+        result = run_with_progress(apply_thread_options(cmd, slot_lease.threads), timeout=timeout)
+    if check:
+        result.check_returncode()
+    return result
+
+
+_scheduler: Optional[CpuSlotScheduler] = None
+
+
+def get_cpu_scheduler() -> CpuSlotScheduler:
+    """프로세스 전역 CpuSlotScheduler 인스턴스"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = CpuSlotScheduler()
+    return _scheduler
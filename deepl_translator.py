@@ -1,30 +1,158 @@
 """
 DeepL Translation Module
 자막의 text_en 필드가 없을 때 DeepL로 번역하는 모듈
+
+- 번역 결과는 SQLite(WAL) 번역 메모리에 (원문, 언어쌍) 키로 저장하여 같은 문장은 다시 요청하지 않음
+- HTTP 연결은 프로세스 전역 Session으로 재사용 (429/5xx는 Retry-After를 따라 재시도)
+- translate_batch는 DeepL 제한(요청당 텍스트 수, 요청 크기)에 맞춰 나눠서 전송
+- 에피소드 자막 캐싱은 subtitle_index의 LRU 한 곳에서 (이 모듈은 읽고 번역하여 파일에 저장만 함)
 """
 import os
 import json
+import time
+import sqlite3
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from config import DATA_DIR
+
 logger = logging.getLogger(__name__)
 
+# 환경 변수 설정 (DEEPL_API_URL로 테스트용 로컬 서버 지정 가능)
+DEEPL_API_URL = os.getenv("DEEPL_API_URL")
+DEEPL_MEMO_ENABLED = os.getenv("DEEPL_MEMO_ENABLED", "true").lower() == "true"
+DEEPL_MEMO_DB = Path(os.getenv("DEEPL_MEMO_DB", str(DATA_DIR / "translation_memo.db")))
+DEEPL_TIMEOUT = float(os.getenv("DEEPL_TIMEOUT", "30"))
+DEEPL_MAX_RETRIES = int(os.getenv("DEEPL_MAX_RETRIES", "3"))
+# DeepL 제한: 요청당 텍스트 50개, 요청 본문 128KiB
+DEEPL_BATCH_SIZE = min(50, int(os.getenv("DEEPL_BATCH_SIZE", "50")))
+DEEPL_MAX_REQUEST_BYTES = int(os.getenv("DEEPL_MAX_REQUEST_BYTES", str(120 * 1024)))
+
+
+class TranslationMemo:
+    """번역 메모리 (원문 + 언어쌍 -> 번역문)"""
+
+    def __init__(self, db_path: Path = DEEPL_MEMO_DB, enabled: bool = DEEPL_MEMO_ENABLED):
+        self.db_path = Path(db_path)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._init_db()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Translation memo disabled ({self.db_path}): {e}")
+                self.enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=10)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translation_memo (
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    source_text TEXT NOT NULL,
+                    translated_text TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (source_lang, target_lang, source_text)
+                )
+            """)
+
+    def get_many(self, texts: List[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        """메모리에 있는 번역 (원문 -> 번역문)"""
+        if not self.enabled or not texts:
+            return {}
+        found = {}
+        with self._connect() as conn:
+            # SQLite 변수 개수 제한 안쪽으로 나눠서 조회
+            for i in range(0, len(texts), 500):
+                chunk = texts[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT source_text, translated_text FROM translation_memo "
+                    f"WHERE source_lang = ? AND target_lang = ? AND source_text IN ({','.join('?' * len(chunk))})",
+                    (source_lang, target_lang, *chunk)
+                ).fetchall()
+                found.update(rows)
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, translations: Dict[str, str], source_lang: str, target_lang: str):
+        if not self.enabled or not translations:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translation_memo VALUES (?, ?, ?, ?, ?)",
+                [(source_lang, target_lang, text, translated, now) for text, translated in translations.items()]
+            )
+
+    def get_stats(self) -> Dict:
+        stats = {"enabled": self.enabled, "hits": self.hits, "misses": self.misses}
+        if self.enabled:
+            with self._connect() as conn:
+                stats["entries"] = conn.execute("SELECT COUNT(*) FROM translation_memo").fetchone()[0]
+        return stats
+
+
+_translation_memo: Optional[TranslationMemo] = None
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_translation_memo() -> TranslationMemo:
+    """프로세스 전역 TranslationMemo 인스턴스"""
+    global _translation_memo
+    if _translation_memo is None:
+        _translation_memo = TranslationMemo()
+    return _translation_memo
+
+
+def get_http_session() -> requests.Session:
+    """프로세스 전역 HTTP 세션 (연결 재사용, 429/5xx 재시도)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=DEEPL_MAX_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["POST"]),
+                respect_retry_after_header=True,
+            )
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_maxsize=10, max_retries=retry))
+            _session.mount("http://", HTTPAdapter(pool_maxsize=10, max_retries=retry))
+        return _session
+
 
 class DeepLTranslator:
     """DeepL API를 사용한 번역 클래스"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, memo: Optional[TranslationMemo] = None,
+                 session: Optional[requests.Session] = None):
         """
         DeepL 번역기 초기화
         
         Args:
             api_key: DeepL API 키. 없으면 환경변수에서 가져옴
+            memo: 번역 메모리. 없으면 프로세스 전역 인스턴스
+            session: HTTP 세션. 없으면 프로세스 전역 세션
         """
         self.api_key = api_key or os.getenv('DEEPL_API_KEY')
+        self.memo = memo or get_translation_memo()
+        self.session = session or get_http_session()
         if not self.api_key:
-            logger.warning("DeepL API key not found. Translation will be skipped.")
+            logger.warning("DeepL API key not found. Only memorized translations will be used.")
             self.enabled = False
         else:
             self.enabled = True
@@ -33,7 +161,9 @@ class DeepLTranslator:
         # Free API: https://api-free.deepl.com/v2/translate
         # Pro API: https://api.deepl.com/v2/translate
         if self.enabled:
-            if self.api_key.endswith(":fx"):  # Free API key format
+            if DEEPL_API_URL:
+                self.api_url = DEEPL_API_URL
+            elif self.api_key.endswith(":fx"):  # Free API key format
                 self.api_url = "https://api-free.deepl.com/v2/translate"
             else:
                 self.api_url = "https://api.deepl.com/v2/translate"
@@ -50,37 +180,11 @@ class DeepLTranslator:
         Returns:
             번역된 텍스트 또는 None (실패시)
         """
-        if not self.enabled:
-            return None
-            
-        try:
-            headers = {
-                "Authorization": f"DeepL-Auth-Key {self.api_key}",
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            
-            data = {
-                "text": text,
-                "source_lang": source_lang,
-                "target_lang": target_lang
-            }
-            
-            response = requests.post(self.api_url, headers=headers, data=data)
-            response.raise_for_status()
-            
-            result = response.json()
-            if result.get("translations"):
-                return result["translations"][0]["text"]
-            
-            return None
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"DeepL translation error: {e}")
-            return None
+        return self.translate_batch([text], source_lang, target_lang)[0]
     
     def translate_batch(self, texts: List[str], source_lang: str = "KO", target_lang: str = "EN") -> List[Optional[str]]:
         """
-        여러 텍스트를 한번에 번역합니다.
+        여러 텍스트를 번역합니다 (번역 메모리에 없는 텍스트만 요청 제한에 맞춰 나눠서 전송).
         
         Args:
             texts: 번역할 텍스트 리스트
@@ -90,43 +194,57 @@ class DeepLTranslator:
         Returns:
             번역된 텍스트 리스트 (실패한 항목은 None)
         """
-        if not self.enabled:
-            return [None] * len(texts)
-            
+        unique_texts = list(dict.fromkeys(texts))
+        translated = self.memo.get_many(unique_texts, source_lang, target_lang)
+        missing = [text for text in unique_texts if text not in translated]
+        
+        if missing and self.enabled:
+            for chunk in self._chunk_texts(missing):
+                results = self._request_translations(chunk, source_lang, target_lang)
+                new_translations = {text: result for text, result in zip(chunk, results) if result is not None}
+                self.memo.put_many(new_translations, source_lang, target_lang)
+                translated.update(new_translations)
+            logger.info(f"DeepL translated {len(missing)} texts ({len(unique_texts) - len(missing)} memorized)")
+        
+        # 결과를 순서대로 매핑
+        return [translated.get(text) for text in texts]
+    
+    @staticmethod
+    def _chunk_texts(texts: List[str]) -> List[List[str]]:
+        """요청당 텍스트 수/본문 크기 제한에 맞춰 나누기"""
+        chunks = []
+        chunk, chunk_bytes = [], 0
+        for text in texts:
+            # form 인코딩 후 크기 (한글은 %XX로 3배) 대략치
+            text_bytes = len(text.encode('utf-8')) * 3 + 8
+            if chunk and (len(chunk) >= DEEPL_BATCH_SIZE or chunk_bytes + text_bytes > DEEPL_MAX_REQUEST_BYTES):
+                chunks.append(chunk)
+                chunk, chunk_bytes = [], 0
+            chunk.append(text)
+            chunk_bytes += text_bytes
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+    
+    def _request_translations(self, texts: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """DeepL API 요청 한 번 (실패하면 모두 None)"""
         try:
             headers = {
                 "Authorization": f"DeepL-Auth-Key {self.api_key}",
                 "Content-Type": "application/x-www-form-urlencoded"
             }
             
-            # DeepL은 여러 텍스트를 한번에 보낼 수 있음
-            data = {
-                "source_lang": source_lang,
-                "target_lang": target_lang
-            }
-            
-            # 여러 텍스트를 text[] 파라미터로 전송
-            data_list = []
-            for text in texts:
-                data_list.append(("text", text))
+            # 여러 텍스트를 text 파라미터 반복으로 전송
+            data = [("text", text) for text in texts]
+            data += [("source_lang", source_lang), ("target_lang", target_lang)]
             
-            response = requests.post(self.api_url, headers=headers, data=data_list + list(data.items()))
+            response = self.session.post(self.api_url, headers=headers, data=data, timeout=DEEPL_TIMEOUT)
             response.raise_for_status()
             
-            result = response.json()
-            translations = result.get("translations", [])
-            
-            # 결과를 순서대로 매핑
-            translated_texts = []
-            for i in range(len(texts)):
-                if i < len(translations):
-                    translated_texts.append(translations[i]["text"])
-                else:
-                    translated_texts.append(None)
-            
-            return translated_texts
+            translations = response.json().get("translations", [])
+            return [translations[i]["text"] if i < len(translations) else None for i in range(len(texts))]
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"DeepL batch translation error: {e}")
             return [None] * len(texts)
 
@@ -154,11 +272,11 @@ class SubtitleTranslator:
             번역된 자막 데이터 리스트
         """
         subtitle_path = Path(subtitle_file)
-        
         if not subtitle_path.exists():
             logger.error(f"Subtitle file not found: {subtitle_file}")
             return []
         
+        # 에피소드별 캐시/동시 요청 합치기는 subtitle_index.get_episode_index에서 처리
         try:
             # JSON 파일 로드
             with open(subtitle_path, 'r', encoding='utf-8') as f:
@@ -193,9 +311,11 @@ class SubtitleTranslator:
                         subtitles[idx]['text_eng'] = translated_text
                         logger.debug(f"Translated: '{subtitles[idx]['text_kor']}' -> '{translated_text}'")
                 
-                # 번역된 내용을 파일에 저장
-                with open(subtitle_path, 'w', encoding='utf-8') as f:
+                # 번역된 내용을 파일에 저장 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록 임시 파일 후 교체)
+                temp_path = subtitle_path.with_name(f".{subtitle_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
                     json.dump(subtitles, f, ensure_ascii=False, indent=2)
+                os.replace(temp_path, subtitle_path)
                 logger.info(f"Updated subtitle file with translations: {subtitle_file}")
             
             return subtitles
@@ -228,6 +348,17 @@ class SubtitleTranslator:
         return subtitle_data
 
 
+_subtitle_translator: Optional[SubtitleTranslator] = None
+
+
+def get_subtitle_translator() -> SubtitleTranslator:
+    """프로세스 전역 SubtitleTranslator 인스턴스"""
+    global _subtitle_translator
+    if _subtitle_translator is None:
+        _subtitle_translator = SubtitleTranslator()
+    return _subtitle_translator
+
+
 # 편의 함수
 def load_subtitles_with_translation(subtitle_file: str) -> List[Dict]:
     """
@@ -239,8 +370,7 @@ def load_subtitles_with_translation(subtitle_file: str) -> List[Dict]:
     Returns:
         번역된 자막 리스트
     """
-    translator = SubtitleTranslator()
-    return translator.load_and_translate_subtitles(subtitle_file)
+    return get_subtitle_translator().load_and_translate_subtitles(subtitle_file)
 
 
 if __name__ == "__main__":
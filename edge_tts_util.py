@@ -6,8 +6,9 @@ import asyncio
 import logging
 import tempfile
 from pathlib import Path
-from typing import Optional
-import edge_tts
+from typing import List, Optional, Tuple
+
+from tts_cache import TTSRequest, get_tts_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,38 +24,53 @@ class EdgeTTSGenerator:
         'en-US-GuyNeural': 'en-US',     # 영어 남성
     }
     
-    def __init__(self, voice: str = 'ko-KR-SunHiNeural', rate: str = '+0%', pitch: str = '+0Hz'):
+    def __init__(self, voice: str = 'ko-KR-SunHiNeural', rate: str = '+0%', pitch: str = '+0Hz',
+                 volume: str = '+0%'):
         """
         Args:
             voice: 음성 종류 (기본: 한국어 선희)
             rate: 속도 조절 (-50% ~ +50%)
             pitch: 피치 조절 (-50Hz ~ +50Hz)
+            volume: 볼륨 조절
         """
         self.voice = voice
         self.rate = rate
         self.pitch = pitch
+        self.volume = volume
         
     async def generate_tts_async(self, text: str, output_path: str) -> bool:
-        """비동기 TTS 생성"""
+        """비동기 TTS 생성 (같은 문장/음성 설정은 TTS 캐시에서 재사용)"""
         try:
-            # Edge TTS 통신 객체 생성
-            communicate = edge_tts.Communicate(
-                text=text,
-                voice=self.voice,
-                rate=self.rate,
-                pitch=self.pitch
+            result = await get_tts_cache().synthesize(
+                text, output_path, voice=self.voice, rate=self.rate, pitch=self.pitch, volume=self.volume
             )
             
-            # 오디오 파일 저장
-            await communicate.save(output_path)
-            
-            logger.info(f"TTS generated: {output_path}")
+            logger.info(f"TTS generated: {output_path}{' (cached)' if result['cached'] else ''}")
             return True
             
         except Exception as e:
             logger.error(f"TTS generation error: {e}")
             return False
     
+    def make_request(self, text: str, output_path: Optional[str] = None) -> TTSRequest:
+        """현재 음성 설정으로 TTS 요청 생성"""
+        return TTSRequest(text, output_path, voice=self.voice, rate=self.rate, pitch=self.pitch, volume=self.volume)
+    
+    async def generate_tts_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        """여러 문장 TTS를 동시에 생성
+        
+        Args:
+            items: [(텍스트, 출력 경로), ...]
+            
+        Returns:
+            항목별 성공 여부 (순서 유지)
+        """
+        results = await get_tts_cache().synthesize_many(
+            [self.make_request(text, output_path) for text, output_path in items]
+        )
+        logger.info(f"TTS batch generated: {sum(1 for r in results if r)}/{len(items)}")
+        return [result is not None for result in results]
+    
     def generate_tts(self, text: str, output_path: str) -> bool:
         """동기 TTS 생성"""
         try:
@@ -82,29 +98,29 @@ class EdgeTTSGenerator:
             }
         
         tts_files = {}
+        requests = []
+        slots = []
         
         for idx, clip in enumerate(clips):
-            clip_tts = {}
-            
-            # 한국어 TTS
-            if clip.get('text_kor'):
-                kor_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-                kor_file.close()
-                
-                self.voice = voice_map.get('ko', 'ko-KR-SunHiNeural')
-                if await self.generate_tts_async(clip['text_kor'], kor_file.name):
-                    clip_tts['kor'] = kor_file.name
-            
-            # 영어 TTS
-            if clip.get('text_eng'):
-                eng_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-                eng_file.close()
-                
-                self.voice = voice_map.get('en', 'en-US-AriaNeural')
-                if await self.generate_tts_async(clip['text_eng'], eng_file.name):
-                    clip_tts['eng'] = eng_file.name
-            
-            tts_files[idx] = clip_tts
+            tts_files[idx] = {}
+            # 한국어 / 영어 TTS
+            for lang, voice_key, default_voice in (('kor', 'ko', 'ko-KR-SunHiNeural'),
+                                                    ('eng', 'en', 'en-US-AriaNeural')):
+                text_key = f'text_{lang}'
+                if not clip.get(text_key):
+                    continue
+                tts_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+                tts_file.close()
+                requests.append(TTSRequest(clip[text_key], tts_file.name,
+                                           voice=voice_map.get(voice_key, default_voice),
+                                           rate=self.rate, pitch=self.pitch, volume=self.volume))
+                slots.append((idx, lang))
+        
+        # 모든 문장을 동시에 생성 (동시 실행 수 제한)
+        results = await get_tts_cache().synthesize_many(requests)
+        for (idx, lang), request, result in zip(slots, requests, results):
+            if result is not None:
+                tts_files[idx][lang] = request.output_path
         
         return tts_files
 
@@ -16,6 +16,8 @@ import queue
 from enum import Enum
 import pickle
 
+from ffmpeg_progress import with_job_context
+
 logger = logging.getLogger(__name__)
 
 
@@ -345,16 +347,18 @@ class EnhancedBatchRenderer:
             loop = asyncio.get_event_loop()
             success = await loop.run_in_executor(
                 None,
-                encoder.create_from_template,
-                job.template_name,
-                job.media_path,
-                subtitle_data,
-                str(output_path),
-                clip_data['start_time'],
-                clip_data['end_time'],
-                0.5,  # padding_before
-                0.5,  # padding_after
-                True  # save_individual_clips
+                with_job_context(
+                    encoder.create_from_template,
+                    job.template_name,
+                    job.media_path,
+                    subtitle_data,
+                    str(output_path),
+                    clip_data['start_time'],
+                    clip_data['end_time'],
+                    0.5,  # padding_before
+                    0.5,  # padding_after
+                    True  # save_individual_clips
+                )
             )
             
             return success
@@ -433,9 +437,8 @@ class EnhancedBatchRenderer:
         }
     
     def create_batch_video(self, video_files: List[str], output_path: str, 
-                          title_1: str = None, title_2: str = None) -> bool:
-        """개별 비디오 파일들을 하나의 배치 비디오로 결합"""
-        import subprocess
+                          title_1: str = None, title_2: str = None, quality: str = 'final') -> bool:
+        """개별 비디오 파일들을 하나의 배치 비디오로 결합 (quality='draft'면 미리보기 설정으로 병합)"""
         import tempfile
         import os
         
@@ -469,6 +472,16 @@ class EnhancedBatchRenderer:
                 concat_file = f.name
             
             try:
+                # 병합 계약을 만족하는 클립은 재인코딩 없이 stream copy로 병합
+                from template_standards import TemplateStandards
+                from cpu_slots import run_ffmpeg
+                from media_probe import get_media_probe
+                is_draft = quality == TemplateStandards.QUALITY_DRAFT
+                if TemplateStandards.merge_clips_by_contract(video_files, output_path, quality=quality):
+                    logger.info(f"Batch video created by stream copy: {output_path}")
+                    return True
+                logger.warning("Stream-copy merge failed, falling back to full re-encode")
+                
                 # 먼저 concat demuxer를 시도하되, vsync와 async 옵션 추가
                 cmd = [
                     'ffmpeg', '-y',
@@ -502,7 +515,9 @@ class EnhancedBatchRenderer:
                 ]
                 
                 logger.info(f"Running FFmpeg concat with re-encoding for {len(video_files)} files")
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                if is_draft:
+                    cmd = TemplateStandards.apply_draft_options(cmd)
+                result = run_ffmpeg(cmd)
                 
                 if result.returncode != 0:
                     logger.error(f"FFmpeg concat error: {result.stderr}")
@@ -540,14 +555,17 @@ class EnhancedBatchRenderer:
                         '-movflags', '+faststart',
                         output_path
                     ])
+                    if is_draft:
+                        cmd = TemplateStandards.apply_draft_options(cmd)
                     
-                    result = subprocess.run(cmd, capture_output=True, text=True)
+                    result = run_ffmpeg(cmd)
                     
                     if result.returncode != 0:
                         logger.error(f"FFmpeg filter_complex error: {result.stderr}")
                         return False
                 
                 logger.info(f"Batch video created successfully: {output_path}")
+                get_media_probe().record_output(output_path)
                 return True
                 
             finally:
@@ -560,27 +578,11 @@ class EnhancedBatchRenderer:
             return False
     
     def _get_video_info(self, video_path: str) -> dict:
-        """비디오 정보 추출"""
-        import subprocess
-        import json
+        """비디오 정보 추출 (MediaProbe 캐시 사용)"""
+        from media_probe import get_media_probe
         
         try:
-            cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_streams',
-                '-show_format',
-                video_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return json.loads(result.stdout)
-            else:
-                logger.error(f"ffprobe error: {result.stderr}")
-                return None
-                
+            return get_media_probe().probe(video_path)
         except Exception as e:
             logger.error(f"Error getting video info: {e}")
             return None
@@ -0,0 +1,318 @@
+"""
+FFmpeg progress tracking
+FFmpeg를 -progress pipe:1로 실행하여 작업별 실제 인코딩 진행률(out_time, fps, speed)을 기록
+
+렌더링은 렌더 워커/프로세스 풀 등 여러 프로세스에서 실행되므로 진행 상황은
+SQLite(WAL)에 FFmpeg 실행 단위로 저장하고, API 프로세스의 SSE 엔드포인트
+(/api/status/{job_id}/events)가 이를 읽어 클라이언트에 전달한다.
+
+어느 작업의 FFmpeg인지는 progress_job() 컨텍스트로 지정한다.
+컨텍스트 밖에서 실행된 FFmpeg는 기록하지 않는다. 컨텍스트 안의 프로세스는
+job_processes에 등록되어 작업 취소 시 종료된다. 작업 ID는 contextvars로만 전달되므로
+스레드 풀에 넘기는 함수는 with_job_context()로 감싸 컨텍스트를 복사한다
+(run_in_executor/ThreadPoolExecutor.submit은 컨텍스트를 전달하지 않음).
+"""
+import os
+import time
+import functools
+import sqlite3
+import logging
+import itertools
+import threading
+import subprocess
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from job_processes import track_process, check_cancelled, is_cancelled, JobCancelled
+from config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+FFMPEG_PROGRESS_ENABLED = os.getenv("FFMPEG_PROGRESS_ENABLED", "true").lower() == "true"
+FFMPEG_PROGRESS_DB = Path(os.getenv("FFMPEG_PROGRESS_DB", str(DATA_DIR / "ffmpeg_progress.db")))
+# 실행 하나당 진행 상황 저장 최소 간격 (초)
+FFMPEG_PROGRESS_INTERVAL = float(os.getenv("FFMPEG_PROGRESS_INTERVAL", "0.5"))
+# 이보다 오래된 기록은 시작 시 정리 (초)
+PROGRESS_RETENTION = 86400
+
+# 현재 작업 ID - asyncio 태스크/스레드별 컨텍스트 (동시에 실행되는 작업끼리 섞이지 않음)
+_current_job: contextvars.ContextVar = contextvars.ContextVar('ffmpeg_progress_job', default=None)
+_run_counter = itertools.count(1)
+
+
+@contextmanager
+def progress_job(job_id: Optional[str]):
+    """with 블록 안에서 실행되는 FFmpeg 진행 상황을 job_id로 기록"""
+    token = _current_job.set(job_id)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def get_current_job() -> Optional[str]:
+    """현재 진행 상황을 기록할 작업 ID"""
+    return _current_job.get()
+
+
+def with_job_context(func: Callable, *args, **kwargs) -> Callable[[], Any]:
+    """현재 컨텍스트(작업 ID)를 복사하여 그 안에서 func를 실행하는 함수 (스레드 풀 제출용)"""
+    return functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+class ProgressStore:
+    """FFmpeg 실행별 진행 상황 저장소"""
+
+    def __init__(self, db_path: Path = FFMPEG_PROGRESS_DB):
+        self.db_path = Path(db_path)
+        self.enabled = FFMPEG_PROGRESS_ENABLED
+        if not self.enabled:
+            return
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS ffmpeg_progress (
+                        job_id TEXT NOT NULL,
+                        run_id TEXT NOT NULL,
+                        label TEXT,
+                        out_time REAL NOT NULL DEFAULT 0,
+                        duration REAL,
+                        fps REAL,
+                        speed REAL,
+                        done INTEGER NOT NULL DEFAULT 0,
+                        updated_at REAL NOT NULL,
+                        PRIMARY KEY (job_id, run_id)
+                    )
+                """)
+                conn.execute("DELETE FROM ffmpeg_progress WHERE updated_at < ?",
+                             (time.time() - PROGRESS_RETENTION,))
+                conn.commit()
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"FFmpeg progress store disabled ({self.db_path}): {e}")
+            self.enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=5)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def update(self, job_id: str, run_id: str, label: str, out_time: float,
+               duration: Optional[float], fps: Optional[float], speed: Optional[float], done: bool = False):
+        if not self.enabled:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ffmpeg_progress "
+                    "(job_id, run_id, label, out_time, duration, fps, speed, done, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, run_id, label, out_time, duration, fps, speed, int(done), time.time())
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # 진행 상황 기록 실패가 인코딩을 멈추면 안 됨
+            logger.debug(f"Failed to record FFmpeg progress for {job_id}: {e}")
+
+    def get_job_progress(self, job_id: str) -> Optional[Dict]:
+        """작업의 인코딩 진행 상황 요약 (기록이 없으면 None)
+
+        Returns:
+            active: 진행 중인 FFmpeg 수, completed: 끝난 FFmpeg 수,
+            current: 가장 최근에 갱신된 진행 중 실행 (label, out_time, duration, fps, speed, eta),
+            eta: 진행 중인 실행들 중 가장 긴 남은 시간 (초, 알 수 없으면 None)
+        """
+        if not self.enabled:
+            return None
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM ffmpeg_progress WHERE job_id = ? ORDER BY updated_at DESC", (job_id,)
+            ).fetchall()
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
+        if not rows:
+            return None
+
+        active = [row for row in rows if not row['done']]
+        runs = [self._run_summary(row) for row in active]
+        etas = [run['eta'] for run in runs if run['eta'] is not None]
+        return {
+            'active': len(active),
+            'completed': len(rows) - len(active),
+            'current': runs[0] if runs else None,
+            'eta': max(etas) if etas else None,
+            'updated_at': rows[0]['updated_at'],
+        }
+
+    @staticmethod
+    def _run_summary(row: sqlite3.Row) -> Dict:
+        eta = None
+        if row['duration'] and row['speed']:
+            eta = round(max(0.0, row['duration'] - row['out_time']) / row['speed'], 1)
+        return {
+            'label': row['label'],
+            'out_time': round(row['out_time'], 2),
+            'duration': row['duration'],
+            'percent': round(min(100.0, 100.0 * row['out_time'] / row['duration']), 1) if row['duration'] else None,
+            'fps': row['fps'],
+            'speed': row['speed'],
+            'eta': eta,
+        }
+
+    def clear(self, job_id: str):
+        """작업 종료 후 기록 삭제"""
+        if not self.enabled:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM ffmpeg_progress WHERE job_id = ?", (job_id,))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to clear FFmpeg progress for {job_id}: {e}")
+
+
+def get_output_duration(cmd: List[str]) -> Optional[float]:
+    """명령어의 -t 값 (출력 길이 추정, 없으면 None)"""
+    for i, arg in enumerate(cmd[:-1]):
+        if arg == '-t':
+            try:
+                return float(cmd[i + 1])
+            except ValueError:
+                return None
+    return None
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    """'1.23x', 'N/A' 등 progress 값을 숫자로"""
+    if not value:
+        return None
+    try:
+        return float(value.rstrip('x'))
+    except ValueError:
+        return None
+
+
+def run_with_progress(cmd: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """FFmpeg를 -progress pipe:1로 실행하며 현재 작업의 진행 상황 기록
+
+    subprocess.run(capture_output=True, text=True)과 같은 결과/예외를 반환한다.
+    작업 컨텍스트 안에서 실행한 프로세스는 작업에 등록되어 취소 시 종료되며,
+    이미 취소된 작업이면 시작하지 않고 JobCancelled를 발생시킨다.
+    stdout에는 progress 출력이 들어가므로 FFmpeg 출력을 stdout(pipe:)으로 쓰는 명령은
+    진행 상황을 기록하지 않는다.
+    """
+    job_id = get_current_job()
+    if not job_id or not cmd:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    check_cancelled(job_id)
+
+    store = get_progress_store()
+    record = (store.enabled and Path(cmd[0]).name == 'ffmpeg'
+              and cmd[-1] not in ('-', 'pipe:', 'pipe:1'))
+    run_id = f"{os.getpid()}-{next(_run_counter)}"
+    label = Path(cmd[-1]).name
+    duration = get_output_duration(cmd)
+    run_cmd = [cmd[0], '-progress', 'pipe:1', '-nostats'] + list(cmd[1:]) if record else list(cmd)
+
+    # 새 세션으로 시작하여 취소 시 프로세스 그룹 전체를 종료
+    process = subprocess.Popen(run_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                               start_new_session=True)
+    with track_process(job_id, process):
+        return _communicate(process, cmd, job_id, store if record else None, run_id, label,
+                            duration, timeout)
+
+
+def _communicate(process: subprocess.Popen, cmd: List[str], job_id: str, store: Optional['ProgressStore'],
+                 run_id: str, label: str, duration: Optional[float],
+                 timeout: Optional[float]) -> subprocess.CompletedProcess:
+    """실행 중인 프로세스의 출력을 읽으며 진행 상황 기록 (store가 None이면 기록 안 함)"""
+    # stderr 파이프가 가득 차서 FFmpeg가 멈추지 않도록 별도 스레드에서 읽음
+    stderr_chunks: List[str] = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    stderr_reader.start()
+
+    timed_out = threading.Event()
+
+    def _kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, _kill) if timeout else None
+    if timer:
+        timer.daemon = True
+        timer.start()
+
+    stdout_lines: List[str] = []
+    block: Dict[str, str] = {}
+    last_write = 0.0
+    try:
+        for line in process.stdout:
+            stdout_lines.append(line)
+            if store is None:
+                continue
+            key, sep, value = line.strip().partition('=')
+            if not sep:
+                continue
+            block[key] = value
+            if key != 'progress':
+                continue
+            # 블록 하나 완료 (progress=continue|end)
+            now = time.time()
+            if value == 'end' or now - last_write >= FFMPEG_PROGRESS_INTERVAL:
+                # out_time_ms도 실제로는 마이크로초 단위
+                out_us = _parse_number(block.get('out_time_us')) or _parse_number(block.get('out_time_ms')) or 0.0
+                store.update(job_id, run_id, label, out_us / 1_000_000, duration,
+                             _parse_number(block.get('fps')), _parse_number(block.get('speed')),
+                             done=value == 'end')
+                last_write = now
+            block = {}
+        process.wait()
+    finally:
+        if timer:
+            timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        stderr_reader.join(timeout=5)
+
+    stdout = ''.join(stdout_lines)
+    stderr = ''.join(stderr_chunks)
+    if process.returncode != 0 and store is not None:
+        # 실패한 실행은 진행 중으로 남지 않도록 종료 표시
+        store.update(job_id, run_id, label, 0.0, duration, None, None, done=True)
+    if process.returncode != 0 and is_cancelled(job_id):
+        # 취소로 종료된 실행의 불완전한 출력 파일 정리
+        partial_output = Path(cmd[-1])
+        if partial_output.suffix and partial_output.is_file():
+            partial_output.unlink()
+        raise JobCancelled(f"Job {job_id} was cancelled")
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+_progress_store: Optional[ProgressStore] = None
+
+
+def get_progress_store() -> ProgressStore:
+    """프로세스 전역 ProgressStore 인스턴스"""
+    global _progress_store
+    if _progress_store is None:
+        _progress_store = ProgressStore()
+    return _progress_store
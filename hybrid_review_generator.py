@@ -5,12 +5,13 @@ Hybrid Review Clip Generator
 import os
 import tempfile
 import logging
-import subprocess
 import asyncio
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from edge_tts_util import EdgeTTSGenerator
 from ass_generator import ASSGenerator
+from media_probe import get_media_probe
+from cpu_slots import run_ffmpeg
 
 logger = logging.getLogger(__name__)
 
@@ -168,28 +169,19 @@ Style: ReviewEng,Arial,{int(base_size * 0.9)},&H00FFFF00,&H00FFFFFF,&H80000000,&
         concat_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
         
         try:
-            # 타이틀 TTS
-            title_tts = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-            title_tts.close()
-            await self.tts_generator.generate_tts_async("Speed Review", title_tts.name)
-            temp_files.append(title_tts.name)
-            concat_file.write(f"file '{title_tts.name}'\n")
-            
-            # 무음 구간 (0.5초)
-            silence = self._create_silence(0.5)
-            temp_files.append(silence)
-            concat_file.write(f"file '{silence}'\n")
-            
-            # 각 클립 TTS
-            for clip in clips_data:
-                # 영어 TTS
-                eng_tts = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-                eng_tts.close()
-                await self.tts_generator.generate_tts_async(clip['text_eng'], eng_tts.name)
-                temp_files.append(eng_tts.name)
-                concat_file.write(f"file '{eng_tts.name}'\n")
-                
-                # 클립 간 무음 (0.5초)
+            # 타이틀 + 각 클립 영어 TTS를 동시에 생성
+            texts = ["Speed Review"] + [clip['text_eng'] for clip in clips_data]
+            tts_paths = []
+            for _ in texts:
+                tts_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+                tts_file.close()
+                temp_files.append(tts_file.name)
+                tts_paths.append(tts_file.name)
+            await self.tts_generator.generate_tts_batch(list(zip(texts, tts_paths)))
+            
+            # 타이틀, 각 클립 뒤에 무음 구간 (0.5초)
+            for tts_path in tts_paths:
+                concat_file.write(f"file '{tts_path}'\n")
                 silence = self._create_silence(0.5)
                 temp_files.append(silence)
                 concat_file.write(f"file '{silence}'\n")
@@ -209,7 +201,7 @@ Style: ReviewEng,Arial,{int(base_size * 0.9)},&H00FFFF00,&H00FFFFFF,&H80000000,&
                 output_audio.name
             ]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            await asyncio.to_thread(run_ffmpeg, cmd, check=True)
             
             return output_audio.name
             
@@ -264,7 +256,7 @@ Style: ReviewEng,Arial,{int(base_size * 0.9)},&H00FFFF00,&H00FFFFFF,&H80000000,&
             temp_bg.name
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True)
+        await asyncio.to_thread(run_ffmpeg, cmd, check=True)
         
         return temp_bg.name
     
@@ -293,7 +285,7 @@ Style: ReviewEng,Arial,{int(base_size * 0.9)},&H00FFFF00,&H00FFFFFF,&H80000000,&
                 output_path
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = await asyncio.to_thread(run_ffmpeg, cmd)
             
             if result.returncode != 0:
                 logger.error(f"FFmpeg compose error: {result.stderr}")
@@ -319,22 +311,13 @@ Style: ReviewEng,Arial,{int(base_size * 0.9)},&H00FFFF00,&H00FFFFFF,&H80000000,&
             temp_file.name
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True)
+        run_ffmpeg(cmd, check=True)
         return temp_file.name
     
     async def _get_audio_duration(self, audio_file: str) -> float:
-        """오디오 길이 확인"""
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            audio_file
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            return float(result.stdout.strip())
-        return 10.0  # 기본값
+        """오디오 길이 확인 (MediaProbe 캐시)"""
+        duration = get_media_probe().get_duration(audio_file)
+        return duration if duration is not None else 10.0  # 기본값
     
     def _format_time(self, seconds: float) -> str:
         """초를 ASS 시간 형식으로 변환"""
@@ -397,7 +380,7 @@ WrapStyle: 0
                 '-crf', '20',
                 title_clip.name
             ]
-            subprocess.run(cmd_title, check=True, capture_output=True)
+            await asyncio.to_thread(run_ffmpeg, cmd_title, check=True)
             clip_videos.append(title_clip.name)
             
             # 각 클립 비디오 생성
@@ -427,7 +410,7 @@ WrapStyle: 0
                     '-crf', '20',
                     clip_file.name
                 ]
-                subprocess.run(cmd_clip, check=True, capture_output=True)
+                await asyncio.to_thread(run_ffmpeg, cmd_clip, check=True)
                 clip_videos.append(clip_file.name)
             
             # concat 리스트 파일 생성
@@ -464,7 +447,7 @@ WrapStyle: 0
                     output_path
                 ]
             
-            result = subprocess.run(cmd_final, capture_output=True, text=True)
+            result = await asyncio.to_thread(run_ffmpeg, cmd_final)
             
             # 임시 파일 정리
             for temp_file in temp_files:
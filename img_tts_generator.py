@@ -19,6 +19,9 @@ from pathlib import Path
 from typing import Optional, Dict, List, Union
 from edge_tts_util import EdgeTTSGenerator
 from template_standards import TemplateStandards
+from segment_cache import get_segment_cache
+from media_probe import get_media_probe
+from cpu_slots import run_ffmpeg
 
 logger = logging.getLogger(__name__)
 
@@ -191,6 +194,11 @@ class ImgTTSGenerator:
         
         width, height = resolution
         
+        # 캐시된 원본 구간이 있으면 NAS 대신 로컬 캐시에서 추출
+        cached = get_segment_cache().find_segment(video_path, time)
+        if cached:
+            video_path, time = cached
+        
         cmd = [
             'ffmpeg', '-y',
             '-ss', str(time),
@@ -246,6 +254,16 @@ class ImgTTSGenerator:
         temp_audio = tempfile.NamedTemporaryFile(suffix='.aac', delete=False)
         temp_audio.close()
         
+        # 캐시된 원본 구간이 있으면 NAS 대신 로컬 캐시에서 추출
+        audio_codec = 'copy'  # 오디오 코덱 복사 (재인코딩 없음)
+        cached = get_segment_cache().find_segment(video_path, start_time, end_time)
+        if cached:
+            video_path, offset = cached
+            if end_time:
+                end_time = offset + (end_time - start_time)
+            start_time = offset
+            audio_codec = TemplateStandards.OUTPUT_AUDIO_CODEC  # 캐시는 PCM이므로 AAC로 인코딩
+        
         cmd = ['ffmpeg', '-y']
         
         # 시작 시간
@@ -262,7 +280,7 @@ class ImgTTSGenerator:
         # 오디오만 추출
         cmd.extend([
             '-vn',  # 비디오 없음
-            '-acodec', 'copy',  # 오디오 코덱 복사 (재인코딩 없음)
+            '-acodec', audio_codec,
             temp_audio.name
         ])
         
@@ -504,35 +522,14 @@ class ImgTTSGenerator:
         return text
     
     async def _get_audio_duration(self, audio_file: str) -> float:
-        """오디오 길이 확인"""
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            audio_file
-        ]
-        
-        result = await self._run_async(cmd)
-        if result.returncode == 0:
-            try:
-                return float(result.stdout.strip())
-            except:
-                pass
-        return 5.0
+        """오디오 길이 확인 (MediaProbe 캐시)"""
+        loop = asyncio.get_event_loop()
+        duration = await loop.run_in_executor(None, get_media_probe().get_duration, audio_file)
+        return duration if duration is not None else 5.0
     
     async def _run_async(self, cmd: List[str]) -> subprocess.CompletedProcess:
-        """비동기 명령 실행"""
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
-        return subprocess.CompletedProcess(
-            cmd, process.returncode,
-            stdout.decode() if stdout else '',
-            stderr.decode() if stderr else ''
-        )
+        """비동기 FFmpeg 실행 (CPU 슬롯 + 작업 취소 시 종료, 작업 컨텍스트는 to_thread가 전달)"""
+        return await asyncio.to_thread(run_ffmpeg, cmd)
 
 
 # 사용 예시
@@ -0,0 +1,158 @@
+"""
+Job process registry and cancellation
+작업별로 실행 중인 하위 프로세스(FFmpeg 등)를 추적하고 취소 시 프로세스 트리를 종료
+
+취소 요청은 공유 디렉토리의 표시 파일로 전달되므로 API 프로세스, 렌더 워커,
+렌더 풀 프로세스 어디서든 같은 작업의 취소 여부를 확인할 수 있다.
+프로세스마다 감시 스레드가 추적 중인 작업의 취소 표시를 확인하고,
+해당 작업의 프로세스 그룹 전체를 종료한다 (하위 프로세스는 새 세션으로 시작).
+"""
+import os
+import time
+import signal
+import logging
+import threading
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+JOB_CANCEL_DIR = Path(os.getenv("JOB_CANCEL_DIR", "/tmp/shadowing_job_cancel"))
+# 취소 표시 확인 간격 (초)
+CANCEL_POLL_INTERVAL = float(os.getenv("JOB_CANCEL_POLL_INTERVAL", "0.3"))
+# SIGTERM 후 SIGKILL까지 대기 (초)
+TERMINATE_GRACE_SECONDS = 3.0
+# 이보다 오래된 취소 표시는 정리 (초)
+CANCEL_MARKER_TTL = 86400
+
+
+class JobCancelled(Exception):
+    """취소된 작업에서 새 프로세스를 시작하려 할 때"""
+
+
+def _marker(job_id: str) -> Path:
+    return JOB_CANCEL_DIR / job_id
+
+
+def request_cancel(job_id: str):
+    """작업 취소 표시 (모든 프로세스의 감시 스레드가 프로세스 트리 종료)"""
+    JOB_CANCEL_DIR.mkdir(parents=True, exist_ok=True)
+    _marker(job_id).touch()
+    # 현재 프로세스에서 실행 중인 것은 바로 종료
+    kill_job_processes(job_id)
+
+
+def clear_cancel(job_id: str):
+    """취소 표시 제거 (같은 작업을 다시 실행할 때)"""
+    try:
+        _marker(job_id).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def is_cancelled(job_id: str) -> bool:
+    return bool(job_id) and _marker(job_id).exists()
+
+
+def check_cancelled(job_id: str):
+    """취소된 작업이면 JobCancelled"""
+    if is_cancelled(job_id):
+        raise JobCancelled(f"Job {job_id} was cancelled")
+
+
+def prune_cancel_markers():
+    """오래된 취소 표시 정리"""
+    if not JOB_CANCEL_DIR.exists():
+        return
+    cutoff = time.time() - CANCEL_MARKER_TTL
+    for marker in JOB_CANCEL_DIR.iterdir():
+        try:
+            if marker.stat().st_mtime < cutoff:
+                marker.unlink()
+        except OSError:
+            pass
+
+
+def kill_process_tree(process: subprocess.Popen):
+    """프로세스와 하위 프로세스 전체 종료 (새 세션으로 시작된 프로세스는 그룹 단위)"""
+    if process.poll() is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError, AttributeError):
+        process.terminate()
+    try:
+        process.wait(timeout=TERMINATE_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            process.kill()
+        process.wait()
+
+
+class JobProcessRegistry:
+    """현재 프로세스에서 작업별로 실행 중인 하위 프로세스"""
+
+    def __init__(self):
+        self._processes: Dict[str, Set[subprocess.Popen]] = {}
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def register(self, job_id: str, process: subprocess.Popen):
+        with self._lock:
+            self._processes.setdefault(job_id, set()).add(process)
+            if self._watcher is None or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name="job-cancel-watcher", daemon=True)
+                self._watcher.start()
+
+    def unregister(self, job_id: str, process: subprocess.Popen):
+        with self._lock:
+            processes = self._processes.get(job_id)
+            if processes:
+                processes.discard(process)
+                if not processes:
+                    del self._processes[job_id]
+
+    def get_processes(self, job_id: str) -> List[subprocess.Popen]:
+        with self._lock:
+            return list(self._processes.get(job_id, ()))
+
+    def kill(self, job_id: str) -> int:
+        """작업의 모든 프로세스 트리 종료"""
+        processes = self.get_processes(job_id)
+        for process in processes:
+            kill_process_tree(process)
+        if processes:
+            logger.info(f"[Job {job_id}] Killed {len(processes)} process tree(s)")
+        return len(processes)
+
+    def _watch(self):
+        while True:
+            time.sleep(CANCEL_POLL_INTERVAL)
+            with self._lock:
+                job_ids = list(self._processes)
+            for job_id in job_ids:
+                if is_cancelled(job_id):
+                    self.kill(job_id)
+
+
+_registry = JobProcessRegistry()
+
+
+@contextmanager
+def track_process(job_id: str, process: subprocess.Popen):
+    """with 블록 동안 프로세스를 작업에 등록 (취소 시 종료 대상)"""
+    _registry.register(job_id, process)
+    try:
+        yield process
+    finally:
+        _registry.unregister(job_id, process)
+
+
+def kill_job_processes(job_id: str) -> int:
+    """현재 프로세스에서 실행 중인 작업의 프로세스 트리 종료"""
+    return _registry.kill(job_id)
@@ -28,7 +28,7 @@ from database import init_db
 # Import configuration
 from api.config import (
     logger, REDIS_HOST, REDIS_PORT, REDIS_DB,
-    ALLOWED_ORIGINS, OUTPUT_DIR
+    ALLOWED_ORIGINS, OUTPUT_DIR, JOB_QUEUE_ENABLED, RENDER_WORKERS
 )
 
 # Import utilities
@@ -170,6 +170,10 @@ async def shutdown_event():
     for job_id in list(active_processes.keys()):
         cleanup_job_processes(job_id)
     
+    # 클립 렌더 프로세스 풀 종료
+    from api.utils.render_pool import shutdown_render_pool
+    shutdown_render_pool()
+    
     logger.info("Video Clipping API shut down")
 
 # Signal handlers
@@ -189,11 +193,32 @@ if __name__ == "__main__":
     port = int(os.getenv("API_PORT", "8000"))
     workers = int(os.getenv("API_WORKERS", "4"))
     
+    # 렌더 워커 프로세스 시작 (API 워커는 작업을 큐에 넣기만 함)
+    render_processes = []
+    if JOB_QUEUE_ENABLED:
+        import multiprocessing
+        from render_worker import main as render_worker_main
+        
+        context = multiprocessing.get_context('spawn')
+        for i in range(RENDER_WORKERS):
+            # daemon 프로세스는 자식(클립 렌더 풀)을 만들 수 없으므로 daemon=False
+            process = context.Process(target=render_worker_main, name=f"render-worker-{i}")
+            process.start()
+            render_processes.append(process)
+        logger.info(f"Started {len(render_processes)} render workers")
+    
     # Run the application
-    uvicorn.run(
-        "main:app",
-        host=host,
-        port=port,
-        workers=workers,
-        reload=os.getenv("API_RELOAD", "false").lower() == "true"
-    )
\ No newline at end of file
+    try:
+        uvicorn.run(
+            "main:app",
+            host=host,
+            port=port,
+            workers=workers,
+            reload=os.getenv("API_RELOAD", "false").lower() == "true"
+        )
+    finally:
+        # 렌더 워커는 현재 작업을 마친 뒤 종료 (중단된 작업은 임대 만료 후 재시도)
+        for process in render_processes:
+            process.terminate()
+        for process in render_processes:
+            process.join(timeout=30)
\ No newline at end of file
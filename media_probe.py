@@ -0,0 +1,306 @@
+"""
+Cached media probe service
+ffprobe 결과를 프로세스 내 LRU + SQLite에 캐싱
+
+같은 파일을 여러 번 ffprobe 하지 않도록 (경로, 크기, mtime) 기준으로
+파싱된 streams/format 정보를 저장한다. 우리가 인코딩한 파일은 생성 직후
+기록해 두어 이후 병합/DB 기록/배치 렌더링에서 다시 프로브하지 않는다.
+"""
+import os
+import re
+import json
+import hashlib
+import time
+import sqlite3
+import logging
+import threading
+import subprocess
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+MEDIA_PROBE_DB = Path(os.getenv("MEDIA_PROBE_DB", str(DATA_DIR / "media_probe.db")))
+MEDIA_PROBE_LRU_SIZE = int(os.getenv("MEDIA_PROBE_LRU_SIZE", "1024"))
+# 이 기간 동안 조회되지 않은 항목은 시작 시 정리 (일)
+MEDIA_PROBE_TTL_DAYS = float(os.getenv("MEDIA_PROBE_TTL_DAYS", "30"))
+
+# H.264 NAL 유닛 종류 (Annex B)
+NAL_IDR_SLICE = 5
+NAL_SEI = 6
+NAL_SPS = 7
+NAL_PPS = 8
+ANNEXB_START_CODE = re.compile(b'\x00\x00\x01')
+X264_OPTION_PATTERN = re.compile(rb'x264 - core .*? options: ([^\x00]*)')
+
+
+class MediaProbe:
+    """ffprobe 결과 캐시"""
+
+    def __init__(self, db_path: Path = MEDIA_PROBE_DB, lru_size: int = MEDIA_PROBE_LRU_SIZE):
+        self.db_path = Path(db_path)
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, Tuple[Tuple[int, int], Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=10)
+
+    def _init_db(self):
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                # 여러 uvicorn 워커/렌더 프로세스가 동시에 사용
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS media_probe (
+                        path TEXT PRIMARY KEY,
+                        size INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        data TEXT NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("DELETE FROM media_probe WHERE accessed_at < ?",
+                             (time.time() - MEDIA_PROBE_TTL_DAYS * 86400,))
+        except sqlite3.Error as e:
+            logger.warning(f"Media probe DB disabled ({self.db_path}): {e}")
+            self._db_enabled = False
+
+    @staticmethod
+    def _file_key(media_path: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """(실제 경로, (크기, mtime)) - 파일이 없으면 None"""
+        try:
+            real_path = os.path.realpath(media_path)
+            stat = os.stat(real_path)
+        except OSError:
+            return None
+        return real_path, (stat.st_size, stat.st_mtime_ns)
+
+    def _lru_get(self, path: str, version: Tuple[int, int]) -> Optional[Dict]:
+        with self._lock:
+            entry = self._lru.get(path)
+            if entry is None or entry[0] != version:
+                return None
+            self._lru.move_to_end(path)
+            return entry[1]
+
+    def _lru_put(self, path: str, version: Tuple[int, int], data: Dict):
+        with self._lock:
+            self._lru[path] = (version, data)
+            self._lru.move_to_end(path)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _db_get(self, path: str, version: Tuple[int, int]) -> Optional[Dict]:
+        if not self._db_enabled:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT data FROM media_probe WHERE path = ? AND size = ? AND mtime_ns = ?",
+                    (path, version[0], version[1])
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE media_probe SET accessed_at = ? WHERE path = ?", (time.time(), path))
+                return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.debug(f"Media probe DB read failed: {e}")
+            return None
+
+    def _db_put(self, path: str, version: Tuple[int, int], data: Dict):
+        if not self._db_enabled:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO media_probe (path, size, mtime_ns, data, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (path, version[0], version[1], json.dumps(data), time.time())
+                )
+        except sqlite3.Error as e:
+            logger.debug(f"Media probe DB write failed: {e}")
+
+    @staticmethod
+    def _run_ffprobe(media_path: str) -> Optional[Dict]:
+        cmd = [
+            'ffprobe', '-v', 'error',
+            '-show_streams', '-show_format',
+            '-of', 'json',
+            media_path
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        except (subprocess.TimeoutExpired, OSError) as e:
+            logger.error(f"ffprobe failed for {media_path}: {e}")
+            return None
+        if result.returncode != 0:
+            logger.error(f"ffprobe error for {media_path}: {result.stderr}")
+            return None
+        try:
+            data = json.loads(result.stdout)
+        except ValueError:
+            return None
+        return {'streams': data.get('streams', []), 'format': data.get('format', {})}
+
+    def probe(self, media_path: str) -> Optional[Dict]:
+        """{'streams': [...], 'format': {...}} (ffprobe JSON과 같은 형태) 또는 None"""
+        file_key = self._file_key(media_path)
+        if file_key is None:
+            return None
+        path, version = file_key
+
+        data = self._lru_get(path, version)
+        if data is None:
+            data = self._db_get(path, version)
+            if data is not None:
+                self._lru_put(path, version, data)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        self.misses += 1
+        data = self._run_ffprobe(path)
+        if data is None:
+            return None
+        self._lru_put(path, version, data)
+        self._db_put(path, version, data)
+        return data
+
+    def record_output(self, media_path: str) -> Optional[Dict]:
+        """우리가 방금 인코딩한 파일의 메타데이터 기록 (헤더만 읽는 ffprobe 한 번)
+
+        이후 병합/DB 기록 등에서는 캐시를 사용하므로 다시 프로브하지 않는다.
+        """
+        return self.probe(media_path)
+
+    @staticmethod
+    def _read_first_video_packet(media_path: str) -> Optional[bytes]:
+        """첫 비디오 패킷을 Annex B로 추출 (SPS/PPS가 IDR 앞에 붙음, 디코딩 없음)"""
+        cmd = [
+            'ffmpeg', '-v', 'error',
+            '-i', media_path,
+            '-map', '0:v:0', '-c', 'copy', '-frames:v', '1',
+            '-bsf:v', 'h264_mp4toannexb', '-f', 'h264', '-'
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=60)
+        except (subprocess.TimeoutExpired, OSError) as e:
+            logger.error(f"First packet read failed for {media_path}: {e}")
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout
+
+    @staticmethod
+    def parse_stream_start(packet: bytes) -> Dict:
+        """첫 패킷의 NAL 유닛 분석
+
+        starts_with_idr: 첫 패킷이 IDR 슬라이스 (디코더 상태 없이 시작 가능)
+        parameter_sets: SPS/PPS 해시 (같아야 stream copy 병합 가능)
+        closed_gop: x264 SEI의 open_gop=0 여부 (x264가 아니면 None)
+        """
+        nal_types = set()
+        parameter_sets = hashlib.md5()
+        closed_gop = None
+        positions = [m.end() for m in ANNEXB_START_CODE.finditer(packet)]
+        for i, start in enumerate(positions):
+            end = positions[i + 1] - 3 if i + 1 < len(positions) else len(packet)
+            nal = packet[start:end].rstrip(b'\x00')
+            if not nal:
+                continue
+            nal_type = nal[0] & 0x1f
+            nal_types.add(nal_type)
+            if nal_type in (NAL_SPS, NAL_PPS):
+                parameter_sets.update(nal)
+            elif nal_type == NAL_SEI:
+                match = X264_OPTION_PATTERN.search(nal)
+                if match:
+                    closed_gop = b'open_gop=0' in match.group(1).split()
+        return {
+            'starts_with_idr': NAL_IDR_SLICE in nal_types,
+            'parameter_sets': parameter_sets.hexdigest() if NAL_SPS in nal_types else None,
+            'closed_gop': closed_gop,
+        }
+
+    def get_stream_start(self, media_path: str) -> Dict:
+        """병합 계약 검사용 첫 비디오 패킷 정보 (프로브 결과와 함께 캐싱)"""
+        file_key = self._file_key(media_path)
+        data = self.probe(media_path)
+        if file_key is None or not data:
+            return {}
+        if 'stream_start' not in data:
+            packet = self._read_first_video_packet(file_key[0])
+            if packet is None:
+                return {}
+            data = dict(data, stream_start=self.parse_stream_start(packet))
+            self._lru_put(file_key[0], file_key[1], data)
+            self._db_put(file_key[0], file_key[1], data)
+        return data['stream_start']
+
+    def record_copy(self, source_path: str, dest_path: str):
+        """복사한 파일은 원본 메타데이터를 그대로 기록 (프로브 없음)"""
+        source_key = self._file_key(source_path)
+        dest_key = self._file_key(dest_path)
+        if source_key is None or dest_key is None:
+            return
+        data = self._lru_get(*source_key) or self._db_get(*source_key)
+        if data is None:
+            return
+        self._lru_put(dest_key[0], dest_key[1], data)
+        self._db_put(dest_key[0], dest_key[1], data)
+
+    def get_stream(self, media_path: str, codec_type: str) -> Dict:
+        """첫 번째 video/audio 스트림 정보 (없으면 빈 딕셔너리)"""
+        data = self.probe(media_path)
+        if not data:
+            return {}
+        for stream in data['streams']:
+            if stream.get('codec_type') == codec_type:
+                return stream
+        return {}
+
+    def get_video_stream(self, media_path: str) -> Dict:
+        return self.get_stream(media_path, 'video')
+
+    def get_audio_stream(self, media_path: str) -> Dict:
+        return self.get_stream(media_path, 'audio')
+
+    def get_duration(self, media_path: str) -> Optional[float]:
+        """컨테이너 길이 (초)"""
+        data = self.probe(media_path)
+        if not data:
+            return None
+        try:
+            return float(data['format'].get('duration'))
+        except (TypeError, ValueError):
+            return None
+
+    def get_stats(self) -> Dict:
+        """캐시 통계"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "lru_entries": len(self._lru),
+            "db_enabled": self._db_enabled,
+        }
+
+
+_media_probe: Optional[MediaProbe] = None
+
+
+def get_media_probe() -> MediaProbe:
+    """프로세스 전역 MediaProbe 인스턴스"""
+    global _media_probe
+    if _media_probe is None:
+        _media_probe = MediaProbe()
+    return _media_probe
@@ -12,6 +12,7 @@ from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from subtitle_pipeline import SubtitlePipeline, SubtitleType
 from template_video_encoder import TemplateVideoEncoder
+from ffmpeg_progress import with_job_context
 
 logger = logging.getLogger(__name__)
 
@@ -124,31 +125,17 @@ class OptimizedBatchProcessor:
         if media_path in self._media_info_cache:
             return self._media_info_cache[media_path]
         
-        # FFprobe를 사용하여 미디어 정보 가져오기
-        import subprocess
-        import json
+        # MediaProbe 캐시 사용 (필요 시에만 ffprobe 실행, 블로킹이므로 스레드에서)
+        from media_probe import get_media_probe
         
-        cmd = [
-            'ffprobe', '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_streams', media_path
-        ]
+        loop = asyncio.get_event_loop()
+        info = await loop.run_in_executor(None, get_media_probe().probe, media_path)
         
-        # 비동기 실행
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await proc.communicate()
-        
-        if proc.returncode == 0:
-            info = json.loads(stdout)
+        if info:
             self._media_info_cache[media_path] = info
             return info
         else:
-            logger.warning(f"Failed to get media info: {stderr.decode()}")
+            logger.warning(f"Failed to get media info: {media_path}")
             return {}
     
     async def _process_tasks_parallel(self, tasks: List[BatchClipTask], 
@@ -208,8 +195,7 @@ class OptimizedBatchProcessor:
             loop = asyncio.get_event_loop()
             success = await loop.run_in_executor(
                 executor,
-                self._encode_clip_sync,
-                task, subtitle_files, individual_clips
+                with_job_context(self._encode_clip_sync, task, subtitle_files, individual_clips)
             )
             
             # 임시 파일 정리
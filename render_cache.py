@@ -0,0 +1,302 @@
+"""
+Content-addressed render cache
+템플릿 렌더 결과(최종 출력 + 개별 클립)를 입력 내용 해시로 캐싱
+
+같은 요청(더블 클릭, 클라이언트 재시도 등)은 다시 렌더링하지 않고 저장된 결과를
+새 작업 디렉토리에 reflink(지원하지 않는 파일시스템에서는 복사)한다. 하드링크는
+사용하지 않는다 - 출력 경로를 나중에 ffmpeg -y로 다시 쓰면 같은 inode인 캐시 항목과
+다른 작업의 출력까지 함께 바뀌기 때문이다.
+동시에 들어온 같은 요청은 키별 잠금(프로세스 간 flock)으로 진행 중인 렌더가
+끝나기를 기다렸다가 그 결과를 사용한다.
+
+캐시 키: 원본(경로, 크기, mtime), 구간, 패딩, 자막 데이터(타이틀 포함),
+         템플릿 정의, 품질, 인코더 설정 + 렌더 코드/스타일 파일 해시
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+from template_standards import TemplateStandards
+from media_probe import get_media_probe
+from config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+# reflink를 사용하려면 출력 디렉토리와 같은 파일시스템이어야 함 (다르면 복사)
+RENDER_CACHE_DIR = Path(os.getenv("RENDER_CACHE_DIR", str(DATA_DIR / "render_cache")))
+RENDER_CACHE_MAX_BYTES = int(float(os.getenv("RENDER_CACHE_MAX_GB", "50")) * 1024 ** 3)
+
+# 인코더/필터 그래프 동작이 바뀌면 올려서 기존 캐시를 무효화
+RENDER_CACHE_VERSION = 1
+
+# 렌더 결과를 결정하는 코드/스타일 파일 - 내용이 바뀌면 캐시 키가 달라짐
+RENDER_CODE_FILES = (
+    'styles.py', 'ass_generator.py', 'subtitle_pipeline.py', 'subtitle_overlay.py',
+    'template_standards.py', 'template_planner.py', 'template_video_encoder.py',
+    'video_encoder.py', 'img_tts_generator.py', 'templates/shadowing_patterns.json',
+)
+
+OUTPUT_NAME = "output.mp4"
+INDIVIDUAL_DIR = "individual_clips"
+
+# 최근에 사용된 항목은 다른 작업이 링크 중일 수 있으므로 제거 유예 (초)
+EVICTION_GRACE_SECONDS = 300
+
+
+_code_hash: Optional[str] = None
+
+
+def get_render_code_hash() -> str:
+    """렌더 코드/스타일 파일 내용 해시 (프로세스에서 한 번 계산)"""
+    global _code_hash
+    if _code_hash is None:
+        digest = hashlib.sha256()
+        base_dir = Path(__file__).parent
+        for name in RENDER_CODE_FILES:
+            digest.update(name.encode('utf-8'))
+            try:
+                digest.update((base_dir / name).read_bytes())
+            except OSError:
+                digest.update(b'missing')
+        _code_hash = digest.hexdigest()
+    return _code_hash
+
+
+def get_encoder_signature() -> list:
+    """인코더 설정 (값이 바뀌면 렌더 결과 키가 달라짐)"""
+    return [
+        RENDER_CACHE_VERSION,
+        get_render_code_hash(),
+        TemplateStandards.get_standard_encoding_options(),
+        TemplateStandards.apply_draft_options(TemplateStandards.get_standard_encoding_options()),
+        TemplateStandards.DRAFT_SCALE_DIVISOR,
+    ]
+
+
+def clone_file(src: Path, dst: Path):
+    """reflink(가능하면) 또는 복사로 파일 복제
+
+    같은 디렉토리의 임시 파일로 만든 뒤 os.replace로 교체하므로 dst를 읽고 있는
+    쪽은 이전 내용을 그대로 보고, 복제본과 원본은 서로 독립적이다.
+    """
+    src, dst = Path(src), Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        try:
+            result = subprocess.run(['cp', '--reflink=auto', '--preserve=timestamps', str(src), str(temp_path)], capture_output=True)
+            copied = result.returncode == 0
+        except OSError:
+            copied = False
+        if not copied:
+            shutil.copy2(src, temp_path)
+        os.replace(temp_path, dst)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+class RenderCache:
+    """템플릿 렌더 결과 캐시"""
+
+    # 최근 사용(mtime)부터 이 시간 안의 항목은 제거하지 않음 (하위 클래스에서 조정)
+    eviction_grace_seconds = EVICTION_GRACE_SECONDS
+
+    def __init__(self, cache_dir: Path = RENDER_CACHE_DIR,
+                 max_bytes: int = RENDER_CACHE_MAX_BYTES,
+                 enabled: bool = RENDER_CACHE_ENABLED):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.enabled:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Render cache disabled, cannot create {self.cache_dir}: {e}")
+                self.enabled = False
+
+    def make_key(self, template_name: str, template: Dict, subtitle_mode_labels: Dict,
+                 media_path: str, start_time: Optional[float], end_time: Optional[float],
+                 padding_before: float, padding_after: float, subtitle_data: Dict,
+                 quality: str, save_individual_clips: bool, output_name: str) -> Optional[str]:
+        """렌더 입력의 정규화된 해시 (원본을 확인할 수 없으면 None - 캐시 사용 안 함)"""
+        if not self.enabled:
+            return None
+        try:
+            real_path = os.path.realpath(media_path)
+            stat = os.stat(real_path)
+        except OSError:
+            return None
+
+        # 미리 생성된 ASS 파일은 작업마다 경로가 다르므로 내용으로 비교
+        subtitle_key = {k: v for k, v in subtitle_data.items() if k != 'ass_file'}
+        if subtitle_data.get('ass_file'):
+            try:
+                with open(subtitle_data['ass_file'], 'rb') as f:
+                    subtitle_key['ass_file'] = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                return None
+
+        payload = json.dumps({
+            'media': [real_path, stat.st_size, stat.st_mtime_ns],
+            'range': [start_time, end_time, padding_before, padding_after],
+            'subtitle': subtitle_key,
+            'template': [template_name, template, subtitle_mode_labels],
+            'quality': quality,
+            # 개별 클립 파일명에 출력 파일명의 클립 번호가 들어감
+            'individual_clips': [save_individual_clips, output_name],
+            'encoder': get_encoder_signature(),
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _get_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    @contextmanager
+    def coalesce(self, key: str):
+        """같은 키의 렌더가 진행 중이면 끝날 때까지 대기 (스레드 + 프로세스 간)"""
+        with self._get_lock(key):
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            with open(self.cache_dir / f".{key}.lock", 'a') as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    logger.info(f"Identical render in flight, waiting: {key[:12]}")
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _link(src: Path, dst: Path):
+        """캐시 항목 <-> 작업 출력 복제 (reflink 또는 복사, inode 공유 없음)"""
+        clone_file(src, dst)
+
+    def materialize(self, key: str, output_path: str, save_individual_clips: bool) -> bool:
+        """캐시 항목을 출력 위치에 링크 (없으면 False)"""
+        entry = self.cache_dir / key
+        cached_output = entry / OUTPUT_NAME
+        if not cached_output.exists():
+            self.misses += 1
+            return False
+
+        try:
+            self._link(cached_output, Path(output_path))
+            if save_individual_clips and (entry / INDIVIDUAL_DIR).is_dir():
+                target_dir = Path(output_path).parent / INDIVIDUAL_DIR
+                for cached_clip in (entry / INDIVIDUAL_DIR).rglob("*.mp4"):
+                    self._link(cached_clip, target_dir / cached_clip.relative_to(entry / INDIVIDUAL_DIR))
+        except OSError as e:
+            logger.warning(f"Render cache materialize failed ({key[:12]}): {e}")
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        # LRU 순서 갱신 + 링크된 출력은 원본 메타데이터 재사용 (프로브 없음)
+        try:
+            os.utime(entry, None)
+        except OSError:
+            pass
+        get_media_probe().record_copy(str(cached_output), output_path)
+        logger.info(f"Render cache hit: {key[:12]} -> {output_path}")
+        return True
+
+    def store(self, key: str, output_path: str, save_individual_clips: bool):
+        """렌더 결과를 캐시에 저장 (임시 디렉토리에 링크한 뒤 이름 변경)"""
+        entry = self.cache_dir / key
+        if entry.exists():
+            return
+        temp_entry = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        try:
+            self._link(Path(output_path), temp_entry / OUTPUT_NAME)
+            individual_dir = Path(output_path).parent / INDIVIDUAL_DIR
+            if save_individual_clips and individual_dir.is_dir():
+                for clip in individual_dir.rglob("*.mp4"):
+                    self._link(clip, temp_entry / INDIVIDUAL_DIR / clip.relative_to(individual_dir))
+            os.rename(temp_entry, entry)
+        except OSError as e:
+            logger.warning(f"Render cache store failed ({key[:12]}): {e}")
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            return
+
+        get_media_probe().record_copy(output_path, str(entry / OUTPUT_NAME))
+        self._evict(keep=entry)
+
+    @staticmethod
+    def _entry_size(entry: Path) -> int:
+        return sum(p.stat().st_size for p in entry.rglob("*") if p.is_file())
+
+    def _evict(self, keep: Optional[Path] = None):
+        """용량 초과 시 가장 오래 사용되지 않은 항목부터 제거"""
+        entries = []
+        total = 0
+        for entry in self.cache_dir.iterdir():
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            try:
+                size = self._entry_size(entry)
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((mtime, size, entry))
+            total += size
+
+        if total <= self.max_bytes:
+            return
+
+        now = time.time()
+        for mtime, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry == keep or now - mtime < self.eviction_grace_seconds:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            logger.debug(f"Render cache evicted: {entry.name[:12]}")
+
+    def get_stats(self) -> Dict:
+        """캐시 통계"""
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    """프로세스 전역 RenderCache 인스턴스"""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache()
+    return _render_cache
@@ -0,0 +1,102 @@
+"""
+Render decision store
+미리보기(draft) 렌더에서 정한 편집 결정을 저장하여 이후 최종(final) 렌더에서 재사용
+
+편집 결정: 생성된 자막(ASS) 내용, 얼굴 인식 크롭 영역
+키: 원본 경로, 구간, 패딩, 템플릿, 자막 데이터 - 같은 입력의 final 렌더는
+미리보기에서 확인한 것과 동일한 자막/크롭으로 렌더링된다.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+RENDER_DECISIONS_DIR = Path(os.getenv("RENDER_DECISIONS_DIR", str(DATA_DIR / "render_decisions")))
+# 이 기간 동안 사용되지 않은 결정은 시작 시 정리 (일)
+RENDER_DECISIONS_TTL_DAYS = float(os.getenv("RENDER_DECISIONS_TTL_DAYS", "7"))
+
+
+class RenderDecisionStore:
+    """편집 결정 저장소 (키별 JSON 파일)"""
+
+    def __init__(self, store_dir: Path = RENDER_DECISIONS_DIR):
+        self.store_dir = Path(store_dir)
+        self.enabled = True
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            self._prune()
+        except OSError as e:
+            logger.warning(f"Render decision store disabled ({self.store_dir}): {e}")
+            self.enabled = False
+
+    def _prune(self):
+        cutoff = time.time() - RENDER_DECISIONS_TTL_DAYS * 86400
+        for path in self.store_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def make_key(template_name: str, media_path: str, start_time: Optional[float],
+                 end_time: Optional[float], padding_before: float, padding_after: float,
+                 subtitle_data: Dict) -> str:
+        """렌더 입력으로 결정 키 생성"""
+        # 미리 생성된 ASS 파일 경로는 작업마다 다르므로 제외 (내용은 subtitles로 포함됨)
+        key_data = {k: v for k, v in subtitle_data.items() if k != 'ass_file'}
+        payload = json.dumps(
+            [template_name, os.path.realpath(media_path), start_time, end_time,
+             padding_before, padding_after, key_data],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def load(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        path = self.store_dir / f"{key}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                decisions = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # 사용 시각 갱신 (TTL 기준)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return decisions
+
+    def save(self, key: str, decisions: Dict):
+        if not self.enabled:
+            return
+        path = self.store_dir / f"{key}.json"
+        try:
+            # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.store_dir), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(decisions, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to save render decisions {key}: {e}")
+
+
+_decision_store: Optional[RenderDecisionStore] = None
+
+
+def get_render_decisions() -> RenderDecisionStore:
+    """프로세스 전역 RenderDecisionStore 인스턴스"""
+    global _decision_store
+    if _decision_store is None:
+        _decision_store = RenderDecisionStore()
+    return _decision_store
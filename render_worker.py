@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Render Worker
+영속 작업 큐(api/utils/job_queue.py)에서 작업을 임대하여 실행하는 장기 실행 프로세스
+
+API 프로세스(uvicorn 워커)는 작업을 큐에 넣기만 하므로 렌더링 용량은
+이 워커 수로 조절한다. main.py 실행 시 RENDER_WORKERS개가 함께 시작되며,
+다른 호스트/셸에서 `python render_worker.py`로 더 추가할 수 있다.
+"""
+import os
+import sys
+import time
+import uuid
+import signal
+import asyncio
+import logging
+import importlib
+import socket
+
+from api.config import PREEMPT_MAX_JOBS
+from api.utils.job_management import job_status, update_job_status_both
+from api.utils.job_queue import get_job_queue, LeaseHeartbeat, JOB_HANDLERS
+from ffmpeg_progress import progress_job, get_progress_store
+from job_processes import is_cancelled, prune_cancel_markers
+
+logger = logging.getLogger(__name__)
+
+# 큐가 비어 있을 때 폴링 간격 (초)
+POLL_INTERVAL = float(os.getenv('RENDER_WORKER_POLL_INTERVAL', '1.0'))
+
+_stopping = False
+# 현재 프로세스가 렌더 워커로 실행 중이면 워커 ID (양보 시 같은 ID로 임대)
+_worker_id = None
+
+
+def _load_handler(job_type: str):
+    """작업 종류의 처리 함수와 요청 모델"""
+    module_name, func_name, model_name = JOB_HANDLERS[job_type]
+    handler = getattr(importlib.import_module(module_name), func_name)
+    model = getattr(importlib.import_module('api.models'), model_name)
+    return handler, model
+
+
+def run_job(worker_id: str, job_id: str, job_type: str, payload: dict, state: dict):
+    """임대한 작업 하나 실행 (하트비트 유지)"""
+    queue = get_job_queue()
+    # 처리 함수가 job_status에서 folder_id 등을 읽으므로 저장된 상태로 초기화
+    job_status[job_id] = state
+
+    with LeaseHeartbeat(queue, job_id, worker_id), progress_job(job_id):
+        try:
+            handler, model = _load_handler(job_type)
+            request = model(**payload)
+            asyncio.run(handler(job_id, request))
+        except Exception as e:
+            logger.error(f"[Job {job_id}] Worker error: {e}", exc_info=True)
+            update_job_status_both(job_id, "failed", 0, message="작업 실패", error_message=str(e))
+
+    final_state = job_status.pop(job_id, state)
+    if is_cancelled(job_id):
+        final_state.update({'status': 'cancelled', 'message': "작업이 취소되었습니다.", 'error': None})
+    queue.finish(job_id, worker_id, final_state)
+    get_progress_store().clear(job_id)
+    logger.info(f"[Job {job_id}] Finished with status: {final_state.get('status')}")
+
+
+async def yield_to_priority_jobs(job_id: str) -> int:
+    """긴 작업의 단위(클립 묶음) 사이에서 호출 - 대기 중인 더 높은 우선순위 작업을 먼저 실행
+
+    렌더 워커 밖(BackgroundTasks 모드)에서는 아무것도 하지 않는다.
+
+    Returns:
+        실행한 작업 수
+    """
+    if _worker_id is None:
+        return 0
+    priority = job_status.get(job_id, {}).get('priority')
+    if priority is None:
+        return 0
+
+    queue = get_job_queue()
+    loop = asyncio.get_running_loop()
+    ran = 0
+    while ran < PREEMPT_MAX_JOBS:
+        job = queue.claim(_worker_id, max_priority=priority - 1)
+        if job is None:
+            break
+        logger.info(f"[Job {job_id}] Yielding to higher priority job {job[0]} ({job[1]})")
+        # 처리 함수가 자체 이벤트 루프를 돌리므로 별도 스레드에서 실행
+        await loop.run_in_executor(None, run_job, _worker_id, *job)
+        ran += 1
+    return ran
+
+
+def run_worker(worker_id: str = None):
+    """작업 큐 처리 루프"""
+    global _worker_id
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    _worker_id = worker_id
+    queue = get_job_queue()
+    prune_cancel_markers()
+    logger.info(f"Render worker started: {worker_id}")
+
+    while not _stopping:
+        job = queue.claim(worker_id)
+        if job is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+        run_job(worker_id, *job)
+
+    logger.info(f"Render worker stopped: {worker_id}")
+
+
+def _handle_signal(sig, frame):
+    """현재 작업을 마친 뒤 종료"""
+    global _stopping
+    logger.info(f"Received signal {sig}, stopping after current job")
+    _stopping = True
+
+
+def main(worker_id: str = None):
+    """시그널 처리기 설치 후 워커 실행 (main.py에서 프로세스 대상으로 사용)"""
+    signal.signal(signal.SIGINT, _handle_signal)
+    signal.signal(signal.SIGTERM, _handle_signal)
+    run_worker(worker_id)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -5,11 +5,13 @@ YouTube 쇼츠용 복습 클립 생성기
 import os
 import tempfile
 import logging
-import subprocess
 import asyncio
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from edge_tts_util import EdgeTTSGenerator
+from segment_cache import get_segment_cache
+from media_probe import get_media_probe
+from cpu_slots import run_ffmpeg
 import sys
 sys.path.append(str(Path(__file__).parent))
 from api.routes.settings import load_settings
@@ -61,22 +63,26 @@ class ReviewClipGenerator:
             # TTS 생성
             logger.info("Generating TTS for review clips...")
             
+            # 모든 문장을 동시에 생성 (동시 실행 수 제한, 캐시에 있으면 링크만)
+            batch = []
             for idx, clip in enumerate(clips_data):
-                logger.info(f"Generating TTS for clip {idx+1}/{len(clips_data)}: {clip['text_eng'][:30]}...")
-                # 영어 TTS (선희 음성으로)
                 eng_tts_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
                 eng_tts_file.close()
-                
-                if await self.tts_generator.generate_tts_async(
-                    clip['text_eng'], 
-                    eng_tts_file.name
-                ):
+                batch.append((idx, clip, eng_tts_file.name))
+            
+            results = await self.tts_generator.generate_tts_batch(
+                [(clip['text_eng'], tts_file) for _, clip, tts_file in batch]
+            )
+            for (idx, clip, tts_file), success in zip(batch, results):
+                if success:
                     tts_files.append({
                         'clip_idx': idx,
-                        'tts_file': eng_tts_file.name,
+                        'tts_file': tts_file,
                         'text_kor': clip['text_kor'],
                         'text_eng': clip['text_eng']
                     })
+                elif os.path.exists(tts_file):
+                    os.unlink(tts_file)
             
             # 비디오 생성
             return await self._create_review_video(
@@ -190,7 +196,7 @@ class ReviewClipGenerator:
                     ]
                 
                 logger.debug(f"FFmpeg command: {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = await asyncio.to_thread(run_ffmpeg, cmd)
                 if result.returncode != 0:
                     logger.error(f"FFmpeg error: {result.stderr}")
                     return False
@@ -299,21 +305,9 @@ class ReviewClipGenerator:
         return f"{filter1},{filter2}"
     
     async def _get_audio_duration(self, audio_file: str) -> float:
-        """오디오 파일 길이 확인"""
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            audio_file
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            try:
-                return float(result.stdout.strip())
-            except:
-                pass
-        return 3.0  # 기본값
+        """오디오 파일 길이 확인 (MediaProbe 캐시)"""
+        duration = get_media_probe().get_duration(audio_file)
+        return duration if duration is not None else 3.0  # 기본값
     
     async def _create_title_clip(self, title: str, width: int, height: int) -> Optional[str]:
         """타이틀 클립 생성 - 템플릿 타이틀과 동일한 스타일"""
@@ -383,7 +377,7 @@ class ReviewClipGenerator:
                 temp_file.name
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = await asyncio.to_thread(run_ffmpeg, cmd)
             if result.returncode == 0:
                 return temp_file.name
                 
@@ -399,6 +393,11 @@ class ReviewClipGenerator:
             temp_frame = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
             temp_frame.close()
             
+            # 캐시된 원본 구간이 있으면 NAS 대신 로컬 캐시에서 추출
+            cached = get_segment_cache().find_segment(video_path, time)
+            if cached:
+                video_path, time = cached
+            
             cmd = [
                 'ffmpeg', '-y',
                 '-ss', str(time),
@@ -411,7 +410,7 @@ class ReviewClipGenerator:
             
             cmd.extend(['-q:v', '2', temp_frame.name])
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = await asyncio.to_thread(run_ffmpeg, cmd)
             if result.returncode == 0:
                 return temp_frame.name
             else:
@@ -459,7 +458,7 @@ class ReviewClipGenerator:
                 ]
             
             logger.debug(f"Concat command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = await asyncio.to_thread(run_ffmpeg, cmd)
             
             if result.returncode != 0:
                 logger.error(f"FFmpeg concat error: {result.stderr}")
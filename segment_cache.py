@@ -0,0 +1,266 @@
+"""
+Decoded source-segment cache
+원본 미디어 구간을 로컬 스크래치에 빠르게 디코딩 가능한 중간 파일로 캐싱
+
+NAS(/mnt/qnap)의 원본을 클립/변형마다 다시 읽고 디코딩하는 대신,
+처음 요청된 구간(padded_start ~ padded_start + duration)을
+all-intra 무손실 H.264 + PCM 오디오(mkv)로 로컬 디스크에 저장하고
+이후 요청은 이 파일을 읽는다.
+
+캐시 키: 원본 경로, mtime, 크기, 시작, 끝, 대상 해상도
+용량 제한: 바이트 기준, 가장 오래 사용하지 않은 파일부터 제거 (LRU)
+"""
+import os
+import glob
+import time
+import hashlib
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config import DATA_DIR
+from cpu_slots import run_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+SEGMENT_CACHE_ENABLED = os.getenv("SEGMENT_CACHE_ENABLED", "true").lower() == "true"
+SEGMENT_CACHE_DIR = Path(os.getenv("SEGMENT_CACHE_DIR", str(DATA_DIR / "segment_cache")))
+SEGMENT_CACHE_MAX_BYTES = int(float(os.getenv("SEGMENT_CACHE_MAX_GB", "20")) * 1024 ** 3)
+# 이보다 긴 구간은 캐싱하지 않음 (무손실 중간 파일은 용량이 큼)
+SEGMENT_CACHE_MAX_DURATION = float(os.getenv("SEGMENT_CACHE_MAX_DURATION", "60"))
+
+# 구간 경로를 받은 인코딩은 작업 큐/CPU 슬롯을 기다린 뒤에야 FFmpeg가 파일을 열므로
+# 최근에 사용된 파일은 제거 유예 (초)
+SEGMENT_CACHE_EVICTION_GRACE_SECONDS = int(os.getenv("SEGMENT_CACHE_EVICTION_GRACE_SECONDS", "3600"))
+
+
+class SegmentCache:
+    """디코딩된 원본 구간 캐시"""
+
+    SEGMENT_SUFFIX = '.mkv'
+    eviction_grace_seconds = SEGMENT_CACHE_EVICTION_GRACE_SECONDS
+
+    def __init__(self, cache_dir: Path = SEGMENT_CACHE_DIR,
+                 max_bytes: int = SEGMENT_CACHE_MAX_BYTES,
+                 max_duration: float = SEGMENT_CACHE_MAX_DURATION,
+                 enabled: bool = SEGMENT_CACHE_ENABLED):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_duration = max_duration
+        self.enabled = enabled
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.enabled:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Segment cache disabled, cannot create {self.cache_dir}: {e}")
+                self.enabled = False
+
+    @staticmethod
+    def _source_key(media_path: str) -> Optional[str]:
+        """원본 파일 식별 키 (경로 + mtime + 크기)"""
+        try:
+            real_path = os.path.realpath(media_path)
+            stat = os.stat(real_path)
+        except OSError:
+            return None
+        raw = f"{real_path}|{stat.st_mtime_ns}|{stat.st_size}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+    @staticmethod
+    def _geometry_key(geometry: Optional[Tuple[int, int]]) -> str:
+        return f"{geometry[0]}x{geometry[1]}" if geometry else "src"
+
+    def _segment_path(self, source_key: str, start: float, end: float,
+                      geometry: Optional[Tuple[int, int]]) -> Path:
+        # 파일 이름에 구간 정보를 포함하여 인덱스 파일 없이 조회 가능하게 함
+        start_ms = int(round(start * 1000))
+        end_ms = int(round(end * 1000))
+        name = f"{source_key}_{start_ms}_{end_ms}_{self._geometry_key(geometry)}{self.SEGMENT_SUFFIX}"
+        return self.cache_dir / name
+
+    def _get_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    @staticmethod
+    def _touch(path: Path):
+        """LRU 순서 갱신"""
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def get_segment(self, media_path: str, start: float, duration: float,
+                    geometry: Optional[Tuple[int, int]] = None) -> Optional[str]:
+        """캐시된 구간 파일 경로 반환 (없으면 생성)
+
+        반환된 파일은 0초부터 시작하므로 호출자는 시작 시간을 0으로 사용해야 한다.
+        캐시를 사용할 수 없으면 None을 반환하고 호출자는 원본을 직접 사용한다.
+        """
+        if not self.enabled or start is None or duration is None or duration <= 0:
+            return None
+        if duration > self.max_duration:
+            return None
+
+        source_key = self._source_key(media_path)
+        if not source_key:
+            return None
+
+        segment_path = self._segment_path(source_key, start, start + duration, geometry)
+
+        with self._get_lock(segment_path.name):
+            if segment_path.exists():
+                self.hits += 1
+                self._touch(segment_path)
+                logger.debug(f"Segment cache hit: {segment_path.name}")
+                return str(segment_path)
+
+            self.misses += 1
+            if not self._create_segment(media_path, start, duration, geometry, segment_path):
+                return None
+
+        self._evict(keep=segment_path)
+        return str(segment_path)
+
+    def find_segment(self, media_path: str, start: float,
+                     end: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """주어진 시간(구간)을 포함하는 기존 캐시 파일 조회 (생성하지 않음)
+
+        Returns:
+            (캐시 파일 경로, 캐시 파일 내 시작 오프셋) 또는 None
+        """
+        if not self.enabled or start is None:
+            return None
+
+        source_key = self._source_key(media_path)
+        if not source_key:
+            return None
+
+        end = start if end is None else end
+        pattern = str(self.cache_dir / f"{source_key}_*_src{self.SEGMENT_SUFFIX}")
+        for candidate in glob.glob(pattern):
+            try:
+                _, seg_start_ms, seg_end_ms, _ = Path(candidate).stem.split('_')
+                seg_start = int(seg_start_ms) / 1000
+                seg_end = int(seg_end_ms) / 1000
+            except ValueError:
+                continue
+
+            if seg_start <= start and end <= seg_end:
+                self.hits += 1
+                self._touch(Path(candidate))
+                return candidate, start - seg_start
+
+        return None
+
+    def _create_segment(self, media_path: str, start: float, duration: float,
+                        geometry: Optional[Tuple[int, int]], segment_path: Path) -> bool:
+        """원본 구간을 all-intra 무손실 중간 파일로 저장"""
+        temp_path = segment_path.with_name(f".{segment_path.stem}.{os.getpid()}.tmp{self.SEGMENT_SUFFIX}")
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-ss', str(start),
+            '-t', str(duration),
+            '-i', media_path,
+            '-map', '0:v:0', '-map', '0:a:0?',
+        ]
+
+        if geometry:
+            width, height = geometry
+            cmd.extend(['-vf', f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                               f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"])
+
+        cmd.extend([
+            # 모든 프레임이 키프레임인 무손실 H.264 - 디코딩/탐색 비용 최소화
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-qp', '0', '-g', '1',
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'pcm_s16le',
+            str(temp_path)
+        ])
+
+        started = time.time()
+        try:
+            result = run_ffmpeg(cmd, timeout=300)
+        except (subprocess.TimeoutExpired, OSError) as e:
+            logger.warning(f"Segment cache encode failed: {e}")
+            self._remove(temp_path)
+            return False
+
+        if result.returncode != 0 or not temp_path.exists():
+            logger.warning(f"Segment cache encode failed: {result.stderr[-500:]}")
+            self._remove(temp_path)
+            return False
+
+        os.replace(temp_path, segment_path)
+        logger.info(f"Segment cached: {segment_path.name} ({time.time() - started:.1f}s)")
+        return True
+
+    def _evict(self, keep: Optional[Path] = None):
+        """용량 초과 시 가장 오래 사용되지 않은 구간부터 제거"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob(f"*{self.SEGMENT_SUFFIX}"):
+            if path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        now = time.time()
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            if now - mtime < self.eviction_grace_seconds:
+                continue
+            if self._remove(path):
+                total -= size
+                logger.debug(f"Segment cache evicted: {path.name}")
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except OSError:
+            return False
+
+    def get_stats(self) -> Dict:
+        """캐시 통계"""
+        total = sum(p.stat().st_size for p in self.cache_dir.glob(f"*{self.SEGMENT_SUFFIX}")) if self.enabled else 0
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_segment_cache: Optional[SegmentCache] = None
+
+
+def get_segment_cache() -> SegmentCache:
+    """프로세스 전역 SegmentCache 인스턴스"""
+    global _segment_cache
+    if _segment_cache is None:
+        _segment_cache = SegmentCache()
+    return _segment_cache
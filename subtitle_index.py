@@ -0,0 +1,160 @@
+"""
+Episode subtitle interval index
+에피소드 자막 JSON(_translated.json)을 한 번만 읽어 메모리에 두고 시간 구간 조회
+
+자막을 시작 시간으로 정렬하고 끝 시간의 누적 최대값을 함께 두면, 구간 [start, end]와
+겹치는 자막은 두 번의 이진 탐색으로 범위를 좁힐 수 있다 (클립마다 전체를 훑지 않음).
+파일의 수정 시간/크기가 바뀌면 다시 읽는다.
+
+에피소드 인덱스는 프로세스 안의 LRU 하나에만 둔다 (DeepL 번역 결과 포함).
+읽기/번역은 전역 잠금 밖에서 하고, 같은 에피소드를 동시에 요청하면 먼저 시작한
+로드가 끝나기를 기다렸다가 그 결과를 사용한다.
+"""
+import os
+import json
+import logging
+import threading
+import concurrent.futures
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 메모리에 유지할 에피소드 인덱스 수
+SUBTITLE_INDEX_CACHE_SIZE = int(os.getenv("SUBTITLE_INDEX_CACHE_SIZE", "64"))
+
+
+class SubtitleIndex:
+    """한 에피소드 자막의 구간 인덱스 (자막은 start_time/end_time 키를 가진 dict)"""
+
+    def __init__(self, subtitles: List[Dict]):
+        valid = [sub for sub in subtitles if 'start_time' in sub and 'end_time' in sub]
+        # 원래 순서를 유지하는 안정 정렬 (같은 시작 시간이면 파일 순서)
+        self.subtitles = sorted(valid, key=lambda sub: sub['start_time'])
+        self._starts = [sub['start_time'] for sub in self.subtitles]
+        # i번째까지의 끝 시간 최대값 (단조 증가 - 이진 탐색 가능)
+        self._max_ends = list(accumulate((sub['end_time'] for sub in self.subtitles), max))
+        # 중심 시간으로 정렬한 (중심, 위치)
+        self._centers = sorted(((sub['start_time'] + sub['end_time']) / 2, i)
+                               for i, sub in enumerate(self.subtitles))
+
+    def __len__(self) -> int:
+        return len(self.subtitles)
+
+    def _overlap_range(self, start: float, end: float) -> Tuple[int, int]:
+        # 앞쪽에서 누적 최대 끝 시간이 start보다 작은 자막은 겹칠 수 없음
+        lo = bisect_left(self._max_ends, start)
+        # start_time이 end보다 큰 자막도 겹칠 수 없음
+        hi = bisect_right(self._starts, end)
+        return lo, hi
+
+    def overlapping(self, start: float, end: float) -> List[Dict]:
+        """구간 [start, end]와 겹치는 자막 (시작 시간 순)"""
+        lo, hi = self._overlap_range(start, end)
+        return [sub for sub in self.subtitles[lo:hi] if sub['end_time'] >= start]
+
+    def first_overlapping(self, start: float, end: float) -> Optional[Dict]:
+        """구간과 겹치는 첫 번째 자막"""
+        lo, hi = self._overlap_range(start, end)
+        for sub in self.subtitles[lo:hi]:
+            if sub['end_time'] >= start:
+                return sub
+        return None
+
+    def first_centered_in(self, start: float, end: float) -> Optional[Dict]:
+        """중심 시간이 구간 [start, end] 안에 있는 자막 (가장 이른 것)"""
+        i = bisect_left(self._centers, (start, -1))
+        if i < len(self._centers) and self._centers[i][0] <= end:
+            return self.subtitles[self._centers[i][1]]
+        return None
+
+
+# 에피소드 JSON 경로 -> ((mtime, size), 인덱스) - 최근 사용 순
+_indexes: "OrderedDict[str, Tuple[Tuple[int, int], SubtitleIndex]]" = OrderedDict()
+# 로드 중인 경로 -> 완료 Future (같은 에피소드 동시 요청 합치기)
+_loading: Dict[str, concurrent.futures.Future] = {}
+_lock = threading.Lock()
+
+
+def _file_version(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_subtitles(path: Path, translate: bool) -> List[Dict]:
+    if translate:
+        # DeepL 번역기를 사용하여 자막 로드 (text_en이 없으면 번역 후 파일에 저장)
+        try:
+            from deepl_translator import get_subtitle_translator
+            return get_subtitle_translator().load_and_translate_subtitles(str(path))
+        except Exception as e:
+            logger.warning(f"Failed to use DeepL translator: {e}")
+    # DeepL 사용 불가시 원본 파일 로드
+    with open(path, 'r', encoding='utf-8') as f:
+        subtitles = json.load(f)
+    return [subtitles] if isinstance(subtitles, dict) else subtitles
+
+
+def get_episode_index(json_path: str, translate: bool = True) -> Optional[SubtitleIndex]:
+    """에피소드 자막 인덱스 (파일이 없거나 읽을 수 없으면 None)"""
+    path = Path(json_path)
+    key = str(path.resolve())
+    while True:
+        version = _file_version(path)
+        if version is None:
+            return None
+        with _lock:
+            cached = _indexes.get(key)
+            if cached and cached[0] == version:
+                _indexes.move_to_end(key)
+                return cached[1]
+            pending = _loading.get(key)
+            if pending is None:
+                pending = _loading[key] = concurrent.futures.Future()
+                break
+        # 같은 에피소드를 다른 요청이 읽는 중 - 끝나면 캐시에서 다시 조회 (실패했으면 직접 로드)
+        pending.result()
+
+    try:
+        # 파일 읽기와 DeepL 번역은 잠금 밖에서 (다른 에피소드 조회를 막지 않음)
+        index = SubtitleIndex(_load_subtitles(path, translate))
+        # 번역 결과를 파일에 저장했으면 저장 후의 버전으로 기록
+        version = _file_version(path)
+        with _lock:
+            _indexes[key] = (version, index)
+            _indexes.move_to_end(key)
+            while len(_indexes) > SUBTITLE_INDEX_CACHE_SIZE:
+                _indexes.popitem(last=False)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load episode subtitles {json_path}: {e}")
+        return None
+    finally:
+        with _lock:
+            del _loading[key]
+        pending.set_result(None)
+    logger.debug(f"Subtitle index built: {json_path} ({len(index)} subtitles)")
+    return index
+
+
+def episode_json_for(path: str) -> str:
+    """ASS/미디어 파일 옆의 번역된 자막 JSON 경로 (<이름>_translated.json)"""
+    return str(Path(path).with_suffix('')) + '_translated.json'
+
+
+def get_range_subtitles(media_path: str, start: float, end: float) -> List[Dict]:
+    """미디어 옆 에피소드 자막 중 구간과 겹치는 것 ({start, end, eng, kor} - 구간 추출 요청 형식)"""
+    index = get_episode_index(episode_json_for(media_path))
+    if index is None:
+        return []
+    return [{
+        'start': sub['start_time'],
+        'end': sub['end_time'],
+        'eng': sub.get('eng') or sub.get('text_eng') or sub.get('text_en') or '',
+        'kor': sub.get('kor') or sub.get('text_kor') or '',
+    } for sub in index.overlapping(start, end)]
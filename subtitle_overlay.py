@@ -0,0 +1,190 @@
+"""
+Pre-rasterized static subtitle overlays
+정적 자막을 한 번만 RGBA 이미지로 렌더링하고 인코딩 시에는 overlay로 합성
+
+템플릿 클립의 자막은 대부분 클립 전체(0 ~ clip_duration)에 고정되어 있는데,
+ass 필터는 프레임마다 libass 레이아웃/블렌딩을 다시 실행한다. 정적 자막이면
+투명 캔버스에 libass로 한 프레임만 그려 PNG로 저장하고, 인코딩 그래프에서는
+movie 소스 + overlay로 합성한다 (프레임당 비용은 알파 합성뿐). 자막이 끝나는 시간은
+overlay의 enable로 그대로 지킨다. ass 필터 결과와의 픽셀 차이는 test_subtitle_overlay.py가
+샘플 프레임으로 확인한다.
+
+이미지는 (시간을 정규화한 ASS 내용, 해상도) 해시로 캐싱하므로 같은 자막은
+변형/작업 사이에서 공유된다. 애니메이션 태그(\\fad, \\move, \\t, \\k 등)가 있거나
+시간이 다른 이벤트가 여러 개인 자막(구간 추출, 하이브리드 리뷰)은 None을 반환하고
+호출한 쪽은 기존 ass 필터를 사용한다.
+"""
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional, Tuple
+
+from cpu_slots import run_ffmpeg
+from config import DATA_DIR
+from render_cache import RenderCache
+from subtitle_store import get_subtitle_store
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+SUBTITLE_OVERLAY_ENABLED = os.getenv("SUBTITLE_OVERLAY_ENABLED", "true").lower() == "true"
+SUBTITLE_OVERLAY_DIR = Path(os.getenv("SUBTITLE_OVERLAY_DIR", str(DATA_DIR / "subtitle_overlays")))
+SUBTITLE_OVERLAY_MAX_BYTES = int(float(os.getenv("SUBTITLE_OVERLAY_MAX_MB", "512")) * 1024 ** 2)
+
+# 래스터화 방식이 바뀌면 올려서 기존 캐시를 무효화
+SUBTITLE_OVERLAY_VERSION = 1
+
+OVERLAY_NAME = "overlay.png"
+RASTERIZE_TIMEOUT = 30
+# 이미지 경로를 받은 인코딩은 CPU 슬롯을 기다린 뒤에야 FFmpeg가 파일을 열므로
+# 최근에 사용된 항목은 렌더 캐시보다 오래 제거 유예 (초)
+SUBTITLE_OVERLAY_EVICTION_GRACE_SECONDS = int(os.getenv("SUBTITLE_OVERLAY_EVICTION_GRACE_SECONDS", "3600"))
+
+# 시간에 따라 모양이 바뀌는 ASS 태그
+ANIMATION_TAG_PATTERN = re.compile(r'\\(?:fade?\s*\(|move\s*\(|t\s*\(|[kK][fo]?\d)')
+# 정규화한 이벤트 시간 (래스터화는 0초 프레임 한 장)
+CANONICAL_START = "0:00:00.00"
+CANONICAL_END = "9:59:59.99"
+
+
+def _parse_ass_time(value: str) -> Optional[float]:
+    try:
+        hours, minutes, seconds = value.strip().split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+def get_static_ass_content(content: str) -> Optional[Tuple[str, float]]:
+    """정적 자막이면 (이벤트 시간을 정규화한 ASS 내용, 원래 끝 시간), 아니면 None
+
+    정적: 모든 Dialogue가 0초에 시작해 같은 시간에 끝나고 Effect/애니메이션 태그가 없음
+    (끝 시간은 이미지에 영향이 없으므로 키에서 빼고 합성 시 overlay enable로 적용)
+    """
+    lines = content.splitlines()
+    end_time = None
+    has_dialogue = False
+    for i, line in enumerate(lines):
+        if not line.startswith('Dialogue:'):
+            continue
+        fields = line[len('Dialogue:'):].split(',', 9)
+        if len(fields) < 10:
+            return None
+        start, end = _parse_ass_time(fields[1]), _parse_ass_time(fields[2])
+        if start is None or end is None or start > 0.01:
+            return None
+        if end_time is not None and abs(end - end_time) > 0.01:
+            return None
+        if fields[8].strip() or ANIMATION_TAG_PATTERN.search(fields[9]):
+            return None
+        end_time = end
+        has_dialogue = True
+        fields[1], fields[2] = CANONICAL_START, CANONICAL_END
+        lines[i] = 'Dialogue:' + ','.join(fields)
+    if not has_dialogue:
+        return None
+    return '\n'.join(lines) + '\n', end_time
+
+
+class SubtitleOverlayCache(RenderCache):
+    """래스터화한 자막 이미지 캐시 (항목: <키>/overlay.png)"""
+
+    eviction_grace_seconds = SUBTITLE_OVERLAY_EVICTION_GRACE_SECONDS
+
+    def make_overlay_key(self, canonical_content: str, width: int, height: int) -> str:
+        payload = json.dumps([canonical_content, width, height, SUBTITLE_OVERLAY_VERSION], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _rasterize(self, key: str, canonical_content: str, width: int, height: int) -> bool:
+        """투명 캔버스에 libass로 한 프레임 렌더링 (임시 디렉토리에서 만든 뒤 이름 변경)"""
+        temp_entry = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        temp_entry.mkdir(parents=True, exist_ok=True)
+        try:
+            ass_path = temp_entry / "subtitle.ass"
+            ass_path.write_text(canonical_content, encoding='utf-8')
+            result = run_ffmpeg([
+                'ffmpeg', '-y',
+                '-f', 'lavfi', '-i', f"color=c=black@0.0:s={width}x{height}:d=1,format=rgba",
+                '-vf', f"ass={_escape_filter_path(str(ass_path))},format=rgba",
+                '-frames:v', '1',
+                str(temp_entry / OVERLAY_NAME)
+            ], timeout=RASTERIZE_TIMEOUT)
+            if result.returncode != 0 or not (temp_entry / OVERLAY_NAME).exists():
+                logger.warning(f"Subtitle rasterization failed ({key[:12]}): {result.stderr[-500:]}")
+                return False
+            ass_path.unlink()
+            os.rename(temp_entry, self.cache_dir / key)
+            return True
+        except Exception as e:
+            logger.warning(f"Subtitle rasterization failed ({key[:12]}): {e}")
+            return False
+        finally:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+
+    def get_overlay(self, subtitle_file: str, width: int, height: int) -> Optional[Tuple[str, float]]:
+        """정적 자막의 (RGBA 이미지 경로, 자막 끝 시간) (정적이 아니거나 실패하면 None - libass 사용)"""
+        if not self.enabled:
+            return None
+        try:
+            static = get_static_ass_content(get_subtitle_store().read(subtitle_file))
+        except OSError:
+            return None
+        if static is None:
+            return None
+        canonical_content, end_time = static
+
+        key = self.make_overlay_key(canonical_content, width, height)
+        entry = self.cache_dir / key
+        overlay_path = entry / OVERLAY_NAME
+        if not overlay_path.exists():
+            # 같은 자막을 동시에 요청하면 한 번만 렌더링
+            with self.coalesce(key):
+                if not overlay_path.exists():
+                    self.misses += 1
+                    if not self._rasterize(key, canonical_content, width, height):
+                        return None
+                    self._evict(keep=entry)
+                    logger.info(f"Subtitle overlay rasterized: {key[:12]} ({width}x{height})")
+                    return str(overlay_path), end_time
+
+        self.hits += 1
+        try:
+            os.utime(entry, None)
+        except OSError:
+            pass
+        return str(overlay_path), end_time
+
+
+def overlay_filter_chain(filters: list, overlay_path: str, label: str, end_time: Optional[float] = None) -> str:
+    """필터 체인 뒤에 자막 이미지 overlay를 붙인 그래프 조각 (이후 필터는 ','로 이어 붙임)
+
+    end_time을 주면 ASS 이벤트처럼 그 시간부터는 자막을 합성하지 않음
+    """
+    chain = ','.join(filters) if filters else 'null'
+    enable = f":enable='lt(t,{end_time:.3f})'" if end_time is not None else ''
+    return (f"{chain}[{label}base];movie={_escape_filter_path(overlay_path)}[{label}img];"
+            f"[{label}base][{label}img]overlay=0:0{enable}")
+
+
+def _escape_filter_path(file_path: str) -> str:
+    """FFmpeg 필터 인자용 파일 경로 이스케이핑"""
+    escaped = os.path.abspath(file_path).replace('\\', '/')
+    escaped = escaped.replace(':', '\\:').replace('[', '\\[').replace(']', '\\]')
+    escaped = escaped.replace(',', '\\,').replace("'", "\\'").replace(' ', '\\ ')
+    return escaped
+
+
+_overlay_cache: Optional[SubtitleOverlayCache] = None
+
+
+def get_subtitle_overlay_cache() -> SubtitleOverlayCache:
+    """프로세스 전역 SubtitleOverlayCache 인스턴스"""
+    global _overlay_cache
+    if _overlay_cache is None:
+        _overlay_cache = SubtitleOverlayCache(SUBTITLE_OVERLAY_DIR, SUBTITLE_OVERLAY_MAX_BYTES,
+                                              SUBTITLE_OVERLAY_ENABLED)
+    return _overlay_cache
@@ -0,0 +1,197 @@
+"""
+Content-addressed subtitle artifact store
+자막(ASS) 내용을 메모리에 두고 ffmpeg가 경로를 필요로 할 때만 파일로 만드는 저장소
+
+- 변형 생성 결과는 (자막 데이터, 변형, 길이) 키로 메모이즈 - 클립/작업 사이에서 한 번만 생성
+- 파일은 내용 해시 이름(<sha256>.ass)으로 한 번만 쓰고 참조 카운트로 관리
+  (같은 자막을 쓰는 작업들이 파일 하나를 공유, 마지막 release에서 삭제)
+- 프로세스별 디렉토리를 사용하고, 종료된 프로세스의 디렉토리는 시작 시 정리
+- SUBTITLE_DEBUG_DUMP=true이면 내용을 로그로 남기고 파일을 삭제하지 않음
+"""
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+SUBTITLE_STORE_DIR = Path(os.getenv("SUBTITLE_STORE_DIR",
+                                    str(Path(tempfile.gettempdir()) / "shadowing_subtitles")))
+SUBTITLE_MEMO_SIZE = int(os.getenv("SUBTITLE_MEMO_SIZE", "1024"))
+SUBTITLE_DEBUG_DUMP = os.getenv("SUBTITLE_DEBUG_DUMP", "false").lower() == "true"
+
+PROCESS_DIR_PREFIX = "proc-"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SubtitleArtifactStore:
+    """내용 주소 기반 자막 저장소 (스레드 안전)"""
+
+    def __init__(self, base_dir: Path, memo_size: int = SUBTITLE_MEMO_SIZE, debug_dump: bool = False):
+        self.base_dir = Path(base_dir)
+        self.memo_size = memo_size
+        self.debug_dump = debug_dump
+        self._dir: Optional[Path] = None
+        self._lock = threading.Lock()
+        # 생성 키 -> ASS 내용 (LRU)
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+        # 내용 해시 -> (내용, 참조 수)
+        self._artifacts: Dict[str, list] = {}
+        self.generated = 0
+        self.memo_hits = 0
+        self.materialized = 0
+        self.shared = 0
+
+    @property
+    def dir(self) -> Path:
+        # 첫 사용 시 프로세스 디렉토리 생성 (종료된 프로세스가 남긴 디렉토리 정리)
+        if self._dir is None:
+            self._dir = self.base_dir / f"{PROCESS_DIR_PREFIX}{os.getpid()}"
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._cleanup_stale()
+        return self._dir
+
+    def _cleanup_stale(self):
+        for entry in self.base_dir.glob(f"{PROCESS_DIR_PREFIX}*"):
+            try:
+                pid = int(entry.name[len(PROCESS_DIR_PREFIX):])
+            except ValueError:
+                continue
+            if pid != os.getpid() and not _pid_alive(pid):
+                shutil.rmtree(entry, ignore_errors=True)
+                logger.info(f"Removed stale subtitle directory: {entry}")
+
+    @staticmethod
+    def make_generation_key(subtitle_data: Dict, variant: str, clip_duration: Optional[float]) -> str:
+        payload = json.dumps([subtitle_data, variant, clip_duration], sort_keys=True,
+                             ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def content_digest(content: str) -> str:
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get_or_generate(self, key: str, generate: Callable[[], str]) -> str:
+        """생성 키의 ASS 내용 (없으면 generate()로 한 번 생성)"""
+        with self._lock:
+            content = self._memo.get(key)
+            if content is not None:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return content
+        content = generate()
+        with self._lock:
+            self._memo[key] = content
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+            self.generated += 1
+        return content
+
+    def acquire(self, content: str, label: str = "") -> str:
+        """내용을 파일로 만들고 경로 반환 (참조 수 증가 - 사용 후 release)"""
+        digest = self.content_digest(content)
+        path = self.dir / f"{digest}.ass"
+        with self._lock:
+            artifact = self._artifacts.get(digest)
+            if artifact is not None and path.exists():
+                artifact[1] += 1
+                self.shared += 1
+                return str(path)
+            # 같은 디렉토리에서 임시 파일로 쓴 뒤 이름 변경
+            temp_path = path.with_name(f".{digest}.{threading.get_ident()}.tmp")
+            temp_path.write_text(content, encoding='utf-8')
+            os.replace(temp_path, path)
+            self._artifacts[digest] = [content, (artifact[1] if artifact else 0) + 1]
+            self.materialized += 1
+
+        if self.debug_dump:
+            logger.info(f"Subtitle artifact {label or digest[:12]}: {path} ({len(content)} bytes)\n{content}")
+        return str(path)
+
+    def release(self, path: str):
+        """참조 수 감소 - 0이 되면 파일 삭제 (저장소가 만든 파일이 아니면 무시)"""
+        digest = self._digest_of(path)
+        if digest is None:
+            return
+        with self._lock:
+            artifact = self._artifacts.get(digest)
+            if artifact is None:
+                return
+            artifact[1] -= 1
+            if artifact[1] > 0:
+                return
+            del self._artifacts[digest]
+            if not self.debug_dump:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def _digest_of(self, path: str) -> Optional[str]:
+        if not path or self._dir is None:
+            return None
+        file_path = Path(path)
+        if file_path.parent != self._dir or file_path.suffix != '.ass':
+            return None
+        return file_path.stem
+
+    def read(self, path: str) -> str:
+        """자막 파일 내용 (저장소 파일이면 메모리에서, 아니면 디스크에서)"""
+        digest = self._digest_of(path)
+        if digest is not None:
+            with self._lock:
+                artifact = self._artifacts.get(digest)
+                if artifact is not None:
+                    return artifact[0]
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def digest(self, path: str) -> str:
+        """자막 파일 내용의 sha256 (저장소 파일은 이름에서 바로)"""
+        digest = self._digest_of(path)
+        if digest is not None and digest in self._artifacts:
+            return digest
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'dir': str(self._dir or self.base_dir),
+                'memo_entries': len(self._memo),
+                'generated': self.generated,
+                'memo_hits': self.memo_hits,
+                'live_files': len(self._artifacts),
+                'materialized': self.materialized,
+                'shared': self.shared,
+            }
+
+
+_store: Optional[SubtitleArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_subtitle_store() -> SubtitleArtifactStore:
+    """프로세스 전역 SubtitleArtifactStore 인스턴스"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SubtitleArtifactStore(SUBTITLE_STORE_DIR, SUBTITLE_MEMO_SIZE, SUBTITLE_DEBUG_DUMP)
+        return _store
@@ -0,0 +1,141 @@
+"""
+Template execution planner
+템플릿을 고유 렌더 작업(op) 목록과 참조 순서로 컴파일
+
+같은 설정의 클립(예: template_1의 1_nosub / 5_nosub, count > 1인 클립)은
+한 번만 렌더링하고, 병합 목록과 individual_clips에서는 같은 결과를 참조한다.
+
+렌더 키: video_mode, subtitle_type, speed, crop, overlays (+ subtitle_mode, 리드인 등 나머지 설정)
+"""
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 렌더 결과에 영향을 주지 않는 클립 설정 키
+# (subtitle_mode는 레이블 외에도 학습 클립의 프레임 위치/쇼츠 레이아웃을 결정하므로 제외하지 않음)
+NON_RENDER_KEYS = ('folder_name', 'count')
+
+
+@dataclass
+class RenderOp:
+    """고유 렌더 작업 - 같은 키의 클립은 이 결과를 공유"""
+    index: int
+    key: Tuple
+    clip_config: Dict
+    refs: List[int] = field(default_factory=list)  # 이 op을 참조하는 시퀀스 위치
+
+
+@dataclass
+class ClipRef:
+    """템플릿 시퀀스의 한 클립 (op 참조)"""
+    position: int
+    op_index: int
+    clip_config: Dict
+    folder_name: str
+    repeat_index: int  # 같은 clip_config 내 반복 번호 (1부터)
+
+
+@dataclass
+class ExecutionPlan:
+    """템플릿 실행 계획"""
+    template_name: str
+    ops: List[RenderOp]
+    sequence: List[ClipRef]
+
+    @property
+    def total_clips(self) -> int:
+        return len(self.sequence)
+
+    @property
+    def encodes_saved(self) -> int:
+        """단일 패스 기준 절약된 변형 렌더 수"""
+        return len(self.sequence) - len(self.ops)
+
+    def padded_op_keys(self, gap_duration: float) -> List[Tuple[int, float]]:
+        """클립별 인코딩 기준 고유 (op, 뒤 갭) 목록 - 갭은 시퀀스 위치에 따라 달라짐"""
+        keys = []
+        for ref in self.sequence:
+            key = (ref.op_index, self.gap_after(ref.position, gap_duration))
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+    def gap_after(self, position: int, gap_duration: float) -> float:
+        """시퀀스 위치의 클립 뒤 갭 (마지막 클립은 0)"""
+        return gap_duration if position < len(self.sequence) - 1 else 0.0
+
+    def summary(self) -> Dict:
+        return {
+            "template": self.template_name,
+            "clips": self.total_clips,
+            "unique_ops": len(self.ops),
+            "encodes_saved": self.encodes_saved,
+        }
+
+
+def get_render_key(clip_config: Dict, subtitle_mode_labels: Optional[Dict] = None) -> Tuple:
+    """클립 설정의 렌더 키 생성"""
+    labels = subtitle_mode_labels or {}
+    video_mode = clip_config.get('video_mode', 'normal')
+    speed = clip_config.get('speed') if video_mode == 'slow_motion' else None
+    crop = clip_config.get('crop') or clip_config.get('aspect_ratio')
+    # 자막 모드 자체가 아니라 화면에 그려지는 레이블이 결과를 결정
+    overlays = (labels.get(clip_config.get('subtitle_mode') or '', ''),)
+
+    extra = {
+        k: v for k, v in clip_config.items()
+        if k not in NON_RENDER_KEYS and k not in ('video_mode', 'subtitle_type', 'speed', 'crop', 'aspect_ratio')
+    }
+    return (video_mode, clip_config.get('subtitle_type'), speed, crop, overlays,
+            json.dumps(extra, sort_keys=True, ensure_ascii=False))
+
+
+def compile_template(template_name: str, template: Dict,
+                     subtitle_mode_labels: Optional[Dict] = None) -> ExecutionPlan:
+    """템플릿을 실행 계획으로 컴파일"""
+    ops: List[RenderOp] = []
+    ops_by_key: Dict[Tuple, RenderOp] = {}
+    sequence: List[ClipRef] = []
+
+    for clip_config in template.get('clips', []):
+        key = get_render_key(clip_config, subtitle_mode_labels)
+        op = ops_by_key.get(key)
+        if op is None:
+            op = RenderOp(index=len(ops), key=key, clip_config=clip_config)
+            ops.append(op)
+            ops_by_key[key] = op
+
+        folder_name = clip_config.get('folder_name', clip_config.get('subtitle_mode'))
+        for i in range(clip_config.get('count', 1)):
+            position = len(sequence)
+            op.refs.append(position)
+            sequence.append(ClipRef(position=position, op_index=op.index,
+                                    clip_config=clip_config, folder_name=folder_name,
+                                    repeat_index=i + 1))
+
+    return ExecutionPlan(template_name=template_name, ops=ops, sequence=sequence)
+
+
+_plan_cache: Dict[Tuple[str, str], ExecutionPlan] = {}
+_plan_cache_lock = threading.Lock()
+
+
+def get_execution_plan(template_name: str, template: Dict,
+                       subtitle_mode_labels: Optional[Dict] = None) -> ExecutionPlan:
+    """템플릿별로 캐시된 실행 계획 반환 (템플릿 내용이 바뀌면 다시 컴파일)"""
+    signature = json.dumps([template.get('clips', []), subtitle_mode_labels or {}],
+                           sort_keys=True, ensure_ascii=False)
+    cache_key = (template_name, signature)
+
+    with _plan_cache_lock:
+        plan = _plan_cache.get(cache_key)
+        if plan is None:
+            plan = compile_template(template_name, template, subtitle_mode_labels)
+            _plan_cache[cache_key] = plan
+            logger.info(f"Execution plan for {template_name}: {plan.total_clips} clips -> "
+                        f"{len(plan.ops)} render ops ({plan.encodes_saved} encodes saved)")
+        return plan
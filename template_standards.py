@@ -10,11 +10,13 @@ Template Standards Module
 
 import os
 import time
-import subprocess
 import tempfile
 import logging
 from typing import List, Optional, Dict, Tuple
 
+from cpu_slots import run_ffmpeg
+from media_probe import get_media_probe
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +36,16 @@ class TemplateStandards:
     STANDARD_VIDEO_LEVEL = '4.1'
     STANDARD_GOP_SIZE = 60  # 키프레임 간격 (2초 @ 30fps)
     STANDARD_FRAMERATE = 30  # 표준 프레임레이트
+    STANDARD_BFRAMES = 3
+    
+    # 병합 계약: 이 설정으로 인코딩된 클립끼리는 재인코딩 없이 stream copy로 병합 가능
+    # (고정 GOP + closed GOP + 장면전환 키프레임 없음 → 모든 클립이 IDR로 시작,
+    #  동일한 x264 설정 → 동일한 SPS/PPS, 동일한 fps/timescale/샘플레이트)
+    CONTRACT_VIDEO_CODEC_NAME = 'h264'
+    CONTRACT_TIMESCALE = 15360  # 비디오 트랙 timescale (30fps의 정수배)
+    
+    # 동시 인코딩 시 FFmpeg 프로세스들이 나눠 쓰는 전체 스레드 수
+    FFMPEG_THREAD_BUDGET = int(os.getenv('FFMPEG_THREAD_BUDGET', str(os.cpu_count() or 4)))
     
     # 무음 생성용 표준 오디오 설정
     SILENCE_SAMPLE_RATE = 44100
@@ -46,6 +58,17 @@ class TemplateStandards:
     OUTPUT_AUDIO_CODEC = 'aac'
     OUTPUT_AUDIO_BITRATE = '192k'
     
+    # 렌더 품질 (draft: 타이밍/텍스트 확인용 미리보기)
+    QUALITY_FINAL = 'final'
+    QUALITY_DRAFT = 'draft'
+    QUALITY_LEVELS = (QUALITY_FINAL, QUALITY_DRAFT)
+    
+    # 미리보기 설정 - 해상도 1/N, ultrafast, 저비트레이트 오디오
+    DRAFT_SCALE_DIVISOR = int(os.getenv('DRAFT_SCALE_DIVISOR', '2'))
+    DRAFT_VIDEO_PRESET = 'ultrafast'
+    DRAFT_VIDEO_CRF = int(os.getenv('DRAFT_VIDEO_CRF', '28'))
+    DRAFT_AUDIO_BITRATE = '64k'
+    
     @staticmethod
     def create_silence_wav(duration: float, output_path: Optional[str] = None) -> str:
         """
@@ -72,7 +95,7 @@ class TemplateStandards:
             output_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd)
         if result.returncode != 0:
             logger.error(f"Failed to create silence WAV: {result.stderr}")
             raise Exception(f"Silence generation failed: {result.stderr}")
@@ -81,28 +104,213 @@ class TemplateStandards:
         return output_path
     
     @staticmethod
-    def get_standard_encoding_options() -> List[str]:
+    def get_thread_share(concurrent_encodes: int) -> int:
+        """
+        동시에 실행되는 인코딩 하나가 사용할 스레드 수
+        
+        Args:
+            concurrent_encodes: 동시에 실행되는 FFmpeg 프로세스 수
+        """
+        return max(1, TemplateStandards.FFMPEG_THREAD_BUDGET // max(1, concurrent_encodes))
+    
+    @staticmethod
+    def get_standard_encoding_options(threads: Optional[int] = None, quality: str = QUALITY_FINAL) -> List[str]:
         """
         모든 템플릿에서 사용할 표준 인코딩 옵션 반환
         
+        Args:
+            threads: 인코더 스레드 수 (None이면 FFmpeg 기본값)
+            quality: 'final' 또는 'draft' (미리보기 preset/crf/오디오 비트레이트)
+        
         Returns:
             FFmpeg 인코딩 옵션 리스트
         """
-        return [
+        thread_options = ['-threads', str(threads)] if threads else []
+        options = thread_options + [
             '-c:v', TemplateStandards.STANDARD_VIDEO_CODEC,
             '-preset', TemplateStandards.STANDARD_VIDEO_PRESET,
             '-crf', str(TemplateStandards.STANDARD_VIDEO_CRF),
             '-profile:v', TemplateStandards.STANDARD_VIDEO_PROFILE,
             '-level', TemplateStandards.STANDARD_VIDEO_LEVEL,
             '-pix_fmt', TemplateStandards.STANDARD_PIX_FMT,
-            '-g', str(TemplateStandards.STANDARD_GOP_SIZE),
+        ] + TemplateStandards.get_contract_video_options() + [
             '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
             '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
             '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
             '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
             '-movflags', '+faststart'
         ]
+        if quality == TemplateStandards.QUALITY_DRAFT:
+            # 옵션 목록에는 -vf가 없으므로 해상도는 바꾸지 않음 (호출하는 쪽 필터에서 처리)
+            return TemplateStandards.apply_draft_options(options)
+        return options
+    
+    @staticmethod
+    def get_draft_resolution(width: int, height: int) -> Tuple[int, int]:
+        """미리보기 해상도 (짝수로 맞춤)"""
+        divisor = max(1, TemplateStandards.DRAFT_SCALE_DIVISOR)
+        return (width // divisor) // 2 * 2, (height // divisor) // 2 * 2
+    
+    @staticmethod
+    def get_draft_scale_filter() -> str:
+        """필터 체인 끝에 붙이는 미리보기 축소 필터"""
+        divisor = max(1, TemplateStandards.DRAFT_SCALE_DIVISOR)
+        return f"scale=trunc(iw/{divisor}/2)*2:trunc(ih/{divisor}/2)*2"
     
+    @staticmethod
+    def apply_draft_options(cmd: List[str]) -> List[str]:
+        """
+        표준 인코딩 명령어를 미리보기 품질로 변경
+        
+        preset/crf/오디오 비트레이트를 바꾸고 x264 세부 옵션은 병합 계약 옵션만 남긴다.
+        -vf가 있으면 끝에 축소 필터를 붙인다 (-filter_complex는 호출하는 쪽에서 처리).
+        GOP/fps/timescale은 그대로이므로 미리보기 클립끼리는 stream copy 병합이 가능하다.
+        """
+        cmd = list(cmd)
+        for i, arg in enumerate(cmd[:-1]):
+            if arg == '-preset':
+                cmd[i + 1] = TemplateStandards.DRAFT_VIDEO_PRESET
+            elif arg == '-crf':
+                cmd[i + 1] = str(TemplateStandards.DRAFT_VIDEO_CRF)
+            elif arg == '-b:a':
+                cmd[i + 1] = TemplateStandards.DRAFT_AUDIO_BITRATE
+            elif arg == '-x264opts':
+                cmd[i + 1] = TemplateStandards.get_contract_x264opts()
+            elif arg == '-vf':
+                cmd[i + 1] = f"{cmd[i + 1]},{TemplateStandards.get_draft_scale_filter()}"
+        return cmd
+    
+    @staticmethod
+    def get_contract_video_options() -> List[str]:
+        """
+        병합 계약(stream copy 병합 가능)을 위한 GOP/프레임레이트/timebase 옵션
+        
+        Returns:
+            FFmpeg 비디오 옵션 리스트
+        """
+        return [
+            '-r', str(TemplateStandards.STANDARD_FRAMERATE),
+            '-g', str(TemplateStandards.STANDARD_GOP_SIZE),
+            '-keyint_min', str(TemplateStandards.STANDARD_GOP_SIZE),
+            '-sc_threshold', '0',
+            '-flags', '+cgop',
+            '-bf', str(TemplateStandards.STANDARD_BFRAMES),
+            '-video_track_timescale', str(TemplateStandards.CONTRACT_TIMESCALE),
+        ]
+    
+    @staticmethod
+    def get_contract_x264opts(extra: str = '') -> str:
+        """
+        -x264opts를 직접 지정하는 인코더용 병합 계약 호환 옵션 문자열
+        
+        Args:
+            extra: 추가 x264 옵션 (예: 'ref=3:me=hex')
+        """
+        opts = (f"keyint={TemplateStandards.STANDARD_GOP_SIZE}:min-keyint={TemplateStandards.STANDARD_GOP_SIZE}:"
+                f"scenecut=0:open-gop=0:bframes={TemplateStandards.STANDARD_BFRAMES}")
+        return f"{opts}:{extra}" if extra else opts
+    
+    @staticmethod
+    def get_pad_filters(lead_in: float = 0.0, gap_after: float = 0.0) -> Tuple[List[str], List[str]]:
+        """
+        클립 인코딩 그래프 안에서 리드인/갭을 만드는 필터 반환
+
+        별도의 프리즈 프레임/무음 파일을 만들지 않고 tpad/adelay/apad로 처리한다.
+        비디오 필터 체인의 마지막(자막/타이틀 이후)에 붙여야 한다.
+
+        Args:
+            lead_in: 클립 앞 검은 화면 + 무음 길이 (초)
+            gap_after: 클립 뒤 마지막 프레임 정지 + 무음 길이 (초)
+
+        Returns:
+            (비디오 필터 리스트, 오디오 필터 리스트)
+        """
+        video_filters = []
+        audio_filters = []
+
+        if lead_in > 0:
+            video_filters.append(f"tpad=start_mode=add:start_duration={lead_in}:color=black")
+            audio_filters.append(f"adelay={int(round(lead_in * 1000))}:all=1")
+
+        if gap_after > 0:
+            video_filters.append(f"tpad=stop_mode=clone:stop_duration={gap_after}")
+            audio_filters.append(f"apad=pad_dur={gap_after}")
+
+        return video_filters, audio_filters
+
+    @staticmethod
+    def concat_with_gaps(clips: List[str], output_path: str, gap_duration: float,
+                         resolution: Tuple[int, int] = None,
+                         gap_after_last: bool = False,
+                         lead_ins: Optional[List[float]] = None,
+                         quality: str = QUALITY_FINAL) -> bool:
+        """
+        갭이 없는 클립들을 하나의 필터 그래프로 갭을 넣어 병합
+
+        클립마다 ffprobe/프레임 추출/무음 생성/갭 인코딩을 하지 않고
+        tpad/apad + concat 필터로 한 번에 인코딩한다.
+
+        Args:
+            clips: 병합할 클립 경로들
+            output_path: 출력 경로
+            gap_duration: 클립 사이 갭 길이 (초)
+            resolution: 출력 해상도 (None이면 표준 FHD)
+            gap_after_last: 마지막 클립 뒤에도 갭 추가 여부
+            lead_ins: 클립별 리드인 길이 (초)
+            quality: 'final' 또는 'draft' (draft는 미리보기 인코딩 설정 사용)
+
+        Returns:
+            성공 여부
+        """
+        if not clips:
+            logger.error("No clips to merge")
+            return False
+
+        width, height = resolution or (TemplateStandards.STANDARD_VIDEO_WIDTH,
+                                       TemplateStandards.STANDARD_VIDEO_HEIGHT)
+
+        cmd = ['ffmpeg', '-y']
+        graph = []
+        concat_inputs = []
+
+        for i, clip in enumerate(clips):
+            cmd.extend(['-i', clip])
+
+            lead_in = lead_ins[i] if lead_ins and i < len(lead_ins) else 0.0
+            gap_after = gap_duration if (i < len(clips) - 1 or gap_after_last) else 0.0
+            pad_v, pad_a = TemplateStandards.get_pad_filters(lead_in, gap_after)
+
+            video_filters = [
+                f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black",
+                "setsar=1",
+                f"fps={TemplateStandards.STANDARD_FRAMERATE}",
+                f"format={TemplateStandards.STANDARD_PIX_FMT}",
+            ] + pad_v
+            audio_filters = [
+                f"aresample={TemplateStandards.OUTPUT_SAMPLE_RATE}",
+                "aformat=sample_fmts=fltp:channel_layouts=stereo",
+            ] + pad_a
+
+            graph.append(f"[{i}:v]{','.join(video_filters)}[v{i}]")
+            graph.append(f"[{i}:a]{','.join(audio_filters)}[a{i}]")
+            concat_inputs.append(f"[v{i}][a{i}]")
+
+        graph.append(f"{''.join(concat_inputs)}concat=n={len(clips)}:v=1:a=1[outv][outa]")
+
+        cmd.extend(['-filter_complex', ';'.join(graph), '-map', '[outv]', '-map', '[outa]'])
+        cmd.extend(TemplateStandards.get_standard_encoding_options(quality=quality))
+        cmd.append(output_path)
+
+        result = run_ffmpeg(cmd)
+        if result.returncode != 0:
+            logger.error(f"Merge with gaps failed: {result.stderr}")
+            return False
+
+        logger.info(f"Merged {len(clips)} clips with {gap_duration}s in-graph gaps to {output_path}")
+        get_media_probe().record_output(output_path)
+        return True
+
     @staticmethod
     def create_freeze_frame(video_path: str, frame_time: float, duration: float = 0.5, 
                           output_path: Optional[str] = None) -> str:
@@ -132,7 +340,7 @@ class TemplateStandards:
             temp_frame
         ]
         
-        result = subprocess.run(extract_cmd, capture_output=True, text=True)
+        result = run_ffmpeg(extract_cmd)
         if result.returncode != 0:
             logger.error(f"Frame extraction failed: {result.stderr}")
             raise Exception(f"Frame extraction failed: {result.stderr}")
@@ -159,7 +367,7 @@ class TemplateStandards:
                 output_path
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_ffmpeg(cmd)
             if result.returncode != 0:
                 logger.error(f"Freeze frame creation failed: {result.stderr}")
                 raise Exception(f"Freeze frame creation failed: {result.stderr}")
@@ -204,7 +412,7 @@ class TemplateStandards:
             output_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd)
         if result.returncode != 0:
             logger.error(f"Black gap creation failed: {result.stderr}")
             raise Exception(f"Black gap creation failed: {result.stderr}")
@@ -213,14 +421,150 @@ class TemplateStandards:
         return output_path
     
     @staticmethod
-    def merge_clips(clips: List[str], output_path: str, mode: str = 'reencode') -> bool:
+    def probe_merge_signature(video_path: str) -> Optional[Dict]:
+        """
+        병합 계약 검사용 스트림 시그니처 추출
+        
+        Args:
+            video_path: 비디오 경로
+            
+        Returns:
+            {'video': {...}, 'audio': {...}, 'start': {...}} 또는 None (probe 실패/스트림 누락)
+        """
+        probe = get_media_probe()
+        data = probe.probe(video_path)
+        if not data:
+            return None
+        
+        streams = data['streams']
+        video = [s for s in streams if s.get('codec_type') == 'video']
+        audio = [s for s in streams if s.get('codec_type') == 'audio']
+        if len(video) != 1 or len(audio) != 1:
+            return None
+        
+        return {'video': video[0], 'audio': audio[0], 'start': probe.get_stream_start(video_path)}
+    
+    @staticmethod
+    def is_contract_compliant(signature: Optional[Dict]) -> bool:
+        """시그니처가 병합 계약의 고정 파라미터를 만족하는지 확인"""
+        if not signature:
+            return False
+        
+        video = signature['video']
+        audio = signature['audio']
+        start = signature.get('start') or {}
+        return (
+            # concat demuxer는 클립 경계에서 디코더를 리셋하지 않으므로 각 클립은
+            # IDR로 시작해야 하고, 앞 클립을 참조하는 open GOP B프레임이 없어야 함
+            start.get('starts_with_idr') is True
+            and start.get('closed_gop') is True
+            and video.get('codec_name') == TemplateStandards.CONTRACT_VIDEO_CODEC_NAME
+            and video.get('pix_fmt') == TemplateStandards.STANDARD_PIX_FMT
+            and video.get('r_frame_rate') == f"{TemplateStandards.STANDARD_FRAMERATE}/1"
+            and video.get('time_base') == f"1/{TemplateStandards.CONTRACT_TIMESCALE}"
+            and audio.get('codec_name') == TemplateStandards.OUTPUT_AUDIO_CODEC
+            and str(audio.get('sample_rate')) == str(TemplateStandards.OUTPUT_SAMPLE_RATE)
+            and audio.get('channels') == TemplateStandards.OUTPUT_CHANNELS
+        )
+    
+    @staticmethod
+    def _signature_key(signature: Dict) -> Tuple:
+        """같은 값이면 stream copy 병합이 가능한 시그니처 키 (SPS/PPS 포함)"""
+        video = signature['video']
+        return (video.get('width'), video.get('height'), video.get('profile'),
+                signature['start'].get('parameter_sets'))
+    
+    @staticmethod
+    def conform_clip(video_path: str, output_path: str, resolution: Tuple[int, int],
+                     quality: str = QUALITY_FINAL) -> bool:
+        """
+        병합 계약에 맞지 않는 클립을 계약 설정으로 재인코딩
+        
+        Args:
+            video_path: 원본 클립
+            output_path: 출력 경로
+            resolution: 맞출 해상도 (width, height)
+            quality: 'final' 또는 'draft'
+        """
+        width, height = resolution
+        cmd = ['ffmpeg', '-y', '-i', video_path]
+        
+        if TemplateStandards.get_audio_info(video_path):
+            cmd.extend(['-map', '0:v:0', '-map', '0:a:0'])
+        else:
+            # 오디오가 없는 클립은 무음 트랙으로 채움
+            cmd.extend([
+                '-f', 'lavfi', '-i',
+                f'anullsrc=channel_layout=stereo:sample_rate={TemplateStandards.OUTPUT_SAMPLE_RATE}',
+                '-map', '0:v:0', '-map', '1:a:0', '-shortest'
+            ])
+        
+        cmd.extend([
+            '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,'
+                   f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1'
+        ])
+        cmd.extend(TemplateStandards.get_standard_encoding_options(quality=quality))
+        cmd.append(output_path)
+        
+        result = run_ffmpeg(cmd)
+        if result.returncode != 0:
+            logger.error(f"Conform encode failed for {video_path}: {result.stderr}")
+            return False
+        return True
+    
+    @staticmethod
+    def concat_copy(clips: List[str], output_path: str, quality: str = QUALITY_FINAL) -> bool:
+        """
+        병합 계약을 만족하는 클립들을 concat demuxer로 병합 (비디오 stream copy)
+        
+        오디오는 AAC 프라이밍(encoder delay) 샘플이 클립 경계마다 끼어들지 않도록
+        디코딩 후 다시 인코딩한다 (비디오 대비 비용은 무시할 수준).
+        """
+        concat_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
+        try:
+            for clip in clips:
+                escaped_path = os.path.abspath(clip).replace('\\', '/').replace("'", "'\\''")
+                concat_file.write(f"file '{escaped_path}'\n")
+            concat_file.close()
+            
+            cmd = [
+                'ffmpeg', '-y',
+                '-f', 'concat',
+                '-safe', '0',
+                '-i', concat_file.name,
+                '-map', '0:v:0', '-map', '0:a:0',
+                '-c:v', 'copy',
+                '-af', 'aresample=async=1:first_pts=0',
+                '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
+                '-b:a', (TemplateStandards.DRAFT_AUDIO_BITRATE if quality == TemplateStandards.QUALITY_DRAFT
+                         else TemplateStandards.OUTPUT_AUDIO_BITRATE),
+                '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
+                '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
+                '-video_track_timescale', str(TemplateStandards.CONTRACT_TIMESCALE),
+                '-movflags', '+faststart',
+                output_path
+            ]
+            
+            result = run_ffmpeg(cmd)
+            if result.returncode != 0:
+                logger.error(f"Stream-copy concat failed: {result.stderr}")
+                return False
+            return True
+        finally:
+            if os.path.exists(concat_file.name):
+                os.remove(concat_file.name)
+    
+    @staticmethod
+    def merge_clips(clips: List[str], output_path: str, mode: str = 'auto', quality: str = QUALITY_FINAL) -> bool:
         """
         표준 방식으로 클립 병합
         
         Args:
             clips: 병합할 클립 경로들
             output_path: 출력 경로
-            mode: 'copy' 또는 'reencode' (기본값: reencode)
+            mode: 'auto' (기본값: 계약 검사 후 stream copy, 맞지 않는 클립만 재인코딩),
+                  'copy' 또는 'reencode'
+            quality: 'final' 또는 'draft' (재인코딩 시 미리보기 설정 사용)
             
         Returns:
             성공 여부
@@ -229,6 +573,12 @@ class TemplateStandards:
             logger.error("No clips to merge")
             return False
         
+        if mode == 'auto':
+            if TemplateStandards.merge_clips_by_contract(clips, output_path, quality=quality):
+                return True
+            logger.warning("Contract merge failed, falling back to full re-encode")
+            mode = 'reencode'
+        
         # concat 파일 생성
         concat_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
         try:
@@ -255,35 +605,102 @@ class TemplateStandards:
                     '-f', 'concat',
                     '-safe', '0',
                     '-i', concat_file.name,
-                    '-c:v', TemplateStandards.STANDARD_VIDEO_CODEC,
-                    '-preset', TemplateStandards.STANDARD_VIDEO_PRESET,
-                    '-crf', str(TemplateStandards.STANDARD_VIDEO_CRF),
-                    '-pix_fmt', TemplateStandards.STANDARD_PIX_FMT,
-                    '-c:a', 'aac',
-                    '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
-                    '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
-                    '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
-                    '-movflags', '+faststart',
-                    output_path
-                ]
+                ] + TemplateStandards.get_standard_encoding_options(quality=quality) + [output_path]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_ffmpeg(cmd)
             
             if result.returncode != 0:
                 logger.error(f"Merge failed: {result.stderr}")
                 return False
             
             logger.info(f"Successfully merged {len(clips)} clips to {output_path}")
+            get_media_probe().record_output(output_path)
             return True
             
         finally:
             if os.path.exists(concat_file.name):
                 os.remove(concat_file.name)
     
+    @staticmethod
+    def merge_clips_by_contract(clips: List[str], output_path: str, quality: str = QUALITY_FINAL) -> bool:
+        """
+        병합 계약 검사 후 stream copy 병합
+        
+        계약을 만족하지 않거나 다수와 SPS/PPS·해상도가 다른 클립만
+        계약 설정으로 재인코딩한 뒤 전체를 stream copy로 이어 붙인다.
+        
+        Args:
+            clips: 병합할 클립 경로들
+            output_path: 출력 경로
+            quality: 'final' 또는 'draft' (재인코딩/오디오 설정)
+            
+        Returns:
+            성공 여부
+        """
+        existing = [clip for clip in clips if os.path.exists(clip)]
+        if not existing:
+            logger.error("No clips to merge")
+            return False
+        
+        signatures = [TemplateStandards.probe_merge_signature(clip) for clip in existing]
+        
+        # 가장 많은 클립이 공유하는 시그니처를 기준으로 사용
+        counts: Dict[Tuple, int] = {}
+        for signature in signatures:
+            if TemplateStandards.is_contract_compliant(signature):
+                key = TemplateStandards._signature_key(signature)
+                counts[key] = counts.get(key, 0) + 1
+        
+        if counts:
+            reference = max(counts, key=counts.get)
+            resolution = (reference[0], reference[1])
+        else:
+            reference = None
+            info = TemplateStandards.get_video_info(existing[0])
+            resolution = (info.get('width') or TemplateStandards.STANDARD_VIDEO_WIDTH,
+                          info.get('height') or TemplateStandards.STANDARD_VIDEO_HEIGHT)
+        
+        merge_inputs = []
+        conformed = []
+        try:
+            for clip, signature in zip(existing, signatures):
+                if (reference is not None and TemplateStandards.is_contract_compliant(signature)
+                        and TemplateStandards._signature_key(signature) == reference):
+                    merge_inputs.append(clip)
+                    continue
+                
+                conformed_path = tempfile.NamedTemporaryFile(suffix='_conform.mp4', delete=False).name
+                conformed.append(conformed_path)
+                logger.info(f"Clip does not meet merge contract, re-encoding: {clip}")
+                if not TemplateStandards.conform_clip(clip, conformed_path, resolution, quality=quality):
+                    return False
+                merge_inputs.append(conformed_path)
+            
+            # 재인코딩한 클립의 SPS/PPS가 기준과 다르면 stream copy 불가
+            if conformed and reference is not None:
+                for conformed_path in conformed:
+                    signature = TemplateStandards.probe_merge_signature(conformed_path)
+                    if not signature or TemplateStandards._signature_key(signature) != reference:
+                        logger.warning("Conformed clip parameter sets differ from reference")
+                        return False
+            
+            logger.info(f"Stream-copy merge: {len(merge_inputs) - len(conformed)} clips copied, "
+                        f"{len(conformed)} re-encoded")
+            if not TemplateStandards.concat_copy(merge_inputs, output_path, quality=quality):
+                return False
+            
+            logger.info(f"Successfully merged {len(merge_inputs)} clips to {output_path}")
+            get_media_probe().record_output(output_path)
+            return True
+        finally:
+            for conformed_path in conformed:
+                if os.path.exists(conformed_path):
+                    os.remove(conformed_path)
+    
     @staticmethod
     def get_video_info(video_path: str) -> Dict:
         """
-        비디오 정보 추출
+        비디오 정보 추출 (MediaProbe 캐시 사용)
         
         Args:
             video_path: 비디오 경로
@@ -291,27 +708,12 @@ class TemplateStandards:
         Returns:
             비디오 정보 딕셔너리
         """
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=width,height,r_frame_rate,codec_name,pix_fmt',
-            '-of', 'json',
-            video_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            import json
-            data = json.loads(result.stdout)
-            if data.get('streams'):
-                return data['streams'][0]
-        
-        return {}
+        return get_media_probe().get_video_stream(video_path)
     
     @staticmethod
     def get_audio_info(video_path: str) -> Dict:
         """
-        오디오 정보 추출
+        오디오 정보 추출 (MediaProbe 캐시 사용)
         
         Args:
             video_path: 비디오 경로
@@ -319,22 +721,7 @@ class TemplateStandards:
         Returns:
             오디오 정보 딕셔너리
         """
-        cmd = [
-            'ffprobe', '-v', 'error',
-            '-select_streams', 'a:0',
-            '-show_entries', 'stream=codec_name,sample_rate,channels,channel_layout',
-            '-of', 'json',
-            video_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            import json
-            data = json.loads(result.stdout)
-            if data.get('streams'):
-                return data['streams'][0]
-        
-        return {}
+        return get_media_probe().get_audio_stream(video_path)
 
 
 # 간편 사용을 위한 별칭
@@ -2,7 +2,11 @@
 Template-based video encoder
 템플릿 기반으로 shadowing 비디오를 생성하는 개선된 인코더
 """
+import copy
 import json
+import itertools
+import threading
+import hashlib
 import os
 import tempfile
 import logging
@@ -10,11 +14,22 @@ import asyncio
 import subprocess
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from video_encoder import VideoEncoder
 from subtitle_generator import SubtitleGenerator
 from subtitle_pipeline import SubtitlePipeline, SubtitleType
 from img_tts_generator import ImgTTSGenerator
 from template_standards import TemplateStandards
+from segment_cache import get_segment_cache
+from cpu_slots import run_ffmpeg
+from ffmpeg_progress import with_job_context
+from job_processes import JobCancelled
+from media_probe import get_media_probe
+from render_decisions import get_render_decisions
+from render_cache import get_render_cache, get_encoder_signature, clone_file
+from subtitle_overlay import get_subtitle_overlay_cache, overlay_filter_chain
+from subtitle_store import get_subtitle_store
+from template_planner import get_execution_plan, ExecutionPlan
 
 # OpenCV for face detection (optional)
 try:
@@ -39,13 +54,34 @@ if not DB_AVAILABLE:
     logger.warning("Database modules not available, processing logs will not be saved to DB")
 
 
+# 변형 산출물 디렉토리의 매니페스트 파일명
+VARIANT_MANIFEST_NAME = "manifest.json"
+
+# 필터 그래프의 자막 overlay 레이블 번호 (워커 스레드가 동시에 사용 - next()는 원자적)
+_overlay_labels = itertools.count(1)
+
+
 class TemplateVideoEncoder(VideoEncoder):
     """템플릿 기반 비디오 인코더"""
     
+    # 단일 패스(한 번 디코딩/한 번 인코딩) 렌더링이 가능한 video_mode
+    SINGLE_PASS_VIDEO_MODES = ('normal', 'slow_motion')
+    
+    # 클립별 인코딩 시 동시에 실행할 변형 인코딩 수
+    VARIANT_WORKERS = int(os.getenv('TEMPLATE_VARIANT_WORKERS', '3'))
+    
+    # 자막 파일로만 렌더에 반영되는 텍스트 필드 (변형 키에서 제외)
+    SUBTITLE_TEXT_KEYS = ('english', 'korean', 'eng', 'kor', 'text_eng', 'text_kor',
+                          'note', 'keywords', 'text_eng_blank', 'ass_file')
+    
     def __init__(self):
         super().__init__()
         self.subtitle_generator = SubtitleGenerator()
         self.templates, self.subtitle_mode_labels = self._load_templates()
+        self._quality = TemplateStandards.QUALITY_FINAL
+        self._render_decisions = {}
+        # 워커 스레드들이 공유하는 렌더 결정(_render_decisions) 갱신용 잠금
+        self._decisions_lock = threading.Lock()
     
     def _load_templates(self) -> tuple:
         """템플릿 파일 로드"""
@@ -62,15 +98,82 @@ class TemplateVideoEncoder(VideoEncoder):
                            subtitle_data: Dict, output_path: str,
                            start_time: float = None, end_time: float = None,
                            padding_before: float = 0.5, padding_after: float = 0.5,
-                           save_individual_clips: bool = True) -> bool:
-        """템플릿을 사용하여 shadowing 비디오 생성"""
+                           save_individual_clips: bool = True,
+                           single_pass: bool = True,
+                           quality: str = TemplateStandards.QUALITY_FINAL,
+                           variant_dir: str = None) -> bool:
+        """템플릿을 사용하여 shadowing 비디오 생성 (렌더 캐시 사용)
+        
+        같은 입력으로 이미 렌더링된 결과가 있으면 출력 위치에 링크만 하고,
+        같은 입력의 렌더가 진행 중이면 끝날 때까지 기다렸다가 그 결과를 사용한다.
+        
+        variant_dir을 주면 변형(op)별 산출물과 manifest.json을 그 디렉토리에 유지하여,
+        다음 렌더에서 입력이 바뀌지 않은 변형은 다시 인코딩하지 않고 병합만 한다.
+        """
+        if template_name not in self.templates:
+            logger.error(f"Template '{template_name}' not found")
+            return False
+        
+        if quality == TemplateStandards.QUALITY_DRAFT:
+            save_individual_clips = False
+        
+        cache = get_render_cache()
+        cache_key = cache.make_key(template_name, self.templates[template_name], self.subtitle_mode_labels,
+                                   media_path, start_time, end_time, padding_before, padding_after,
+                                   subtitle_data, quality, save_individual_clips, Path(output_path).name)
+        if cache_key is None:
+            return self._render_from_template(template_name, media_path, subtitle_data, output_path,
+                                              start_time, end_time, padding_before, padding_after,
+                                              save_individual_clips, single_pass, quality, variant_dir)
+        
+        with cache.coalesce(cache_key):
+            if cache.materialize(cache_key, output_path, save_individual_clips):
+                return True
+            success = self._render_from_template(template_name, media_path, subtitle_data, output_path,
+                                                 start_time, end_time, padding_before, padding_after,
+                                                 save_individual_clips, single_pass, quality, variant_dir)
+            if success:
+                cache.store(cache_key, output_path, save_individual_clips)
+            return success
+    
+    def _render_from_template(self, template_name: str, media_path: str,
+                              subtitle_data: Dict, output_path: str,
+                              start_time: float = None, end_time: float = None,
+                              padding_before: float = 0.5, padding_after: float = 0.5,
+                              save_individual_clips: bool = True,
+                              single_pass: bool = True,
+                              quality: str = TemplateStandards.QUALITY_FINAL,
+                              variant_dir: str = None) -> bool:
+        """템플릿 렌더링 (캐시 없이)
+        
+        single_pass가 True이고 템플릿의 모든 클립이 지원되는 모드이면
+        하나의 필터 그래프로 렌더링하고, 실패 시 클립별 인코딩으로 대체한다.
+        
+        quality가 'draft'이면 같은 실행 계획을 축소 해상도/ultrafast로 렌더링하고
+        개별 클립 저장과 출력 프로브를 생략한다. 미리보기에서 정한 편집 결정
+        (자막, 얼굴 크롭)은 저장되어 같은 입력의 final 렌더에서 재사용된다.
+        """
         
         if template_name not in self.templates:
             logger.error(f"Template '{template_name}' not found")
             return False
         
         template = self.templates[template_name]
-        logger.info(f"Using template: {template['name']} - {template['description']}")
+        logger.info(f"Using template: {template['name']} - {template['description']} (quality: {quality})")
+        
+        is_draft = quality == TemplateStandards.QUALITY_DRAFT
+        self._quality = quality
+        if is_draft:
+            save_individual_clips = False
+        
+        # 이전 미리보기에서 정한 편집 결정 (자막 생성 전 원본 입력으로 키 계산)
+        decision_store = get_render_decisions()
+        decision_key = decision_store.make_key(template_name, media_path, start_time, end_time,
+                                               padding_before, padding_after, subtitle_data)
+        stored_decisions = decision_store.load(decision_key)
+        self._render_decisions = dict(stored_decisions or {})
+        if stored_decisions:
+            logger.info(f"Reusing render decisions from previous {stored_decisions.get('quality')} render")
         
         # Extract job_id from output path if available
         job_id = None
@@ -123,11 +226,27 @@ class TemplateVideoEncoder(VideoEncoder):
             padded_start = None
             duration = None
         
+        # 변형 키용 원본 식별 정보 (구간 캐시 경로로 바뀌기 전)
+        source_identity = self._get_source_identity(media_path, padded_start, duration)
+        
+        # 디코딩된 원본 구간 캐시 사용 (변형/작업마다 NAS 원본을 다시 디코딩하지 않음)
+        cached_segment = get_segment_cache().get_segment(media_path, padded_start, duration)
+        if cached_segment:
+            logger.info(f"Using cached source segment: {cached_segment}")
+            media_path = cached_segment
+            padded_start = 0.0
+        
         # Get gap duration from template
         gap_duration = template.get('gap_duration', 1.5)
         
         # Prepare subtitle files with gap duration
-        subtitle_files = self._prepare_subtitle_files(subtitle_data, template_name, duration, gap_duration)
+        if self._render_decisions.get('subtitles'):
+            subtitle_files = self._restore_subtitle_files(self._render_decisions['subtitles'])
+        else:
+            subtitle_files = self._prepare_subtitle_files(subtitle_data, template_name, duration, gap_duration)
+        
+        # 템플릿을 고유 렌더 작업으로 컴파일 (동일 변형은 한 번만 렌더링)
+        plan = get_execution_plan(template_name, template, self.subtitle_mode_labels)
         
         # Create clips based on template
         temp_clips = []
@@ -141,125 +260,114 @@ class TemplateVideoEncoder(VideoEncoder):
             clip_number = Path(output_path).stem.split('_')[-1] if '_' in Path(output_path).stem else '0000'
             
             # 전체 클립 수 계산
-            total_clips = sum(clip['count'] for clip in template['clips'])
-            current_clip_index = 0
+            total_clips = plan.total_clips
             
-            for clip_config in template['clips']:
-                for i in range(clip_config['count']):
-                    current_clip_index += 1
+            rendered = False
+            if variant_dir:
+                # 변형별 산출물 재사용 - 입력이 바뀐 변형만 인코딩한 뒤 병합
+                variant_keys = [self._get_variant_key(template_name, op.clip_config, source_identity,
+                                                      subtitle_files, subtitle_data)
+                                for op in plan.ops]
+                can_single_pass = single_pass and self._can_render_single_pass(template, padded_start, duration)
+                variant_clips, merged = self._render_variants(plan, Path(variant_dir), variant_keys,
+                                                              media_path, padded_start, duration,
+                                                              subtitle_files, subtitle_data, output_path,
+                                                              gap_duration, can_single_pass)
+                if save_individual_clips and clip_base_dir:
+                    for ref in plan.sequence:
+                        self._save_individual_clip(variant_clips[ref.op_index], clip_base_dir,
+                                                 ref.folder_name, ref.repeat_index, clip_number)
+                if not merged:
+                    sequence_clips = [variant_clips[ref.op_index] for ref in plan.sequence]
+                    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                    if not self._concatenate_clips(sequence_clips, output_path, gap_duration=gap_duration):
+                        raise Exception("Failed to merge variant clips")
+                rendered = True
+            
+            # 단일 패스 렌더링 시도
+            if not rendered and single_pass and self._can_render_single_pass(template, padded_start, duration):
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                
+                # 개별 클립은 고유 op마다 하나만 인코딩하고 참조마다 복사
+                individual_outputs = None
+                if save_individual_clips and clip_base_dir:
+                    individual_outputs = []
+                    for _ in plan.ops:
+                        temp_file = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
+                        temp_file.close()
+                        temp_clips.append(temp_file.name)
+                        individual_outputs.append(temp_file.name)
+                
+                rendered = self._render_single_pass(plan, media_path, subtitle_files,
+                                                    output_path, padded_start, duration,
+                                                    gap_duration, individual_outputs)
+                if rendered and individual_outputs:
+                    for ref in plan.sequence:
+                        self._save_individual_clip(individual_outputs[ref.op_index], clip_base_dir,
+                                                 ref.folder_name, ref.repeat_index, clip_number)
+                elif not rendered:
+                    logger.warning("Single-pass render failed, falling back to per-clip encoding")
+                    for temp_clip in temp_clips:
+                        if os.path.exists(temp_clip):
+                            os.unlink(temp_clip)
+                    temp_clips.clear()
+            
+            if not rendered:
+                # 고유 (op, 뒤 갭)마다 한 번씩 병렬 인코딩
+                padded_keys = plan.padded_op_keys(gap_duration)
+                encoded_clips = {}
+                for padded_key in padded_keys:
                     temp_file = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
                     temp_clips.append(temp_file.name)
                     temp_file.close()
-                    
-                    # Get subtitle file for this clip
-                    subtitle_file = subtitle_files.get(clip_config['subtitle_type'])
-                    logger.info(f"Template {template_name}, clip {i+1}: subtitle_type={clip_config['subtitle_type']}, subtitle_file={subtitle_file}")
-                    if subtitle_file and not os.path.exists(subtitle_file):
-                        logger.error(f"Subtitle file does not exist: {subtitle_file}")
-                    
-                    # Store progress info for encoding
-                    self._current_clip_index = current_clip_index
-                    self._total_clips = total_clips
-                    
-                    # Check if this clip should use still frame mode
-                    video_mode = clip_config.get('video_mode', 'normal')
-                    
-                    # Check for pre_silence
-                    pre_silence = clip_config.get('pre_silence', 0.0)
-                    post_silence = clip_config.get('post_silence', 0.0)
-                    
-                    # Create temporary clip without pre_silence first
-                    temp_clip_no_silence = None
-                    if pre_silence > 0:
-                        temp_clip_no_silence = tempfile.NamedTemporaryFile(suffix='_no_silence.mp4', delete=False)
-                        temp_clip_no_silence.close()
-                        actual_output = temp_clip_no_silence.name
-                    else:
-                        actual_output = temp_clips[-1]
-                    
-                    # Encode the clip based on video mode
-                    if video_mode == 'still_frame':
-                        if not self._encode_still_frame_clip(media_path, actual_output,
-                                                           padded_start, duration,
-                                                           subtitle_file=subtitle_file):
-                            raise Exception(f"Failed to create still frame {clip_config['subtitle_mode']} clip")
-                    elif video_mode in ['still_frame_tts', 'still_frame_original', 'still_frame_kor_tts'] and clip_config.get('use_img_tts_generator'):
-                        # Use img_tts_generator for study clips
-                        if not self._encode_study_clip(media_path, actual_output,
-                                                      padded_start, duration,
-                                                      subtitle_data, clip_config):
-                            raise Exception(f"Failed to create study {clip_config['subtitle_mode']} clip")
-                    elif video_mode == 'slow_motion':
-                        # Slow motion video with speed adjustment
-                        speed = clip_config.get('speed', 0.7)
-                        if not self._encode_slow_motion_clip(media_path, actual_output,
-                                                           padded_start, duration,
-                                                           subtitle_file=subtitle_file,
-                                                           speed=speed):
-                            raise Exception(f"Failed to create slow motion {clip_config['subtitle_mode']} clip")
-                    else:
-                        # Pass subtitle_mode to encoding method
-                        self._current_subtitle_mode = clip_config.get('subtitle_mode')
-                        if not self._encode_clip(media_path, actual_output,
-                                               padded_start, duration,
-                                               subtitle_file=subtitle_file):
-                            raise Exception(f"Failed to create {clip_config['subtitle_mode']} clip")
-                    
-                    # Add pre_silence if needed
-                    if pre_silence > 0 and temp_clip_no_silence:
-                        # 쫼츠 여부 확인
-                        is_shorts = '_shorts' in self._current_template_name if hasattr(self, '_current_template_name') else False
-                        resolution = (1080, 1920) if is_shorts else (1920, 1080)
-                        
-                        # Create black video for pre_silence and concatenate
-                        cmd = [
-                            'ffmpeg', '-y',
-                            '-f', 'lavfi',
-                            '-i', f'color=black:s={resolution[0]}x{resolution[1]}:d={pre_silence}',
-                            '-f', 'lavfi', 
-                            '-i', f'anullsrc=channel_layout=stereo:sample_rate=44100:duration={pre_silence}',
-                            '-i', temp_clip_no_silence.name,
-                            '-filter_complex',
-                            '[0:v][2:v]concat=n=2:v=1:a=0[outv];[1:a][2:a]concat=n=2:v=0:a=1[outa]',
-                            '-map', '[outv]',
-                            '-map', '[outa]',
-                            '-c:v', TemplateStandards.STANDARD_VIDEO_CODEC,
-                            '-preset', TemplateStandards.STANDARD_VIDEO_PRESET,
-                            '-crf', str(TemplateStandards.STANDARD_VIDEO_CRF),
-                            '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
-                            '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
-                            '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
-                            '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
-                            '-movflags', '+faststart',
-                            temp_clips[-1]
-                        ]
-                        
-                        returncode, stdout, stderr = self._run_ffmpeg_with_timeout(cmd)
-                        if returncode != 0:
-                            logger.error(f"Failed to add pre_silence: {stderr}")
-                            raise Exception(f"Failed to add pre_silence to {clip_config['subtitle_mode']} clip")
-                        
-                        # Clean up temporary file
-                        os.unlink(temp_clip_no_silence.name)
+                    encoded_clips[padded_key] = temp_file.name
+                
+                workers = max(1, min(self.VARIANT_WORKERS, len(padded_keys)))
+                threads = TemplateStandards.get_thread_share(workers)
+                logger.info(f"Per-clip render: {len(padded_keys)} encodes for {total_clips} clips "
+                            f"({total_clips - len(padded_keys)} reused), {workers} workers x {threads} threads")
+                
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = []
+                    for index, (op_index, gap_after) in enumerate(padded_keys, 1):
+                        futures.append(pool.submit(with_job_context(
+                            self._render_plan_op, plan.ops[op_index].clip_config,
+                            encoded_clips[(op_index, gap_after)], media_path,
+                            padded_start, duration, subtitle_files, subtitle_data,
+                            gap_after, threads, index, len(padded_keys)
+                        )))
+                    # 모든 인코딩이 끝나야 병합 가능 - 첫 실패 예외를 그대로 전달
+                    for future in futures:
+                        future.result()
+                
+                # 병합 순서대로의 클립 목록 (같은 렌더 결과는 같은 파일을 참조)
+                sequence_clips = []
+                for ref in plan.sequence:
+                    actual_output = encoded_clips[(ref.op_index, plan.gap_after(ref.position, gap_duration))]
+                    sequence_clips.append(actual_output)
                     
                     # Save individual clip if requested
                     if save_individual_clips and clip_base_dir:
-                        folder_name = clip_config.get('folder_name', clip_config['subtitle_mode'])
-                        self._save_individual_clip(temp_clips[-1], clip_base_dir,
-                                                 folder_name, i + 1, clip_number)
-                    
-                    logger.info(f"Created {clip_config['subtitle_mode']} clip {i+1}/{clip_config['count']}")
+                        self._save_individual_clip(actual_output, clip_base_dir,
+                                                 ref.folder_name, ref.repeat_index, clip_number)
             
-            # Ensure output directory exists
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                # Ensure output directory exists
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
             
-            # Concatenate clips with gaps
-            gap_duration = template.get('gap_duration', 1.5)
-            logger.info(f"Using gap_duration from template '{template_name}': {gap_duration} seconds")
-            if not self._concatenate_clips(temp_clips, output_path, gap_duration):
-                raise Exception("Failed to concatenate clips")
+                # 갭은 이미 각 클립에 포함되어 있으므로 그대로 병합
+                logger.info(f"Using gap_duration from template '{template_name}': {gap_duration} seconds")
+                if not self._concatenate_clips(sequence_clips, output_path, gap_duration=0.0):
+                    raise Exception("Failed to concatenate clips")
             
             logger.info(f"Successfully created shadowing video: {output_path}")
+            if is_draft:
+                # final 렌더가 같은 자막/크롭을 사용하도록 결정 저장
+                if not stored_decisions:
+                    self._render_decisions['subtitles'] = self._read_subtitle_files(subtitle_files)
+                    self._render_decisions['quality'] = quality
+                    decision_store.save(decision_key, self._render_decisions)
+            else:
+                get_media_probe().record_output(output_path)
             
             # Log successful completion to DB
             if DB_AVAILABLE and job_id:
@@ -273,8 +381,11 @@ class TemplateVideoEncoder(VideoEncoder):
                             message=f"Successfully created video with {template_name}",
                             details={
                                 "output": str(output_path),
-                                "clips_count": len(temp_clips),
-                                "duration": duration
+                                "clips_count": total_clips,
+                                "render_ops": len(plan.ops),
+                                "encodes_saved": plan.encodes_saved,
+                                "duration": duration,
+                                "quality": quality
                             }
                         )
                 except Exception as e:
@@ -282,6 +393,9 @@ class TemplateVideoEncoder(VideoEncoder):
             
             return True
             
+        except JobCancelled:
+            # 취소된 작업은 실패 처리/대체 경로 없이 호출한 쪽으로 전달
+            raise
         except Exception as e:
             logger.error(f"Error creating video from template: {e}", exc_info=True)
             
@@ -304,14 +418,227 @@ class TemplateVideoEncoder(VideoEncoder):
             
         finally:
             # Clean up
+            self._render_decisions = {}
+            self._clip_lead_in = 0.0
+            self._clip_gap_after = 0.0
             for temp_clip in temp_clips:
                 if os.path.exists(temp_clip):
                     os.unlink(temp_clip)
             
-            # Clean up subtitle files (temporarily disabled for debugging)
-            # for subtitle_file in subtitle_files.values():
-            #     if subtitle_file and os.path.exists(subtitle_file):
-            #         os.unlink(subtitle_file)
+            # 자막 파일 참조 해제 (저장소가 만든 파일만 - 마지막 참조에서 삭제)
+            for subtitle_file in subtitle_files.values():
+                get_subtitle_store().release(subtitle_file)
+    
+    def _render_plan_op(self, clip_config: Dict, actual_output: str, media_path: str,
+                        padded_start: float, duration: float, subtitle_files: Dict[str, str],
+                        subtitle_data: Dict, gap_after: float, threads: int,
+                        index: int, total: int):
+        """실행 계획의 렌더 작업 하나를 인코딩 (워커 스레드에서 실행)
+
+        인코더 메서드가 인스턴스 상태(리드인/갭/자막 모드)를 읽으므로
+        작업마다 얕은 복사본을 사용한다. 복사본이 공유하는 것은 읽기 전용 설정(_quality,
+        템플릿)과 잠금으로 보호하는 렌더 결정 저장소(_render_decisions)뿐이다.
+        """
+        worker = copy.copy(self)
+        worker._render_decisions = self._render_decisions
+        worker._decisions_lock = self._decisions_lock
+        
+        # Get subtitle file for this clip
+        subtitle_file = subtitle_files.get(clip_config['subtitle_type'])
+        logger.info(f"Render op {index}/{total}: subtitle_type={clip_config['subtitle_type']}, subtitle_file={subtitle_file}")
+        if subtitle_file and not os.path.exists(subtitle_file):
+            logger.error(f"Subtitle file does not exist: {subtitle_file}")
+        
+        # Store progress info for encoding
+        worker._current_clip_index = index
+        worker._total_clips = total
+        worker._encode_threads = threads
+        
+        # Check if this clip should use still frame mode
+        video_mode = clip_config.get('video_mode', 'normal')
+        
+        # 리드인(pre_silence)과 다음 클립과의 갭은 클립 인코딩 그래프 안에서 생성
+        worker._clip_lead_in = clip_config.get('pre_silence', 0.0)
+        worker._clip_gap_after = gap_after
+        
+        # Encode the clip based on video mode
+        if video_mode == 'still_frame':
+            if not worker._encode_still_frame_clip(media_path, actual_output,
+                                                   padded_start, duration,
+                                                   subtitle_file=subtitle_file):
+                raise Exception(f"Failed to create still frame {clip_config['subtitle_mode']} clip")
+            if not worker._apply_clip_padding(actual_output):
+                raise Exception(f"Failed to pad still frame {clip_config['subtitle_mode']} clip")
+        elif video_mode in ['still_frame_tts', 'still_frame_original', 'still_frame_kor_tts'] and clip_config.get('use_img_tts_generator'):
+            # Use img_tts_generator for study clips
+            if not worker._encode_study_clip(media_path, actual_output,
+                                             padded_start, duration,
+                                             subtitle_data, clip_config):
+                raise Exception(f"Failed to create study {clip_config['subtitle_mode']} clip")
+            if not worker._apply_clip_padding(actual_output):
+                raise Exception(f"Failed to pad study {clip_config['subtitle_mode']} clip")
+        elif video_mode == 'slow_motion':
+            # Slow motion video with speed adjustment
+            speed = clip_config.get('speed', 0.7)
+            if not worker._encode_slow_motion_clip(media_path, actual_output,
+                                                   padded_start, duration,
+                                                   subtitle_file=subtitle_file,
+                                                   speed=speed):
+                raise Exception(f"Failed to create slow motion {clip_config['subtitle_mode']} clip")
+        else:
+            # Pass subtitle_mode to encoding method
+            worker._current_subtitle_mode = clip_config.get('subtitle_mode')
+            if not worker._encode_clip(media_path, actual_output,
+                                       padded_start, duration,
+                                       subtitle_file=subtitle_file):
+                raise Exception(f"Failed to create {clip_config['subtitle_mode']} clip")
+        
+        logger.info(f"Created {clip_config['subtitle_mode']} render op {index}/{total}")
+    
+    @staticmethod
+    def _get_source_identity(media_path: str, start_time: float = None, duration: float = None) -> list:
+        """원본 미디어 식별 정보 (경로, 크기, mtime, 구간)"""
+        real_path = os.path.realpath(media_path)
+        try:
+            stat = os.stat(real_path)
+            return [real_path, stat.st_size, stat.st_mtime_ns, start_time, duration]
+        except OSError:
+            return [real_path, None, None, start_time, duration]
+    
+    def _get_variant_key(self, template_name: str, clip_config: Dict, source_identity: list,
+                         subtitle_files: Dict[str, str], subtitle_data: Dict) -> str:
+        """변형(op) 하나의 렌더 입력 해시
+        
+        자막 텍스트는 해당 변형이 사용하는 자막 파일 내용으로만 반영하므로
+        한국어 자막만 고치면 자막 없는 변형의 키는 바뀌지 않는다.
+        """
+        subtitle_content = None
+        subtitle_file = subtitle_files.get(clip_config.get('subtitle_type'))
+        if subtitle_file:
+            try:
+                subtitle_content = get_subtitle_store().digest(subtitle_file)
+            except OSError:
+                subtitle_content = subtitle_file
+        
+        if clip_config.get('video_mode', 'normal') in self.SINGLE_PASS_VIDEO_MODES + ('still_frame',):
+            # 텍스트는 자막 파일로만 들어감 - 타이틀/화면 옵션만 포함
+            options = {k: v for k, v in subtitle_data.items() if k not in self.SUBTITLE_TEXT_KEYS}
+        else:
+            # 학습 클립 생성기는 텍스트를 직접 사용
+            options = {k: v for k, v in subtitle_data.items() if k != 'ass_file'}
+        
+        payload = json.dumps({
+            'template': template_name,
+            'clip': clip_config,
+            'label': self.subtitle_mode_labels.get(clip_config.get('subtitle_mode')),
+            'source': source_identity,
+            'subtitle': subtitle_content,
+            'options': options,
+            'quality': self._quality,
+            'encoder': get_encoder_signature(),
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+    
+    def _render_variants(self, plan: ExecutionPlan, variant_dir: Path, variant_keys: List[str],
+                         media_path: str, padded_start: float, duration: float,
+                         subtitle_files: Dict[str, str], subtitle_data: Dict, output_path: str,
+                         gap_duration: float, can_single_pass: bool) -> Tuple[List[str], bool]:
+        """변형별 산출물을 variant_dir에 유지하며 없는 변형만 렌더링
+        
+        모든 변형을 새로 렌더링해야 하면 단일 패스로 최종 출력과 변형 산출물을 함께 만든다.
+        
+        Returns:
+            (op별 변형 클립 경로 - 리드인 포함/갭 제외, 최종 출력까지 렌더링했는지)
+        """
+        variant_dir.mkdir(parents=True, exist_ok=True)
+        variant_clips = [str(variant_dir / f"{key}.mp4") for key in variant_keys]
+        missing = [i for i, path in enumerate(variant_clips) if not os.path.exists(path)]
+        logger.info(f"Variant render: {len(missing)} of {len(plan.ops)} variants to encode "
+                    f"({len(plan.ops) - len(missing)} reused)")
+        
+        sequence_keys = [variant_keys[ref.op_index] for ref in plan.sequence]
+        merged = False
+        if not missing:
+            # 변형 구성과 갭이 이전 렌더와 같으면 이전 병합 결과 재사용 (다시 병합하지 않음)
+            merged = self._reuse_variant_merge(variant_dir, sequence_keys, gap_duration, output_path)
+        temp_outputs = {i: f"{variant_clips[i]}.{os.getpid()}.tmp.mp4" for i in missing}
+        try:
+            if missing and len(missing) == len(plan.ops) and can_single_pass:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                merged = self._render_single_pass(plan, media_path, subtitle_files, output_path,
+                                                  padded_start, duration, gap_duration,
+                                                  [temp_outputs[i] for i in range(len(plan.ops))])
+                if not merged:
+                    logger.warning("Single-pass variant render failed, falling back to per-variant encoding")
+            
+            if missing and not merged:
+                workers = max(1, min(self.VARIANT_WORKERS, len(missing)))
+                threads = TemplateStandards.get_thread_share(workers)
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(with_job_context(self._render_plan_op, plan.ops[op_index].clip_config,
+                                                     temp_outputs[op_index], media_path, padded_start, duration,
+                                                     subtitle_files, subtitle_data, 0.0, threads, index,
+                                                     len(missing)))
+                        for index, op_index in enumerate(missing, 1)
+                    ]
+                    for future in futures:
+                        future.result()
+            
+            for op_index in missing:
+                os.replace(temp_outputs[op_index], variant_clips[op_index])
+        finally:
+            for temp_output in temp_outputs.values():
+                if os.path.exists(temp_output):
+                    os.unlink(temp_output)
+        
+        # 이번 렌더에 쓰이지 않는 이전 변형 정리 + 매니페스트 기록
+        current = set(Path(path).name for path in variant_clips)
+        for stale in variant_dir.glob("*.mp4"):
+            if stale.name not in current:
+                stale.unlink()
+        manifest = {
+            'template': plan.template_name,
+            'output': str(output_path),
+            'sequence': sequence_keys,
+            'gap_duration': gap_duration,
+            'variants': [
+                {
+                    'key': variant_keys[op.index],
+                    'file': Path(variant_clips[op.index]).name,
+                    'subtitle_mode': op.clip_config.get('subtitle_mode'),
+                    'folders': sorted(set(plan.sequence[position].folder_name for position in op.refs)),
+                    'reused': op.index not in missing,
+                }
+                for op in plan.ops
+            ],
+        }
+        with open(variant_dir / VARIANT_MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        
+        return variant_clips, merged
+    
+    @staticmethod
+    def _reuse_variant_merge(variant_dir: Path, sequence_keys: List[str], gap_duration: float,
+                             output_path: str) -> bool:
+        """이전 매니페스트의 병합 출력이 같은 변형 순서/갭이면 output_path로 복제"""
+        try:
+            with open(variant_dir / VARIANT_MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        previous_output = manifest.get('output')
+        if (manifest.get('sequence') != sequence_keys or manifest.get('gap_duration') != gap_duration
+                or not previous_output or not os.path.exists(previous_output)):
+            return False
+        if os.path.abspath(previous_output) != os.path.abspath(output_path):
+            try:
+                clone_file(Path(previous_output), Path(output_path))
+            except OSError as e:
+                logger.warning(f"Variant merge reuse failed, merging again: {e}")
+                return False
+        logger.info(f"Variant sequence unchanged, reusing merged output: {previous_output}")
+        return True
     
     def _prepare_subtitle_files(self, subtitle_data: Dict, template_name: str, clip_duration: float = None, gap_duration: float = 0.0) -> Dict[str, str]:
         """템플릿에 필요한 자막 파일들을 준비 - 새로운 파이프라인 사용"""
@@ -371,28 +698,22 @@ class TemplateVideoEncoder(VideoEncoder):
         
         # Gap duration을 포함한 총 클립 길이 계산
         total_clip_duration = clip_duration + gap_duration if clip_duration else None
+        store = get_subtitle_store()
         
         # 필요한 자막 파일들 생성 (파이프라인 사용)
         for subtitle_type in needed_types:
             if subtitle_type in type_mapping:
                 variant_type = type_mapping[subtitle_type]
                 
-                # 임시 파일 생성
-                temp_file = tempfile.NamedTemporaryFile(suffix=f'_{subtitle_type}.ass', delete=False)
-                temp_file.close()
+                # 같은 입력의 변형은 한 번만 생성하고 같은 내용의 파일은 공유
+                generation_key = store.make_generation_key(subtitle_data, variant_type.value,
+                                                           total_clip_duration)
+                content = store.get_or_generate(
+                    generation_key,
+                    lambda: pipeline.generate_ass_content(variant_type, total_clip_duration))
+                subtitle_files[subtitle_type] = store.acquire(content, subtitle_type)
                 
-                # 파이프라인으로 자막 저장
-                pipeline.save_variant_to_file(variant_type, temp_file.name, total_clip_duration)
-                subtitle_files[subtitle_type] = temp_file.name
-                
-                # 디버깅: 생성된 자막 파일 내용 확인
-                with open(temp_file.name, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    logger.info(f"Generated {subtitle_type} subtitle file: {temp_file.name}")
-                    logger.info(f"File size: {len(content)} bytes")
-                    logger.info(f"First 200 chars: {content[:200]}")
-                
-                logger.debug(f"Generated {subtitle_type} subtitle using pipeline")
+                logger.debug(f"Prepared {subtitle_type} subtitle: {subtitle_files[subtitle_type]}")
         
         # 기존 방식으로 fallback (pipeline에서 지원하지 않는 타입)
         if len(subtitle_files) < len(needed_types):
@@ -405,6 +726,22 @@ class TemplateVideoEncoder(VideoEncoder):
         
         return subtitle_files
     
+    @staticmethod
+    def _read_subtitle_files(subtitle_files: Dict[str, str]) -> Dict[str, str]:
+        """자막 파일 내용 (편집 결정 저장용)"""
+        contents = {}
+        for subtitle_type, subtitle_file in subtitle_files.items():
+            if subtitle_file and os.path.exists(subtitle_file):
+                contents[subtitle_type] = get_subtitle_store().read(subtitle_file)
+        return contents
+    
+    @staticmethod
+    def _restore_subtitle_files(contents: Dict[str, str]) -> Dict[str, str]:
+        """저장된 자막 내용을 자막 저장소 파일로 복원"""
+        store = get_subtitle_store()
+        return {subtitle_type: store.acquire(content, subtitle_type)
+                for subtitle_type, content in contents.items()}
+    
     def _save_individual_clip(self, clip_path: str, base_dir: Path, 
                             clip_type: str, index: int, clip_number: str):
         """개별 클립 저장"""
@@ -417,6 +754,11 @@ class TemplateVideoEncoder(VideoEncoder):
         
         dest_file = sub_dir / f"clip_{clip_number}_{index}.mp4"
         shutil.copy2(clip_path, str(dest_file))
+        
+        # 같은 렌더 결과의 복사본은 원본 메타데이터를 재사용 (DB 기록 시 다시 프로브하지 않음)
+        probe = get_media_probe()
+        probe.record_output(clip_path)
+        probe.record_copy(clip_path, str(dest_file))
         logger.debug(f"Saved: {dest_file.relative_to(base_dir)}")
         
         # Save to DB if available
@@ -447,7 +789,7 @@ class TemplateVideoEncoder(VideoEncoder):
                 logger.warning(f"Failed to save individual clip to DB: {e}")
     
     def _concatenate_clips(self, clips: List[str], output_path: str, gap_duration: float = 1.5) -> bool:
-        """프리즈 프레임 갭을 사용하여 클립들을 병합 - 현재 템플릿의 gap_duration 사용"""
+        """클립 병합 - gap_duration > 0이면 필터 그래프 안에서 프리즈 프레임 갭 생성"""
         if not clips:
             logger.error("No clips to concatenate")
             return False
@@ -458,86 +800,227 @@ class TemplateVideoEncoder(VideoEncoder):
             shutil.copy2(clips[0], output_path)
             return True
         
-        logger.info(f"Starting concatenation of {len(clips)} clips with {gap_duration}s gaps")
-        
-        # 각 클립의 마지막 프레임으로 프리즈 프레임 생성
-        clips_with_gaps = []
-        temp_gaps = []
-        
-        # 쇼츠 여부 확인
-        is_shorts = '_shorts' in self._current_template_name if hasattr(self, '_current_template_name') else False
-        
-        for i, clip in enumerate(clips):
-            clips_with_gaps.append(clip)
-            
-            # 마지막 클립이 아니면 갭 추가
-            if i < len(clips) - 1 and gap_duration > 0:
-                # 클립의 길이 구하기
-                probe_cmd = [
-                    'ffprobe', '-v', 'error',
-                    '-show_entries', 'format=duration',
-                    '-of', 'default=noprint_wrappers=1:nokey=1',
-                    clip
-                ]
-                result = subprocess.run(probe_cmd, capture_output=True, text=True)
-                
-                try:
-                    clip_duration = float(result.stdout.strip())
-                except ValueError:
-                    logger.warning(f"Could not get duration for clip {i+1}, using default")
-                    clip_duration = 5.0
-                
-                # 마지막 프레임 시간 (끝에서 0.1초 전)
-                last_frame_time = max(0, clip_duration - 0.1)
-                
-                # 프리즈 프레임 생성
-                temp_gap = tempfile.NamedTemporaryFile(suffix='_gap.mp4', delete=False)
-                temp_gap.close()
-                temp_gaps.append(temp_gap.name)
-                
-                # 쇼츠인 경우 해상도 설정
-                if is_shorts:
-                    freeze_frame = TemplateStandards.create_freeze_frame(
-                        clip, last_frame_time, gap_duration, temp_gap.name
-                    )
-                    # 쇼츠 해상도로 변경
-                    temp_gap_shorts = tempfile.NamedTemporaryFile(suffix='_gap_shorts.mp4', delete=False)
-                    temp_gap_shorts.close()
-                    
-                    resize_cmd = [
-                        'ffmpeg', '-y',
-                        '-i', temp_gap.name,
-                        '-vf', 'scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2:black',
-                        '-c:a', 'copy',
-                        temp_gap_shorts.name
-                    ]
-                    
-                    result = subprocess.run(resize_cmd, capture_output=True, text=True)
-                    if result.returncode == 0:
-                        os.unlink(temp_gap.name)
-                        temp_gaps[-1] = temp_gap_shorts.name
-                        clips_with_gaps.append(temp_gap_shorts.name)
-                    else:
-                        logger.warning(f"Failed to resize gap for shorts: {result.stderr}")
-                        clips_with_gaps.append(temp_gap.name)
-                else:
-                    freeze_frame = TemplateStandards.create_freeze_frame(
-                        clip, last_frame_time, gap_duration, temp_gap.name
-                    )
-                    clips_with_gaps.append(freeze_frame)
-                
-                logger.info(f"Created {gap_duration}s gap after clip {i+1}")
-        
-        # 병합 수행
-        result = TemplateStandards.merge_clips(clips_with_gaps, output_path, mode='reencode')
+        if gap_duration <= 0:
+            return TemplateStandards.merge_clips(clips, output_path, mode='auto', quality=self._quality)
         
-        # 임시 갭 파일들 정리
-        for temp_gap in temp_gaps:
-            if os.path.exists(temp_gap):
-                os.unlink(temp_gap)
+        logger.info(f"Starting concatenation of {len(clips)} clips with {gap_duration}s in-graph gaps")
+        return TemplateStandards.concat_with_gaps(clips, output_path, gap_duration,
+                                                  resolution=self._get_output_resolution(),
+                                                  quality=self._quality)
+    
+    def _get_output_resolution(self) -> Tuple[int, int]:
+        """현재 템플릿의 출력 해상도"""
+        is_shorts = '_shorts' in getattr(self, '_current_template_name', '')
+        if is_shorts:
+            resolution = (1080, 1920)
+        else:
+            resolution = (TemplateStandards.STANDARD_VIDEO_WIDTH, TemplateStandards.STANDARD_VIDEO_HEIGHT)
+        if self._quality == TemplateStandards.QUALITY_DRAFT:
+            return TemplateStandards.get_draft_resolution(*resolution)
+        return resolution
+    
+    def _apply_clip_padding(self, clip_path: str) -> bool:
+        """외부 생성기로 만든 클립에 리드인/갭 추가 (필터 그래프 1회 인코딩)"""
+        lead_in = getattr(self, '_clip_lead_in', 0.0)
+        gap_after = getattr(self, '_clip_gap_after', 0.0)
+        if lead_in <= 0 and gap_after <= 0:
+            return True
         
-        return result
+        padded = tempfile.NamedTemporaryFile(suffix='_padded.mp4', delete=False)
+        padded.close()
+        if not TemplateStandards.concat_with_gaps([clip_path], padded.name, gap_after,
+                                                  resolution=self._get_output_resolution(),
+                                                  gap_after_last=True, lead_ins=[lead_in],
+                                                  quality=self._quality):
+            os.unlink(padded.name)
+            return False
+        os.replace(padded.name, clip_path)
+        return True
     
+    def _can_render_single_pass(self, template: Dict, start_time: float = None,
+                                duration: float = None) -> bool:
+        """템플릿 전체를 하나의 필터 그래프로 렌더링할 수 있는지 확인"""
+        if start_time is None or duration is None:
+            return False
+
+        for clip_config in template['clips']:
+            # 정지 프레임/스터디 클립은 별도 생성기를 사용하므로 기존 방식으로 처리
+            if clip_config.get('video_mode', 'normal') not in self.SINGLE_PASS_VIDEO_MODES:
+                return False
+
+        return True
+
+    def _build_branch_video_filters(self, clip_config: Dict, media_path: str,
+                                    start_time: float, subtitle_file: str = None) -> List[str]:
+        """단일 패스 그래프의 변형(branch)별 비디오 필터 체인 생성"""
+        current_template = getattr(self, '_current_template_name', '')
+        is_shorts = '_shorts' in current_template
+        video_mode = clip_config.get('video_mode', 'normal')
+
+        filters = []
+
+        # 해상도 통일 (concat 필터는 모든 입력의 해상도가 같아야 함)
+        if is_shorts:
+            filters.append(self._get_shorts_crop_filter(media_path, start_time, 1080, 1920))
+        else:
+            filters.append(
+                f"scale=w={TemplateStandards.STANDARD_VIDEO_WIDTH}:h={TemplateStandards.STANDARD_VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
+                f"pad={TemplateStandards.STANDARD_VIDEO_WIDTH}:{TemplateStandards.STANDARD_VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2:black"
+            )
+        filters.append("setsar=1")
+
+        if video_mode == 'slow_motion':
+            speed = clip_config.get('speed', 0.7)
+            filters.append(f"setpts={1/speed}*PTS")
+
+        filters.append(f"fps={TemplateStandards.STANDARD_FRAMERATE}")
+
+        if subtitle_file and os.path.exists(subtitle_file):
+            if is_shorts:
+                width, height = 1080, 1920
+            else:
+                width, height = TemplateStandards.STANDARD_VIDEO_WIDTH, TemplateStandards.STANDARD_VIDEO_HEIGHT
+            filters = self._add_subtitle_filter(filters, subtitle_file, width, height)
+
+        # 자막 모드 레이블은 일반 모드 클립에만 표시 (기존 _encode_clip_with_title과 동일)
+        if video_mode == 'normal':
+            mode_text = self._get_mode_label_filter(clip_config.get('subtitle_mode'))
+            if mode_text:
+                filters.append(mode_text)
+
+        title_filter = self._get_title_filter()
+        if title_filter:
+            filters.append(title_filter)
+
+        # 미리보기는 자막/타이틀을 그린 뒤 축소 (-vf가 아니므로 여기서 처리)
+        if self._quality == TemplateStandards.QUALITY_DRAFT:
+            filters.append(TemplateStandards.get_draft_scale_filter())
+
+        filters.append(f"format={TemplateStandards.STANDARD_PIX_FMT}")
+        return filters
+
+    def _build_branch_audio_filters(self, clip_config: Dict) -> List[str]:
+        """단일 패스 그래프의 변형(branch)별 오디오 필터 체인 생성"""
+        filters = []
+
+        if clip_config.get('video_mode', 'normal') == 'slow_motion':
+            filters.append(f"atempo={clip_config.get('speed', 0.7)}")
+
+        # concat 필터를 위해 모든 branch의 오디오 포맷 통일
+        filters.append(f"aresample={TemplateStandards.OUTPUT_SAMPLE_RATE}")
+        filters.append("aformat=sample_fmts=fltp:channel_layouts=stereo")
+        return filters
+
+    def _render_single_pass(self, plan: ExecutionPlan, media_path: str,
+                            subtitle_files: Dict[str, str], output_path: str,
+                            start_time: float, duration: float, gap_duration: float,
+                            individual_outputs: List[str] = None) -> bool:
+        """템플릿 전체를 하나의 FFmpeg 필터 그래프로 렌더링
+
+        소스 구간을 한 번만 디코딩한 뒤 split/asplit으로 고유 렌더 작업(op)별 branch를 만들고,
+        branch마다 자막/타이틀을 입힌 후 참조 수만큼 다시 분기하여 concat으로 이어 붙여
+        한 번만 인코딩한다. 갭은 tpad(마지막 프레임 복제)와 apad(무음)로 그래프 안에서 생성한다.
+
+        Args:
+            plan: 템플릿 실행 계획
+            individual_outputs: op별 개별 클립 출력 경로 (갭 제외). None이면 생성하지 않음
+        """
+        if not plan.ops:
+            logger.error("Template has no clips to render")
+            return False
+
+        if individual_outputs is not None and len(individual_outputs) != len(plan.ops):
+            logger.error("individual_outputs length does not match render op count")
+            return False
+
+        n_ops = len(plan.ops)
+        n_refs = plan.total_clips
+        graph = [
+            "[0:v]split={}{}".format(n_ops, ''.join(f"[sv{i}]" for i in range(n_ops))),
+            "[0:a]asplit={}{}".format(n_ops, ''.join(f"[sa{i}]" for i in range(n_ops))),
+        ]
+        ref_labels = {}
+        individual_maps = []
+
+        for op in plan.ops:
+            i = op.index
+            clip_config = op.clip_config
+            subtitle_file = subtitle_files.get(clip_config['subtitle_type'])
+            video_filters = self._build_branch_video_filters(clip_config, media_path, start_time, subtitle_file)
+            audio_filters = self._build_branch_audio_filters(clip_config)
+
+            # 리드인 (검은 화면 + 무음) - 개별 클립에도 포함
+            lead_v, lead_a = TemplateStandards.get_pad_filters(lead_in=clip_config.get('pre_silence', 0.0))
+            video_filters += lead_v
+            audio_filters += lead_a
+
+            graph.append(f"[sv{i}]{','.join(video_filters)}[bv{i}]")
+            graph.append(f"[sa{i}]{','.join(audio_filters)}[ba{i}]")
+
+            # 참조 수(+ 개별 클립 출력)만큼 분기
+            v_outputs = [f"rv{i}_{position}" for position in op.refs]
+            a_outputs = [f"ra{i}_{position}" for position in op.refs]
+            if individual_outputs is not None:
+                v_outputs.append(f"iv{i}")
+                a_outputs.append(f"ia{i}")
+                individual_maps.append((f"[iv{i}]", f"[ia{i}]"))
+
+            if len(v_outputs) > 1:
+                graph.append(f"[bv{i}]split={len(v_outputs)}{''.join(f'[{label}]' for label in v_outputs)}")
+                graph.append(f"[ba{i}]asplit={len(a_outputs)}{''.join(f'[{label}]' for label in a_outputs)}")
+            else:
+                v_outputs, a_outputs = [f"bv{i}"], [f"ba{i}"]
+
+            for position, v_label, a_label in zip(op.refs, v_outputs, a_outputs):
+                ref_labels[position] = (v_label, a_label)
+
+        concat_inputs = []
+        for ref in plan.sequence:
+            v_label, a_label = ref_labels[ref.position]
+
+            # 마지막 클립을 제외하고 갭 추가 (마지막 프레임 정지 + 무음)
+            gap_after = plan.gap_after(ref.position, gap_duration)
+            if gap_after > 0:
+                gap_v, gap_a = TemplateStandards.get_pad_filters(gap_after=gap_after)
+                graph.append(f"[{v_label}]{','.join(gap_v)}[gv{ref.position}]")
+                graph.append(f"[{a_label}]{','.join(gap_a)}[ga{ref.position}]")
+                v_label, a_label = f"gv{ref.position}", f"ga{ref.position}"
+
+            concat_inputs.append(f"[{v_label}][{a_label}]")
+
+        graph.append(f"{''.join(concat_inputs)}concat=n={n_refs}:v=1:a=1[outv][outa]")
+        filter_complex = ';'.join(graph)
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-ss', str(start_time),
+            '-t', str(duration),
+            '-i', media_path,
+            '-filter_complex', filter_complex,
+            '-map', '[outv]', '-map', '[outa]',
+        ]
+        # 출력마다 -threads 지정 (run_ffmpeg가 모든 출력의 값을 슬롯 수로 바꾸도록)
+        threads = self._encode_threads or TemplateStandards.FFMPEG_THREAD_BUDGET
+        cmd.extend(TemplateStandards.get_standard_encoding_options(threads=threads))
+        cmd.append(output_path)
+
+        for (v_map, a_map), individual_path in zip(individual_maps, individual_outputs or []):
+            cmd.extend(['-map', v_map, '-map', a_map])
+            cmd.extend(TemplateStandards.get_standard_encoding_options(threads=threads))
+            cmd.append(individual_path)
+
+        logger.info(f"Single-pass render: {n_refs} clips from {n_ops} render ops, gap={gap_duration}s")
+        logger.debug(f"Single-pass filter graph: {filter_complex}")
+
+        # 변형 수에 비례하여 타임아웃 확장
+        returncode, stdout, stderr = self._run_ffmpeg_with_timeout(cmd, timeout=300 * n_ops)
+
+        if returncode != 0:
+            logger.error(f"Single-pass FFmpeg error: {stderr}")
+            return False
+
+        return True
+
     def _encode_still_frame_clip(self, media_path: str, output_path: str,
                                start_time: float = None, duration: float = None,
                                subtitle_file: str = None) -> bool:
@@ -567,6 +1050,8 @@ class TemplateVideoEncoder(VideoEncoder):
             
             return success
             
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error(f"Error creating still frame clip: {e}", exc_info=True)
             return False
@@ -596,22 +1081,9 @@ class TemplateVideoEncoder(VideoEncoder):
                                                start_time, duration, 
                                                subtitle_file)
     
-    def _encode_clip_with_crop(self, input_path: str, output_path: str,
-                             start_time: float = None, duration: float = None,
-                             subtitle_file: str = None, 
-                             width: int = 1080, height: int = 1920) -> bool:
-        """크롭을 적용한 클립 인코딩 (쇼츠용)"""
-        
-        cmd = ['ffmpeg', '-y']
-        
-        if start_time is not None:
-            cmd.extend(['-ss', str(start_time)])
-        
-        cmd.extend(['-i', input_path])
-        
-        if duration is not None:
-            cmd.extend(['-t', str(duration)])
-        
+    def _get_shorts_crop_filter(self, input_path: str, start_time: float = None,
+                               width: int = 1080, height: int = 1920) -> str:
+        """쇼츠 템플릿별 크롭/스케일 필터 생성"""
         # 템플릿 이름에 따라 다른 크롭 방식 적용
         current_template = getattr(self, '_current_template_name', '')
         
@@ -638,7 +1110,7 @@ class TemplateVideoEncoder(VideoEncoder):
                 video_filter = f"crop='iw*0.8:ih:iw*0.1:0',scale={width}:-1,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"
             elif aspect_ratio == 'face' and CV2_AVAILABLE:
                 # 얼굴 인식 기반 크롭
-                face_crop = self._get_face_crop_params(input_path, start_time)
+                face_crop = self._get_decided_face_crop(input_path, start_time)
                 if face_crop:
                     x, y, w, h = face_crop
                     # 얼굴 영역을 중심으로 9:16 비율로 크롭
@@ -662,28 +1134,52 @@ class TemplateVideoEncoder(VideoEncoder):
             # 기본값: 원본 100% 정사각형 크롭
             video_filter = f"crop='min(iw,ih):min(iw,ih)',scale=1080:1080,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"
         
+        return video_filter
+    
+    @staticmethod
+    def _escape_filter_path(file_path: str) -> str:
+        """FFmpeg 필터 인자용 파일 경로 이스케이핑"""
+        # FFmpeg ass 필터를 위한 올바른 이스케이핑
+        abs_path = os.path.abspath(file_path)
+        # Windows 호환을 위해 백슬래시를 슬래시로 변환
+        escaped = abs_path.replace('\\', '/')
+        # FFmpeg ass 필터를 위한 특수 문자 이스케이핑
+        escaped = escaped.replace(':', '\\:').replace('[', '\\[').replace(']', '\\]')
+        escaped = escaped.replace(',', '\\,').replace("'", "\\'").replace(' ', '\\ ')
+        return escaped
+    
+    def _add_subtitle_filter(self, filters: List[str], subtitle_file: str, width: int, height: int) -> List[str]:
+        """자막 필터 추가 - 정적 자막은 미리 래스터화한 이미지를 overlay, 아니면 libass(ass 필터)"""
+        overlay = get_subtitle_overlay_cache().get_overlay(subtitle_file, width, height)
+        if overlay is None:
+            return filters + [f"ass={self._escape_filter_path(subtitle_file)}"]
+        overlay_path, end_time = overlay
+        # 그래프 안에서 레이블이 겹치지 않도록 호출마다 번호 부여
+        logger.info(f"Using pre-rasterized subtitle overlay: {overlay_path}")
+        return [overlay_filter_chain(filters, overlay_path, f"sub{next(_overlay_labels)}", end_time)]
+    
+    def _encode_clip_with_crop(self, input_path: str, output_path: str,
+                             start_time: float = None, duration: float = None,
+                             subtitle_file: str = None, 
+                             width: int = 1080, height: int = 1920) -> bool:
+        """크롭을 적용한 클립 인코딩 (쇼츠용)"""
+        
+        cmd = ['ffmpeg', '-y']
+        
+        if start_time is not None:
+            cmd.extend(['-ss', str(start_time)])
+        
+        # -t를 입력 옵션으로 지정해야 그래프에서 추가하는 갭이 잘리지 않음
+        if duration is not None:
+            cmd.extend(['-t', str(duration)])
+        
+        cmd.extend(['-i', input_path])
+        
+        video_filter = self._get_shorts_crop_filter(input_path, start_time, width, height)
+        
         if subtitle_file and os.path.exists(subtitle_file):
-            # FFmpeg ass 필터를 위한 올바른 이스케이핑
-            abs_path = os.path.abspath(subtitle_file)
-            # Windows 호환을 위해 백슬래시를 슬래시로 변환
-            subtitle_path = abs_path.replace('\\', '/')
-            # FFmpeg ass 필터를 위한 특수 문자 이스케이핑
-            subtitle_path = subtitle_path.replace(':', '\\:').replace('[', '\\[').replace(']', '\\]')
-            subtitle_path = subtitle_path.replace(',', '\\,').replace("'", "\\'").replace(' ', '\\ ')
-            video_filter += f",ass={subtitle_path}"
-            logger.info(f"Adding ASS subtitle filter for shorts: ass={subtitle_path}")
-            
-            # 디버깅: ASS 파일 내용 확인
-            with open(subtitle_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                logger.info(f"ASS file content length: {len(content)} bytes")
-                if 'Dialogue:' in content:
-                    dialogue_lines = [line for line in content.split('\n') if line.startswith('Dialogue:')]
-                    logger.info(f"Found {len(dialogue_lines)} dialogue lines in ASS file")
-                    if dialogue_lines:
-                        logger.info(f"First dialogue: {dialogue_lines[0]}")
-                else:
-                    logger.warning("No 'Dialogue:' lines found in ASS file!")
+            video_filter = ','.join(self._add_subtitle_filter([video_filter], subtitle_file, width, height))
+            logger.info(f"Adding subtitle filter for shorts: {subtitle_file}")
         else:
             logger.warning(f"Subtitle file not found or not provided: {subtitle_file}")
         
@@ -692,24 +1188,18 @@ class TemplateVideoEncoder(VideoEncoder):
         if title_filter:
             video_filter += f",{title_filter}"
         
+        # 리드인/갭 (그래프 내 생성)
+        pad_v, pad_a = self._get_clip_pad_filters()
+        if pad_v:
+            video_filter += "," + ",".join(pad_v)
+        
         cmd.extend(['-vf', video_filter])
+        if pad_a:
+            cmd.extend(['-af', ','.join(pad_a)])
         
-        # 인코딩 설정 (일반 인코딩과 동일하게 통일)
-        cmd.extend([
-            '-c:v', TemplateStandards.STANDARD_VIDEO_CODEC,
-            '-preset', TemplateStandards.STANDARD_VIDEO_PRESET,
-            '-crf', str(TemplateStandards.STANDARD_VIDEO_CRF),
-            '-profile:v', TemplateStandards.STANDARD_VIDEO_PROFILE,
-            '-level', TemplateStandards.STANDARD_VIDEO_LEVEL,
-            '-pix_fmt', TemplateStandards.STANDARD_PIX_FMT,
-            '-r', str(TemplateStandards.STANDARD_FRAMERATE),
-            '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
-            '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
-            '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
-            '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
-            '-movflags', '+faststart',
-            output_path
-        ])
+        # 인코딩 설정 (병합 계약 - stream copy 병합 가능)
+        cmd.extend(TemplateStandards.get_standard_encoding_options(threads=self._encode_threads))
+        cmd.append(output_path)
         
         logger.info(f"Encoding clip with command: {' '.join(cmd[:10])}...")
         
@@ -738,13 +1228,13 @@ class TemplateVideoEncoder(VideoEncoder):
             # 스터디 모드에 따른 설정
             if 'preview' in clip_config.get('subtitle_mode', ''):
                 # 미리보기: 시작 부분 프레임
-                frame_time = start_time + 0.5 if start_time else 0.5
+                frame_time = start_time + 0.5 if start_time is not None else 0.5
             elif 'review' in clip_config.get('subtitle_mode', ''):
                 # 복습: 중간 부분 프레임
-                frame_time = start_time + (duration / 2) if start_time and duration else 2.5
+                frame_time = start_time + (duration / 2) if start_time is not None and duration else 2.5
             else:
                 # 기본: 중간 프레임
-                frame_time = start_time + (duration / 2) if start_time and duration else 2.5
+                frame_time = start_time + (duration / 2) if start_time is not None and duration else 2.5
             
             # TTS 언어 설정
             tts_language = 'english'  # 기본값
@@ -757,7 +1247,7 @@ class TemplateVideoEncoder(VideoEncoder):
                 output_path=output_path,
                 frame_time=frame_time,
                 start_time=start_time,
-                end_time=start_time + duration if start_time and duration else None,
+                end_time=start_time + duration if start_time is not None and duration else None,
                 text_eng=subtitle_data.get('text_eng', ''),
                 text_kor=subtitle_data.get('text_kor', ''),
                 use_original_audio=use_original_audio,
@@ -767,6 +1257,8 @@ class TemplateVideoEncoder(VideoEncoder):
             
             return success
             
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error(f"Error creating study clip: {e}", exc_info=True)
             return False
@@ -872,6 +1364,29 @@ class TemplateVideoEncoder(VideoEncoder):
         
         return ",".join(filters)
     
+    def _get_mode_label_filter(self, subtitle_mode: str) -> str:
+        """자막 모드 레이블 drawtext 필터 생성 (일반 템플릿 1, 2, 3 전용)"""
+        current_template = getattr(self, '_current_template_name', '')
+
+        # 표시할 레이블 가져오기
+        mode_label = self.subtitle_mode_labels.get(subtitle_mode or '', '')
+
+        # 레이블이 있고, 일반 템플릿인 경우에만 표시
+        if not mode_label or '_shorts' in current_template:
+            return ""
+        if not ('template_1' in current_template or 'template_2' in current_template or 'template_3' in current_template):
+            return ""
+
+        # 폰트 파일 경로
+        font_file = "/home/kang/.fonts/TmonMonsori.ttf"
+        if not os.path.exists(font_file):
+            font_file = "NanumGothic"  # 폴백 폰트
+
+        # 자막 모드 텍스트 추가 (좌측 상단, 작은 골드색 폰트)
+        # 해상도에 따라 폰트 크기 조정 (FHD 기준 40, 비율에 따라 조정)
+        logger.info(f"Adding subtitle mode indicator '{mode_label}' for {current_template}")
+        return "drawtext=text='{}':fontfile={}:fontsize='40*min(1,min(w/1920,h/1080))':fontcolor=#FFD700:borderw=2:bordercolor=black:x='80*min(1,min(w/1920,h/1080))':y='80*min(1,min(w/1920,h/1080))':alpha='if(lt(t,0.5),t/0.5,1)'".format(mode_label, font_file)
+
     def _encode_clip_with_title(self, input_path: str, output_path: str,
                                start_time: float = None, duration: float = None,
                                subtitle_file: str = None) -> bool:
@@ -882,11 +1397,12 @@ class TemplateVideoEncoder(VideoEncoder):
         if start_time is not None:
             cmd.extend(['-ss', str(start_time)])
         
-        cmd.extend(['-i', input_path])
-        
+        # -t를 입력 옵션으로 지정해야 그래프에서 추가하는 갭이 잘리지 않음
         if duration is not None:
             cmd.extend(['-t', str(duration)])
         
+        cmd.extend(['-i', input_path])
+        
         # 비디오 필터 구성
         vf_filters = []
         
@@ -899,49 +1415,33 @@ class TemplateVideoEncoder(VideoEncoder):
         
         # 자막 추가
         if subtitle_file and os.path.exists(subtitle_file):
-            # FFmpeg ass 필터를 위한 올바른 이스케이핑
-            abs_path = os.path.abspath(subtitle_file)
-            # Windows 호환을 위해 백슬래시를 슬래시로 변환
-            subtitle_path = abs_path.replace('\\', '/')
-            # FFmpeg ass 필터를 위한 특수 문자 이스케이핑
-            subtitle_path = subtitle_path.replace(':', '\\:').replace('[', '\\[').replace(']', '\\]')
-            subtitle_path = subtitle_path.replace(',', '\\,').replace("'", "\\'").replace(' ', '\\ ')
-            vf_filters.append(f"ass={subtitle_path}")
-            logger.info(f"Adding ASS subtitle filter: ass={subtitle_path}")
+            vf_filters = self._add_subtitle_filter(vf_filters, subtitle_file, 1920, 1080)
+            logger.info(f"Adding subtitle filter: {subtitle_file}")
         
         # 자막 모드 표시 추가 (일반 템플릿 1, 2, 3에서만)
-        current_template = getattr(self, '_current_template_name', '')
-        current_subtitle_mode = getattr(self, '_current_subtitle_mode', '')
-        
-        # 표시할 레이블 가져오기
-        mode_label = self.subtitle_mode_labels.get(current_subtitle_mode, '')
-        
-        # 레이블이 있고, 일반 템플릿인 경우에만 표시
-        if mode_label and ('template_1' in current_template or 'template_2' in current_template or 'template_3' in current_template):
-            if '_shorts' not in current_template:  # 일반 템플릿만 (쇼츠 제외)
-                # 폰트 파일 경로
-                font_file = "/home/kang/.fonts/TmonMonsori.ttf"
-                if not os.path.exists(font_file):
-                    font_file = "NanumGothic"  # 폴백 폰트
-                
-                # 자막 모드 텍스트 추가 (좌측 상단, 작은 골드색 폰트)
-                # 해상도에 따라 폰트 크기 조정 (FHD 기준 40, 비율에 따라 조정)
-                mode_text = "drawtext=text='{}':fontfile={}:fontsize='40*min(1,min(w/1920,h/1080))':fontcolor=#FFD700:borderw=2:bordercolor=black:x='80*min(1,min(w/1920,h/1080))':y='80*min(1,min(w/1920,h/1080))':alpha='if(lt(t,0.5),t/0.5,1)'".format(mode_label, font_file)
-                vf_filters.append(mode_text)
-                logger.info(f"Adding subtitle mode indicator '{mode_label}' for {current_template}")
+        mode_text = self._get_mode_label_filter(getattr(self, '_current_subtitle_mode', ''))
+        if mode_text:
+            vf_filters.append(mode_text)
         
         # 타이틀 추가
         title_filter = self._get_title_filter()
         if title_filter:
             vf_filters.append(title_filter)
         
+        # 리드인/갭 (그래프 내 생성)
+        pad_v, pad_a = self._get_clip_pad_filters()
+        vf_filters.extend(pad_v)
+        
         if vf_filters:
             vf_string = ','.join(vf_filters)
             cmd.extend(['-vf', vf_string])
             logger.info(f"Video filters applied: {vf_string}")
         
+        if pad_a:
+            cmd.extend(['-af', ','.join(pad_a)])
+        
         # 인코딩 설정
-        encoding_opts = TemplateStandards.get_standard_encoding_options()
+        encoding_opts = TemplateStandards.get_standard_encoding_options(threads=self._encode_threads)
         cmd.extend(encoding_opts)
         cmd.append(output_path)
         
@@ -955,13 +1455,17 @@ class TemplateVideoEncoder(VideoEncoder):
         return True
     
     def _run_ffmpeg_with_timeout(self, cmd: List[str], timeout: int = 300) -> tuple:
-        """타임아웃이 있는 FFmpeg 실행 (5분)"""
+        """타임아웃이 있는 FFmpeg 실행 (5분) - 호스트 CPU 슬롯을 잡은 뒤 실행"""
+        if self._quality == TemplateStandards.QUALITY_DRAFT:
+            cmd = TemplateStandards.apply_draft_options(cmd)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            result = run_ffmpeg(cmd, timeout=timeout)
             return result.returncode, result.stdout, result.stderr
         except subprocess.TimeoutExpired:
             logger.error(f"FFmpeg command timed out after {timeout} seconds")
             return -1, "", "Command timed out"
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error(f"FFmpeg execution error: {e}")
             return -1, "", str(e)
@@ -976,56 +1480,53 @@ class TemplateVideoEncoder(VideoEncoder):
         if start_time is not None:
             cmd.extend(['-ss', str(start_time)])
         
-        cmd.extend(['-i', input_path])
-        
+        # 입력 구간을 제한하면 슬로우 모션 적용 후 실제 길이는 duration / speed
+        # (-t를 입력 옵션으로 지정해야 그래프에서 추가하는 갭이 잘리지 않음)
         if duration is not None:
-            # 슬로우 모션이므로 실제 길이는 duration / speed
-            actual_duration = duration / speed
-            cmd.extend(['-t', str(actual_duration)])
+            cmd.extend(['-t', str(duration)])
         
-        # 비디오/오디오 필터
-        vf_filters = []
+        cmd.extend(['-i', input_path])
+        
+        # 해상도/프레임레이트 통일 (단일 패스 branch와 같은 정규화)
+        if '_shorts' in getattr(self, '_current_template_name', ''):
+            width, height = 1080, 1920
+            vf_filters = [self._get_shorts_crop_filter(input_path, start_time, width, height)]
+        else:
+            width, height = TemplateStandards.STANDARD_VIDEO_WIDTH, TemplateStandards.STANDARD_VIDEO_HEIGHT
+            vf_filters = [f"scale=w={width}:h={height}:force_original_aspect_ratio=decrease,"
+                          f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"]
+        vf_filters.append("setsar=1")
         af_filters = []
         
         # 속도 조절 필터
         vf_filters.append(f"setpts={1/speed}*PTS")
+        vf_filters.append(f"fps={TemplateStandards.STANDARD_FRAMERATE}")
         af_filters.append(f"atempo={speed}")
         
         # 자막 추가
         if subtitle_file and os.path.exists(subtitle_file):
-            subtitle_path = subtitle_file.replace('\\', '/').replace("'", "'\\''")
-            vf_filters.append(f"ass='{subtitle_path}'")
+            vf_filters = self._add_subtitle_filter(vf_filters, subtitle_file, width, height)
         
         # 타이틀 추가
         title_filter = self._get_title_filter()
         if title_filter:
             vf_filters.append(title_filter)
         
+        # 리드인/갭 (그래프 내 생성)
+        pad_v, pad_a = self._get_clip_pad_filters()
+        vf_filters.extend(pad_v)
+        af_filters.extend(pad_a)
+        
         if vf_filters:
             cmd.extend(['-vf', ','.join(vf_filters)])
         
         if af_filters:
             cmd.extend(['-af', ','.join(af_filters)])
         
-        # 인코딩 설정
-        cmd.extend([
-            '-c:v', TemplateStandards.STANDARD_VIDEO_CODEC,
-            '-preset', TemplateStandards.STANDARD_VIDEO_PRESET,
-            '-crf', str(TemplateStandards.STANDARD_VIDEO_CRF),
-            '-profile:v', TemplateStandards.STANDARD_VIDEO_PROFILE,
-            '-level', TemplateStandards.STANDARD_VIDEO_LEVEL,
-            '-pix_fmt', TemplateStandards.STANDARD_PIX_FMT,
-            '-tune', 'film',
-            '-r', str(TemplateStandards.STANDARD_FRAMERATE),
-            '-vsync', 'cfr',
-            '-x264opts', f'keyint={TemplateStandards.STANDARD_GOP_SIZE}:min-keyint=24:scenecut=40:threads=12:lookahead-threads=2:rc-lookahead=20:ref=3:bframes=3:b-adapt=1:me=hex:subme=7',
-            '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
-            '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
-            '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
-            '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
-            '-movflags', '+faststart',
-            output_path
-        ])
+        # 인코딩 설정 (일반 클립과 같은 SPS/PPS가 나오도록 표준 옵션 사용)
+        cmd.extend(['-vsync', 'cfr'])
+        cmd.extend(TemplateStandards.get_standard_encoding_options(threads=self._encode_threads))
+        cmd.append(output_path)
         
         returncode, stdout, stderr = self._run_ffmpeg_with_timeout(cmd)
         
@@ -1035,6 +1536,17 @@ class TemplateVideoEncoder(VideoEncoder):
         
         return True
     
+    def _get_decided_face_crop(self, video_path: str, start_time: float = None) -> Optional[Tuple[int, int, int, int]]:
+        """얼굴 크롭 영역 - 이전 렌더에서 정한 값이 있으면 재사용"""
+        # 변형 워커들이 동시에 요청해도 한 번만 계산하고 같은 값을 사용
+        with self._decisions_lock:
+            if 'face_crop' not in self._render_decisions:
+                face_crop = self._get_face_crop_params(video_path, start_time)
+                # JSON으로 저장되므로 numpy 정수를 int로 변환
+                self._render_decisions['face_crop'] = [int(v) for v in face_crop] if face_crop else None
+            face_crop = self._render_decisions['face_crop']
+        return tuple(face_crop) if face_crop else None
+    
     def _get_face_crop_params(self, video_path: str, start_time: float = None) -> Optional[Tuple[int, int, int, int]]:
         """얼굴 인식을 통한 크롭 영역 계산"""
         if not CV2_AVAILABLE:
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+DeepL 번역 테스트 - DEEPL_API_URL로 지정한 로컬 스텁 서버 사용 (실제 API 호출 없음)
+"""
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import deepl_translator
+from deepl_translator import DeepLTranslator, SubtitleTranslator, TranslationMemo
+
+
+class StubDeepLHandler(BaseHTTPRequestHandler):
+    """받은 text마다 'EN(<원문>)'으로 응답하고 요청을 기록"""
+
+    requests = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        form = parse_qs(body)
+        StubDeepLHandler.requests.append({'auth': self.headers.get('Authorization'), 'texts': form['text']})
+        payload = json.dumps({'translations': [{'text': f"EN({text})"} for text in form['text']]})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(payload.encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubDeepLHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # DEEPL_API_URL 환경 변수와 같은 값
+    deepl_translator.DEEPL_API_URL = f"http://127.0.0.1:{server.server_address[1]}/v2/translate"
+    StubDeepLHandler.requests.clear()
+    return server
+
+
+def test_translate_batch_uses_stub_and_memo():
+    server = start_stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            memo = TranslationMemo(db_path=Path(tmp_dir) / "memo.db")
+            translator = DeepLTranslator(api_key="test-key", memo=memo)
+            assert translator.api_url == deepl_translator.DEEPL_API_URL
+
+            assert translator.translate_batch(["안녕", "고마워", "안녕"]) == ["EN(안녕)", "EN(고마워)", "EN(안녕)"]
+            assert len(StubDeepLHandler.requests) == 1
+            assert StubDeepLHandler.requests[0]['texts'] == ["안녕", "고마워"]
+            assert StubDeepLHandler.requests[0]['auth'] == "DeepL-Auth-Key test-key"
+
+            # 번역 메모리에 있는 문장은 다시 요청하지 않음
+            assert translator.translate_text("고마워") == "EN(고마워)"
+            assert len(StubDeepLHandler.requests) == 1
+    finally:
+        server.shutdown()
+
+
+def test_episode_translated_once():
+    server = start_stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            memo = TranslationMemo(db_path=Path(tmp_dir) / "memo.db")
+            subtitle_translator = SubtitleTranslator(DeepLTranslator(api_key="test-key", memo=memo))
+            json_path = Path(tmp_dir) / "episode_translated.json"
+            json_path.write_text(json.dumps([
+                {'start_time': 0.0, 'end_time': 1.0, 'text_kor': '하나'},
+                {'start_time': 1.0, 'end_time': 2.0, 'text_kor': '둘', 'text_eng': 'two'},
+            ], ensure_ascii=False), encoding='utf-8')
+
+            subtitles = subtitle_translator.load_and_translate_subtitles(str(json_path))
+            assert subtitles[0]['text_en'] == "EN(하나)"
+            assert StubDeepLHandler.requests[0]['texts'] == ["하나"]
+            # 번역 결과는 파일에도 저장
+            assert json.loads(json_path.read_text(encoding='utf-8'))[0]['text_eng'] == "EN(하나)"
+
+            assert subtitle_translator.load_and_translate_subtitles(str(json_path)) == subtitles
+            assert len(StubDeepLHandler.requests) == 1
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_translate_batch_uses_stub_and_memo()
+    test_episode_translated_once()
+    print("All DeepL stub tests passed")
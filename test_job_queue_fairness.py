@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+작업 큐 스케줄링 테스트 - 우선순위, 클라이언트별 가중 공정 큐잉(가상 시간)
+"""
+import tempfile
+from pathlib import Path
+
+from api.utils import job_queue
+from api.utils.job_queue import JobQueue, PRIORITY_HIGH, PRIORITY_LOW
+
+
+def make_queue(tmp_dir: str) -> JobQueue:
+    return JobQueue(db_path=Path(tmp_dir) / "jobs.db")
+
+
+def enqueue(queue: JobQueue, job_id: str, client_id: str, priority: int = PRIORITY_LOW, cost: float = 1.0):
+    queue.enqueue(job_id, 'batch_clip', {}, {'status': 'pending'}, priority=priority,
+                  client_id=client_id, cost=cost)
+
+
+def claim_order(queue: JobQueue) -> list:
+    order = []
+    while True:
+        claimed = queue.claim("worker-1")
+        if claimed is None:
+            return order
+        order.append(claimed[0])
+
+
+def virtual_time(queue: JobQueue, client_id: str) -> float:
+    conn = queue._connect()
+    try:
+        return conn.execute("SELECT virtual_time FROM client_service WHERE client_id = ?",
+                            (client_id,)).fetchone()['virtual_time']
+    finally:
+        conn.close()
+
+
+def test_clients_interleave():
+    """먼저 여러 작업을 넣은 클라이언트가 나중에 온 클라이언트를 막지 않음"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = make_queue(tmp_dir)
+        for i in range(1, 4):
+            enqueue(queue, f"a{i}", "10.0.0.1")
+        enqueue(queue, "b1", "10.0.0.2")
+        assert claim_order(queue) == ["a1", "b1", "a2", "a3"]
+
+
+def test_priority_before_fairness():
+    """높은 우선순위 작업은 가상 시간과 관계없이 먼저"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = make_queue(tmp_dir)
+        enqueue(queue, "batch", "10.0.0.1")
+        enqueue(queue, "single", "10.0.0.1", priority=PRIORITY_HIGH)
+        assert queue.claim("worker-1", max_priority=PRIORITY_HIGH)[0] == "single"
+        assert queue.claim("worker-1", max_priority=PRIORITY_HIGH) is None
+        assert queue.claim("worker-1")[0] == "batch"
+
+
+def test_charge_uses_cost_and_weight():
+    """임대 시 작업량/가중치만큼 가상 시간 증가 (재시도는 다시 청구하지 않음)"""
+    job_queue.JOB_CLIENT_WEIGHTS["heavy"] = 2.0
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            queue = make_queue(tmp_dir)
+            enqueue(queue, "h1", "heavy", cost=4)
+            enqueue(queue, "n1", "normal", cost=4)
+            claim_order(queue)
+            assert virtual_time(queue, "heavy") == 2.0
+            assert virtual_time(queue, "normal") == 4.0
+    finally:
+        del job_queue.JOB_CLIENT_WEIGHTS["heavy"]
+
+
+def test_idle_client_gets_no_credit():
+    """쉬다가 돌아온 클라이언트는 대기 중인 클라이언트의 최소 가상 시간부터 시작"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = make_queue(tmp_dir)
+        for i in range(1, 5):
+            enqueue(queue, f"a{i}", "busy", cost=2)
+        queue.claim("worker-1")
+        queue.claim("worker-1")
+        busy_time = virtual_time(queue, "busy")
+        enqueue(queue, "late1", "late")
+        assert virtual_time(queue, "late") == busy_time
+        # 동률이면 먼저 들어온 작업 - late는 busy를 한 번에 하나씩만 끼어듦
+        assert claim_order(queue) == ["a3", "late1", "a4"]
+
+
+if __name__ == "__main__":
+    test_clients_interleave()
+    test_priority_before_fairness()
+    test_charge_uses_cost_and_weight()
+    test_idle_client_gets_no_credit()
+    print("All job queue fairness tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+병합 계약 검사 테스트 - 첫 패킷 NAL 분석과 계약 조건 (ffmpeg 없이 실행)
+"""
+from media_probe import MediaProbe
+from template_standards import TemplateStandards
+
+
+def nal(nal_type: int, payload: bytes = b'') -> bytes:
+    return b'\x00\x00\x00\x01' + bytes([0x60 | nal_type]) + payload
+
+
+X264_SEI = (b'\x05\x40' + b'\x00' * 16 +
+            b'x264 - core 164 - H.264/MPEG-4 AVC codec - options: cabac=1 ref=3 '
+            b'open_gop=0 keyint=60 keyint_min=31 scenecut=0\x00\x80')
+
+
+def make_signature(start: dict) -> dict:
+    return {
+        'video': {'codec_name': 'h264', 'pix_fmt': 'yuv420p', 'r_frame_rate': '30/1',
+                  'time_base': f"1/{TemplateStandards.CONTRACT_TIMESCALE}",
+                  'width': 1920, 'height': 1080, 'profile': 'High'},
+        'audio': {'codec_name': 'aac', 'sample_rate': '48000', 'channels': 2},
+        'start': start,
+    }
+
+
+def test_idr_start_with_closed_gop():
+    packet = nal(9, b'\xf0') + nal(7, b'\x64\x00\x29') + nal(8, b'\xeb\xe3') + nal(6, X264_SEI) + nal(5, b'\x88\x84')
+    start = MediaProbe.parse_stream_start(packet)
+    assert start['starts_with_idr'] is True
+    assert start['closed_gop'] is True
+    assert start['parameter_sets']
+    assert TemplateStandards.is_contract_compliant(make_signature(start))
+
+
+def test_parameter_sets_identify_sps_pps():
+    a = MediaProbe.parse_stream_start(nal(7, b'\x64\x00\x29') + nal(8, b'\xeb') + nal(5, b'\x88'))
+    b = MediaProbe.parse_stream_start(nal(7, b'\x64\x00\x29') + nal(8, b'\xeb') + nal(5, b'\x99'))
+    c = MediaProbe.parse_stream_start(nal(7, b'\x64\x00\x28') + nal(8, b'\xeb') + nal(5, b'\x88'))
+    assert a['parameter_sets'] == b['parameter_sets']
+    assert a['parameter_sets'] != c['parameter_sets']
+
+
+def test_non_idr_or_open_gop_rejected():
+    # 첫 패킷이 non-IDR 슬라이스
+    start = MediaProbe.parse_stream_start(nal(7, b'\x64') + nal(8, b'\xeb') + nal(6, X264_SEI) + nal(1, b'\x9a'))
+    assert start['starts_with_idr'] is False
+    assert not TemplateStandards.is_contract_compliant(make_signature(start))
+
+    # open GOP
+    open_sei = X264_SEI.replace(b'open_gop=0', b'open_gop=1')
+    start = MediaProbe.parse_stream_start(nal(7, b'\x64') + nal(8, b'\xeb') + nal(6, open_sei) + nal(5, b'\x88'))
+    assert start['closed_gop'] is False
+    assert not TemplateStandards.is_contract_compliant(make_signature(start))
+
+    # x264 SEI 없음 (GOP 구조를 알 수 없음)
+    start = MediaProbe.parse_stream_start(nal(7, b'\x64') + nal(8, b'\xeb') + nal(5, b'\x88'))
+    assert start['closed_gop'] is None
+    assert not TemplateStandards.is_contract_compliant(make_signature(start))
+
+
+if __name__ == "__main__":
+    test_idr_start_with_closed_gop()
+    test_parameter_sets_identify_sps_pps()
+    test_non_idr_or_open_gop_rejected()
+    print("All merge contract tests passed")
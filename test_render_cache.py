@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+렌더 캐시 테스트 - 입력별 키, 저장/복원, 출력을 덮어써도 캐시 항목이 바뀌지 않는지 (ffmpeg 없이 실행)
+"""
+import os
+import tempfile
+from pathlib import Path
+
+from render_cache import RenderCache, get_encoder_signature, get_render_code_hash
+
+
+def make_key(cache: RenderCache, media_path: str, **overrides) -> str:
+    args = dict(template_name="template_1", template={'clips': [{'subtitle_mode': 'both'}]},
+                subtitle_mode_labels={}, media_path=media_path, start_time=1.0, end_time=3.0,
+                padding_before=0.5, padding_after=0.5,
+                subtitle_data={'english': 'Hello', 'korean': '안녕'},
+                quality='final', save_individual_clips=False, output_name="clip_001.mp4")
+    args.update(overrides)
+    return cache.make_key(**args)
+
+
+def test_key_follows_render_inputs():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = RenderCache(cache_dir=Path(tmp_dir) / "cache", enabled=True)
+        media_path = Path(tmp_dir) / "source.mp4"
+        media_path.write_bytes(b'source')
+
+        key = make_key(cache, str(media_path))
+        assert key == make_key(cache, str(media_path))
+        assert key != make_key(cache, str(media_path), end_time=3.5)
+        assert key != make_key(cache, str(media_path), quality='draft')
+        assert key != make_key(cache, str(media_path), subtitle_data={'english': 'Hello!', 'korean': '안녕'})
+
+        # 원본 파일이 바뀌면 (크기/mtime) 다른 키
+        media_path.write_bytes(b'source, re-encoded')
+        assert key != make_key(cache, str(media_path))
+
+        # 원본을 확인할 수 없으면 캐시 사용 안 함
+        assert make_key(cache, str(Path(tmp_dir) / "missing.mp4")) is None
+
+
+def test_ass_file_keyed_by_content():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = RenderCache(cache_dir=Path(tmp_dir) / "cache", enabled=True)
+        media_path = Path(tmp_dir) / "source.mp4"
+        media_path.write_bytes(b'source')
+        ass_a = Path(tmp_dir) / "job_a.ass"
+        ass_b = Path(tmp_dir) / "job_b.ass"
+        ass_a.write_text("Dialogue: one", encoding='utf-8')
+        ass_b.write_text("Dialogue: one", encoding='utf-8')
+
+        key_a = make_key(cache, str(media_path), subtitle_data={'ass_file': str(ass_a)})
+        assert key_a == make_key(cache, str(media_path), subtitle_data={'ass_file': str(ass_b)})
+        ass_b.write_text("Dialogue: two", encoding='utf-8')
+        assert key_a != make_key(cache, str(media_path), subtitle_data={'ass_file': str(ass_b)})
+
+
+def test_encoder_signature_includes_code_hash():
+    assert get_render_code_hash() in get_encoder_signature()
+
+
+def test_store_and_materialize_are_independent_copies():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = RenderCache(cache_dir=Path(tmp_dir) / "cache", enabled=True)
+        first_output = Path(tmp_dir) / "job1" / "output.mp4"
+        first_output.parent.mkdir()
+        first_output.write_bytes(b'rendered')
+        cache.store("k" * 64, str(first_output), save_individual_clips=False)
+
+        second_output = Path(tmp_dir) / "job2" / "output.mp4"
+        assert cache.materialize("k" * 64, str(second_output), save_individual_clips=False)
+        assert second_output.read_bytes() == b'rendered'
+        assert os.stat(second_output).st_ino != os.stat(cache.cache_dir / ("k" * 64) / "output.mp4").st_ino
+
+        # 출력을 다시 쓰는 것(ffmpeg -y)은 캐시와 다른 작업의 출력에 영향 없음
+        first_output.write_bytes(b'overwritten')
+        second_output.write_bytes(b'overwritten too')
+        assert (cache.cache_dir / ("k" * 64) / "output.mp4").read_bytes() == b'rendered'
+        assert not cache.materialize("m" * 64, str(second_output), save_individual_clips=False)
+
+
+if __name__ == "__main__":
+    test_key_follows_render_inputs()
+    test_ass_file_keyed_by_content()
+    test_encoder_signature_includes_code_hash()
+    test_store_and_materialize_are_independent_copies()
+    print("All render cache tests passed")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+에피소드 자막 구간 인덱스 테스트 - 이진 탐색 결과를 전체 탐색과 비교, 파일 변경 시 다시 읽기, 동시 로드 합치기/LRU 크기 제한
+"""
+import os
+import json
+import time
+import random
+import tempfile
+import threading
+from pathlib import Path
+
+import subtitle_index
+from subtitle_index import SubtitleIndex, get_episode_index, get_range_subtitles
+
+
+def make_subtitles(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    subtitles = []
+    for i in range(count):
+        start = round(rng.uniform(0, 600), 2)
+        # 가끔 아주 긴 자막 (누적 최대 끝 시간이 필요한 경우)
+        length = rng.uniform(20, 60) if i % 17 == 0 else rng.uniform(0.5, 5)
+        subtitles.append({'start_time': start, 'end_time': round(start + length, 2), 'text_kor': f"문장 {i}"})
+    return subtitles
+
+
+def test_overlapping_matches_linear_scan():
+    subtitles = make_subtitles(300)
+    index = SubtitleIndex(subtitles)
+    rng = random.Random(11)
+    for _ in range(200):
+        start = rng.uniform(-10, 620)
+        end = start + rng.uniform(0, 30)
+        expected = sorted((sub for sub in subtitles if sub['end_time'] >= start and sub['start_time'] <= end),
+                          key=lambda sub: sub['start_time'])
+        assert index.overlapping(start, end) == expected
+        assert index.first_overlapping(start, end) == (expected[0] if expected else None)
+
+
+def test_first_centered_in():
+    index = SubtitleIndex([
+        {'start_time': 0.0, 'end_time': 10.0},
+        {'start_time': 4.0, 'end_time': 6.0},
+        {'start_time': 20.0, 'end_time': 22.0},
+    ])
+    # 중심 5.0인 자막이 둘 - 시작 시간이 이른 것
+    assert index.first_centered_in(4.5, 5.5)['start_time'] == 0.0
+    assert index.first_centered_in(20.5, 21.5)['start_time'] == 20.0
+    assert index.first_centered_in(12.0, 18.0) is None
+
+
+def test_invalid_entries_skipped():
+    index = SubtitleIndex([{'start_time': 1.0}, {'start_time': 2.0, 'end_time': 3.0}, {'text_kor': '없음'}])
+    assert len(index) == 1
+
+
+def test_episode_index_reloads_on_change():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        media_path = Path(tmp_dir) / "episode.mp4"
+        json_path = Path(tmp_dir) / "episode_translated.json"
+        json_path.write_text(json.dumps([{'start_time': 1.0, 'end_time': 2.0, 'text_eng': 'one',
+                                          'text_kor': '하나'}]), encoding='utf-8')
+
+        first = get_episode_index(str(json_path), translate=False)
+        assert get_episode_index(str(json_path), translate=False) is first
+        assert get_range_subtitles(str(media_path), 0.0, 5.0) == [
+            {'start': 1.0, 'end': 2.0, 'eng': 'one', 'kor': '하나'}]
+
+        json_path.write_text(json.dumps([{'start_time': 1.0, 'end_time': 2.0},
+                                         {'start_time': 3.0, 'end_time': 4.0}]), encoding='utf-8')
+        stat = json_path.stat()
+        os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert len(get_episode_index(str(json_path), translate=False)) == 2
+
+        assert get_episode_index(str(Path(tmp_dir) / "missing.json"), translate=False) is None
+
+
+def write_episode(path: Path, count: int = 1):
+    path.write_text(json.dumps([{'start_time': float(i), 'end_time': i + 0.5} for i in range(count)]),
+                    encoding='utf-8')
+
+
+def test_concurrent_loads_coalesce_without_blocking_others():
+    """같은 에피소드는 한 번만 읽고, 느린 로드(번역) 중에도 다른 에피소드 조회는 진행"""
+    original_load = subtitle_index._load_subtitles
+    loads = []
+    slow_started = threading.Event()
+
+    def counting_load(path, translate):
+        loads.append(path.name)
+        if path.name == "slow.json":
+            slow_started.set()
+            time.sleep(0.3)
+        return original_load(path, translate)
+
+    subtitle_index._load_subtitles = counting_load
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            slow_path, fast_path = Path(tmp_dir) / "slow.json", Path(tmp_dir) / "fast.json"
+            write_episode(slow_path, 3)
+            write_episode(fast_path, 2)
+
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(get_episode_index(str(slow_path), False)))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            slow_started.wait(5)
+            started = time.time()
+            assert len(get_episode_index(str(fast_path), translate=False)) == 2
+            assert time.time() - started < 0.2
+            for thread in threads:
+                thread.join()
+
+            assert loads.count("slow.json") == 1
+            assert len(results) == 4 and all(result is results[0] for result in results)
+    finally:
+        subtitle_index._load_subtitles = original_load
+
+
+def test_cache_is_bounded():
+    original_size = subtitle_index.SUBTITLE_INDEX_CACHE_SIZE
+    subtitle_index.SUBTITLE_INDEX_CACHE_SIZE = 2
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = [Path(tmp_dir) / f"episode{i}.json" for i in range(3)]
+            for path in paths:
+                write_episode(path)
+                get_episode_index(str(path), translate=False)
+            cached = set(subtitle_index._indexes)
+            assert str(paths[0].resolve()) not in cached
+            assert {str(paths[1].resolve()), str(paths[2].resolve())} <= cached
+            assert len(subtitle_index._indexes) <= 2
+    finally:
+        subtitle_index.SUBTITLE_INDEX_CACHE_SIZE = original_size
+
+
+if __name__ == "__main__":
+    test_overlapping_matches_linear_scan()
+    test_first_centered_in()
+    test_invalid_entries_skipped()
+    test_episode_index_reloads_on_change()
+    test_concurrent_loads_coalesce_without_blocking_others()
+    test_cache_is_bounded()
+    print("All subtitle index tests passed")
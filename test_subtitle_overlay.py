@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+정적 자막 overlay 테스트 - 정적 자막 판별, 끝 시간(enable), 제거 유예,
+ass 필터와의 샘플 프레임 픽셀 비교 (FFmpeg가 있을 때만)
+"""
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+
+from subtitle_overlay import (
+    SubtitleOverlayCache, get_static_ass_content, overlay_filter_chain,
+    CANONICAL_START, CANONICAL_END, OVERLAY_NAME
+)
+
+WIDTH, HEIGHT = 640, 360
+
+ASS_HEADER = f"""[Script Info]
+ScriptType: v4.00+
+PlayResX: {WIDTH}
+PlayResY: {HEIGHT}
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,40,&H00FFFFFF,&H000000FF,&H00000000,&H80000000,1,0,0,0,100,100,0,0,1,3,1,2,20,20,40,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+def make_ass(*events: str) -> str:
+    return ASS_HEADER + ''.join(f"Dialogue: 0,{event}\n" for event in events)
+
+
+def test_static_detection():
+    static = get_static_ass_content(make_ass("0:00:00.00,0:00:04.50,Default,,0,0,0,,Hello",
+                                             "0:00:00.00,0:00:04.50,Default,,0,0,0,,안녕"))
+    assert static is not None
+    content, end_time = static
+    assert end_time == 4.5
+    assert f"{CANONICAL_START},{CANONICAL_END}" in content
+
+    # 끝 시간만 다른 자막은 같은 이미지
+    other = get_static_ass_content(make_ass("0:00:00.00,0:00:07.00,Default,,0,0,0,,Hello",
+                                            "0:00:00.00,0:00:07.00,Default,,0,0,0,,안녕"))
+    assert other[0] == content and other[1] == 7.0
+
+    # 애니메이션, 시작/끝이 다른 이벤트, 자막 없음
+    assert get_static_ass_content(make_ass("0:00:00.00,0:00:04.50,Default,,0,0,0,,{\\fad(200,200)}Hi")) is None
+    assert get_static_ass_content(make_ass("0:00:01.00,0:00:04.50,Default,,0,0,0,,Hi")) is None
+    assert get_static_ass_content(make_ass("0:00:00.00,0:00:02.00,Default,,0,0,0,,A",
+                                           "0:00:00.00,0:00:04.00,Default,,0,0,0,,B")) is None
+    assert get_static_ass_content(ASS_HEADER) is None
+
+
+def test_filter_chain_applies_end_time():
+    chain = overlay_filter_chain(['scale=640:360'], '/tmp/overlay.png', 'sub1', 4.5)
+    assert chain.endswith("overlay=0:0:enable='lt(t,4.500)'")
+    assert overlay_filter_chain([], '/tmp/overlay.png', 'sub2').endswith("overlay=0:0")
+
+
+def test_recently_used_overlays_not_evicted():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SubtitleOverlayCache(cache_dir=Path(tmp_dir), max_bytes=0, enabled=True)
+        recent, stale = Path(tmp_dir) / ("a" * 64), Path(tmp_dir) / ("b" * 64)
+        for entry in (recent, stale):
+            entry.mkdir()
+            (entry / OVERLAY_NAME).write_bytes(b'png')
+        old = time.time() - cache.eviction_grace_seconds - 10
+        os.utime(stale, (old, old))
+        cache._evict()
+        assert recent.exists()
+        assert not stale.exists()
+
+
+def grab_frame(subtitle_filter: str) -> bytes:
+    """회색 배경에 자막 필터를 적용한 첫 프레임 (rgb24)"""
+    return subprocess.run([
+        'ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', f"color=c=gray:s={WIDTH}x{HEIGHT}:d=1",
+        '-vf', f"{subtitle_filter},format=rgb24", '-frames:v', '1', '-f', 'rawvideo', '-'
+    ], capture_output=True, check=True).stdout
+
+
+def mean_abs_diff(a: bytes, b: bytes) -> float:
+    assert len(a) == len(b) and a
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+def test_overlay_matches_ass_filter():
+    """샘플 프레임에서 overlay 합성 결과가 ass 필터 결과와 거의 같은지"""
+    if shutil.which('ffmpeg') is None:
+        print("ffmpeg not found, skipping pixel comparison")
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ass_path = Path(tmp_dir) / "subtitle.ass"
+        ass_path.write_text(make_ass("0:00:00.00,0:00:05.00,Default,,0,0,0,,Speed Review 스피드 복습"),
+                            encoding='utf-8')
+        cache = SubtitleOverlayCache(cache_dir=Path(tmp_dir) / "cache", enabled=True)
+        overlay_path, end_time = cache.get_overlay(str(ass_path), WIDTH, HEIGHT)
+
+        base = grab_frame("format=yuv420p")
+        with_ass = grab_frame(f"format=yuv420p,ass={ass_path}")
+        with_overlay = grab_frame(overlay_filter_chain(['format=yuv420p'], overlay_path, 'sub1', end_time))
+        after_end = grab_frame(overlay_filter_chain(['format=yuv420p'], overlay_path, 'sub2', 0.0))
+
+        # 자막이 실제로 그려졌고, 두 방식의 평균 픽셀 차이는 자막 자체보다 훨씬 작음
+        text_diff = mean_abs_diff(base, with_ass)
+        assert text_diff > 0.5
+        assert mean_abs_diff(with_ass, with_overlay) < text_diff * 0.1
+        # 끝 시간 이후에는 자막 없음
+        assert after_end == base
+
+
+if __name__ == "__main__":
+    test_static_detection()
+    test_filter_chain_applies_end_time()
+    test_recently_used_overlays_not_evicted()
+    test_overlay_matches_ass_filter()
+    print("All subtitle overlay tests passed")
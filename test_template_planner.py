@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+템플릿 실행 계획 테스트 - 같은 설정의 클립만 하나의 렌더 작업으로 합쳐지는지 확인
+"""
+import json
+from pathlib import Path
+
+from template_planner import compile_template, get_render_key
+
+
+def load_patterns():
+    with open(Path(__file__).parent / "templates" / "shadowing_patterns.json", encoding='utf-8') as f:
+        data = json.load(f)
+    return data['patterns'], data.get('subtitle_mode_labels', {})
+
+
+def test_identical_clips_share_op():
+    patterns, labels = load_patterns()
+    plan = compile_template('template_1', patterns['template_1'], labels)
+    # 1_nosub / 5_nosub는 같은 렌더 결과
+    first, last = plan.sequence[0], plan.sequence[-1]
+    assert first.op_index == last.op_index
+    assert plan.total_clips == sum(clip.get('count', 1) for clip in patterns['template_1']['clips'])
+    assert len(plan.ops) < plan.total_clips
+    # 참조 위치는 시퀀스 순서대로
+    assert [ref.position for ref in plan.sequence] == list(range(plan.total_clips))
+
+
+def test_subtitle_mode_is_part_of_render_key():
+    # 학습 클립은 subtitle_mode로 프레임 위치/쇼츠 레이아웃을 고르므로 다른 op이어야 함
+    base = {'video_mode': 'still_frame_tts', 'subtitle_type': 'full', 'count': 1}
+    preview = dict(base, subtitle_mode='study_preview', folder_name='a')
+    review = dict(base, subtitle_mode='study_review', folder_name='b')
+    assert get_render_key(preview) != get_render_key(review)
+
+    plan = compile_template('study', {'clips': [preview, review]})
+    assert len(plan.ops) == 2
+
+
+def test_folder_name_and_count_do_not_split_ops():
+    clip = {'subtitle_mode': 'no_subtitle', 'subtitle_type': None, 'count': 2, 'folder_name': 'x'}
+    same = dict(clip, count=3, folder_name='y')
+    assert get_render_key(clip) == get_render_key(same)
+
+    plan = compile_template('repeat', {'clips': [clip, same]})
+    assert len(plan.ops) == 1
+    assert plan.total_clips == 5
+    assert [ref.repeat_index for ref in plan.sequence] == [1, 2, 1, 2, 3]
+
+
+def test_gap_after_last_clip():
+    plan = compile_template('repeat', {'clips': [{'subtitle_mode': 'no_subtitle', 'count': 3}]})
+    assert [plan.gap_after(ref.position, 1.5) for ref in plan.sequence] == [1.5, 1.5, 0.0]
+    assert plan.padded_op_keys(1.5) == [(0, 1.5), (0, 0.0)]
+
+
+if __name__ == "__main__":
+    test_identical_clips_share_op()
+    test_subtitle_mode_is_part_of_render_key()
+    test_folder_name_and_count_do_not_split_ops()
+    test_gap_after_last_clip()
+    print("All template planner tests passed")
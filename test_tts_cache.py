@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+TTS 캐시 테스트 - 오프라인 fake 엔진으로 합성/캐시 적중/동시 요청 합치기 (프로세스 간 포함, 네트워크 없이 실행)
+"""
+import os
+import time
+import wave
+import asyncio
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+from tts_cache import TTSCache, TTSRequest, FakeTTSEngine, get_tts_engine
+
+
+class CountingEngine(FakeTTSEngine):
+    """합성 호출 수를 세는 fake 엔진"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def synthesize(self, text, output_path, voice, rate, pitch, volume):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        await super().synthesize(text, output_path, voice, rate, pitch, volume)
+
+
+class MarkingEngine(FakeTTSEngine):
+    """합성할 때마다 디렉토리에 표시 파일을 남기는 fake 엔진 (프로세스 간 호출 수 확인용)"""
+
+    def __init__(self, marker_dir: str):
+        self.marker_dir = marker_dir
+
+    async def synthesize(self, text, output_path, voice, rate, pitch, volume):
+        Path(self.marker_dir, f"{os.getpid()}-{time.time_ns()}").touch()
+        await asyncio.sleep(0.3)
+        await super().synthesize(text, output_path, voice, rate, pitch, volume)
+
+
+def synthesize_in_process(cache_dir: str, marker_dir: str, output_path: str):
+    cache = TTSCache(cache_dir=Path(cache_dir), engine=MarkingEngine(marker_dir))
+    cache.synthesize_sync("shared sentence", output_path, "en-US-AriaNeural")
+
+
+def test_fake_engine_selected_by_name():
+    assert isinstance(get_tts_engine("fake"), FakeTTSEngine)
+
+
+def test_fake_engine_writes_wav():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = str(Path(tmp_dir) / "out.wav")
+        asyncio.run(FakeTTSEngine().synthesize("hello", output_path, "en-US-AriaNeural", "+0%", "+0Hz", "+0%"))
+        with wave.open(output_path, 'rb') as f:
+            assert f.getframerate() == FakeTTSEngine.SAMPLE_RATE
+            assert abs(f.getnframes() / f.getframerate() - 5 * FakeTTSEngine.SECONDS_PER_CHAR) < 1e-6
+
+
+def test_cache_hit_and_key():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = CountingEngine()
+        cache = TTSCache(cache_dir=Path(tmp_dir) / "cache", engine=engine)
+        first = cache.synthesize_sync("Speed Review", str(Path(tmp_dir) / "a.wav"), "en-US-AriaNeural")
+        second = cache.synthesize_sync("Speed Review", str(Path(tmp_dir) / "b.wav"), "en-US-AriaNeural")
+        assert first['cached'] is False and second['cached'] is True
+        assert first['duration'] == second['duration']
+        assert engine.calls == 1
+
+        # 음성/속도가 다르면 다른 항목
+        cache.synthesize_sync("Speed Review", str(Path(tmp_dir) / "c.wav"), "en-US-GuyNeural")
+        cache.synthesize_sync("Speed Review", str(Path(tmp_dir) / "d.wav"), "en-US-AriaNeural", rate="-20%")
+        assert engine.calls == 3
+
+        # 출력을 덮어써도 캐시 항목은 그대로
+        Path(tmp_dir, "b.wav").write_bytes(b'overwritten')
+        third = cache.synthesize_sync("Speed Review", str(Path(tmp_dir) / "e.wav"), "en-US-AriaNeural")
+        assert third['cached'] is True
+        with wave.open(str(Path(tmp_dir) / "e.wav"), 'rb') as f:
+            assert f.getnframes() > 0
+
+
+def test_concurrent_requests_synthesize_once():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = CountingEngine()
+        cache = TTSCache(cache_dir=Path(tmp_dir) / "cache", engine=engine)
+        requests = [TTSRequest("same sentence", str(Path(tmp_dir) / f"{i}.wav"), "en-US-AriaNeural")
+                    for i in range(4)]
+        requests.append(TTSRequest("other sentence", None, "en-US-AriaNeural"))
+        results = asyncio.run(cache.synthesize_many(requests))
+        assert engine.calls == 2
+        assert sum(1 for result in results if not result['cached']) == 2
+        assert all(Path(request.output_path).exists() for request in requests if request.output_path)
+
+
+def test_processes_synthesize_once():
+    """미리 합성(API 프로세스)과 실제 사용(렌더 워커)이 겹쳐도 엔진은 한 번만 호출"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir, marker_dir = str(Path(tmp_dir) / "cache"), Path(tmp_dir) / "markers"
+        marker_dir.mkdir()
+        context = multiprocessing.get_context('spawn')
+        processes = [context.Process(target=synthesize_in_process,
+                                     args=(cache_dir, str(marker_dir), str(Path(tmp_dir) / f"{i}.wav")))
+                     for i in range(2)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(30)
+            assert process.exitcode == 0
+        assert len(list(marker_dir.iterdir())) == 1
+        assert all(Path(tmp_dir, f"{i}.wav").exists() for i in range(2))
+
+
+if __name__ == "__main__":
+    test_fake_engine_selected_by_name()
+    test_fake_engine_writes_wav()
+    test_cache_hit_and_key()
+    test_concurrent_requests_synthesize_once()
+    test_processes_synthesize_once()
+    print("All TTS cache tests passed")
@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 import csv
 import os
-import edge_tts
+import sys
 import asyncio
 from pathlib import Path
 import json
 from mutagen.mp3 import MP3
 import re
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from tts_cache import TTSRequest, get_tts_cache
+
 class EnglishLearningVideo:
     def __init__(self, csv_file, output_dir="output"):
         self.csv_file = csv_file
@@ -46,35 +49,39 @@ class EnglishLearningVideo:
                 blank_text = re.sub(pattern, '_'*len(keyword), blank_text, flags=re.IGNORECASE)
         return blank_text
     
+    @staticmethod
+    def get_duration(result, output_file):
+        # 길이는 TTS 캐시 인덱스에 저장됨 (없으면 MP3에서 읽음)
+        if result['duration'] is not None:
+            return result['duration']
+        return MP3(output_file).info.length
+    
     async def generate_tts(self, text, voice, output_file):
-        communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(output_file)
-        
-        audio = MP3(output_file)
-        duration = audio.info.length
-        return duration
+        # 같은 문장/음성은 TTS 캐시에서 재사용
+        result = await get_tts_cache().synthesize(text, output_file, voice=voice)
+        return self.get_duration(result, output_file)
     
     async def generate_all_tts(self):
+        # 모든 문장의 한글/영어 TTS를 한 번씩만, 동시에 생성 (영어는 모든 단계에서 재사용)
+        requests = []
         for idx, item in enumerate(self.data):
             audio_dir = self.output_dir / f"sentence_{idx:03d}"
             audio_dir.mkdir(exist_ok=True)
-            
+            for lang in ('korean', 'english'):
+                requests.append(TTSRequest(item[lang], str(audio_dir / f"{lang}.mp3"), voice=self.tts_voices[lang]))
+        
+        print(f"  Generating {len(requests)} TTS files...")
+        results = await get_tts_cache().synthesize_many(requests)
+        
+        for idx, item in enumerate(self.data):
             audio_files = {}
             durations = {}
-            
-            # 한글 TTS - 한 번만 생성
-            kor_file = audio_dir / "korean.mp3"
-            print(f"  Generating korean: {kor_file.name}")
-            kor_duration = await self.generate_tts(item['korean'], self.tts_voices['korean'], str(kor_file))
-            audio_files['korean'] = str(kor_file)
-            durations['korean'] = kor_duration
-            
-            # 영어 TTS - 한 번만 생성 (모든 단계에서 재사용)
-            eng_file = audio_dir / "english.mp3"
-            print(f"  Generating english: {eng_file.name}")
-            eng_duration = await self.generate_tts(item['english'], self.tts_voices['english'], str(eng_file))
-            audio_files['english'] = str(eng_file)
-            durations['english'] = eng_duration
+            for offset, lang in enumerate(('korean', 'english')):
+                request, result = requests[idx * 2 + offset], results[idx * 2 + offset]
+                if result is None:
+                    raise RuntimeError(f"TTS generation failed: {request.text}")
+                audio_files[lang] = request.output_path
+                durations[lang] = self.get_duration(result, request.output_path)
             
             # 빈칸 처리된 텍스트 (TTS는 생성하지 않고 텍스트만 저장)
             blank_text = self.create_blank_text(item['english'], item['keywords'])
@@ -0,0 +1,451 @@
+"""
+Persistent TTS audio cache
+TTS 합성 결과를 (텍스트, 음성, 속도, 피치, 볼륨, 엔진 버전) 해시로 디스크에 캐싱
+
+리뷰 클립 타이틀("Speed Review"), 인트로 문장 등 같은 문장이 작업마다 반복해서
+합성되므로, 한 번 합성한 오디오는 캐시 디렉토리에 저장하고 이후 요청은 출력 위치에
+reflink(불가능하면 복사)한다. 길이/샘플레이트/채널 수는 SQLite(WAL) 인덱스에 함께 저장하여
+캐시 적중 시 다시 프로브하지 않는다.
+
+엔진: edge (Microsoft Edge TTS - 패키지가 없으면 CLI), fake (네트워크 없이 텍스트 길이에
+비례하는 무음 WAV를 만드는 오프라인 테스트용). TTS_ENGINE 환경 변수로 선택한다.
+용량 제한: 바이트 기준, 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+
+여러 문장은 synthesize_many()로 동시에 합성한다 (동시 실행 수 제한, 실패 시 재시도).
+같은 문장을 이미 다른 요청이 합성 중이면 끝날 때까지 기다렸다가 캐시에서 가져온다.
+같은 프로세스 안에서는 Future로, 프로세스 사이에서는 키별 파일 잠금(flock)으로 기다리므로
+API 프로세스에서 미리 시작한 합성(schedule_prefetch)과 렌더 워커의 실제 사용이 겹쳐도 한 번만 합성한다.
+"""
+import os
+import json
+import wave
+import time
+import shutil
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import edge_tts
+    EDGE_TTS_AVAILABLE = True
+except ImportError:
+    EDGE_TTS_AVAILABLE = False
+
+from media_probe import get_media_probe
+from render_cache import clone_file
+from config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 환경 변수 설정
+TTS_ENGINE = os.getenv("TTS_ENGINE", "edge")
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", str(DATA_DIR / "tts_cache")))
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "2048")) * 1024 ** 2)
+# edge_tts 패키지가 없을 때 사용할 CLI
+EDGE_TTS_PATH = os.getenv("EDGE_TTS_PATH", shutil.which("edge-tts") or "/home/kang/.local/bin/edge-tts")
+
+# 동시 합성 수와 실패 시 재시도 (지수 백오프)
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+TTS_MAX_RETRIES = int(os.getenv("TTS_MAX_RETRIES", "2"))
+TTS_RETRY_BACKOFF = float(os.getenv("TTS_RETRY_BACKOFF", "1.0"))
+
+# 최근에 사용된 항목은 다른 프로세스가 링크 중일 수 있으므로 제거 유예 (초)
+EVICTION_GRACE_SECONDS = 60
+
+
+@dataclass
+class TTSRequest:
+    """합성할 문장 (output_path가 None이면 캐시에만 저장 - 미리 합성)"""
+    text: str
+    output_path: Optional[str]
+    voice: str
+    rate: str = "+0%"
+    pitch: str = "+0Hz"
+    volume: str = "+0%"
+
+
+class EdgeTTSEngine:
+    """Microsoft Edge TTS (edge_tts 패키지, 없으면 edge-tts CLI)"""
+
+    name = "edge"
+    suffix = ".mp3"
+
+    @property
+    def version(self) -> str:
+        if EDGE_TTS_AVAILABLE:
+            return getattr(edge_tts, '__version__', 'unknown')
+        return "cli"
+
+    async def synthesize(self, text: str, output_path: str, voice: str, rate: str, pitch: str, volume: str):
+        if EDGE_TTS_AVAILABLE:
+            communicate = edge_tts.Communicate(text=text, voice=voice, rate=rate, pitch=pitch, volume=volume)
+            await communicate.save(output_path)
+            return
+        process = await asyncio.create_subprocess_exec(
+            EDGE_TTS_PATH, "--voice", voice, f"--rate={rate}", f"--pitch={pitch}", f"--volume={volume}",
+            "--text", text, "--write-media", output_path,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"edge-tts failed: {stderr.decode(errors='replace')}")
+
+
+class FakeTTSEngine:
+    """오프라인 테스트용 TTS - 글자당 60ms 길이의 무음 WAV"""
+
+    name = "fake"
+    suffix = ".wav"
+    version = "1"
+    SAMPLE_RATE = 24000
+    SECONDS_PER_CHAR = 0.06
+
+    async def synthesize(self, text: str, output_path: str, voice: str, rate: str, pitch: str, volume: str):
+        frames = int(max(1, len(text)) * self.SECONDS_PER_CHAR * self.SAMPLE_RATE)
+        with wave.open(output_path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.SAMPLE_RATE)
+            f.writeframes(b'\x00\x00' * frames)
+
+
+TTS_ENGINES = {
+    'edge': EdgeTTSEngine,
+    'fake': FakeTTSEngine,
+}
+
+
+def get_tts_engine(name: str = TTS_ENGINE):
+    """이름으로 TTS 엔진 생성 (알 수 없으면 edge)"""
+    return TTS_ENGINES.get(name, EdgeTTSEngine)()
+
+
+def read_audio_metadata(audio_path: str) -> Dict:
+    """오디오 길이/샘플레이트/채널 수 (WAV는 직접 읽고 나머지는 MediaProbe)"""
+    if audio_path.endswith('.wav'):
+        try:
+            with wave.open(audio_path, 'rb') as f:
+                return {'duration': f.getnframes() / f.getframerate(),
+                        'sample_rate': f.getframerate(), 'channels': f.getnchannels()}
+        except (wave.Error, OSError):
+            pass
+    probe = get_media_probe()
+    stream = probe.get_audio_stream(audio_path)
+    return {
+        'duration': probe.get_duration(audio_path),
+        'sample_rate': int(stream['sample_rate']) if stream.get('sample_rate') else None,
+        'channels': stream.get('channels'),
+    }
+
+
+class TTSCache:
+    """TTS 오디오 캐시"""
+
+    def __init__(self, cache_dir: Path = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 enabled: bool = TTS_CACHE_ENABLED, engine=None):
+        self.cache_dir = Path(cache_dir)
+        self.db_path = self.cache_dir / "index.db"
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.engine = engine or get_tts_engine()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # 합성 중인 키 -> 완료 Future (스레드/이벤트 루프 사이에서 공유)
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+
+        if self.enabled:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._init_db()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"TTS cache disabled ({self.cache_dir}): {e}")
+                self.enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tts_audio (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    voice TEXT NOT NULL,
+                    engine TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    duration REAL,
+                    sample_rate INTEGER,
+                    channels INTEGER,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+
+    def make_key(self, text: str, voice: str, rate: str, pitch: str, volume: str) -> str:
+        payload = json.dumps([text, voice, rate, pitch, volume, self.engine.name, self.engine.version],
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[sqlite3.Row]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM tts_audio WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if not (self.cache_dir / row['file_name']).exists():
+                conn.execute("DELETE FROM tts_audio WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE tts_audio SET hits = hits + 1, accessed_at = ? WHERE key = ?",
+                         (time.time(), key))
+            return row
+
+    @staticmethod
+    def _link(src: Path, dst: Path):
+        """캐시 오디오를 출력 위치에 복제 (reflink 또는 복사 - 출력을 덮어써도 캐시는 안전)"""
+        clone_file(src, dst)
+
+    def _lock_key(self, key: str):
+        """같은 문장을 다른 프로세스가 합성 중이면 끝날 때까지 대기 (블로킹 - 잠금 파일 반환)"""
+        if not FCNTL_AVAILABLE:
+            return None
+        lock_path = self.cache_dir / key[:2] / f".{key}.lock"
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            logger.info(f"Identical TTS in flight in another process, waiting: {key[:12]}")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    @staticmethod
+    def _unlock_key(lock_file):
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _use_cached(self, row: sqlite3.Row, output_path: Optional[str]) -> Dict:
+        """캐시 항목을 출력 위치에 복제하고 메타데이터 반환"""
+        cached_path = self.cache_dir / row['file_name']
+        if output_path is not None:
+            self._link(cached_path, Path(output_path))
+            get_media_probe().record_copy(str(cached_path), output_path)
+        with self._lock:
+            self.hits += 1
+        logger.debug(f"TTS cache hit: {row['text'][:30]!r} ({row['voice']})")
+        return {'duration': row['duration'], 'sample_rate': row['sample_rate'],
+                'channels': row['channels'], 'cached': True}
+
+    async def synthesize(self, text: str, output_path: Optional[str], voice: str, rate: str = "+0%",
+                         pitch: str = "+0Hz", volume: str = "+0%") -> Optional[Dict]:
+        """텍스트를 합성하여 output_path에 저장 (캐시에 있으면 링크만)
+
+        Returns:
+            {'duration', 'sample_rate', 'channels', 'cached'} (캐시 없이 미리 합성만 요청하면 None)
+        """
+        if not self.enabled:
+            if output_path is None:
+                return None
+            await self.engine.synthesize(text, output_path, voice, rate, pitch, volume)
+            return dict(read_audio_metadata(output_path), cached=False)
+
+        key = self.make_key(text, voice, rate, pitch, volume)
+        while True:
+            row = self._lookup(key)
+            if row is not None:
+                return self._use_cached(row, output_path)
+
+            with self._lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = concurrent.futures.Future()
+                    break
+            # 같은 문장을 다른 요청이 합성 중 - 끝나면 캐시에서 다시 조회 (실패했으면 직접 합성)
+            await asyncio.wrap_future(pending)
+
+        lock_file = None
+        try:
+            # 다른 프로세스가 합성 중이었으면 끝난 뒤 캐시에 들어 있음
+            lock_file = await asyncio.to_thread(self._lock_key, key)
+            row = self._lookup(key)
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                metadata = await self._synthesize_entry(key, text, voice, rate, pitch, volume)
+        finally:
+            self._unlock_key(lock_file)
+            with self._lock:
+                del self._inflight[key]
+            pending.set_result(None)
+
+        if row is not None:
+            return self._use_cached(row, output_path)
+        if output_path is not None:
+            cached_path = self.cache_dir / metadata.pop('file_name')
+            self._link(cached_path, Path(output_path))
+            get_media_probe().record_copy(str(cached_path), output_path)
+        else:
+            metadata.pop('file_name')
+        self._evict(keep=key)
+        return dict(metadata, cached=False)
+
+    async def _synthesize_entry(self, key: str, text: str, voice: str, rate: str,
+                                pitch: str, volume: str) -> Dict:
+        """합성하여 캐시 항목 추가"""
+        # 여러 프로세스가 같은 문장을 합성해도 임시 파일 + 이름 변경으로 항목은 하나만 남음
+        file_name = f"{key[:2]}/{key}{self.engine.suffix}"
+        cached_path = self.cache_dir / file_name
+        temp_path = cached_path.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}{self.engine.suffix}")
+        temp_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            await self.engine.synthesize(text, str(temp_path), voice, rate, pitch, volume)
+            os.replace(temp_path, cached_path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        metadata = read_audio_metadata(str(cached_path))
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tts_audio (key, text, voice, engine, file_name, size, duration, "
+                "sample_rate, channels, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, text, voice, f"{self.engine.name}-{self.engine.version}", file_name,
+                 cached_path.stat().st_size, metadata['duration'], metadata['sample_rate'],
+                 metadata['channels'], now, now)
+            )
+        return dict(metadata, file_name=file_name)
+
+    async def synthesize_many(self, requests: List[TTSRequest], concurrency: int = TTS_CONCURRENCY,
+                              retries: int = TTS_MAX_RETRIES) -> List[Optional[Dict]]:
+        """여러 문장을 동시에 합성 (동시 실행 수 제한, 실패 시 재시도)
+
+        Returns:
+            요청 순서대로 synthesize() 결과 (재시도 후에도 실패하면 None)
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(request: TTSRequest) -> Optional[Dict]:
+            async with semaphore:
+                for attempt in range(retries + 1):
+                    try:
+                        return await self.synthesize(request.text, request.output_path, request.voice,
+                                                     request.rate, request.pitch, request.volume)
+                    except Exception as e:
+                        if attempt == retries:
+                            logger.error(f"TTS failed after {attempt + 1} attempts: {request.text[:30]!r}: {e}")
+                            return None
+                        delay = TTS_RETRY_BACKOFF * 2 ** attempt
+                        logger.warning(f"TTS failed ({request.text[:30]!r}), retrying in {delay:.1f}s: {e}")
+                        await asyncio.sleep(delay)
+
+        return await asyncio.gather(*(run(request) for request in requests))
+
+    async def prefetch(self, requests: List[TTSRequest]):
+        """캐시에 없는 문장을 미리 합성 (출력 파일 없음)"""
+        if not self.enabled or not requests:
+            return
+        started = time.time()
+        results = await self.synthesize_many([TTSRequest(r.text, None, r.voice, r.rate, r.pitch, r.volume)
+                                              for r in requests])
+        cached = sum(1 for r in results if r and r['cached'])
+        failed = sum(1 for r in results if r is None)
+        logger.info(f"TTS prefetch: {len(requests)} sentences ({cached} cached, {failed} failed) "
+                    f"in {time.time() - started:.1f}s")
+
+    def synthesize_sync(self, text: str, output_path: str, voice: str, rate: str = "+0%",
+                        pitch: str = "+0Hz", volume: str = "+0%") -> Optional[Dict]:
+        """동기 버전 (이벤트 루프가 없는 스레드에서 호출)"""
+        return asyncio.run(self.synthesize(text, output_path, voice, rate, pitch, volume))
+
+    def _evict(self, keep: Optional[str] = None):
+        """용량 초과 시 가장 오래 사용되지 않은 항목부터 제거"""
+        with self._connect() as conn:
+            total = conn.execute("SELECT IFNULL(SUM(size), 0) FROM tts_audio").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            cutoff = time.time() - EVICTION_GRACE_SECONDS
+            rows = conn.execute(
+                "SELECT key, file_name, size FROM tts_audio WHERE accessed_at < ? ORDER BY accessed_at",
+                (cutoff,)
+            ).fetchall()
+            for row in rows:
+                if total <= self.max_bytes:
+                    break
+                if row['key'] == keep:
+                    continue
+                try:
+                    (self.cache_dir / row['file_name']).unlink()
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM tts_audio WHERE key = ?", (row['key'],))
+                total -= row['size']
+                logger.debug(f"TTS cache evicted: {row['key'][:12]}")
+
+    def get_stats(self) -> Dict:
+        """캐시 통계 (적중률은 현재 프로세스 기준, 항목/누적 적중은 전체)"""
+        stats = {
+            "enabled": self.enabled,
+            "engine": f"{self.engine.name}-{self.engine.version}",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / (self.hits + self.misses), 3) if self.hits + self.misses else None,
+            "max_bytes": self.max_bytes,
+        }
+        if self.enabled:
+            with self._connect() as conn:
+                row = conn.execute("SELECT COUNT(*) AS n, IFNULL(SUM(size), 0) AS size, "
+                                   "IFNULL(SUM(hits), 0) AS hits FROM tts_audio").fetchone()
+            stats.update(entries=row['n'], total_bytes=row['size'], total_hits=row['hits'])
+        return stats
+
+
+_tts_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> TTSCache:
+    """프로세스 전역 TTSCache 인스턴스"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
+
+
+# 실행 중인 미리 합성 태스크 (가비지 컬렉션 방지)
+_prefetch_tasks = set()
+
+
+def schedule_prefetch(requests: List[TTSRequest]) -> Optional[asyncio.Task]:
+    """현재 이벤트 루프에서 백그라운드로 미리 합성 시작 (실패해도 작업에는 영향 없음)"""
+    cache = get_tts_cache()
+    if not cache.enabled or not requests:
+        return None
+
+    async def run():
+        try:
+            await cache.prefetch(requests)
+        except Exception as e:
+            logger.warning(f"TTS prefetch failed: {e}")
+
+    task = asyncio.get_running_loop().create_task(run())
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_tasks.discard)
+    return task
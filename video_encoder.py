@@ -1,7 +1,6 @@
 import subprocess
 import os
 import tempfile
-import json
 import signal
 import time
 import logging
@@ -9,7 +8,10 @@ from pathlib import Path
 from typing import List, Dict, Optional
 from subtitle_pipeline import SubtitlePipeline, SubtitleType
 from template_standards import TemplateStandards
-from deepl_translator import SubtitleTranslator
+from cpu_slots import get_cpu_scheduler, get_requested_threads, apply_thread_options, run_ffmpeg
+from ffmpeg_progress import run_with_progress
+from job_processes import JobCancelled
+from subtitle_index import get_episode_index
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +33,7 @@ class VideoEncoder:
                 "audio_codec": TemplateStandards.OUTPUT_AUDIO_CODEC,
                 "audio_bitrate": TemplateStandards.OUTPUT_AUDIO_BITRATE,
                 # 추가 품질 옵션
-                "x264opts": f"keyint={TemplateStandards.STANDARD_GOP_SIZE}:min-keyint=24:scenecut=40:threads=12:lookahead-threads=2:rc-lookahead=20:ref=3:bframes=3:b-adapt=1:me=hex:subme=7",
+                "x264opts": TemplateStandards.get_contract_x264opts("lookahead-threads=2:rc-lookahead=20:ref=3:b-adapt=1:me=hex:subme=7"),
                 "tune": "film"  # 영화/드라마에 최적화
             },
             "with_subtitle": {
@@ -46,11 +48,18 @@ class VideoEncoder:
                 "audio_codec": TemplateStandards.OUTPUT_AUDIO_CODEC,
                 "audio_bitrate": TemplateStandards.OUTPUT_AUDIO_BITRATE,
                 # 추가 품질 옵션
-                "x264opts": f"keyint={TemplateStandards.STANDARD_GOP_SIZE}:min-keyint=24:scenecut=40:threads=12:lookahead-threads=2:rc-lookahead=20:ref=3:bframes=3:b-adapt=1:me=hex:subme=7",
+                "x264opts": TemplateStandards.get_contract_x264opts("lookahead-threads=2:rc-lookahead=20:ref=3:b-adapt=1:me=hex:subme=7"),
                 "tune": "film"  # 영화/드라마에 최적화
             }
         }
         
+        # 클립 인코딩 시 그래프 안에서 추가할 리드인/갭 (초)
+        self._clip_lead_in = 0.0
+        self._clip_gap_after = 0.0
+        
+        # 인코더 스레드 수 (None이면 전체 스레드 예산 사용)
+        self._encode_threads = None
+        
         # Shadowing pattern 
         # Type 1: 무자막 2회, 영한자막 2회
         # Type 2: 무자막 2회, 키워드 공백 2회, 영한+노트 2회
@@ -60,49 +69,38 @@ class VideoEncoder:
             "both_subtitle": 2
         }
     
+    def _get_clip_pad_filters(self) -> tuple:
+        """현재 클립의 리드인/갭 필터 (tpad/adelay/apad)"""
+        return TemplateStandards.get_pad_filters(self._clip_lead_in, self._clip_gap_after)
+    
     def _run_ffmpeg_with_timeout(self, cmd: List[str], timeout: int = None) -> tuple:
         """Run FFmpeg command with timeout and proper cleanup"""
         if timeout is None:
             timeout = self.process_timeout
             
-        process = None
+        slot_lease = get_cpu_scheduler().acquire(get_requested_threads(cmd))
         try:
-            # Start process
-            process = subprocess.Popen(cmd, 
-                                     stdout=subprocess.PIPE, 
-                                     stderr=subprocess.PIPE,
-                                     text=True)
-            
-            # Wait for completion with timeout
-            stdout, stderr = process.communicate(timeout=timeout)
+            # 획득한 CPU 슬롯 수에 맞춰 스레드 설정
+            cmd = apply_thread_options(cmd, slot_lease.threads)
             
-            return process.returncode, stdout, stderr
+            # 진행 상황 기록 + 시간 초과 시 프로세스 종료는 run_with_progress에서 처리
+            result = run_with_progress(cmd, timeout=timeout)
+            return result.returncode, result.stdout, result.stderr
             
         except subprocess.TimeoutExpired:
             logger.error(f"FFmpeg process timed out after {timeout} seconds")
-            if process:
-                # Try graceful termination first
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    # Force kill if still running
-                    process.kill()
-                    process.wait()
             return -1, "", "Process timed out"
             
+        except JobCancelled:
+            # 취소는 실패(-1)로 바꾸지 않고 전달 - 대체 인코딩 경로를 시작하지 않도록
+            raise
+            
         except Exception as e:
             logger.error(f"FFmpeg process error: {str(e)}", exc_info=True)
-            if process and process.poll() is None:
-                process.kill()
-                process.wait()
             return -1, "", str(e)
             
         finally:
-            # Ensure process is cleaned up
-            if process and process.poll() is None:
-                process.kill()
-                process.wait()
+            slot_lease.release()
     
     def create_shadowing_video(self, media_path: str, ass_path: str, output_path: str, 
                               start_time: float = None, end_time: float = None,
@@ -137,28 +135,10 @@ class VideoEncoder:
                 if subtitle_data:
                     matching_subtitle = subtitle_data
                 else:
-                    # Load original translated subtitles to find matching subtitle
-                    translated_json = ass_path.replace('.ass', '_translated.json')
-                    if os.path.exists(translated_json):
-                        # DeepL 번역기를 사용하여 자막 로드 (text_en이 없으면 자동 번역)
-                        try:
-                            subtitle_translator = SubtitleTranslator()
-                            subtitles_data = subtitle_translator.load_and_translate_subtitles(translated_json)
-                        except Exception as e:
-                            logger.warning(f"Failed to use DeepL translator: {e}")
-                            # DeepL 사용 불가시 원본 파일 로드
-                            with open(translated_json, 'r', encoding='utf-8') as f:
-                                subtitles_data = json.load(f)
-                        
-                        # Find the subtitle that matches this time range
-                        # Use the original time range (without padding) to find the correct subtitle
-                        matching_subtitle = None
-                        for sub in subtitles_data:
-                            # Check if this subtitle's center point falls within our original time range
-                            sub_center = (sub['start_time'] + sub['end_time']) / 2
-                            if start_time <= sub_center <= end_time:
-                                matching_subtitle = sub
-                                break
+                    # 에피소드 자막 인덱스에서 찾기 (text_en이 없으면 자동 번역, 에피소드당 한 번만 로드)
+                    # Use the original time range (without padding) to find the correct subtitle
+                    index = get_episode_index(ass_path.replace('.ass', '_translated.json'))
+                    matching_subtitle = index.first_centered_in(start_time, end_time) if index else None
                 
                 if matching_subtitle:
                     # Generate ASS file with only this subtitle, adjusted for clip timing
@@ -237,6 +217,9 @@ class VideoEncoder:
             clip_number = Path(output_path).stem.split('_')[-1] if '_' in Path(output_path).stem else '0000'
             clip_index = 1
             
+            # 1.5s freeze-frame gap is added inside each clip's encode (tpad/apad)
+            self._clip_gap_after = 1.5
+            
             # 1. Create no-subtitle clips
             for i in range(self.pattern["no_subtitle"]):
                 temp_file = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
@@ -309,18 +292,22 @@ class VideoEncoder:
                 print(f"Created both subtitle clip {i+1}/{self.pattern['both_subtitle']}")
                 clip_index += 1
             
-            # 4. Concatenate all clips with 1.5s freeze frame gaps
-            if not self._concatenate_clips(temp_clips, output_path, gap_duration=1.5):
+            # 4. Concatenate all clips (gaps are already part of each clip)
+            if not self._concatenate_clips(temp_clips, output_path, gap_duration=0):
                 raise Exception("Failed to concatenate clips")
             
             print(f"Successfully created shadowing video: {output_path}")
             return True
             
+        except JobCancelled:
+            raise
         except Exception as e:
             print(f"Error creating shadowing video: {str(e)}")
             return False
             
         finally:
+            self._clip_gap_after = 0.0
+            
             # Clean up temporary files
             for temp_clip in temp_clips:
                 if os.path.exists(temp_clip):
@@ -349,12 +336,12 @@ class VideoEncoder:
         if start_time is not None:
             cmd.extend(['-ss', str(start_time)])
         
-        cmd.extend(['-i', input_path])
-        
-        # Duration if specified
+        # Duration if specified (input option so the in-graph gap is not cut off)
         if duration is not None:
             cmd.extend(['-t', str(duration)])
         
+        cmd.extend(['-i', input_path])
+        
         # Video filter for subtitles and scaling with aspect ratio preservation
         # Removed setsar=1 to preserve original pixel aspect ratio
         video_filter = f"scale={settings['width']}:{settings['height']}:force_original_aspect_ratio=decrease,pad={settings['width']}:{settings['height']}:(ow-iw)/2:(oh-ih)/2:black"
@@ -400,7 +387,14 @@ class VideoEncoder:
             escaped_path = escaped_path.replace(',', '\\,').replace("'", "\\'")
             video_filter = f"scale={settings['width']}:{settings['height']}:force_original_aspect_ratio=decrease,pad={settings['width']}:{settings['height']}:(ow-iw)/2:(oh-ih)/2:black,ass={escaped_path}"
         
+        # Freeze-frame gap / lead-in generated inside this encode
+        pad_v, pad_a = self._get_clip_pad_filters()
+        if pad_v:
+            video_filter += "," + ",".join(pad_v)
+        
         cmd.extend(['-vf', video_filter])
+        if pad_a:
+            cmd.extend(['-af', ','.join(pad_a)])
         
         # Video encoding settings
         cmd.extend([
@@ -418,6 +412,10 @@ class VideoEncoder:
         if 'x264opts' in settings:
             cmd.extend(['-x264opts', settings['x264opts']])
         
+        # 병합 계약: 고정 fps/closed GOP/timescale
+        cmd.extend(TemplateStandards.get_contract_video_options())
+        cmd.extend(['-threads', str(self._encode_threads or TemplateStandards.FFMPEG_THREAD_BUDGET)])
+        
         # Audio encoding settings
         cmd.extend([
             '-c:a', settings['audio_codec'],
@@ -455,246 +453,21 @@ class VideoEncoder:
             shutil.copy2(clip_paths[0], output_path)
             return True
         
-        # If no gap needed, use simple concat
+        # If no gap needed, stream-copy clips that meet the merge contract
+        # (non-compliant clips are re-encoded to the contract first)
         if gap_duration <= 0.0:
-            # Create concat file without gaps
-            concat_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
-            
-            try:
-                # Write file paths to concat file
-                for clip_path in clip_paths:
-                    # Escape path for concat demuxer
-                    escaped_path = clip_path.replace('\\', '/').replace("'", "'\\''")
-                    concat_file.write(f"file '{escaped_path}'\n")
-                
-                concat_file.close()
-                
-                # Build FFmpeg concat command
-                cmd = [
-                    'ffmpeg', '-y',
-                    '-f', 'concat',
-                    '-safe', '0',
-                    '-i', concat_file.name,
-                    '-c', 'copy',
-                    output_path
-                ]
-                
-                # Execute command
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    print(f"FFmpeg concat error: {result.stderr}")
-                    return False
-                
-                return True
-                
-            finally:
-                # Clean up concat file
-                if os.path.exists(concat_file.name):
-                    os.unlink(concat_file.name)
-        
-        # Create temp files list for cleanup
-        temp_freeze_files = []
-        
-        try:
-            # Get video info from first clip
-            probe_cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_streams', clip_paths[0]
-            ]
-            
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            if probe_result.returncode != 0:
-                print(f"Failed to probe video: {probe_result.stderr}")
-                return False
-            
-            import json
-            video_info = json.loads(probe_result.stdout)
-            video_stream = next(s for s in video_info['streams'] if s['codec_type'] == 'video')
-            width = video_stream['width']
-            height = video_stream['height']
-            
-            # Create concat file
-            concat_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
-            
-            # Write file paths to concat file with freeze frame gaps
-            for i, clip_path in enumerate(clip_paths):
-                # Escape path for concat demuxer
-                escaped_path = clip_path.replace('\\', '/').replace("'", "'\\''")
-                concat_file.write(f"file '{escaped_path}'\n")
-                
-                # Add freeze frame gap after each clip (including the last one)
-                if True:  # Always add gap, even after the last clip
-                    # Create freeze frame from current clip's last frame
-                    freeze_file = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
-                    freeze_file.close()
-                    temp_freeze_files.append(freeze_file.name)
-                    
-                    # Enhanced freeze frame creation with better compatibility
-                    # Step 1: Extract last frame as image
-                    last_frame_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-                    last_frame_file.close()
-                    temp_freeze_files.append(last_frame_file.name)
-                    
-                    extract_cmd = [
-                        'ffmpeg', '-y',
-                        '-sseof', '-0.1',  # Get from 0.1 second before end
-                        '-i', clip_path,
-                        '-vframes', '1',  # Extract single frame
-                        '-f', 'image2',
-                        last_frame_file.name
-                    ]
-                    
-                    extract_result = subprocess.run(extract_cmd, capture_output=True, text=True)
-                    
-                    if extract_result.returncode == 0:
-                        # Step 2: Create silent WAV file
-                        silence_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-                        silence_wav.close()
-                        temp_freeze_files.append(silence_wav.name)
-                        
-                        silence_cmd = [
-                            'ffmpeg', '-y',
-                            '-f', 'lavfi',
-                            '-i', f'anullsrc=channel_layout={TemplateStandards.SILENCE_CHANNEL_LAYOUT}:sample_rate={TemplateStandards.SILENCE_SAMPLE_RATE}',
-                            '-t', str(gap_duration),
-                            '-acodec', 'pcm_s16le',
-                            '-ar', str(TemplateStandards.SILENCE_SAMPLE_RATE),
-                            '-ac', str(TemplateStandards.SILENCE_CHANNELS),
-                            silence_wav.name
-                        ]
-                        
-                        silence_result = subprocess.run(silence_cmd, capture_output=True, text=True)
-                        
-                        # Step 3: Create video from still image with silent WAV
-                        freeze_cmd = [
-                            'ffmpeg', '-y',
-                            '-loop', '1',
-                            '-i', last_frame_file.name,
-                            '-i', silence_wav.name,
-                            '-t', str(gap_duration),
-                            '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2',
-                            '-c:v', TemplateStandards.STANDARD_VIDEO_CODEC,
-                            '-preset', TemplateStandards.STANDARD_VIDEO_PRESET,
-                            '-crf', str(TemplateStandards.STANDARD_VIDEO_CRF),
-                            '-pix_fmt', TemplateStandards.STANDARD_PIX_FMT,
-                            '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
-                            '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
-                            '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
-                            '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
-                            '-shortest',
-                            freeze_file.name
-                        ]
-                    else:
-                        # Fallback: use direct method
-                        freeze_cmd = [
-                            'ffmpeg', '-y',
-                            '-sseof', '-0.1',
-                            '-i', clip_path,
-                            '-t', str(gap_duration),
-                            '-vf', f'select=\'eq(n\\,0)\',scale={width}:{height},setpts=N/TB',
-                            '-af', f'anullsrc=channel_layout={TemplateStandards.SILENCE_CHANNEL_LAYOUT}:sample_rate={TemplateStandards.SILENCE_SAMPLE_RATE}',
-                            '-c:v', TemplateStandards.STANDARD_VIDEO_CODEC,
-                            '-preset', TemplateStandards.STANDARD_VIDEO_PRESET,
-                            '-crf', str(TemplateStandards.STANDARD_VIDEO_CRF),
-                            '-pix_fmt', TemplateStandards.STANDARD_PIX_FMT,
-                            '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
-                            '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
-                            '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
-                            '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
-                            freeze_file.name
-                        ]
-                    
-                    print(f"[DEBUG] Creating freeze frame {i+1} with duration {gap_duration}s")
-                    freeze_result = subprocess.run(freeze_cmd, capture_output=True, text=True)
-                    
-                    if freeze_result.returncode == 0:
-                        freeze_escaped = freeze_file.name.replace('\\', '/').replace("'", "'\\''")
-                        concat_file.write(f"file '{freeze_escaped}'\n")
-                        print(f"[DEBUG] Successfully created freeze frame: {freeze_file.name}")
-                    else:
-                        print(f"[ERROR] Freeze frame creation failed: {freeze_result.stderr}")
-                        print(f"[ERROR] Command was: {' '.join(freeze_cmd)}")
-                        
-                        # Try one more time with a simpler method
-                        # Create silent WAV first
-                        simple_silence_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-                        simple_silence_wav.close()
-                        temp_freeze_files.append(simple_silence_wav.name)
-                        
-                        simple_silence_cmd = [
-                            'ffmpeg', '-y',
-                            '-f', 'lavfi',
-                            '-i', f'anullsrc=channel_layout={TemplateStandards.SILENCE_CHANNEL_LAYOUT}:sample_rate={TemplateStandards.SILENCE_SAMPLE_RATE}',
-                            '-t', str(gap_duration),
-                            '-acodec', 'pcm_s16le',
-                            '-ar', str(TemplateStandards.SILENCE_SAMPLE_RATE),
-                            '-ac', str(TemplateStandards.SILENCE_CHANNELS),
-                            simple_silence_wav.name
-                        ]
-                        subprocess.run(simple_silence_cmd, capture_output=True, text=True)
-                        
-                        simple_freeze_cmd = [
-                            'ffmpeg', '-y',
-                            '-i', clip_path,
-                            '-i', simple_silence_wav.name,
-                            '-ss', '0',  # Take first frame instead
-                            '-t', str(gap_duration),
-                            '-vf', f'select=\'eq(n\\,0)\',scale={width}:{height}',
-                            '-map', '0:v',
-                            '-map', '1:a',
-                            '-c:v', TemplateStandards.STANDARD_VIDEO_CODEC,
-                            '-preset', TemplateStandards.STANDARD_VIDEO_PRESET,
-                            '-crf', str(TemplateStandards.STANDARD_VIDEO_CRF),
-                            '-pix_fmt', TemplateStandards.STANDARD_PIX_FMT,
-                            '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
-                            '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
-                            '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
-                            '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
-                            freeze_file.name
-                        ]
-                        
-                        simple_result = subprocess.run(simple_freeze_cmd, capture_output=True, text=True)
-                        if simple_result.returncode == 0:
-                            freeze_escaped = freeze_file.name.replace('\\', '/').replace("'", "'\\''")
-                            concat_file.write(f"file '{freeze_escaped}'\n")
-                            print(f"[DEBUG] Successfully created freeze frame with simple method")
-                        else:
-                            print(f"[ERROR] All freeze frame methods failed, skipping gap")
-            
-            concat_file.close()
-            
-            # Build FFmpeg concat command with audio re-encoding
-            cmd = [
-                'ffmpeg', '-y',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', concat_file.name,
-                '-c:v', 'copy',
-                '-c:a', TemplateStandards.OUTPUT_AUDIO_CODEC,
-                '-b:a', TemplateStandards.OUTPUT_AUDIO_BITRATE,
-                '-ar', str(TemplateStandards.OUTPUT_SAMPLE_RATE),
-                '-ac', str(TemplateStandards.OUTPUT_CHANNELS),
-                '-af', 'aresample=async=1:min_hard_comp=0.100000:first_pts=0',
-                output_path
-            ]
-            
-            # Execute command
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                print(f"FFmpeg concat error: {result.stderr}")
-                return False
-            
-            return True
-            
-        finally:
-            # Clean up temporary files
-            for freeze_file in temp_freeze_files:
-                if os.path.exists(freeze_file):
-                    os.unlink(freeze_file)
-            if 'concat_file' in locals() and os.path.exists(concat_file.name):
-                os.unlink(concat_file.name)
+            return TemplateStandards.merge_clips_by_contract(clip_paths, output_path)
+        
+        # Gaps are generated in one filter graph (tpad/apad) instead of
+        # per-gap frame extraction, silence and freeze-clip encodes
+        video_info = TemplateStandards.get_video_info(clip_paths[0])
+        resolution = None
+        if video_info.get('width') and video_info.get('height'):
+            resolution = (video_info['width'], video_info['height'])
+        
+        # Gap is added after every clip, including the last one
+        return TemplateStandards.concat_with_gaps(clip_paths, output_path, gap_duration,
+                                                  resolution=resolution, gap_after_last=True)
     
     def create_shadowing_video_efficient(self, media_path: str, ass_path: str, output_path: str, 
                                         start_time: float = None, end_time: float = None,
@@ -718,25 +491,10 @@ class VideoEncoder:
             temp_ass_file.close()
             
             try:
-                # Load original translated subtitles to find matching subtitle
-                translated_json = ass_path.replace('.ass', '_translated.json')
-                if os.path.exists(translated_json):
-                    # DeepL 번역기를 사용하여 자막 로드 (text_en이 없으면 자동 번역)
-                    try:
-                        subtitle_translator = SubtitleTranslator()
-                        subtitles_data = subtitle_translator.load_and_translate_subtitles(translated_json)
-                    except Exception as e:
-                        logger.warning(f"Failed to use DeepL translator: {e}")
-                        # DeepL 사용 불가시 원본 파일 로드
-                        with open(translated_json, 'r', encoding='utf-8') as f:
-                            subtitles_data = json.load(f)
-                    
-                    # Find the subtitle that matches this time range
-                    matching_subtitle = None
-                    for sub in subtitles_data:
-                        if (sub['start_time'] <= padded_end and sub['end_time'] >= padded_start):
-                            matching_subtitle = sub
-                            break
+                # 에피소드 자막 인덱스에서 구간과 겹치는 자막 찾기 (에피소드당 한 번만 로드)
+                index = get_episode_index(ass_path.replace('.ass', '_translated.json'))
+                if index is not None:
+                    matching_subtitle = index.first_overlapping(padded_start, padded_end)
                     
                     if matching_subtitle:
                         # Generate ASS file with only this subtitle
@@ -812,7 +570,7 @@ class VideoEncoder:
             ])
             
             # Execute command
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_ffmpeg(cmd)
             
             if result.returncode != 0:
                 print(f"FFmpeg error: {result.stderr}")
@@ -821,6 +579,8 @@ class VideoEncoder:
             print(f"Successfully created shadowing video: {output_path}")
             return True
             
+        except JobCancelled:
+            raise
         except Exception as e:
             print(f"Error creating shadowing video: {str(e)}")
             return False
@@ -830,14 +590,21 @@ class VideoEncoder:
             if 'temp_ass_file' in locals() and os.path.exists(temp_ass_file.name):
                 os.unlink(temp_ass_file.name)
 
-    def process_full_video(self, media_path: str, subtitles: List[Dict], 
+    def process_full_video(self, media_path: str, subtitles: Optional[List[Dict]], 
                           ass_path: str, output_dir: str, 
                           padding_before: float = 0.5, padding_after: float = 0.5) -> List[str]:
-        """Process full video into multiple shadowing clips"""
+        """Process full video into multiple shadowing clips
+        
+        subtitles가 None이면 에피소드 자막 인덱스(<ass 이름>_translated.json)의 전체 자막 사용
+        """
         
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
+        if subtitles is None:
+            index = get_episode_index(ass_path.replace('.ass', '_translated.json'))
+            subtitles = index.subtitles if index else []
+        
         created_files = []
         
         for i, sub in enumerate(subtitles):